@@ -0,0 +1,62 @@
+"""
+Full-recipe throughput of AsyncRecipeClient.get_recipes at 1/8/64
+concurrency versus the synchronous api_request loop used by 06_recipe.py.
+
+The stand-in server adds a fixed per-request latency so the run is
+latency-bound, like the real API.
+
+    python benchmarks/bench_async.py --recipes=500 --latency=0.02
+"""
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from client import RecipeClient
+from async_client import AsyncRecipeClient
+from mock_server import MockApi, MockApiServer
+import synthetic
+
+API_KEY = 'rapi_benchmark'
+
+def bench_sync(base_url, ids):
+    with RecipeClient(api_key=API_KEY, base_url=base_url) as client:
+        start = time.perf_counter()
+        for recipe_id in ids:
+            client.request(f'/api/v1/recipes/{recipe_id}')
+        return time.perf_counter() - start
+
+async def bench_async(base_url, ids, concurrency):
+    failures = 0
+    async with AsyncRecipeClient(api_key=API_KEY, base_url=base_url, concurrency=concurrency) as api:
+        start = time.perf_counter()
+        async for result in api.get_recipes(ids):
+            if result.error:
+                failures += 1
+        return time.perf_counter() - start, failures
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark async bulk recipe fetches')
+    parser.add_argument('--recipes', type=int, default=500, help='Recipes to fetch per run')
+    parser.add_argument('--latency', type=float, default=0.02, help='Server latency per request (s)')
+    args = parser.parse_args()
+
+    ids = [synthetic.recipe_id(i) for i in range(args.recipes)]
+    # A few unknown IDs, which must come back as per-item 404s
+    missing = ['rec_missing'] * max(1, args.recipes // 100)
+
+    with MockApiServer(MockApi(recipes=args.recipes, latency=args.latency)) as server:
+        elapsed = bench_sync(server.url, ids)
+        print(f"sync api_request      {args.recipes / elapsed:8,.0f} recipes/s")
+
+        for concurrency in (1, 8, 64):
+            elapsed, failures = asyncio.run(bench_async(server.url, ids + missing, concurrency))
+            rate = (len(ids) + len(missing)) / elapsed
+            print(f"async concurrency={concurrency:<3} {rate:8,.0f} recipes/s  ({failures} not found)")
+
+if __name__ == "__main__":
+    main()
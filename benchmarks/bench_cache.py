@@ -0,0 +1,63 @@
+"""
+Latency of repeat lookups with and without the on-disk ResponseCache, plus
+the cost of an ETag revalidation once entries expire.
+
+    python benchmarks/bench_cache.py --requests=200 --latency=0.02
+"""
+import sys
+import os
+import argparse
+import statistics
+import tempfile
+import time
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from cache import ResponseCache, DEFAULT_TTLS
+from client import RecipeClient
+from mock_server import MockApi, MockApiServer
+
+API_KEY = 'rapi_benchmark'
+ENDPOINTS = ['/api/v1/cuisines', '/api/v1/dietary-flags', '/api/v1/ingredient-categories']
+
+def timings(client, n):
+    samples = []
+    for i in range(n):
+        start = time.perf_counter()
+        client.request(ENDPOINTS[i % len(ENDPOINTS)])
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def report(name, samples):
+    samples = sorted(samples)
+    p50 = statistics.median(samples) * 1000
+    p95 = samples[int(len(samples) * 0.95)] * 1000
+    print(f"{name:<22} p50 {p50:8.3f}ms  p95 {p95:8.3f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the response cache')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per run')
+    parser.add_argument('--latency', type=float, default=0.02, help='Server latency per request (s)')
+    args = parser.parse_args()
+
+    api = MockApi(latency=args.latency)
+    with MockApiServer(api) as server, tempfile.TemporaryDirectory() as tmp:
+        with RecipeClient(api_key=API_KEY, base_url=server.url) as client:
+            report('no cache', timings(client, args.requests))
+
+        cache = ResponseCache(os.path.join(tmp, 'cache.sqlite3'))
+        with RecipeClient(api_key=API_KEY, base_url=server.url, cache=cache) as client:
+            hits_before = api.hits
+            report('cache (warm)', timings(client, args.requests))
+            stats = cache.stats()
+            print(f"{'':<22} hits {stats['hits']}  misses {stats['misses']}  upstream calls {api.hits - hits_before}")
+
+        # TTL of zero: every lookup is stale and revalidated with If-None-Match
+        expired = ResponseCache(os.path.join(tmp, 'expired.sqlite3'), ttls={k: 0 for k in DEFAULT_TTLS})
+        with RecipeClient(api_key=API_KEY, base_url=server.url, cache=expired) as client:
+            report('cache (revalidate)', timings(client, args.requests))
+            print(f"{'':<22} 304 revalidations {expired.stats()['revalidations']}")
+
+if __name__ == "__main__":
+    main()
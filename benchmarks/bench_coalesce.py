@@ -0,0 +1,115 @@
+"""
+Upstream calls and credits spent during a traffic spike of overlapping
+requests for popular recipes and searches, made at once from threads
+(RecipeClient) and asyncio tasks (AsyncRecipeClient), without request
+coalescing, with single-flight only, and with single-flight plus the
+micro-cache (src/coalesce.py).
+
+    python benchmarks/bench_coalesce.py --threads=16 --tasks=32 --requests=40 --latency=0.05
+"""
+import sys
+import os
+import argparse
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from async_client import AsyncRecipeClient
+from client import RecipeClient
+from coalesce import Coalescer
+from mock_server import MockApi, MockApiServer
+
+API_KEY = 'rapi_benchmark'
+SEARCHES = ['pasta', 'chicken', 'curry', 'salad', 'soup']
+
+def workload(workers, per_worker, popular, seed=0):
+    """Per-worker request lists skewed toward a few popular recipes and searches."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(popular)]
+    plans = []
+    for _ in range(workers):
+        plan = []
+        for _ in range(per_worker):
+            if rng.random() < 0.7:
+                recipe_id = f'rec_{rng.choices(range(popular), weights)[0]:07d}'
+                plan.append((f'/api/v1/recipes/{recipe_id}', None, recipe_id))
+            else:
+                plan.append(('/api/v1/recipes', {'q': rng.choice(SEARCHES), 'per_page': 10}, None))
+        plans.append(plan)
+    return plans
+
+def check(response, recipe_id):
+    if recipe_id is not None:
+        assert response['data']['id'] == recipe_id
+    else:
+        assert isinstance(response['data'], list)
+
+def run(server, coalescer, thread_plans, task_plans):
+    start_gate = threading.Barrier(len(thread_plans) + 1)
+
+    def thread_worker(client, plan):
+        start_gate.wait()
+        for endpoint, params, recipe_id in plan:
+            check(client.request(endpoint, params), recipe_id)
+
+    async def async_workers():
+        async with AsyncRecipeClient(api_key=API_KEY, base_url=server.url, concurrency=len(task_plans),
+                                     coalescer=coalescer) as api:
+            async def task_worker(plan):
+                for endpoint, params, recipe_id in plan:
+                    check(await api.request(endpoint, params), recipe_id)
+
+            await asyncio.get_running_loop().run_in_executor(None, start_gate.wait)
+            await asyncio.gather(*(task_worker(plan) for plan in task_plans))
+
+    hits, credits = server.api.hits, server.api.monthly_remaining
+    with RecipeClient(api_key=API_KEY, base_url=server.url, pool_size=len(thread_plans),
+                      coalescer=coalescer) as client, \
+            ThreadPoolExecutor(len(thread_plans) + 1) as pool:
+        start = time.perf_counter()
+        futures = [pool.submit(thread_worker, client, plan) for plan in thread_plans]
+        futures.append(pool.submit(asyncio.run, async_workers()))
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - start
+    return server.api.hits - hits, credits - server.api.monthly_remaining, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark request coalescing under a concurrent spike')
+    parser.add_argument('--threads', type=int, default=16, help='Threads sharing one RecipeClient')
+    parser.add_argument('--tasks', type=int, default=32, help='Asyncio tasks sharing one AsyncRecipeClient')
+    parser.add_argument('--requests', type=int, default=40, help='Requests per thread or task')
+    parser.add_argument('--popular', type=int, default=20, help='Distinct recipe IDs in the spike')
+    parser.add_argument('--latency', type=float, default=0.05, help='Server latency per request (seconds)')
+    args = parser.parse_args()
+
+    plans = workload(args.threads + args.tasks, args.requests, args.popular)
+    thread_plans, task_plans = plans[:args.threads], plans[args.threads:]
+    total = sum(map(len, plans))
+    print(f"{total:,} requests from {args.threads} threads and {args.tasks} asyncio tasks, "
+          f"{args.latency * 1000:.0f}ms server latency\n")
+    print(f"  {'':<30}{'upstream':>10}{'credits':>9}{'time':>9}")
+
+    rows = [
+        ('no coalescing', lambda: None),
+        ('single-flight', lambda: Coalescer(ttl=0)),
+        ('single-flight + 1s cache', lambda: Coalescer(ttl=1.0)),
+    ]
+    api = MockApi(recipes=1000, latency=args.latency, monthly_credits=10 ** 9, daily_credits=10 ** 9)
+    with MockApiServer(api) as server:
+        for name, make in rows:
+            coalescer = make()
+            upstream, credits, elapsed = run(server, coalescer, thread_plans, task_plans)
+            print(f"  {name:<30}{upstream:10,}{credits:9,}{elapsed:8.2f}s")
+            if coalescer:
+                stats = coalescer.stats()
+                assert stats['upstream'] == upstream and stats['in_flight'] == 0
+                print(f"  {'':<30}{stats['coalesced']:,} joined an in-flight call, {stats['hits']:,} served from cache")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+ISO 8601 duration parsing and formatting in src/duration.py versus the
+previous utils.format_duration (regex looked up per call, no memo) and an
+uncached per-value regex parse, plus the vectorized parse_durations path.
+
+    python benchmarks/bench_duration.py --values=1000000
+"""
+import sys
+import os
+import argparse
+import random
+import re
+import time
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from duration import humanize_duration, parse_duration, parse_durations
+import synthetic
+
+def old_format_duration(iso_duration):
+    # utils.format_duration before src/duration.py
+    if not iso_duration.startswith('PT'):
+        return iso_duration
+    match = re.match(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?', iso_duration)
+    if not match:
+        return iso_duration
+    hours = int(match.group(1) or 0)
+    minutes = int(match.group(2) or 0)
+    if hours == 0 and minutes == 0:
+        return 'instant'
+    if hours == 0:
+        return f"{minutes} min"
+    if minutes == 0:
+        return f"{hours}h"
+    return f"{hours}h {minutes}m"
+
+_DURATION = re.compile(r'P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$')
+
+def uncached_seconds(iso_duration):
+    # The per-call parse query.py used
+    match = _DURATION.match(iso_duration or '')
+    if not match:
+        return 0
+    days, hours, minutes, seconds = (int(g or 0) for g in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+def ns_per_value(fn, values, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(values)
+        best = min(best, time.perf_counter() - start)
+    return best / len(values) * 1e9
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ISO 8601 duration parsing and formatting')
+    parser.add_argument('--values', type=int, default=1000000, help='Durations per run')
+    args = parser.parse_args()
+
+    # Catalog-like mix: recipe totals and step durations
+    rng = random.Random(0)
+    values = [synthetic.iso_duration(rng.choice([rng.randint(1, 40), rng.randint(5, 600)])) for _ in range(args.values)]
+    print(f"{args.values:,} durations, {len(set(values)):,} distinct\n")
+
+    assert [old_format_duration(v) for v in values[:1000]] == [humanize_duration(v) for v in values[:1000]]
+    assert [uncached_seconds(v) for v in values[:1000]] == parse_durations(values[:1000]).tolist()
+
+    rows = [
+        ('format  old utils.format_duration', lambda vs: [old_format_duration(v) for v in vs]),
+        ('format  humanize_duration (memoized)', lambda vs: [humanize_duration(v) for v in vs]),
+        ('seconds uncached regex', lambda vs: [uncached_seconds(v) for v in vs]),
+        ('seconds parse_duration (memoized)', lambda vs: [parse_duration(v) for v in vs]),
+        ('seconds parse_durations (array)', parse_durations),
+    ]
+    baseline = {}
+    for name, fn in rows:
+        ns = ns_per_value(fn, values)
+        kind = name.split()[0]
+        baseline.setdefault(kind, ns)
+        print(f"  {name:<40}{ns:8.1f} ns/value  {baseline[kind] / ns:5.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Bulk catalog export (src/export.py) from the stand-in server: rows/s and
+peak memory for a serial baseline (iter_recipes decoding every page in the
+calling process, flattening and writing one gzip csv per table) versus
+CatalogExport on one process and on a worker pool.
+
+Each configuration runs in a fresh child process; peak memory is that
+process's high-water RSS plus the largest worker's.
+
+    python benchmarks/bench_export.py --recipes=1000000 --processes=4
+"""
+import sys
+import os
+import argparse
+import copy
+import csv
+import gzip
+import json
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(BENCHMARKS), 'src'))
+
+API_KEY = 'rapi_benchmark'
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    if who == resource.RUSAGE_SELF:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    return resource.getrusage(who).ru_maxrss / 1024
+
+def serial_export(client, out_dir, max_items):
+    """Baseline: one process decodes, flattens and writes everything, page by page."""
+    from client import iter_ingredients, iter_recipes
+    from export import GZIP_LEVEL, TABLES, flatten_ingredient, flatten_recipe
+
+    names = ('recipes', 'recipe_flags', 'ingredients')
+    files = {name: gzip.open(os.path.join(out_dir, f'{name}.csv.gz'), 'wt', compresslevel=GZIP_LEVEL, newline='')
+             for name in names}
+    writers = {name: csv.writer(f, lineterminator='\n') for name, f in files.items()}
+    counts = dict.fromkeys(names, 0)
+    for name in names:
+        writers[name].writerow(TABLES[name])
+
+    def drain(tables):
+        for name, rows in tables.items():
+            writers[name].writerows(rows)
+            counts[name] += len(rows)
+            rows.clear()
+
+    tables = {'recipes': [], 'recipe_flags': []}
+    for recipe in iter_recipes(max_items, per_page=1000, client=client):
+        flatten_recipe(recipe, tables)
+        if len(tables['recipes']) >= 1000:
+            drain(tables)
+    drain(tables)
+    tables = {'ingredients': []}
+    for ingredient in iter_ingredients(max_items, per_page=1000, client=client):
+        flatten_ingredient(ingredient, tables)
+    drain(tables)
+    for f in files.values():
+        f.close()
+    return counts
+
+def child(mode, processes, url, max_items):
+    from client import RecipeClient
+    from export import CatalogExport
+
+    out_dir = tempfile.mkdtemp(prefix='bench_export_')
+    client = RecipeClient(api_key=API_KEY, base_url=url)
+    try:
+        start = time.perf_counter()
+        if mode == 'serial':
+            rows = serial_export(client, out_dir, max_items)
+        else:
+            manifest = CatalogExport(out_dir, processes=processes, max_items=max_items, client=client).run()
+            rows = {name: table['rows'] for name, table in manifest['tables'].items()}
+        elapsed = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(out_dir) for f in fs)
+    finally:
+        client.close()
+        shutil.rmtree(out_dir)
+    print(json.dumps({
+        'elapsed': elapsed, 'rows': rows, 'bytes': size,
+        'rss': peak_rss_mb(), 'worker_rss': peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }))
+
+def run_child(mode, processes, url, max_items):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', mode, str(processes), url, str(max_items)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the process-pool catalog export')
+    parser.add_argument('--recipes', type=int, default=1_000_000, help='Catalog size served by the stand-in server')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help='Pool size for the parallel run')
+    parser.add_argument('--child', nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, processes, url, max_items = args.child
+        child(mode, int(processes), url, int(max_items))
+        return
+
+    sys.path.append(BENCHMARKS)
+    from mock_server import MockApi, MockApiServer
+    import synthetic
+
+    class FastCatalog(MockApi):
+        """List pages copied from a pool of generated summaries with fresh IDs, so the server keeps up."""
+
+        def __init__(self, **options):
+            super().__init__(**options)
+            self.pool = [synthetic.recipe_summary(i) for i in range(min(self.recipes, 5000))]
+
+        def summary(self, index):
+            recipe = copy.copy(self.pool[index % len(self.pool)])
+            recipe['id'] = synthetic.recipe_id(index)
+            return recipe
+
+        def recipe_list(self, query):
+            if set(query) <= {'page', 'per_page'}:
+                start = (int(query.get('page', 1)) - 1) * int(query.get('per_page', 10))
+                end = min(start + int(query.get('per_page', 10)), self.recipes)
+                return 200, {'data': [self.summary(i) for i in range(start, end)],
+                             'meta': {'page': int(query.get('page', 1)), 'per_page': int(query.get('per_page', 10)),
+                                      'total': self.recipes}}
+            return super().recipe_list(query)
+
+    configs = [('serial', 1), ('export', 1)]
+    if args.processes > 1:
+        configs.append(('export', args.processes))
+    print(f"{args.recipes:,} recipes, list pages of 1,000, gzip csv, {os.cpu_count()} CPU(s)\n")
+    print(f"  {'configuration':<26}{'rows':>11}{'time':>9}{'rows/s':>11}{'output':>10}{'peak RSS':>17}")
+
+    with MockApiServer(FastCatalog(recipes=args.recipes)) as server:
+        for mode, processes in configs:
+            result = run_child(mode, processes, server.url, args.recipes)
+            rows = sum(result['rows'].values())
+            name = 'serial iter_recipes' if mode == 'serial' else \
+                f"CatalogExport, {processes} proc{'s' if processes > 1 else ''}"
+            workers = f" + {result['worker_rss']:.0f}/worker" if processes > 1 else ''
+            print(f"  {name:<26}{rows:>11,}{result['elapsed']:8.1f}s{rows / result['elapsed']:>11,.0f}"
+                  f"{result['bytes'] / 1e6:8.1f}MB{result['rss']:9.0f} MB{workers}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Memory per recipe and analytics speed of RecipeFrame versus plain
+list-of-dicts processing of list-page recipes.
+
+    python benchmarks/bench_frame.py --recipes=200000
+"""
+import sys
+import os
+import argparse
+import re
+import time
+import tracemalloc
+from collections import defaultdict
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from frame import RecipeFrame
+import synthetic
+
+def minutes(iso_duration):
+    match = re.match(r'PT(?:(\d+)H)?(?:(\d+)M)?', iso_duration)
+    return int(match.group(1) or 0) * 60 + int(match.group(2) or 0)
+
+def dicts_analytics(recipes):
+    # Mean calories per cuisine for quick vegan recipes, plus top 10 by protein
+    sums, counts = defaultdict(float), defaultdict(int)
+    quick = []
+    for recipe in recipes:
+        if 'Vegan' in recipe['dietary']['flags'] and minutes(recipe['meta']['total_time']) <= 30:
+            sums[recipe['cuisine']] += recipe['nutrition_summary']['calories']
+            counts[recipe['cuisine']] += 1
+            quick.append(recipe)
+    top = sorted(quick, key=lambda r: r['nutrition_summary']['protein_g'], reverse=True)[:10]
+    return {c: sums[c] / counts[c] for c in sums}, [r['id'] for r in top]
+
+def frame_analytics(frame):
+    quick = frame[frame.mask(dietary='Vegan', total_time=(None, 30 * 60))]
+    top = quick.top_k('protein_g', 10)
+    return quick.group_mean('calories', by='cuisine'), [str(i) for i in quick.ids[top]]
+
+def timed(fn, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the columnar RecipeFrame')
+    parser.add_argument('--recipes', type=int, default=200_000, help='Catalog size')
+    args = parser.parse_args()
+
+    # Fully distinct recipes, so dict memory isn't flattered by shared objects
+    tracemalloc.start()
+    recipes = [synthetic.recipe_summary(i) for i in range(min(args.recipes, 50_000))]
+    dict_bytes = tracemalloc.get_traced_memory()[0] / len(recipes)
+    tracemalloc.stop()
+    recipes = list(synthetic.recipe_summaries(args.recipes, distinct=len(recipes)))
+
+    start = time.perf_counter()
+    frame = RecipeFrame.from_recipes(recipes)
+    build = time.perf_counter() - start
+
+    print(f"{len(recipes):,} recipes (frame built in {build:.2f}s)")
+    print(f"memory per recipe: dicts {dict_bytes:,.0f} B, frame {frame.nbytes / len(frame):,.0f} B")
+
+    dict_time, (dict_means, dict_top) = timed(lambda: dicts_analytics(recipes))
+    frame_time, (frame_means, frame_top) = timed(lambda: frame_analytics(frame))
+    assert set(dict_means) == set(frame_means)
+    assert all(abs(dict_means[c] - frame_means[c]) < 0.01 * dict_means[c] for c in dict_means)
+
+    print(f"filter + group mean + top-10: dicts {dict_time * 1000:,.1f}ms, "
+          f"frame {frame_time * 1000:,.1f}ms ({dict_time / frame_time:,.0f}x)")
+
+if __name__ == "__main__":
+    main()
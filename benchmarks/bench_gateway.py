@@ -0,0 +1,196 @@
+"""
+Load test for the local gateway (src/gateway.py): N worker processes, each
+with its own RecipeClient, run the same mixed workload either straight
+against the API (the stand-in server) or through one gateway process.
+Reports aggregate throughput and how many calls reached the API.
+
+    python benchmarks/bench_gateway.py --workers=8 --requests=200 --latency=0.05
+"""
+import sys
+import os
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import tempfile
+import time
+import urllib.request
+from multiprocessing import Pool
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+# Add src directory to path
+sys.path.append(SRC)
+
+from cache import ResponseCache
+from client import RecipeApiError, RecipeClient
+from mock_server import MockApi, MockApiServer
+
+API_KEY = 'rapi_benchmark'
+LOOKUPS = ['/api/v1/cuisines', '/api/v1/dietary-flags', '/api/v1/ingredient-categories']
+
+def workload(seed, n, popular):
+    """A worker's requests: list pages, lookups, and full recipes skewed toward popular IDs."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(popular)]
+    plan = []
+    for _ in range(n):
+        roll = rng.random()
+        if roll < 0.4:
+            plan.append(('/api/v1/recipes', {'page': rng.randint(1, 10), 'per_page': 20}))
+        elif roll < 0.55:
+            plan.append((rng.choice(LOOKUPS), None))
+        else:
+            index = rng.choices(range(popular), weights)[0]
+            plan.append((f'/api/v1/recipes/rec_{index:07d}', None))
+    return plan
+
+def worker(job):
+    base_url, seed, n, popular = job
+    errors = 0
+    with RecipeClient(api_key=API_KEY, base_url=base_url) as client:
+        start = time.perf_counter()
+        for endpoint, params in workload(seed, n, popular):
+            try:
+                client.request(endpoint, params)
+            except RecipeApiError:
+                errors += 1
+        return time.perf_counter() - start, errors
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_gateway(upstream, cache_path):
+    port = free_port()
+    env = {**os.environ, 'RECIPE_API_KEY': API_KEY}
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(SRC, 'scripts', '11_gateway.py'), '--port', str(port),
+         '--upstream', upstream, '--cache', cache_path],
+        env=env, stdout=subprocess.DEVNULL,
+    )
+    url = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f'{url}/gateway/stats')
+            return process, url
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError('gateway did not start')
+
+class SlowCache(ResponseCache):
+    """A ResponseCache on a slow disk: every read and write takes `delay` seconds longer."""
+
+    def __init__(self, path, delay):
+        super().__init__(path)
+        self.delay = delay
+
+    def get(self, *args, **kwargs):
+        time.sleep(self.delay)
+        return super().get(*args, **kwargs)
+
+    def put(self, *args, **kwargs):
+        time.sleep(self.delay)
+        return super().put(*args, **kwargs)
+
+async def stalled_for(upstream, cache_path, requests, delay):
+    """
+    Worst /metrics latency while `requests` distinct full recipes go
+    through an in-process gateway whose cache takes `delay` seconds per
+    call. If cache I/O ran on the event loop, every probe would wait behind
+    the queued cache calls.
+    """
+    import aiohttp
+    from aiohttp import web
+    from gateway import Gateway
+
+    gateway = Gateway(upstream=upstream, api_key=API_KEY, cache=SlowCache(cache_path, delay))
+    runner = web.AppRunner(gateway.app)
+    await runner.setup()
+    port = free_port()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+    url = f'http://127.0.0.1:{port}'
+    try:
+        # Probes get their own session, so they never wait for one of the load's connections
+        async with aiohttp.ClientSession() as session, aiohttp.ClientSession() as probe_session:
+            async def fetch(path, session=session):
+                start = time.perf_counter()
+                async with session.get(f'{url}{path}') as response:
+                    await response.read()
+                return time.perf_counter() - start
+
+            load = asyncio.gather(*(fetch(f'/api/v1/recipes/rec_{i:07d}') for i in range(requests)))
+            await asyncio.sleep(delay)
+            probes = [await fetch('/metrics', probe_session) for _ in range(5)]
+            await load
+    finally:
+        await runner.cleanup()
+    return max(probes)
+
+def run(base_url, args, api):
+    hits, credits, limited = api.hits, api.monthly_remaining, api.rate_limited
+    jobs = [(base_url, seed, args.requests, args.popular) for seed in range(args.workers)]
+    start = time.perf_counter()
+    with Pool(args.workers) as pool:
+        results = pool.map(worker, jobs)
+    elapsed = time.perf_counter() - start
+    return {
+        'elapsed': elapsed,
+        'errors': sum(e for _, e in results),
+        'upstream': api.hits - hits,
+        'credits': credits - api.monthly_remaining,
+        'rate_limited': api.rate_limited - limited,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the local API gateway')
+    parser.add_argument('--workers', type=int, default=8, help='Simulated worker processes')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per worker')
+    parser.add_argument('--popular', type=int, default=200, help='Distinct full recipes requested')
+    parser.add_argument('--latency', type=float, default=0.05, help='API latency per request (seconds)')
+    parser.add_argument('--rate_limit', type=int, help='API requests/sec before it answers 429')
+    parser.add_argument('--cache_delay', type=float, default=0.005, help='Added seconds per cache call in the concurrency check')
+    args = parser.parse_args()
+
+    total = args.workers * args.requests
+    print(f"{args.workers} workers x {args.requests} requests = {total:,}, "
+          f"{args.latency * 1000:.0f}ms API latency\n")
+    print(f"  {'':<18}{'req/s':>9}{'upstream':>10}{'credits':>9}{'429s':>7}{'errors':>8}")
+
+    api = MockApi(recipes=1000, latency=args.latency, rate_limit=args.rate_limit,
+                  monthly_credits=10 ** 9, daily_credits=10 ** 9)
+    with MockApiServer(api) as server, tempfile.TemporaryDirectory() as tmp:
+        rows = [('direct', lambda: (None, server.url))]
+        rows.append(('via gateway', lambda: start_gateway(server.url, os.path.join(tmp, 'gateway.sqlite3'))))
+        for name, start in rows:
+            process, url = start()
+            try:
+                result = run(url, args, api)
+                if process:
+                    stats = json.load(urllib.request.urlopen(f'{url}/gateway/stats'))
+            finally:
+                if process:
+                    process.terminate()
+                    process.wait()
+            print(f"  {name:<18}{total / result['elapsed']:9,.0f}{result['upstream']:10,}{result['credits']:9,}"
+                  f"{result['rate_limited']:7,}{result['errors']:8,}")
+        cache = stats['cache']
+        print(f"\n  gateway: {stats['coalescer']['coalesced']:,} coalesced, {stats['coalescer']['hits']:,} micro-cache hits, "
+              f"{cache['hits']:,} cache hits, {cache['revalidations']:,} revalidations")
+
+        # Cache I/O must not hold up the event loop: with N calls queued on
+        # the loop, a probe would wait about N x cache_delay
+        concurrent = 200
+        stalled = asyncio.run(stalled_for(server.url, os.path.join(tmp, 'slow.sqlite3'), concurrent, args.cache_delay))
+        blocked = concurrent * args.cache_delay
+        print(f"\n  concurrency: /metrics took at most {stalled * 1000:.0f}ms during {concurrent} misses "
+              f"with a {args.cache_delay * 1000:.0f}ms cache ({blocked * 1000:.0f}ms if cache I/O blocked the loop)")
+        if stalled > blocked / 4:
+            print('  [X] cache I/O is stalling the gateway\'s event loop')
+
+if __name__ == "__main__":
+    main()
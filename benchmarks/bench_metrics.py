@@ -0,0 +1,99 @@
+"""
+Per-request cost of the instrumentation hooks in src/metrics.py: no hooks
+(instrumentation disabled), a MetricsRegistry, and a registry plus spans.
+Measured in-process on responses served from memory, where any overhead
+shows up undiluted, and end to end against the local stand-in server.
+
+    python benchmarks/bench_metrics.py --requests=200000 --server_requests=2000
+"""
+import sys
+import os
+import argparse
+import statistics
+import time
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from client import RecipeClient
+from coalesce import Coalescer
+from metrics import MetricsRegistry, SpanHooks
+from mock_server import MockApi, MockApiServer
+
+API_KEY = 'rapi_benchmark'
+ENDPOINT = '/api/v1/cuisines'
+
+class Span:
+    # Minimal stand-in for an OpenTelemetry span that records nothing
+    def set_attribute(self, key, value):
+        pass
+
+    def record_exception(self, error):
+        pass
+
+    def end(self):
+        pass
+
+class Tracer:
+    def start_span(self, name, attributes=None):
+        return Span()
+
+CONFIGS = [
+    ('disabled (no hooks)', lambda: []),
+    ('MetricsRegistry', lambda: [MetricsRegistry()]),
+    ('MetricsRegistry + spans', lambda: [MetricsRegistry(), SpanHooks(Tracer())]),
+]
+
+BATCH = 1000
+
+def best_batch(calls, n):
+    """Best per-request time of each call over batches of BATCH, interleaved so drift affects all alike."""
+    best = [float('inf')] * len(calls)
+    for _ in range(max(1, n // BATCH)):
+        for i, call in enumerate(calls):
+            start = time.perf_counter()
+            for _ in range(BATCH):
+                call(ENDPOINT, None)
+            best[i] = min(best[i], (time.perf_counter() - start) / BATCH)
+    return best
+
+def median_each(calls, n):
+    """Median latency of each call, taking turns request by request."""
+    samples = [[] for _ in calls]
+    for _ in range(n):
+        for i, call in enumerate(calls):
+            start = time.perf_counter()
+            call(ENDPOINT, None)
+            samples[i].append(time.perf_counter() - start)
+    return [statistics.median(s) for s in samples]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark instrumentation overhead')
+    parser.add_argument('--requests', type=int, default=200000, help='In-memory requests per config')
+    parser.add_argument('--server_requests', type=int, default=2000, help='Requests per config against the server')
+    args = parser.parse_args()
+
+    with MockApiServer(MockApi()) as server:
+        # A long-lived micro-cache answers every repeat without touching the network
+        memory_clients = [RecipeClient(api_key=API_KEY, base_url=server.url, coalescer=Coalescer(ttl=3600),
+                                       hooks=make_hooks()) for _, make_hooks in CONFIGS]
+        network_clients = [RecipeClient(api_key=API_KEY, base_url=server.url, hooks=make_hooks())
+                           for _, make_hooks in CONFIGS]
+        for client in memory_clients + network_clients:
+            client.request(ENDPOINT)
+
+        # The request path with no instrumentation code at all, as the baseline
+        names = ['uninstrumented'] + [name for name, _ in CONFIGS]
+        memory = best_batch([memory_clients[0]._request] + [c.request for c in memory_clients], args.requests)
+        network = median_each([network_clients[0]._request] + [c.request for c in network_clients],
+                              args.server_requests)
+        for client in memory_clients + network_clients:
+            client.close()
+
+    print(f"  {'':<26}{'in-memory':>12}{'overhead':>11}{'server p50':>12}{'overhead':>10}")
+    for name, m, n in zip(names, memory, network):
+        print(f"  {name:<26}{m * 1e6:9.2f} us{(m - memory[0]) * 1e9:+8.0f}ns"
+              f"{n * 1e6:9.0f} us{(n / network[0] - 1) * 100:+9.1f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Offline mirror: time for a first sync and an incremental re-sync, then
+filter-query latency against the API (stand-in server with network-like
+latency) versus the local mirror.
+
+    python benchmarks/bench_mirror.py --recipes=5000 --latency=0.05
+"""
+import sys
+import os
+import argparse
+import statistics
+import tempfile
+import time
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from client import RecipeClient
+from mirror import Mirror, MirrorClient
+from mock_server import MockApi, MockApiServer
+
+API_KEY = 'rapi_benchmark'
+QUERIES = [
+    {'cuisine': 'Italian'},
+    {'dietary': 'Vegan', 'max_calories': 400},
+    {'category': 'Dessert', 'cuisine': 'French'},
+    {'difficulty': 'Beginner', 'min_protein': 30},
+    {'q': 'garlic'},
+]
+
+def query_latency(client, runs):
+    samples = []
+    for _ in range(runs):
+        for params in QUERIES:
+            start = time.perf_counter()
+            client.request('/api/v1/recipes', {**params, 'per_page': 10})
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the offline mirror')
+    parser.add_argument('--recipes', type=int, default=5000, help='Catalog size')
+    parser.add_argument('--latency', type=float, default=0.05, help='Server latency per request (s)')
+    parser.add_argument('--runs', type=int, default=5, help='Query rounds')
+    args = parser.parse_args()
+
+    api = MockApi(recipes=args.recipes, ingredients=args.recipes // 5, latency=args.latency)
+    with MockApiServer(api) as server, tempfile.TemporaryDirectory() as tmp, \
+            RecipeClient(api_key=API_KEY, base_url=server.url) as client:
+        mirror = Mirror(os.path.join(tmp, 'mirror.sqlite3'))
+
+        for name in ('first sync', 're-sync'):
+            start = time.perf_counter()
+            stats = mirror.sync(client)
+            print(f"{name:<11} {time.perf_counter() - start:6.2f}s  "
+                  f"recipe pages changed {stats['recipes']['changed_pages']}/{stats['recipes']['pages']}")
+
+        online = query_latency(client, args.runs)
+        offline = query_latency(MirrorClient(mirror), args.runs)
+        print(f"\nfilter query p50: API {online:.1f}ms, mirror {offline:.2f}ms ({online / offline:.0f}x)")
+
+if __name__ == "__main__":
+    main()
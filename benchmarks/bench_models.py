@@ -0,0 +1,101 @@
+"""
+Memory footprint, construction time and attribute access cost of the
+`__slots__` models in src/models.py versus the plain dicts json.loads
+returns, for list-page and full recipes.
+
+    python benchmarks/bench_models.py --summaries=200000 --recipes=20000
+"""
+import sys
+import os
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from models import Recipe, RecipeSummary
+import synthetic
+
+def retained(build):
+    """(objects, bytes still allocated by `build` once it returns)."""
+    gc.collect()
+    tracemalloc.start()
+    objects = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return objects, size
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def report(label, count, size, elapsed):
+    print(f"  {label:<28}{size / count:9,.0f} B/recipe{elapsed / count * 1e6:10.2f}us")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark typed models against raw dicts')
+    parser.add_argument('--summaries', type=int, default=200000, help='List-page recipes held in memory')
+    parser.add_argument('--recipes', type=int, default=20000, help='Full recipes held in memory')
+    args = parser.parse_args()
+
+    # Decode from JSON text so the dicts hold their own strings, as API responses do
+    summaries = [json.dumps(synthetic.recipe_summary(i)) for i in range(args.summaries)]
+    full = [json.dumps(synthetic.full_recipe(i)) for i in range(args.recipes)]
+
+    for label, lines, model in (('list-page', summaries, RecipeSummary), ('full', full, Recipe)):
+        count = len(lines)
+        print(f"{count:,} {label} recipes{'':14}{'memory':>9}{'':9}{'build':>10}")
+        dicts, dict_size = retained(lambda: [json.loads(s) for s in lines])
+        report('dicts (json.loads)', count, dict_size, timed(lambda: [json.loads(s) for s in lines], 1))
+        models, model_size = retained(lambda: [model.from_json(json.loads(s)) for s in lines])
+        report(f'{model.__name__}.from_json', count, model_size,
+               timed(lambda: [model.from_json(json.loads(s)) for s in lines], 1))
+        if model is Recipe:
+            def parse_all():
+                for recipe in models:
+                    for group in recipe.ingredients:
+                        group.items
+                    recipe.instructions, recipe.equipment, recipe.nutrition
+            parsed = timed(parse_all, 1)
+            gc.collect()
+            tracemalloc.start()
+            models = [model.from_json(json.loads(s)) for s in lines]
+            parse_all()
+            gc.collect()
+            report('  ... every section parsed', count, tracemalloc.get_traced_memory()[0], parsed)
+            tracemalloc.stop()
+        print(f"  {dict_size / model_size:.1f}x less memory\n")
+
+        print(f"  attribute access (ns per read){'':6}{'dict':>8}{'model':>8}")
+        if model is RecipeSummary:
+            reads = [
+                ('protein', lambda: [r['nutrition_summary']['protein_g'] for r in dicts],
+                 lambda: [r.nutrition_summary.protein_g for r in models]),
+                ('total_time', lambda: [r['meta']['total_time'] for r in dicts],
+                 lambda: [r.meta.total_time for r in models]),
+                ('cuisine', lambda: [r['cuisine'] for r in dicts], lambda: [r.cuisine for r in models]),
+            ]
+        else:
+            reads = [
+                ('ingredient names', lambda: [i['name'] for r in dicts for g in r['ingredients'] for i in g['items']],
+                 lambda: [i.name for r in models for g in r.ingredients for i in g.items]),
+                ('step phases', lambda: [s['phase'] for r in dicts for s in r['instructions']],
+                 lambda: [s.phase for r in models for s in r.instructions]),
+            ]
+        for name, from_dicts, from_models in reads:
+            assert from_dicts() == from_models()
+            per_read = 1e9 / len(from_dicts())
+            print(f"  {name:<36}{timed(from_dicts) * per_read:8.1f}{timed(from_models) * per_read:8.1f}")
+        print()
+        del dicts, models
+
+if __name__ == "__main__":
+    main()
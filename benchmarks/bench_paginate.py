@@ -0,0 +1,50 @@
+"""
+Peak traced memory of streaming the whole catalog with iter_recipes versus
+collecting it into a list, as the catalog grows. Streaming should stay
+flat (about two pages in memory); the list grows with the catalog.
+
+    python benchmarks/bench_paginate.py --sizes=1000,5000,20000
+"""
+import sys
+import os
+import argparse
+import time
+import tracemalloc
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from client import RecipeClient, iter_recipes
+from mock_server import MockApi, MockApiServer
+
+API_KEY = 'rapi_benchmark'
+
+def measure(consume):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = consume()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark streaming pagination memory')
+    parser.add_argument('--sizes', type=str, default='1000,5000,20000', help='Comma-separated catalog sizes')
+    parser.add_argument('--per_page', type=int, default=100, help='Items per page')
+    args = parser.parse_args()
+
+    print(f"{'recipes':>8}  {'stream peak':>12}  {'list peak':>12}  {'stream rate':>14}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        with MockApiServer(MockApi(recipes=size)) as server, \
+                RecipeClient(api_key=API_KEY, base_url=server.url) as client:
+            stream = lambda: sum(1 for _ in iter_recipes(per_page=args.per_page, client=client))
+            collect = lambda: len(list(iter_recipes(per_page=args.per_page, client=client)))
+
+            count, elapsed, stream_peak = measure(stream)
+            _, _, list_peak = measure(collect)
+
+        print(f"{count:>8,}  {stream_peak / 1e6:>10.1f}MB  {list_peak / 1e6:>10.1f}MB  {count / elapsed:>10,.0f} it/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Plan generation time of src/planner.py for a large recipe pool: the
+vectorized planner with its candidate index, the same planner searching
+every eligible recipe, and a plain-Python greedy loop over the recipe
+dicts (no swap passes), across a few constraint sets. Score is shown
+against the relaxed upper bound, with whether every daily bound was met.
+
+    python benchmarks/bench_plan.py --recipes=100000 --repeat=5
+"""
+import sys
+import os
+import argparse
+import statistics
+import time
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from duration import parse_duration
+from frame import RecipeFrame
+from planner import PLAN_COLUMNS, MealPlanner
+import synthetic
+
+# (label, MealPlanner.plan arguments)
+SCENARIOS = [
+    ('week, 1800-2200 kcal, 90g protein', dict(
+        days=7, meals=3, daily={'calories': (1800, 2200), 'protein_g': (90, None)})),
+    ('+ vegetarian, 45 min, variety caps', dict(
+        days=7, meals=3, daily={'calories': (1800, 2200), 'protein_g': (90, None), 'total_time': (None, 2 * 3600)},
+        dietary='Vegetarian', max_time=45 * 60, max_per_cuisine=3, max_per_category=1)),
+    ('month, low-carb, 140g protein', dict(
+        days=30, meals=3, daily={'calories': (1600, 1900), 'protein_g': (140, None), 'carbohydrates_g': (None, 100)},
+        max_per_cuisine=10)),
+    ('vegan + gluten-free, tight kcal', dict(
+        days=7, meals=4, daily={'calories': (2000, 2050), 'protein_g': (100, None), 'fat_g': (None, 70)},
+        dietary=['Vegan', 'Gluten-Free'], max_per_cuisine=4)),
+]
+
+def python_plan(recipes, score, days=7, meals=3, daily=None, dietary=None, max_time=None,
+                max_per_cuisine=None, max_per_category=None):
+    """The greedy fill of MealPlanner, one recipe at a time over the dicts (what a hand-rolled loop would do)."""
+    required = set([dietary] if isinstance(dietary, str) else dietary or ())
+    low = [(daily or {}).get(column, (None, None))[0] for column in PLAN_COLUMNS]
+    high = [(daily or {}).get(column, (None, None))[1] for column in PLAN_COLUMNS]
+    pool = []
+    for recipe, value in zip(recipes, score):
+        values = [recipe['nutrition_summary'][column] for column in PLAN_COLUMNS[:-1]]
+        values.append(parse_duration(recipe['meta']['total_time']) or 0)
+        if required <= set(recipe['dietary']['flags']) and (max_time is None or values[-1] <= max_time):
+            pool.append((value, values, recipe['cuisine'], recipe['category'], recipe['id']))
+    least = [min(p[1][i] for p in pool) for i in range(len(PLAN_COLUMNS))]
+    most = [max(p[1][i] for p in pool) for i in range(len(PLAN_COLUMNS))]
+
+    used, cuisines, plan, total_score, feasible = set(), {}, [], 0.0, True
+    for _ in range(days):
+        totals, categories, day = [0.0] * len(PLAN_COLUMNS), {}, []
+        for meal in range(meals):
+            rest = meals - meal - 1
+            best = None
+            for value, values, cuisine, category, recipe_id in pool:
+                if recipe_id in used or (best is not None and value <= best[0]):
+                    continue
+                if max_per_cuisine is not None and cuisines.get(cuisine, 0) >= max_per_cuisine:
+                    continue
+                if max_per_category is not None and categories.get(category, 0) >= max_per_category:
+                    continue
+                if all((hi is None or t + v + rest * lo_each <= hi) and (lo is None or t + v + rest * hi_each >= lo)
+                       for t, v, lo, hi, lo_each, hi_each in zip(totals, values, low, high, least, most)):
+                    best = (value, values, cuisine, category, recipe_id)
+            if best is None:
+                return plan, total_score, False
+            value, values, cuisine, category, recipe_id = best
+            used.add(recipe_id)
+            cuisines[cuisine] = cuisines.get(cuisine, 0) + 1
+            categories[category] = categories.get(category, 0) + 1
+            totals = [t + v for t, v in zip(totals, values)]
+            total_score += value
+            day.append(recipe_id)
+        feasible &= all((lo is None or t >= lo) and (hi is None or t <= hi) for t, lo, hi in zip(totals, low, high))
+        plan.append(day)
+    return plan, total_score, feasible
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark meal plan generation')
+    parser.add_argument('--recipes', type=int, default=100_000, help='Recipe pool size')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (median reported)')
+    parser.add_argument('--python_repeat', type=int, default=1, help='Runs of the plain-Python loop')
+    args = parser.parse_args()
+
+    recipes = [synthetic.recipe_summary(i) for i in range(args.recipes)]
+    build, frame = timed(lambda: RecipeFrame.from_recipes(recipes), 1)
+    start = time.perf_counter()
+    planner = MealPlanner(frame)
+    score = planner.score()
+    setup = time.perf_counter() - start
+    print(f"{len(frame):,} recipes: frame built in {build * 1000:,.0f}ms, planner + scores in {setup * 1000:,.1f}ms\n")
+
+    print(f"{'':<38}{'candidates':>11}{'ms':>10}{'score/bound':>13}  feasible")
+    for name, kwargs in SCENARIOS:
+        print(name)
+        for variant, prune in (('planner, candidate index', True), ('planner, every recipe', False)):
+            seconds, plan = timed(lambda: planner.plan(prune=prune, **kwargs), args.repeat)
+            print(f"  {variant:<36}{plan.candidates:>11,}{seconds * 1000:>10.1f}"
+                  f"{plan.score / plan.bound:>13.3f}  {'yes' if plan.feasible else 'no'}")
+        bound = planner.plan(**kwargs).bound
+        seconds, (_, total, feasible) = timed(lambda: python_plan(recipes, score.tolist(), **kwargs), args.python_repeat)
+        print(f"  {'plain Python greedy':<36}{'':>11}{seconds * 1000:>10.1f}"
+              f"{total / bound:>13.3f}  {'yes' if feasible else 'no'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Prefetching full recipes against a mock server with a small daily credit
+quota: a naive concurrent batch versus Prefetcher, which stops at its
+credit reserve, fetches high-priority IDs first and resumes from its
+checkpoint (after an interruption, and again after the daily reset)
+without spending a credit twice.
+
+    python benchmarks/bench_prefetch.py --ids=1500 --daily=1000 --latency=0.02
+"""
+import sys
+import os
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from async_client import AsyncRecipeClient
+from mirror import Mirror
+from mock_server import MockApi, MockApiServer
+from prefetch import CreditBudget, Prefetcher
+from ratelimit import RetryPolicy
+import synthetic
+
+API_KEY = 'rapi_benchmark'
+
+async def naive(ids, url, concurrency):
+    fetched, failed = set(), 0
+    async with AsyncRecipeClient(api_key=API_KEY, base_url=url, concurrency=concurrency,
+                                 retry=RetryPolicy(max_retries=0)) as api:
+        async for result in api.get_recipes(ids):
+            if result.error is None:
+                fetched.add(result.id)
+            else:
+                failed += 1
+    return fetched, failed
+
+def prefetch_run(store, checkpoint, url, args, hot, rest, interrupt=None):
+    prefetcher = Prefetcher(
+        store,
+        budget=CreditBudget(reserve=args.reserve),
+        concurrency=args.concurrency,
+        checkpoint=checkpoint,
+        client=AsyncRecipeClient(api_key=API_KEY, base_url=url, concurrency=args.concurrency),
+    )
+    resumed = len(prefetcher)
+    prefetcher.add(hot, priority=0)
+    prefetcher.add(rest, priority=1)
+
+    async def run():
+        if interrupt is None:
+            return await prefetcher.run_async()
+        try:
+            return await asyncio.wait_for(prefetcher.run_async(), interrupt)
+        except asyncio.TimeoutError:
+            return prefetcher.current_stats()
+
+    stats = asyncio.run(run())
+    return resumed, stats
+
+def age_checkpoint(path, seconds):
+    with open(path) as f:
+        state = json.load(f)
+    state['saved_at'] -= seconds
+    with open(path, 'w') as f:
+        json.dump(state, f)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark credit-budgeted prefetching')
+    parser.add_argument('--ids', type=int, default=1500, help='Recipe IDs to fetch')
+    parser.add_argument('--hot', type=float, default=0.2, help='Fraction of IDs with top priority')
+    parser.add_argument('--daily', type=int, default=1000, help='Daily credit quota of the mock server')
+    parser.add_argument('--reserve', type=int, default=50, help='Credits the prefetcher leaves unspent')
+    parser.add_argument('--concurrency', type=int, default=16, help='Requests in flight')
+    parser.add_argument('--latency', type=float, default=0.02, help='Server latency per request (s)')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    ids = [synthetic.recipe_id(i) for i in range(args.ids)]
+    rng.shuffle(ids)
+    hot = set(ids[:int(len(ids) * args.hot)])
+    rest = [i for i in ids if i not in hot]
+    order = ids[:]
+    rng.shuffle(order)
+
+    api = MockApi(recipes=args.ids, latency=args.latency, daily_credits=args.daily)
+    with MockApiServer(api) as server:
+        start = time.perf_counter()
+        fetched, failed = asyncio.run(naive(order, server.url, args.concurrency))
+        elapsed = time.perf_counter() - start
+        print(f"naive batch     fetched {len(fetched):5,}  failed {failed:5,} (quota)  "
+              f"hot covered {len(hot & fetched) / len(hot):5.0%}  daily left {api.daily_remaining}  "
+              f"{len(fetched) / elapsed:6.1f}/s")
+
+    api = MockApi(recipes=args.ids, latency=args.latency, daily_credits=args.daily)
+    with MockApiServer(api) as server, tempfile.TemporaryDirectory() as tmp:
+        store = Mirror(os.path.join(tmp, 'mirror.sqlite3'))
+        checkpoint = os.path.join(tmp, 'prefetch.json')
+        runs = [('interrupted', 0.5), ('resumed', None), ('after reset', None)]
+        for name, interrupt in runs:
+            if name == 'after reset':
+                # A day later: the server's daily quota is back and the checkpoint is a day old
+                api.daily_remaining = args.daily
+                age_checkpoint(checkpoint, 24 * 3600)
+            resumed, stats = prefetch_run(store, checkpoint, server.url, args, hot, rest, interrupt)
+            stored = store.has_full_recipes(ids)
+            print(f"prefetch {name:<12} resumed {resumed:5,}  fetched {stats['fetched']:5,}  "
+                  f"failed {stats['failed']:3,}  hot covered {len(hot & stored) / len(hot):5.0%}  "
+                  f"daily left {api.daily_remaining}  {stats['fetched_per_sec']:6.1f}/s  "
+                  f"{stats['credits_per_sec']:6.1f} credits/s  ({stats['stop_reason'] or 'interrupted'})")
+
+        spent = 100_000 - api.monthly_remaining
+        stored = len(store.has_full_recipes(ids))
+        print(f"\ncredits spent {spent:,} for {stored:,} stored recipes "
+              f"({spent - stored} lost to requests in flight at the interruption)")
+        store.close()
+
+if __name__ == "__main__":
+    main()
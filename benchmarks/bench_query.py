@@ -0,0 +1,54 @@
+"""
+RecipeIndex compound/range queries versus a linear scan over the same
+list-page dicts, at growing catalog sizes.
+
+    python benchmarks/bench_query.py --sizes=10000,100000,1000000
+"""
+import sys
+import os
+import argparse
+import time
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from query import RecipeIndex
+import synthetic
+
+QUERIES = {
+    'vegan 300-500kcal <30min by protein': dict(
+        dietary='Vegan', min_calories=300, max_calories=500, max_total_time=30,
+        sort='-protein_g', limit=20),
+    'italian beginner': dict(cuisine='Italian', difficulty='Beginner', limit=50),
+    'dessert french gluten-free': dict(category='Dessert', cuisine='French', dietary='Gluten-Free'),
+    'protein >= 65g': dict(min_protein=65, sort='calories', limit=10),
+}
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark indexed queries against a linear scan')
+    parser.add_argument('--sizes', type=str, default='10000,100000,1000000', help='Comma-separated catalog sizes')
+    args = parser.parse_args()
+
+    for size in (int(s) for s in args.sizes.split(',')):
+        recipes = list(synthetic.recipe_summaries(size))
+        start = time.perf_counter()
+        index = RecipeIndex(recipes)
+        print(f"\n{size:,} recipes (index built in {time.perf_counter() - start:.2f}s)")
+
+        for name, query in QUERIES.items():
+            indexed, found = timed(lambda: index.query(**query), 20)
+            scanned, expected = timed(lambda: index.scan(**query), 1)
+            assert [r['id'] for r in found] == [r['id'] for r in expected] or query.get('sort'), name
+            print(f"  {name:<38} index {indexed * 1e6:10,.0f}us  scan {scanned * 1e6:12,.0f}us  "
+                  f"({scanned / indexed:,.0f}x, {len(found)} hits)")
+
+        del recipes, index
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Rendering throughput for recipe listings written to a pipe: the previous
+print-per-line path (line-buffered, as on a terminal or SSH session, and
+block-buffered) versus src/render.py's Output in text, jsonl and csv modes.
+
+    python benchmarks/bench_render.py --recipes=10000
+"""
+import sys
+import os
+import argparse
+import io
+import threading
+import time
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from render import RECIPE_COLUMNS, Output
+from utils import print_recipe_summary
+import synthetic
+
+class CountingPipe(io.RawIOBase):
+    """Write end of an OS pipe whose read end a thread drains, counting write calls and bytes."""
+
+    def __init__(self):
+        read_fd, self._fd = os.pipe()
+        self.writes = 0
+        self.bytes = 0
+        self._reader = threading.Thread(target=self._drain, args=(read_fd,), daemon=True)
+        self._reader.start()
+
+    def _drain(self, fd):
+        while os.read(fd, 1 << 16):
+            pass
+        os.close(fd)
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.writes += 1
+        self.bytes += len(data)
+        return os.write(self._fd, data)
+
+    def close(self):
+        if not self.closed:
+            os.close(self._fd)
+            self._reader.join()
+        super().close()
+
+def pipe_stream(raw, line_buffering):
+    return io.TextIOWrapper(io.BufferedWriter(raw), encoding='utf-8', line_buffering=line_buffering)
+
+def old_render(recipes, stream):
+    # Scripts before render.py: one print per line straight to stdout
+    saved, sys.stdout = sys.stdout, stream
+    try:
+        for recipe in recipes:
+            print_recipe_summary(recipe)
+    finally:
+        sys.stdout = saved
+
+def output_render(format):
+    def render(recipes, stream):
+        with Output(format, RECIPE_COLUMNS, stream=stream) as out:
+            out.emit(recipes, print_recipe_summary)
+    return render
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark rendering recipe listings to a pipe')
+    parser.add_argument('--recipes', type=int, default=10000, help='Recipes rendered per run')
+    args = parser.parse_args()
+
+    recipes = [synthetic.recipe_summary(i) for i in range(args.recipes)]
+    print(f"{args.recipes:,} recipes rendered to a pipe\n")
+    print(f"  {'':<34}{'time':>9}{'recipes/s':>12}{'writes':>9}{'MB':>7}")
+
+    rows = [
+        ('text  print per line (tty-like)', old_render, True),
+        ('text  print per line (buffered)', old_render, False),
+        ('text  Output', output_render('text'), True),
+        ('jsonl Output', output_render('jsonl'), True),
+        ('csv   Output', output_render('csv'), True),
+    ]
+    for name, render, line_buffering in rows:
+        best = None
+        for _ in range(3):
+            raw = CountingPipe()
+            stream = pipe_stream(raw, line_buffering)
+            start = time.perf_counter()
+            render(recipes, stream)
+            stream.flush()
+            elapsed = time.perf_counter() - start
+            stream.close()
+            if best is None or elapsed < best[0]:
+                best = (elapsed, raw.writes, raw.bytes)
+        elapsed, writes, size = best
+        print(f"  {name:<34}{elapsed * 1000:7.0f}ms{args.recipes / elapsed:12,.0f}{writes:9,}{size / 1e6:7.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Resolve a noisy 10k-line shopping list to ingredient IDs locally (one
+catalog download, then IngredientResolver) versus one
+/api/v1/ingredients?q= call per line against the mock server.
+
+    python benchmarks/bench_resolve.py --lines=10000 --latency=0.02
+"""
+import sys
+import os
+import argparse
+import random
+import time
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from client import RecipeClient, iter_ingredients
+from mock_server import MockApi, MockApiServer
+from resolver import IngredientResolver
+import synthetic
+
+API_KEY = 'rapi_benchmark'
+QUANTITIES = ['', '1 ', '2 ', '1/2 ', '250 ', '3 ']
+UNITS = ['', 'cups ', 'tbsp ', 'g ', 'cloves of ', 'lb ']
+NOTES = ['', '', ', chopped', ', finely diced', ', to taste']
+
+def typo(word, rng):
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 2)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+def shopping_list(catalog, count, seed=0):
+    """(line, expected_id) pairs: catalog names with quantities, plurals, notes, typos and unknown items."""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        if rng.random() < 0.05:
+            lines.append((f"{rng.choice(QUANTITIES)}{rng.choice(['tofu skin', 'yuzu kosho', 'beef'])}", None))
+            continue
+        item = rng.choice(catalog)
+        words = item['name'].split()
+        if rng.random() < 0.3:
+            words[-1] += 's'
+        if rng.random() < 0.15:
+            words[-1] = typo(words[-1], rng)
+        line = f"{rng.choice(QUANTITIES)}{rng.choice(UNITS)}{' '.join(words)}{rng.choice(NOTES)}"
+        lines.append((line, item['id']))
+    return lines
+
+def accuracy(found, expected):
+    return sum(f == e for f, e in zip(found, expected)) / len(expected)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark local ingredient resolution against per-name API calls')
+    parser.add_argument('--lines', type=int, default=10000, help='Shopping-list lines to resolve')
+    parser.add_argument('--ingredients', type=int, default=2000, help='Catalog size')
+    parser.add_argument('--latency', type=float, default=0.02, help='Server latency per request (s)')
+    parser.add_argument('--api_sample', type=int, default=300, help='Lines resolved via the API (timing is extrapolated)')
+    args = parser.parse_args()
+
+    catalog = [synthetic.ingredient(i) for i in range(args.ingredients)]
+    # Suffixed duplicates ("garlic (3)") aren't things people write on a list
+    plain = [item for item in catalog if '(' not in item['name']]
+    lines = shopping_list(plain, args.lines)
+    names = [line for line, _ in lines]
+    expected = [expected for _, expected in lines]
+
+    with MockApiServer(MockApi(ingredients=args.ingredients, latency=args.latency)) as server:
+        with RecipeClient(api_key=API_KEY, base_url=server.url) as client:
+            start = time.perf_counter()
+            resolver = IngredientResolver(iter_ingredients(client=client))
+            loaded = time.perf_counter() - start
+
+            start = time.perf_counter()
+            results = resolver.resolve_many(names)
+            resolved = time.perf_counter() - start
+
+            print(f"{args.lines:,} lines, {len(resolver):,} catalog ingredients\n")
+            print(f"local   catalog load {loaded:6.2f}s  resolve {resolved:6.2f}s  "
+                  f"({args.lines / resolved:,.0f} lines/s)  accuracy {accuracy([r.id for r in results], expected):.1%}")
+
+            sample = lines[:args.api_sample]
+            start = time.perf_counter()
+            found = []
+            for line, _ in sample:
+                data = client.request('/api/v1/ingredients', {'q': line, 'per_page': 1})['data']
+                found.append(data[0]['id'] if data else None)
+            per_line = (time.perf_counter() - start) / len(sample)
+            print(f"api     {per_line * 1000:6.1f}ms/line  -> {per_line * args.lines:8.1f}s for {args.lines:,} lines  "
+                  f"accuracy {accuracy(found, [e for _, e in sample]):.1%}")
+            print(f"\nspeedup {per_line * args.lines / (loaded + resolved):,.0f}x including the catalog download")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Retry/backoff harness: crawl a stand-in server that enforces a per-second
+rate limit and randomly fails with 503, and check every request still
+succeeds. Compares sustained throughput with and without client-side
+token-bucket pacing at the server's limit.
+
+    python benchmarks/bench_retry.py --requests=600 --limit=200 --error_rate=0.05
+"""
+import sys
+import os
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from client import RecipeClient, RecipeApiError
+from ratelimit import RetryPolicy
+from mock_server import MockApi, MockApiServer
+
+API_KEY = 'rapi_benchmark'
+
+def crawl(client, n, threads):
+    failures = 0
+
+    def fetch(page):
+        nonlocal failures
+        try:
+            client.request('/api/v1/recipes', {'page': page % 50 + 1, 'per_page': 10})
+        except RecipeApiError:
+            failures += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(fetch, range(n)))
+    return time.perf_counter() - start, failures
+
+def main():
+    parser = argparse.ArgumentParser(description='Retry/backoff harness with injected 429s and 503s')
+    parser.add_argument('--requests', type=int, default=600, help='Requests per run')
+    parser.add_argument('--limit', type=int, default=200, help='Server rate limit (requests/sec)')
+    parser.add_argument('--error_rate', type=float, default=0.05, help='Fraction of requests failing with 503')
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent callers')
+    args = parser.parse_args()
+
+    ok = True
+    for name, rate_limit in (('retry only', None), ('token bucket', args.limit)):
+        api = MockApi(rate_limit=args.limit, error_rate=args.error_rate)
+        with MockApiServer(api) as server:
+            client = RecipeClient(
+                api_key=API_KEY, base_url=server.url, pool_size=args.threads,
+                rate_limit=rate_limit, retry=RetryPolicy(max_retries=8, base_delay=0.05),
+            )
+            with client:
+                elapsed, failures = crawl(client, args.requests, args.threads)
+
+        ok = ok and failures == 0
+        print(f"{name:<13} {args.requests / elapsed:7,.0f} req/s (limit {args.limit})  "
+              f"429s {api.rate_limited:<4} 503s {api.injected_errors:<4} "
+              f"retries {client.retries:<4} failed {failures}")
+
+    if not ok:
+        print('\n[X] Some requests failed after retries')
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
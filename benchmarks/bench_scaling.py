@@ -0,0 +1,107 @@
+"""
+Rescaling full recipes to new yields and unit systems: src/scaling.py's
+RecipeBatch (one NumPy pass over every ingredient of the batch) versus a
+naive per-recipe, per-item Python implementation of the same math.
+
+Each round gives every recipe its own target servings and converts to
+the next unit system, as a meal-planning service would.
+
+    python benchmarks/bench_scaling.py --recipes=100000 --rounds=4
+"""
+import sys
+import os
+import argparse
+import random
+import time
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import numpy as np
+
+from scaling import CONVERSIONS, LADDERS, NUTRIENTS, SYSTEMS, RecipeBatch, canonical_unit, parse_servings
+import synthetic
+
+def full_recipes(count, distinct=2000):
+    """`count` full recipes with unique IDs, sharing the nested sections of `distinct` generated ones."""
+    pool = [synthetic.full_recipe(i) for i in range(min(count, distinct))]
+    recipes = []
+    for index in range(count):
+        recipe = dict(pool[index % len(pool)])
+        recipe['id'] = synthetic.recipe_id(index)
+        recipes.append(recipe)
+    return recipes
+
+def naive_rescale(recipes, targets, system):
+    """Per-recipe loop: parse the yield, scale and convert each item, recompute nutrition totals."""
+    results = []
+    for recipe, target in zip(recipes, targets):
+        servings = parse_servings(recipe['meta']['yields'])
+        factor = target / servings if servings else 1.0
+        items = []
+        for group in recipe['ingredients']:
+            for item in group['items']:
+                quantity = item['quantity'] * factor
+                unit = canonical_unit(item['unit'])
+                if unit in CONVERSIONS:
+                    dimension, size = CONVERSIONS[unit]
+                    base = quantity * size
+                    for low, step in LADDERS[system, dimension]:
+                        if base >= low:
+                            unit = step
+                    quantity = base / CONVERSIONS[unit][1]
+                items.append((quantity, unit))
+        per_serving = recipe['nutrition']['per_serving']
+        totals = [per_serving[name] * target for name in NUTRIENTS]
+        results.append((items, totals))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark vectorized recipe rescaling and unit conversion')
+    parser.add_argument('--recipes', type=int, default=100000, help='Recipes per round')
+    parser.add_argument('--rounds', type=int, default=4, help='Rescaling rounds per implementation')
+    args = parser.parse_args()
+
+    recipes = full_recipes(args.recipes)
+    rng = np.random.default_rng(0)
+    rounds = [
+        (rng.choice([1, 2, 3, 4, 6, 8, 12], size=len(recipes)).astype(np.float64), SYSTEMS[i % len(SYSTEMS)])
+        for i in range(args.rounds)
+    ]
+
+    start = time.perf_counter()
+    batch = RecipeBatch.from_recipes(recipes)
+    build = time.perf_counter() - start
+    items = len(batch.quantities)
+    print(f"{len(recipes):,} recipes, {items:,} ingredient items, {args.rounds} rounds\n")
+    print(f"  RecipeBatch.from_recipes (once):  {build * 1000:8.0f} ms")
+
+    # Interleave the two so machine noise hits them alike
+    naive, vectorized = [], []
+    for targets, system in rounds:
+        target_list = targets.tolist()
+        start = time.perf_counter()
+        expected = naive_rescale(recipes, target_list, system)
+        naive.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        scaled = batch.scale(targets).convert(system)
+        totals = scaled.totals
+        vectorized.append(time.perf_counter() - start)
+
+        # Spot-check that both computed the same thing
+        for row in random.Random(len(naive)).sample(range(len(recipes)), 20):
+            want_items, want_totals = expected[row]
+            got = scaled.ingredients(row)
+            assert [u for _, u in got] == [u for _, u in want_items]
+            assert np.allclose([q for q, _ in got], [q for q, _ in want_items])
+            assert np.allclose(totals[row], want_totals)
+
+    best_naive, best_vectorized = min(naive), min(vectorized)
+    print(f"  naive per-item Python (per round): {best_naive * 1000:8.0f} ms  {len(recipes) / best_naive:12,.0f} recipes/s")
+    print(f"  RecipeBatch scale+convert:         {best_vectorized * 1000:8.1f} ms  {len(recipes) / best_vectorized:12,.0f} recipes/s")
+    print(f"\n  speedup: {best_naive / best_vectorized:.0f}x per round; the one-time build pays for itself after "
+          f"{build / (best_naive - best_vectorized):.1f} rounds")
+
+if __name__ == "__main__":
+    main()
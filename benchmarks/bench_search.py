@@ -0,0 +1,90 @@
+"""
+SearchIndex build, save/load and incremental-update time, plus query
+latency for exact and prefix (typeahead) queries, against a linear
+substring scan like the one behind `--offline` search.
+
+    python benchmarks/bench_search.py --recipes=100000
+"""
+import sys
+import os
+import argparse
+import statistics
+import tempfile
+import time
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from search_index import SearchIndex
+import synthetic
+
+QUERIES = [
+    ('garlic', False),
+    ('creamy chicken', False),
+    ('spicy roasted salmon', False),
+    ('chi', True),
+    ('honey gar', True),
+    ('lemon tart', False),
+]
+
+def scan(recipes, query):
+    words = query.lower().split()
+    return [
+        r['id'] for r in recipes
+        if all(w in r['name'].lower() or w in r['description'].lower() for w in words)
+    ]
+
+def latencies(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), sorted(samples)[int(len(samples) * 0.95) - 1]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the local full-text search index')
+    parser.add_argument('--recipes', type=int, default=100000, help='Catalog size')
+    parser.add_argument('--repeat', type=int, default=50, help='Timed runs per query')
+    parser.add_argument('--changed', type=float, default=0.01, help='Fraction of recipes changed for the incremental update')
+    args = parser.parse_args()
+
+    recipes = list(synthetic.recipe_summaries(args.recipes))
+    print(f"{args.recipes:,} recipes")
+
+    start = time.perf_counter()
+    index = SearchIndex()
+    index.add_many(recipes)
+    index.freeze()
+    print(f"  build                {time.perf_counter() - start:8.2f}s  ({len(index.vocab):,} terms, "
+          f"{len(index.post_docs):,} postings)")
+
+    path = os.path.join(tempfile.mkdtemp(), 'search.npz')
+    start = time.perf_counter()
+    index.save(path)
+    saved = time.perf_counter() - start
+    start = time.perf_counter()
+    index = SearchIndex.load(path)
+    loaded = time.perf_counter() - start
+    print(f"  save / load          {saved:8.2f}s / {loaded:.2f}s  ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+    # Re-syncing an unchanged catalog should only cost the hash checks
+    changed = int(args.recipes * args.changed)
+    updated = [dict(r, description=r['description'] + ' updated') if i < changed else r
+               for i, r in enumerate(recipes)]
+    start = time.perf_counter()
+    indexed, removed = index.update(updated)
+    index.freeze()
+    print(f"  incremental update   {time.perf_counter() - start:8.2f}s  ({indexed:,} re-indexed)")
+
+    print()
+    for query, prefix in QUERIES:
+        p50, p95 = latencies(lambda: index.search(query, limit=10, prefix=prefix), args.repeat)
+        line = f"  {query + ('*' if prefix else ''):<22} p50 {p50 * 1e3:7.2f}ms  p95 {p95 * 1e3:7.2f}ms"
+        if not prefix:
+            scanned, _ = latencies(lambda: scan(updated, query), 3)
+            line += f"  scan {scanned * 1e3:8.1f}ms ({scanned / p50:,.0f}x)"
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Requests/sec of bare `requests.get` (one connection per call) versus the
+pooled keep-alive RecipeClient, against the local stand-in server.
+
+    python benchmarks/bench_session.py --requests=2000
+"""
+import sys
+import os
+import argparse
+import time
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import requests
+
+from client import RecipeClient
+from mock_server import MockApiServer
+
+API_KEY = 'rapi_benchmark'
+ENDPOINT = '/api/v1/cuisines'
+
+def bench_bare(base_url, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        headers = {'X-API-Key': API_KEY, 'Accept': 'application/json'}
+        requests.get(f'{base_url}{ENDPOINT}', headers=headers).json()
+    return n / (time.perf_counter() - start)
+
+def bench_pooled(base_url, n):
+    with RecipeClient(api_key=API_KEY, base_url=base_url) as client:
+        start = time.perf_counter()
+        for _ in range(n):
+            client.request(ENDPOINT)
+        return n / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark connection reuse')
+    parser.add_argument('--requests', type=int, default=1000, help='Requests per run')
+    args = parser.parse_args()
+
+    with MockApiServer() as server:
+        bare = bench_bare(server.url, args.requests)
+        pooled = bench_pooled(server.url, args.requests)
+
+    print(f"bare requests.get   {bare:10,.0f} req/s")
+    print(f"pooled RecipeClient {pooled:10,.0f} req/s  ({pooled / bare:.1f}x)")
+
+if __name__ == "__main__":
+    main()
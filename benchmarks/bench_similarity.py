@@ -0,0 +1,103 @@
+"""
+Build time and query latency of src/similarity.py at catalog scale: exact
+top-k (batched scatter-add plus matrix product over every recipe) versus
+approximate MinHash LSH candidates, with recall of the approximate mode,
+and bulk neighbour-list precomputation on one process versus a pool.
+
+The catalog is variations on a few thousand generated full recipes (a
+couple of ingredients swapped in each), so recipes have real neighbours.
+
+    python benchmarks/bench_similarity.py --recipes=100000 --queries=200 --precompute=20000
+"""
+import sys
+import os
+import argparse
+import random
+import time
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import numpy as np
+
+from similarity import DEFAULT_NEIGHBOURS, SimilarityIndex
+import synthetic
+
+def catalog(count, distinct=5000, swaps=2, seed=0):
+    """`count` full recipes: copies of `distinct` generated ones, each with `swaps` ingredients replaced."""
+    pool = [synthetic.full_recipe(i) for i in range(min(count, distinct))]
+    rng = random.Random(seed)
+    names = synthetic.INGREDIENT_NAMES
+    recipes = []
+    for index in range(count):
+        recipe = dict(pool[index % len(pool)])
+        recipe['id'] = synthetic.recipe_id(index)
+        items = [item for group in recipe['ingredients'] for item in group['items']]
+        for _ in range(swaps):
+            n = rng.randrange(len(names))
+            items[rng.randrange(len(items))] = {'id': synthetic.ingredient_id(n), 'name': names[n]}
+        recipe['ingredients'] = [{'group_name': None, 'items': items}]
+        recipes.append(recipe)
+    return recipes
+
+def latencies(fn, rows):
+    times = []
+    for row in rows:
+        start = time.perf_counter()
+        fn(row)
+        times.append(time.perf_counter() - start)
+    return np.percentile(np.array(times) * 1000, [50, 95])
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the recipe similarity index')
+    parser.add_argument('--recipes', type=int, default=100000, help='Catalog size')
+    parser.add_argument('--queries', type=int, default=200, help='Single-recipe queries timed per mode')
+    parser.add_argument('--k', type=int, default=DEFAULT_NEIGHBOURS, help='Neighbours per query')
+    parser.add_argument('--precompute', type=int, default=20000, help='Recipes whose neighbour lists are precomputed')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help='Pool size for precomputation')
+    args = parser.parse_args()
+
+    recipes = catalog(args.recipes)
+    print(f"{len(recipes):,} recipes, k={args.k}\n")
+
+    start = time.perf_counter()
+    index = SimilarityIndex.from_recipes(recipes)
+    build = time.perf_counter() - start
+    del recipes
+    start = time.perf_counter()
+    index._posting_lists()
+    postings = time.perf_counter() - start
+    start = time.perf_counter()
+    index._lsh_bands()
+    bands = time.perf_counter() - start
+    print(f"  build: vectors {build:.2f}s, postings {postings * 1000:.0f}ms, "
+          f"LSH signatures {bands:.2f}s ({len(index.vocab):,} terms, {len(index.terms):,} entries)\n")
+
+    rows = random.Random(1).sample(range(len(index)), args.queries)
+    exact_ms = latencies(lambda row: index.top_k([row], args.k), rows)
+    approx_ms = latencies(lambda row: index.top_k([row], args.k, approximate=True), rows)
+
+    start = time.perf_counter()
+    batch_found, _ = index.top_k(rows, args.k)
+    batched = (time.perf_counter() - start) / len(rows)
+    approx_found, _ = index.top_k(rows, args.k, approximate=True)
+    recall = np.mean([len(set(a) & set(e)) / args.k for a, e in zip(approx_found, batch_found)])
+
+    print(f"  {'query':<26}{'p50':>9}{'p95':>10}")
+    print(f"  {'exact, one at a time':<26}{exact_ms[0]:7.2f}ms{exact_ms[1]:8.2f}ms")
+    print(f"  {'exact, batched':<26}{batched * 1000:7.2f}ms  (per query, batches of 64)")
+    print(f"  {'approximate (LSH)':<26}{approx_ms[0]:7.2f}ms{approx_ms[1]:8.2f}ms  recall@{args.k} {recall:.1%}\n")
+
+    subset = SimilarityIndex(index.ids[:args.precompute], index.vocab, index.offsets[:args.precompute + 1],
+                             index.terms[:index.offsets[args.precompute]], index.weights[:index.offsets[args.precompute]],
+                             index.features[:args.precompute])
+    for approximate in (False, True):
+        for processes in dict.fromkeys([1, args.processes]):
+            start = time.perf_counter()
+            subset.precompute(args.k, approximate=approximate, processes=processes)
+            elapsed = time.perf_counter() - start
+            print(f"  precompute {len(subset):,} {'approximate' if approximate else 'exact'} neighbour lists, "
+                  f"{processes} process{'es' if processes > 1 else ''}: {elapsed:.2f}s ({len(subset) / elapsed:,.0f} recipes/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+CLI startup cost: `-X importtime` totals and wall-clock time per invocation
+of the scripts run directly, through `src/cli.py`, and through cli.py with
+a warm daemon (see src/daemon.py), against the stand-in server.
+
+With `--before=<git ref>`, the same direct-script runs are repeated on that
+revision's src/ (exported with `git archive`), for a before/after view.
+
+    python benchmarks/bench_startup.py --runs=20 --before=HEAD~1
+"""
+import sys
+import os
+import argparse
+import re
+import statistics
+import subprocess
+import tempfile
+import time
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCHMARKS)
+
+sys.path.append(BENCHMARKS)
+
+from mock_server import MockApi, MockApiServer
+
+API_KEY = 'rapi_benchmark'
+
+# (label, script, cli command, arguments)
+CASES = [
+    ('--help', '03_browse', 'browse', ['--help']),
+    ('cuisines', '02_cuisines', 'cuisines', []),
+    ('browse, 10 recipes', '03_browse', 'browse', []),
+    ('recipe, full', '06_recipe', 'recipe', ['--id=rec_0000042']),
+    ('cuisines --offline', '02_cuisines', 'cuisines', ['--offline']),
+]
+
+def wall_ms(argv, env, cwd, runs):
+    """Median wall-clock milliseconds of `runs` invocations (after one warm-up)."""
+    times = []
+    for _ in range(runs + 1):
+        start = time.perf_counter()
+        subprocess.run(argv, env=env, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times[1:]) * 1000
+
+def import_ms(argv, env, cwd, runs=5):
+    """Median total of top-level import times reported by -X importtime (site included), in milliseconds."""
+    totals = []
+    for _ in range(runs):
+        stderr = subprocess.run([sys.executable, '-X', 'importtime', *argv[1:]], env=env, cwd=cwd,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+        # Top-level imports are indented by one space after the second '|'
+        totals.append(sum(int(m.group(1)) for m in re.finditer(r'\|\s+(\d+) \| (?! )\S', stderr)))
+    return statistics.median(totals) / 1000
+
+def export_src(ref, directory):
+    """Extract src/ of git revision `ref` into `directory`."""
+    os.makedirs(directory)
+    archive = subprocess.run(['git', 'archive', ref, 'src'], cwd=ROOT, check=True, capture_output=True).stdout
+    subprocess.run(['tar', '-x', '-C', directory], input=archive, check=True)
+    return os.path.join(directory, 'src')
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CLI startup: direct scripts, cli.py and the daemon')
+    parser.add_argument('--runs', type=int, default=20, help='Invocations per measurement')
+    parser.add_argument('--before', type=str, help='Also measure the scripts of this git revision')
+    args = parser.parse_args()
+
+    with MockApiServer(MockApi(recipes=1000)) as server, tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, 'RECIPE_API_BASE_URL': server.url, 'RECIPE_API_KEY': API_KEY,
+               'RECIPE_API_DAEMON_SOCKET': os.path.join(tmp, 'daemon.sock')}
+        local = {**env, 'RECIPE_API_NO_DAEMON': '1'}
+        cwd = os.path.join(tmp, 'work')
+        os.makedirs(cwd)
+        src = os.path.join(ROOT, 'src')
+        cli = os.path.join(src, 'cli.py')
+        # The offline case needs a mirror
+        subprocess.run([sys.executable, os.path.join(src, 'scripts', '09_sync.py')], env=local, cwd=cwd,
+                       check=True, stdout=subprocess.DEVNULL)
+
+        columns = {}
+        if args.before:
+            before_src = export_src(args.before, os.path.join(tmp, 'before'))
+            columns[f'{args.before} script'] = lambda script, command, argv: [
+                sys.executable, os.path.join(before_src, 'scripts', f'{script}.py'), *argv]
+        columns['script'] = lambda script, command, argv: [sys.executable, os.path.join(src, 'scripts', f'{script}.py'), *argv]
+        columns['cli.py'] = lambda script, command, argv: [sys.executable, cli, command, *argv]
+
+        python_ms = wall_ms([sys.executable, '-c', 'pass'], env, cwd, args.runs)
+        print(f"Median of {args.runs} runs; bare `python -c pass` takes {python_ms:.0f}ms\n")
+
+        print('-X importtime, top-level imports (ms):')
+        print(f"  {'':<22}" + ''.join(f'{name:>18}' for name in columns))
+        row = [import_ms(build('03_browse', 'browse', ['--help']), local, cwd) for build in columns.values()]
+        print(f"  {'browse --help':<22}" + ''.join(f'{value:18.1f}' for value in row))
+        handoff = import_ms([sys.executable, '-c', f'import sys; sys.path.insert(0, {src!r}); import cli, daemon'], local, cwd)
+        print(f"  {'cli.py -> daemon':<22}{handoff:18.1f}  (all a daemon-served invocation imports)\n")
+
+        results = {label: [] for label, *_ in CASES}
+        for build in columns.values():
+            for label, script, command, argv in CASES:
+                results[label].append(wall_ms(build(script, command, argv), local, cwd, args.runs))
+
+        subprocess.run([sys.executable, cli, 'daemon', 'start', '--idle=120'], env=env, cwd=cwd,
+                       check=True, stdout=subprocess.DEVNULL)
+        try:
+            for label, script, command, argv in CASES:
+                results[label].append(wall_ms([sys.executable, cli, command, *argv], env, cwd, args.runs))
+        finally:
+            subprocess.run([sys.executable, cli, 'daemon', 'stop'], env=env, cwd=cwd, stdout=subprocess.DEVNULL)
+
+        print('Wall clock per invocation (ms):')
+        print(f"  {'':<22}" + ''.join(f'{name:>18}' for name in [*columns, 'cli.py + daemon']))
+        for label, row in results.items():
+            print(f"  {label:<22}" + ''.join(f'{value:18.0f}' for value in row))
+
+if __name__ == "__main__":
+    main()
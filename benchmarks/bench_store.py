@@ -0,0 +1,124 @@
+"""
+Size and load time of full recipes in RecipeStore's binary format versus
+raw JSON: a JSON-lines file with an offset index decoded by json.loads, and
+the mirror's SQLite full_recipes table (JSON text per row).
+
+    python benchmarks/bench_store.py --recipes=20000
+"""
+import sys
+import os
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from mirror import Mirror
+from recipe_store import RecipeCodec, RecipeStore
+import synthetic
+
+PARTIAL_FIELDS = ('name', 'meta', 'nutrition')
+
+class JsonLines:
+    """Baseline: one JSON document per line, with an in-memory id -> (offset, length) index."""
+
+    def __init__(self, path, recipes):
+        self.path = path
+        self.offsets = {}
+        with open(path, 'wb') as f:
+            for recipe in recipes:
+                line = json.dumps(recipe).encode()
+                self.offsets[recipe['id']] = (f.tell(), len(line))
+                f.write(line + b'\n')
+        self.file = open(path, 'rb')
+
+    def get(self, recipe_id):
+        offset, length = self.offsets[recipe_id]
+        self.file.seek(offset)
+        return json.loads(self.file.read(length))
+
+    def recipes(self):
+        with open(self.path, 'rb') as f:
+            return [json.loads(line) for line in f]
+
+def per_call_us(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) / len(items) * 1e6
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the binary full-recipe store against raw JSON')
+    parser.add_argument('--recipes', type=int, default=20000, help='Full recipes stored')
+    parser.add_argument('--lookups', type=int, default=5000, help='Random single-recipe reads')
+    args = parser.parse_args()
+
+    recipes = [synthetic.full_recipe(i) for i in range(args.recipes)]
+    rng = random.Random(0)
+    sample = [rng.choice(recipes)['id'] for _ in range(args.lookups)]
+    print(f"{args.recipes:,} full recipes\n")
+
+    # Decode cost of a single record, outside any file
+    codec = RecipeCodec()
+    encoded = [codec.dumps(r) for r in recipes[:2000]]
+    as_json = [json.dumps(r).encode() for r in recipes[:2000]]
+    assert all(codec.loads(b) == r for b, r in zip(encoded, recipes))
+    json_us = min(per_call_us(json.loads, as_json) for _ in range(3))
+    codec_us = min(per_call_us(codec.loads, encoded) for _ in range(3))
+    print(f"record        json {statistics.mean(map(len, as_json)):7,.0f} B  {json_us:6.1f}us  |  "
+          f"binary {statistics.mean(map(len, encoded)):7,.0f} B  {codec_us:6.1f}us  "
+          f"({json_us / codec_us:.1f}x faster, {len(codec.strings):,} interned strings, {len(codec.shapes)} shapes)\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        lines, write_json = timed(lambda: JsonLines(os.path.join(tmp, 'recipes.jsonl'), recipes))
+
+        mirror = Mirror(os.path.join(tmp, 'mirror.sqlite3'))
+        def fill_mirror():
+            for recipe in recipes:
+                mirror.put_full_recipe(recipe)
+        _, write_mirror = timed(fill_mirror)
+
+        store_path = os.path.join(tmp, 'recipes.dat')
+        def fill_store():
+            with RecipeStore(store_path) as store:
+                store.put_many(recipes)
+        _, write_store = timed(fill_store)
+        store, open_store = timed(lambda: RecipeStore(store_path))
+
+        sizes = {
+            'json lines': os.path.getsize(lines.path),
+            'sqlite json': os.path.getsize(mirror.path) + os.path.getsize(f'{mirror.path}-wal'),
+            'binary store': store.size(),
+        }
+        print(f"{'':14}{'bytes/recipe':>13}{'write':>9}{'load all':>10}{'get one':>10}{'3 fields':>10}")
+        rows = [
+            ('json lines', write_json, lambda: lines.recipes(), lines.get, None),
+            ('sqlite json', write_mirror, lambda: [mirror.full_recipe(i) for i in mirror.has_full_recipes(lines.offsets)],
+             mirror.full_recipe, None),
+            ('binary store', write_store, lambda: list(store.recipes()), store.get,
+             lambda i: store.get(i, fields=PARTIAL_FIELDS)),
+        ]
+        for name, write, load_all, get_one, get_fields in rows:
+            _, elapsed = timed(load_all)
+            one = per_call_us(get_one, sample)
+            fields = f"{per_call_us(get_fields, sample):8.1f}us" if get_fields else f"{'-':>10}"
+            print(f"{name:<14}{sizes[name] / args.recipes:13,.0f}{write:8.2f}s{elapsed:9.2f}s{one:8.1f}us{fields}")
+
+        print(f"\nbinary store opens in {open_store * 1000:.0f}ms; "
+              f"{sizes['json lines'] / sizes['binary store']:.1f}x smaller than JSON lines")
+        assert all(store.get(i) == lines.get(i) for i in sample[:200])
+        store.close()
+        mirror.close()
+        lines.file.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Streaming vs buffered decoding of large list pages (RecipeClient.stream vs
+RecipeClient.request): time to the first item, total time, and peak RSS
+while walking a 1k- and a 10k-item page from the stand-in server, with
+orjson (when installed) and with the stdlib json module.
+
+Each run is a fresh child process, so its peak RSS is its own.
+
+    python benchmarks/bench_stream.py --sizes 1000 10000 --bandwidth=12.5 --repeat=3
+"""
+import sys
+import os
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import time
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(BENCHMARKS), 'src'))
+
+API_KEY = 'rapi_benchmark'
+ENDPOINT = '/api/v1/recipes'
+MODES = ['request', 'stream']
+
+def reset_peak_rss():
+    """Restart the kernel's peak RSS count at the current RSS (Linux 4.0+); False if unsupported."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def peak_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 2 ** 20
+    except OSError:
+        return peak_rss_mb()
+
+def child(mode, per_page, url, backend):
+    if backend == 'json':
+        # Make the optional import fail so jsonstream falls back to json
+        sys.modules['orjson'] = None
+    from client import RecipeClient
+
+    with RecipeClient(api_key=API_KEY, base_url=url) as client:
+        client.request('/api/v1/cuisines')
+        # Without a reset, a peak from start-up can hide the request's own
+        baseline = rss_mb() if reset_peak_rss() else peak_rss_mb()
+        params = {'per_page': per_page}
+        first = None
+        calories = 0
+
+        start = time.perf_counter()
+        if mode == 'stream':
+            with client.stream(ENDPOINT, params) as items:
+                for item in items:
+                    if first is None:
+                        first = time.perf_counter() - start
+                    calories += item['nutrition_summary']['calories']
+                total = items.meta['total']
+        else:
+            response = client.request(ENDPOINT, params)
+            for item in response['data']:
+                if first is None:
+                    first = time.perf_counter() - start
+                calories += item['nutrition_summary']['calories']
+            total = response['meta']['total']
+            del response
+        elapsed = time.perf_counter() - start
+
+    print(json.dumps({'first': first, 'elapsed': elapsed, 'rss': peak_rss_mb() - baseline, 'total': total}))
+
+def run_child(mode, per_page, url, backend):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', mode, str(per_page), url, backend],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark streaming JSON decoding of large list pages')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000], help='Items per page')
+    parser.add_argument('--bandwidth', type=float, default=12.5, help='Server bandwidth in MB/s (0 for unlimited)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per configuration (median reported)')
+    parser.add_argument('--child', nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, per_page, url, backend = args.child
+        child(mode, int(per_page), url, backend)
+        return
+
+    sys.path.append(BENCHMARKS)
+    from jsonstream import BACKEND
+    from mock_server import MockApi, MockApiServer
+
+    class PageCache(MockApi):
+        """Builds each page once, so runs time the transfer and decoding, not the stand-in server."""
+
+        def __init__(self, **options):
+            super().__init__(**options)
+            self.pages = {}
+
+        def handle(self, path, query):
+            key = (path, tuple(sorted(query.items())))
+            if key not in self.pages:
+                self.pages[key] = super().handle(path, query)
+            return self.pages[key]
+
+    backends = ['orjson', 'json'] if BACKEND == 'orjson' else ['json']
+    bandwidth = args.bandwidth * 1e6 if args.bandwidth else None
+    api = PageCache(recipes=max(args.sizes), bandwidth=bandwidth)
+    configs = [(size, backend, mode) for size in args.sizes for backend in backends for mode in MODES]
+
+    print(f"Bandwidth: {f'{args.bandwidth:g} MB/s' if bandwidth else 'unlimited'}, "
+          f"median of {args.repeat} runs, RSS is peak above the pre-request baseline\n")
+    print(f"  {'items':>7}  {'backend':<8}{'mode':<9}{'first item':>12}{'total':>10}{'peak RSS':>11}")
+
+    with MockApiServer(api) as server:
+        # Interleave configurations so machine noise hits them alike
+        results = {config: [] for config in configs}
+        for _ in range(args.repeat):
+            for config in configs:
+                size, backend, mode = config
+                results[config].append(run_child(mode, size, server.url, backend))
+
+    for size, backend, mode in configs:
+        runs = results[size, backend, mode]
+        first = statistics.median(r['first'] for r in runs) * 1000
+        elapsed = statistics.median(r['elapsed'] for r in runs) * 1000
+        rss = statistics.median(r['rss'] for r in runs)
+        print(f"  {size:>7,}  {backend:<8}{mode:<9}{first:10.1f}ms{elapsed:8.0f}ms{rss:8.1f} MB")
+
+if __name__ == "__main__":
+    main()
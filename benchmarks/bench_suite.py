@@ -0,0 +1,375 @@
+"""
+End-to-end benchmark suite: every script in src/scripts and the main client
+paths, run against the stand-in server (benchmarks/mock_server.py), with
+results compared to a stored baseline (benchmarks/baseline.json).
+
+Scripts run as their own processes, in an order that builds up local state
+(mirror, prefetched recipes, indexes) in a scratch directory; each reports
+wall time and peak RSS. Client paths run in child processes and report
+throughput, latency percentiles and peak RSS above the post-import baseline,
+best of `--repeat` runs.
+
+A metric regresses when it is more than `--tolerance` worse than the
+baseline and by more than its noise floor; the run then exits with status 1.
+Baselines are machine-specific: record one with `--save` before comparing.
+
+    python benchmarks/bench_suite.py --save
+    python benchmarks/bench_suite.py --tolerance=0.25
+"""
+import sys
+import os
+import argparse
+import asyncio
+import json
+import random
+import resource
+import socket
+import statistics
+import subprocess
+import tempfile
+import time
+import urllib.request
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(os.path.dirname(BENCHMARKS), 'src')
+SCRIPTS = os.path.join(SRC, 'scripts')
+DEFAULT_BASELINE = os.path.join(BENCHMARKS, 'baseline.json')
+
+# Add src directory to path
+sys.path.append(SRC)
+
+API_KEY = 'rapi_benchmark'
+RECIPE = 'rec_0000042'
+
+# Script runs, in order: (metric name, script, arguments)
+SCRIPT_RUNS = [
+    ('01_categories', '01_categories.py', []),
+    ('02_cuisines', '02_cuisines.py', []),
+    ('07_ingredient_categories', '07_ingredient_categories.py', []),
+    ('03_browse', '03_browse.py', ['--all', '--max_items=2000', '--format=csv']),
+    ('04_search', '04_search.py', ['--q=garlic', '--all', '--max_items=1000', '--format=jsonl']),
+    ('05_filter', '05_filter.py', ['--cuisine=Italian', '--max_calories=600', '--all', '--max_items=1000', '--format=jsonl']),
+    ('06_recipe', '06_recipe.py', [f'--id={RECIPE}', '--servings=6', '--units=metric']),
+    ('08_ingredients', '08_ingredients.py', ['--all', '--format=csv']),
+    ('09_sync', '09_sync.py', []),
+    ('10_prefetch', '10_prefetch.py', ['--all', '--max_credits=500', '--reserve=0']),
+    ('04_search_local', '04_search.py', ['--q=garlic', '--local']),
+    ('06_recipe_offline', '06_recipe.py', [f'--id={RECIPE}', '--offline']),
+    ('12_similar', '12_similar.py', [f'--id={RECIPE}', '--k=10']),
+    ('13_export', '13_export.py', ['--max_items=5000', '--processes=1']),
+    ('14_plan', '14_plan.py', ['--days=7', '--min_calories=1800', '--max_calories=2200', '--min_protein=90', '--max_per_cuisine=3']),
+]
+
+# Units a metric name can end with, whether lower is better, and the
+# smallest change worth flagging however large it is in percent
+UNITS = {
+    '_ms': (True, 0.5),
+    '_s': (True, 0.05),
+    '_mb': (True, 3.0),
+    '_per_s': (False, 0.0),
+}
+
+def unit_of(name):
+    return next(suffix for suffix in sorted(UNITS, key=len, reverse=True) if name.endswith(suffix))
+
+def percentiles_ms(times, prefix):
+    times = sorted(times)
+    pick = lambda q: times[min(len(times) - 1, int(q * len(times)))] * 1000
+    return {f'{prefix}.p50_ms': pick(0.50), f'{prefix}.p95_ms': pick(0.95), f'{prefix}.p99_ms': pick(0.99)}
+
+# ---- client paths (each runs in its own child process) ----
+
+def reset_peak_rss():
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+def peak_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def path_request(url, args):
+    """Sequential full-recipe requests on one pooled client."""
+    from client import RecipeClient
+    with RecipeClient(api_key=API_KEY, base_url=url) as client:
+        times = []
+        start = time.perf_counter()
+        for index in range(args.requests):
+            t = time.perf_counter()
+            client.request(f'/api/v1/recipes/rec_{index % args.recipes:07d}')
+            times.append(time.perf_counter() - t)
+        elapsed = time.perf_counter() - start
+    return {'request.req_per_s': args.requests / elapsed, **percentiles_ms(times, 'request')}
+
+def path_pages(url, args):
+    """Every list page of the catalog, 100 items per page, decoded whole."""
+    from client import RecipeClient, iter_recipes
+    with RecipeClient(api_key=API_KEY, base_url=url) as client:
+        start = time.perf_counter()
+        count = sum(1 for _ in iter_recipes(per_page=100, client=client))
+    return {'pages.items_per_s': count / (time.perf_counter() - start)}
+
+def path_stream(url, args):
+    """Every list page of the catalog, 1,000 items per page, decoded while downloading."""
+    from client import RecipeClient, iter_recipes
+    with RecipeClient(api_key=API_KEY, base_url=url) as client:
+        start = time.perf_counter()
+        count = sum(1 for _ in iter_recipes(per_page=1000, client=client, stream=True))
+    return {'stream.items_per_s': count / (time.perf_counter() - start)}
+
+def path_async(url, args):
+    """Concurrent full-recipe fetches with the asyncio client."""
+    from async_client import AsyncRecipeClient
+    ids = [f'rec_{index % args.recipes:07d}' for index in range(args.requests)]
+
+    async def run():
+        async with AsyncRecipeClient(api_key=API_KEY, base_url=url) as client:
+            start = time.perf_counter()
+            fetched = 0
+            async for result in client.get_recipes(ids):
+                fetched += result.error is None
+            return time.perf_counter() - start, fetched
+
+    elapsed, fetched = asyncio.run(run())
+    return {'async.req_per_s': fetched / elapsed}
+
+def path_cache(url, args):
+    """Full recipes served from the on-disk response cache after one warming pass."""
+    from cache import ResponseCache
+    from client import RecipeClient
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(os.path.join(tmp, 'cache.sqlite3'))
+        with RecipeClient(api_key=API_KEY, base_url=url, cache=cache) as client:
+            endpoints = [f'/api/v1/recipes/rec_{index:07d}' for index in range(min(args.requests, args.recipes))]
+            for endpoint in endpoints:
+                client.request(endpoint)
+            times = []
+            for endpoint in endpoints:
+                t = time.perf_counter()
+                client.request(endpoint)
+                times.append(time.perf_counter() - t)
+        cache.close()
+    return percentiles_ms(times, 'cache_hit')
+
+def path_faults(url, args):
+    """
+    Sequential requests against a server answering some with 429 or 503,
+    retried by the client. Backoff starts at 50ms (not the default 0.5s)
+    and its jitter is seeded, so runs are comparable.
+    """
+    from client import RecipeApiError, RecipeClient
+    from ratelimit import RetryPolicy
+    random.seed(0)
+    with RecipeClient(api_key=API_KEY, base_url=url, retry=RetryPolicy(base_delay=0.05)) as client:
+        times, failed = [], 0
+        start = time.perf_counter()
+        for index in range(args.requests):
+            t = time.perf_counter()
+            try:
+                client.request('/api/v1/recipes', {'page': index % 50 + 1, 'per_page': 20})
+            except RecipeApiError:
+                failed += 1
+            times.append(time.perf_counter() - t)
+        elapsed = time.perf_counter() - start
+    return {'faults.req_per_s': (args.requests - failed) / elapsed, **percentiles_ms(times, 'faults')}
+
+CLIENT_PATHS = {
+    'request': path_request,
+    'pages': path_pages,
+    'stream': path_stream,
+    'async': path_async,
+    'cache': path_cache,
+    'faults': path_faults,
+}
+
+def child(name, url, args):
+    import client, async_client, cache  # noqa: F401  (count imports in the baseline, not the path)
+    reset_peak_rss()
+    baseline = peak_rss_mb()
+    metrics = CLIENT_PATHS[name](url, args)
+    metrics[f'{name}.rss_mb'] = peak_rss_mb() - baseline
+    print(json.dumps(metrics))
+
+def best(runs):
+    """Per metric, the best value of several runs: machine noise only ever makes a run worse."""
+    return {
+        name: (min if UNITS[unit_of(name)][0] else max)(run[name] for run in runs)
+        for name in runs[0]
+    }
+
+def run_client_path(name, url, args):
+    runs = []
+    for _ in range(args.repeat):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', name, url,
+             f'--recipes={args.recipes}', f'--requests={args.requests}'],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        runs.append(json.loads(output))
+    return best(runs)
+
+# ---- scripts ----
+
+def run_script(script, script_args, cwd, env):
+    """(seconds, peak RSS in MB) of one script run; raises if it fails."""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.join(SCRIPTS, script), *script_args],
+                               cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    stderr = process.stderr.read()
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode:
+        raise RuntimeError(f'{script} {" ".join(script_args)} exited {process.returncode}:\n{stderr.decode()[-2000:]}')
+    return elapsed, usage.ru_maxrss / 1024
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def run_gateway(upstream, cwd, env, repeat):
+    """03_browse through 11_gateway.py: seconds for a cold then a cached pass, and the gateway's peak RSS."""
+    port = free_port()
+    gateway = subprocess.Popen([sys.executable, os.path.join(SCRIPTS, '11_gateway.py'), f'--port={port}',
+                                f'--upstream={upstream}'], cwd=cwd, env=env, stdout=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    try:
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(f'{url}/gateway/stats')
+                break
+            except OSError:
+                time.sleep(0.1)
+        browse = ['--all', '--max_items=2000', '--format=csv']
+        via = {**env, 'RECIPE_API_BASE_URL': url}
+        cold, _ = run_script('03_browse.py', browse, cwd, via)
+        warm = statistics.median(run_script('03_browse.py', browse, cwd, via)[0] for _ in range(repeat))
+    finally:
+        gateway.terminate()
+        _, _, usage = os.wait4(gateway.pid, 0)
+        gateway.returncode = 0
+    return {
+        'script.11_gateway_cold.wall_s': cold,
+        'script.11_gateway_cached.wall_s': warm,
+        'script.11_gateway.rss_mb': usage.ru_maxrss / 1024,
+    }
+
+def run_scripts(url, args):
+    metrics = {}
+    env = {**os.environ, 'RECIPE_API_BASE_URL': url, 'RECIPE_API_KEY': API_KEY}
+    with tempfile.TemporaryDirectory() as cwd:
+        for name, script, script_args in SCRIPT_RUNS:
+            # The first run of a stateful script does the work; repeats would be no-ops
+            runs = [run_script(script, script_args, cwd, env)]
+            if name not in ('09_sync', '10_prefetch', '12_similar'):
+                runs += [run_script(script, script_args, cwd, env) for _ in range(args.repeat - 1)]
+            metrics[f'script.{name}.wall_s'] = statistics.median(seconds for seconds, _ in runs)
+            metrics[f'script.{name}.rss_mb'] = max(rss for _, rss in runs)
+            print(f"  {name:<28}{metrics[f'script.{name}.wall_s']:8.2f}s{metrics[f'script.{name}.rss_mb']:8.0f} MB",
+                  flush=True)
+        gateway = run_gateway(url, cwd, env, args.repeat)
+        print(f"  {'03_browse via 11_gateway':<28}{gateway['script.11_gateway_cold.wall_s']:8.2f}s cold, "
+              f"{gateway['script.11_gateway_cached.wall_s']:.2f}s cached, gateway {gateway['script.11_gateway.rss_mb']:.0f} MB")
+        metrics.update(gateway)
+    return metrics
+
+# ---- baseline ----
+
+def compare(current, baseline, tolerance):
+    """Print current against baseline; returns the names of regressed metrics."""
+    regressions = []
+    print(f"\n  {'metric':<40}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name in sorted(current):
+        value = current[name]
+        if name not in baseline:
+            print(f"  {name:<40}{'-':>12}{value:12.2f}{'new':>9}")
+            continue
+        lower_better, floor = UNITS[unit_of(name)]
+        before = baseline[name]
+        change = (value - before) / before if before else 0.0
+        worse = (value - before) if lower_better else (before - value)
+        flag = ''
+        if worse > floor and worse > tolerance * abs(before):
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"  {name:<40}{before:12.2f}{value:12.2f}{change:+8.0%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Run every script and client path against the stand-in server')
+    parser.add_argument('--recipes', type=int, default=5000, help='Catalog size')
+    parser.add_argument('--requests', type=int, default=500, help='Requests per client path')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds the server adds to every response')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per script (median reported) and per client path (best reported)')
+    parser.add_argument('--only', choices=['scripts', 'client'], help='Run one half of the suite')
+    parser.add_argument('--baseline', type=str, default=DEFAULT_BASELINE, help='Baseline file')
+    parser.add_argument('--save', action='store_true', help='Store this run as the baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Fraction a metric may worsen before it counts as a regression')
+    parser.add_argument('--child', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child, args)
+        return
+
+    sys.path.append(BENCHMARKS)
+    from mock_server import MockApi, MockApiServer
+
+    credits = {'monthly_credits': 10 ** 9, 'daily_credits': 10 ** 9}
+    api = MockApi(recipes=args.recipes, latency=args.latency, **credits)
+    faulty = MockApi(recipes=args.recipes, latency=args.latency, throttle_rate=0.05, error_rate=0.05, **credits)
+    print(f"{args.recipes:,} recipes, {args.requests:,} requests per client path, "
+          f"server latency {args.latency * 1000:g}ms, {os.cpu_count()} CPU(s)\n")
+
+    metrics = {}
+    with MockApiServer(api) as server, MockApiServer(faulty) as faulty_server:
+        if args.only != 'client':
+            print('Scripts (median seconds, peak RSS):')
+            metrics.update(run_scripts(server.url, args))
+        if args.only != 'scripts':
+            print('\nClient paths:')
+            for name in CLIENT_PATHS:
+                result = run_client_path(name, faulty_server.url if name == 'faults' else server.url, args)
+                print('  ' + ', '.join(f'{key} {value:,.1f}' for key, value in result.items()), flush=True)
+                metrics.update(result)
+
+    if args.save:
+        saved = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                saved = json.load(f)['metrics']
+        saved.update(metrics)
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'recipes': args.recipes, 'requests': args.requests, 'latency': args.latency,
+                'python': sys.version.split()[0], 'cpus': os.cpu_count(),
+                'metrics': {name: round(value, 3) for name, value in sorted(saved.items())},
+            }, f, indent=2)
+            f.write('\n')
+        print(f'\nSaved {len(metrics)} metrics to {args.baseline}')
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f'\nNo baseline at {args.baseline}; record one with --save')
+        return
+    with open(args.baseline) as f:
+        stored = json.load(f)
+    if (stored['recipes'], stored['requests'], stored['latency']) != (args.recipes, args.requests, args.latency):
+        print('\n!! Baseline was recorded with different --recipes/--requests/--latency; comparing anyway !!')
+    regressions = compare(metrics, stored['metrics'], args.tolerance)
+    if regressions:
+        print(f'\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {", ".join(regressions)}')
+        sys.exit(1)
+    print(f'\nNo regressions beyond {args.tolerance:.0%}.')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Stand-in Recipe API server for local benchmarks.
+
+Runs an HTTP/1.1 (keep-alive) server on a background thread and answers
+`/api/v1/...` routes with canned JSON, so client code can be measured
+without a network or an API key. Run it on its own to point the scripts
+at it:
+
+    python benchmarks/mock_server.py --port=8080 --recipes=100000 --latency=0.02 --throttle_rate=0.02
+    RECIPE_API_BASE_URL=http://127.0.0.1:8080 RECIPE_API_KEY=rapi_local python src/scripts/03_browse.py
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import synthetic
+
+# Slice size for bodies sent at a limited `bandwidth`
+WRITE_SIZE = 16 * 1024
+
+def parse_recipe_id(value):
+    if not value.startswith('rec_') or not value[4:].isdigit():
+        return None
+    return int(value[4:])
+
+def paginate(query, total, get_item):
+    page = int(query.get('page', 1))
+    per_page = int(query.get('per_page', 10))
+    start = (page - 1) * per_page
+    data = [get_item(i) for i in range(start, min(start + per_page, total))]
+    return {'data': data, 'meta': {'page': page, 'per_page': per_page, 'total': total}}
+
+def recipe_filter(query):
+    """Build a predicate for the /api/v1/recipes filter params, or None if unfiltered."""
+    checks = []
+    if 'q' in query:
+        q = query['q'].lower()
+        checks.append(lambda r: q in r['name'].lower() or q in r['description'].lower())
+    for field in ('category', 'cuisine', 'difficulty'):
+        if field in query:
+            checks.append(lambda r, field=field, value=query[field]: r[field] == value)
+    if 'dietary' in query:
+        checks.append(lambda r: query['dietary'] in r['dietary']['flags'])
+    if 'max_calories' in query:
+        checks.append(lambda r: r['nutrition_summary']['calories'] <= float(query['max_calories']))
+    if 'min_protein' in query:
+        checks.append(lambda r: r['nutrition_summary']['protein_g'] >= float(query['min_protein']))
+    if not checks:
+        return None
+    return lambda r: all(check(r) for check in checks)
+
+def error_payload(code, message):
+    return {'error': {'code': code, 'message': message}}
+
+def lookup_payload(names):
+    return {'data': [{'name': name, 'count': 20 * (i + 1)} for i, name in enumerate(names)]}
+
+class MockApiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        status, payload, headers = self.server.api.dispatch(parts.path, query, self.headers.get('X-API-Key'))
+        self.send_json(status, payload, headers)
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            status, body = 304, b''
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if status in (200, 304):
+            self.send_header('ETag', etag)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        bandwidth = self.server.api.bandwidth
+        if not bandwidth:
+            self.wfile.write(body)
+            return
+        # Pace the body like a link of `bandwidth` bytes/sec
+        start = time.perf_counter()
+        for offset in range(0, len(body), WRITE_SIZE):
+            self.wfile.write(body[offset:offset + WRITE_SIZE])
+            delay = start + (offset + WRITE_SIZE) / bandwidth - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def log_message(self, format, *args):
+        pass
+
+class MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def handle_error(self, request, client_address):
+        # Clients that cancel in-flight requests are expected; don't dump tracebacks
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+class MockApi:
+    """
+    Route table for the stand-in server. Subclass or extend to add routes.
+
+    Requests without an API key (or, with `api_keys`, with one not in it)
+    get 401. `rate_limit` answers 429 past that many requests a second,
+    `throttle_rate` and `error_rate` the given fraction of requests with a
+    429 (Retry-After: 0) or 503. Full recipes cost a credit and carry a
+    `usage` block; 429 QUOTA_EXCEEDED once the credits run out.
+    """
+
+    def __init__(self, recipes=10_000, ingredients=2_000, latency=0.0,
+                 monthly_credits=100_000, daily_credits=10_000,
+                 rate_limit=None, error_rate=0.0, bandwidth=None, seed=0,
+                 throttle_rate=0.0, api_keys=None):
+        self.recipes = recipes
+        self.ingredients = ingredients
+        self.latency = latency
+        self.monthly_remaining = monthly_credits
+        self.daily_remaining = daily_credits
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.bandwidth = bandwidth
+        self.throttle_rate = throttle_rate
+        self.api_keys = set(api_keys) if api_keys is not None else None
+        self.hits = 0
+        self.rate_limited = 0
+        self.injected_errors = 0
+        self.unauthorized = 0
+        self._rng = random.Random(seed)
+        self._window = None
+        self._window_count = 0
+        self._lock = threading.Lock()
+
+    def dispatch(self, path, query, api_key=''):
+        """Apply auth, rate limiting and fault injection, then route. Returns (status, payload, headers)."""
+        with self._lock:
+            self.hits += 1
+            if not api_key or (self.api_keys is not None and api_key not in self.api_keys):
+                self.unauthorized += 1
+                return 401, error_payload('INVALID_API_KEY', 'Missing or invalid API key'), {}
+            headers = self._rate_limit_headers()
+            if headers and headers['X-RateLimit-Remaining'] == '-1':
+                self.rate_limited += 1
+                headers['X-RateLimit-Remaining'] = '0'
+                headers['Retry-After'] = str(math.ceil(self._window + 1 - time.time()))
+                return 429, error_payload('RATE_LIMITED', 'Rate limit exceeded'), headers
+            if self.throttle_rate and self._rng.random() < self.throttle_rate:
+                self.rate_limited += 1
+                return 429, error_payload('RATE_LIMITED', 'Rate limit exceeded'), {**headers, 'Retry-After': '0'}
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.injected_errors += 1
+                return 503, error_payload('UNAVAILABLE', 'Service temporarily unavailable'), {}
+
+        if self.latency:
+            time.sleep(self.latency)
+        status, payload = self.handle(path, query)
+        return status, payload, headers
+
+    def _rate_limit_headers(self):
+        # Fixed one-second windows, like a typical per-second plan limit
+        if not self.rate_limit:
+            return {}
+        now = time.time()
+        window = int(now)
+        if window != self._window:
+            self._window, self._window_count = window, 0
+        self._window_count += 1
+        remaining = max(-1, self.rate_limit - self._window_count)
+        return {
+            'X-RateLimit-Limit': str(self.rate_limit),
+            'X-RateLimit-Remaining': str(remaining),
+            'X-RateLimit-Reset': str(window + 1),
+        }
+
+    def handle(self, path, query):
+        if path == '/api/v1/cuisines':
+            return 200, lookup_payload(synthetic.CUISINES)
+        if path == '/api/v1/dietary-flags':
+            return 200, lookup_payload(synthetic.DIETARY_FLAGS)
+        if path == '/api/v1/ingredient-categories':
+            return 200, lookup_payload(synthetic.INGREDIENT_CATEGORIES)
+        if path == '/api/v1/recipes':
+            return self.recipe_list(query)
+        if path.startswith('/api/v1/recipes/'):
+            return self.recipe_detail(path[len('/api/v1/recipes/'):])
+        if path == '/api/v1/ingredients':
+            return self.ingredient_list(query)
+        return self.not_found()
+
+    def recipe_list(self, query):
+        matches = recipe_filter(query)
+        if matches is None:
+            return 200, paginate(query, self.recipes, synthetic.recipe_summary)
+        found = [r for r in map(synthetic.recipe_summary, range(self.recipes)) if matches(r)]
+        return 200, paginate(query, len(found), found.__getitem__)
+
+    def ingredient_list(self, query):
+        q = query.get('q', '').lower()
+        category = query.get('category')
+        if not q and not category:
+            return 200, paginate(query, self.ingredients, synthetic.ingredient)
+        found = [
+            item for item in map(synthetic.ingredient, range(self.ingredients))
+            if q in item['name'].lower() and (not category or item['category'] == category)
+        ]
+        return 200, paginate(query, len(found), found.__getitem__)
+
+    def recipe_detail(self, value):
+        index = parse_recipe_id(value)
+        if index is None or index >= self.recipes:
+            return self.not_found()
+        with self._lock:
+            if self.monthly_remaining <= 0 or self.daily_remaining <= 0:
+                return 429, error_payload('QUOTA_EXCEEDED', 'Credit quota exhausted')
+            self.monthly_remaining -= 1
+            self.daily_remaining -= 1
+            usage = {'monthly_remaining': self.monthly_remaining, 'daily_remaining': self.daily_remaining}
+        return 200, {'data': synthetic.full_recipe(index), 'usage': usage}
+
+    def not_found(self):
+        return 404, error_payload('NOT_FOUND', 'Resource not found')
+
+class MockApiServer:
+    """
+    Context manager that serves a MockApi on 127.0.0.1.
+
+        with MockApiServer() as server:
+            client.BASE_URL = server.url
+    """
+
+    def __init__(self, api=None, host='127.0.0.1', port=0):
+        self.api = api or MockApi()
+        self.httpd = MockHTTPServer((host, port), MockApiHandler)
+        self.httpd.api = self.api
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the stand-in Recipe API until interrupted')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on (0 for any free port)')
+    parser.add_argument('--recipes', type=int, default=10_000, help='Catalog size')
+    parser.add_argument('--ingredients', type=int, default=2_000, help='Ingredient count')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--rate_limit', type=int, help='Requests per second before answering 429')
+    parser.add_argument('--throttle_rate', type=float, default=0.0, help='Fraction of requests answered 429')
+    parser.add_argument('--error_rate', type=float, default=0.0, help='Fraction of requests answered 503')
+    parser.add_argument('--bandwidth', type=float, help='Response bandwidth in MB/s (default: unlimited)')
+    parser.add_argument('--monthly_credits', type=int, default=100_000, help='Credits before the monthly quota runs out')
+    parser.add_argument('--daily_credits', type=int, default=10_000, help='Credits before the daily quota runs out')
+    parser.add_argument('--api_keys', type=str, help='Comma-separated keys to accept (default: any)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the fault injection')
+    args = parser.parse_args()
+
+    api = MockApi(
+        recipes=args.recipes, ingredients=args.ingredients, latency=args.latency,
+        monthly_credits=args.monthly_credits, daily_credits=args.daily_credits,
+        rate_limit=args.rate_limit, error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+        bandwidth=args.bandwidth * 1e6 if args.bandwidth else None, seed=args.seed,
+        api_keys=args.api_keys.split(',') if args.api_keys else None,
+    )
+    server = MockApiServer(api, args.host, args.port).start()
+    print(f'Serving {args.recipes:,} recipes at {server.url}', flush=True)
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f'{api.hits:,} requests, {api.rate_limited:,} answered 429, {api.injected_errors:,} answered 503')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Deterministic synthetic Recipe API data for benchmarks.
+
+Every record is derived from its integer index, so the same index always
+yields the same recipe and catalogs of any size can be generated lazily.
+"""
+import random
+
+CATEGORIES = ['Breakfast', 'Main', 'Side', 'Soup', 'Salad', 'Dessert', 'Snack', 'Drink']
+CUISINES = [
+    'Italian', 'French', 'Mexican', 'Japanese', 'Indian', 'Thai',
+    'Chinese', 'Greek', 'Spanish', 'American', 'Korean', 'Moroccan',
+]
+DIFFICULTIES = ['Beginner', 'Intermediate', 'Advanced']
+DIETARY_FLAGS = [
+    'Vegetarian', 'Vegan', 'Gluten-Free', 'Dairy-Free', 'Nut-Free',
+    'Low-Carb', 'High-Protein', 'Keto', 'Paleo', 'Pescatarian',
+]
+INGREDIENT_CATEGORIES = [
+    'Vegetables', 'Fruits', 'Meat', 'Seafood', 'Dairy', 'Grains',
+    'Legumes', 'Herbs', 'Spices', 'Oils', 'Nuts', 'Baking',
+]
+WORDS = [
+    'garlic', 'lemon', 'smoky', 'roasted', 'crispy', 'creamy', 'spiced',
+    'herb', 'braised', 'grilled', 'tomato', 'chicken', 'mushroom', 'basil',
+    'ginger', 'honey', 'chili', 'coconut', 'sesame', 'pepper', 'potato',
+    'salmon', 'lentil', 'spinach', 'pasta', 'rice', 'noodle', 'curry',
+]
+DISHES = ['Stew', 'Salad', 'Bowl', 'Tart', 'Soup', 'Skillet', 'Bake', 'Curry', 'Pasta', 'Tacos']
+UNITS = ['g', 'ml', 'cup', 'tbsp', 'tsp', 'oz', 'lb', '', 'clove', 'pinch']
+PHASES = ['prep', 'cook', 'rest', 'assemble', 'serve']
+PREPARATIONS = ['', 'diced', 'minced', 'sliced', 'chopped', 'grated']
+EQUIPMENT = ['Large skillet', 'Dutch oven', 'Baking sheet', 'Chef knife', 'Blender', 'Saucepan']
+
+INGREDIENT_NAMES = [
+    f'{adj} {noun}'.strip()
+    for adj in ['', 'fresh', 'dried', 'red', 'green', 'smoked', 'ground', 'whole']
+    for noun in WORDS
+]
+
+def recipe_id(index):
+    return f'rec_{index:07d}'
+
+def ingredient_id(index):
+    return f'ing_{index:05d}'
+
+def iso_duration(minutes):
+    hours, minutes = divmod(minutes, 60)
+    if hours and minutes:
+        return f'PT{hours}H{minutes}M'
+    if hours:
+        return f'PT{hours}H'
+    return f'PT{minutes}M'
+
+def _recipe_core(index):
+    rng = random.Random(index)
+    name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {rng.choice(DISHES)}"
+    active = rng.randint(5, 60)
+    passive = rng.choice([0, 0, 10, 20, 45, 90, 480])
+    calories = round(rng.uniform(80, 1100), 1)
+    protein = round(rng.uniform(1, 70), 1)
+    return rng, {
+        'id': recipe_id(index),
+        'name': name,
+        'description': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(12, 30))).capitalize() + '.',
+        'category': rng.choice(CATEGORIES),
+        'cuisine': rng.choice(CUISINES),
+        'difficulty': rng.choice(DIFFICULTIES),
+        'active': active,
+        'passive': passive,
+        'flags': sorted(rng.sample(DIETARY_FLAGS, rng.randint(0, 4))),
+        'calories': calories,
+        'protein_g': protein,
+        'carbohydrates_g': round(rng.uniform(0, 120), 1),
+        'fat_g': round(rng.uniform(0, 60), 1),
+    }
+
+def recipe_summary(index):
+    """A recipe as it appears in `/api/v1/recipes` list pages."""
+    _, core = _recipe_core(index)
+    return {
+        'id': core['id'],
+        'name': core['name'],
+        'description': core['description'],
+        'category': core['category'],
+        'cuisine': core['cuisine'],
+        'difficulty': core['difficulty'],
+        'meta': {'total_time': iso_duration(core['active'] + core['passive'])},
+        'dietary': {'flags': core['flags']},
+        'nutrition_summary': {
+            'calories': core['calories'],
+            'protein_g': core['protein_g'],
+            'carbohydrates_g': core['carbohydrates_g'],
+            'fat_g': core['fat_g'],
+        },
+    }
+
+def full_recipe(index):
+    """A recipe as returned by `/api/v1/recipes/{id}`."""
+    rng, core = _recipe_core(index)
+    servings = rng.choice([1, 2, 4, 4, 6, 8])
+
+    groups = []
+    for g in range(rng.randint(1, 3)):
+        items = []
+        for _ in range(rng.randint(3, 8)):
+            ing_index = rng.randrange(len(INGREDIENT_NAMES))
+            items.append({
+                'id': ingredient_id(ing_index),
+                'name': INGREDIENT_NAMES[ing_index],
+                'quantity': rng.choice([0.25, 0.5, 1, 1.5, 2, 3, 100, 200, 250]),
+                'unit': rng.choice(UNITS),
+                'preparation': rng.choice(PREPARATIONS) or None,
+                'notes': rng.choice([None, None, None, 'optional', 'to taste']),
+            })
+        groups.append({'group_name': None if g == 0 else f'For the {rng.choice(WORDS)}', 'items': items})
+
+    instructions = []
+    for step in range(1, rng.randint(4, 10)):
+        duration = iso_duration(rng.randint(1, 40)) if rng.random() < 0.6 else None
+        instructions.append({
+            'step_number': step,
+            'phase': rng.choice(PHASES),
+            'text': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 25))).capitalize() + '.',
+            'structured': {'duration': duration} if duration else {},
+            'tips': [f'Use {rng.choice(WORDS)} for best results.'] if rng.random() < 0.2 else [],
+        })
+
+    return {
+        'id': core['id'],
+        'name': core['name'],
+        'description': core['description'],
+        'category': core['category'],
+        'cuisine': core['cuisine'],
+        'difficulty': core['difficulty'],
+        'meta': {
+            'active_time': iso_duration(core['active']),
+            'passive_time': iso_duration(core['passive']),
+            'total_time': iso_duration(core['active'] + core['passive']),
+            'yields': f'{servings} servings',
+            'overnight_required': core['passive'] >= 480,
+        },
+        'dietary': {'flags': core['flags']},
+        'nutrition': {
+            'per_serving': {
+                'calories': core['calories'],
+                'protein_g': core['protein_g'],
+                'carbohydrates_g': core['carbohydrates_g'],
+                'fat_g': core['fat_g'],
+                'fiber_g': round(rng.uniform(0, 15), 1),
+            },
+        },
+        'equipment': [
+            {'name': name, 'alternative': None, 'required': rng.random() < 0.8}
+            for name in rng.sample(EQUIPMENT, rng.randint(1, 3))
+        ],
+        'ingredients': groups,
+        'instructions': instructions,
+        'chef_notes': [f'Swap the {rng.choice(WORDS)} for {rng.choice(WORDS)} if needed.'],
+        'cultural_context': f"A {core['cuisine']} classic.",
+        'storage': {
+            'does_not_keep': False,
+            'refrigerator': {'duration': 'P3D', 'notes': 'Keeps 3 days in an airtight container.'},
+            'reheating': 'Warm gently over low heat.',
+        },
+    }
+
+def ingredient(index):
+    """An ingredient as it appears in `/api/v1/ingredients` list pages."""
+    name = INGREDIENT_NAMES[index % len(INGREDIENT_NAMES)]
+    if index >= len(INGREDIENT_NAMES):
+        name = f'{name} ({index // len(INGREDIENT_NAMES)})'
+    return {
+        'id': ingredient_id(index),
+        'name': name,
+        'category': INGREDIENT_CATEGORIES[index % len(INGREDIENT_CATEGORIES)],
+        'source': 'USDA' if index % 3 else 'Recipe API',
+    }
+
+def recipe_summaries(count, distinct=10_000):
+    """
+    `count` list-page recipes with unique IDs, cheap enough for catalogs of
+    millions: only `distinct` recipes are generated and the rest are shallow
+    copies of them (nested sections and strings are shared).
+    """
+    pool = [recipe_summary(i) for i in range(min(count, distinct))]
+    for index in range(count):
+        recipe = dict(pool[index % len(pool)])
+        recipe['id'] = recipe_id(index)
+        yield recipe
@@ -0,0 +1,263 @@
+import asyncio
+import time
+from collections import namedtuple
+
+import aiohttp
+
+import client
+from cache import cache_key
+from client import RecipeApiError, NetworkError, get_api_key, error_for_status
+from jsonstream import CHUNK_SIZE as STREAM_CHUNK_SIZE, AsyncItemStream, loads
+from metrics import begin, finish
+from models import Recipe
+from ratelimit import TokenBucket, RetryPolicy, retry_after_from_headers
+
+DEFAULT_CONCURRENCY = 8
+
+# One entry per requested ID: `data` is the recipe on success, otherwise
+# `error` holds the RecipeApiError for that ID (e.g. 404 NOT_FOUND).
+RecipeResult = namedtuple('RecipeResult', ['id', 'data', 'usage', 'error'])
+
+class AsyncRecipeClient:
+    """
+    Asyncio counterpart to client.api_request.
+
+    All requests share one aiohttp connection pool, and a semaphore caps how
+    many are in flight at once. Retries and optional `rate_limit` pacing
+    behave as in client.RecipeClient, and so do `cache`, `hooks` and
+    `coalescer`; pass coalesce.get_default_coalescer() to share in-flight
+    requests with the default sync client:
+
+        async with AsyncRecipeClient(concurrency=32) as api:
+            async for result in api.get_recipes(ids):
+                ...
+    """
+
+    def __init__(self, api_key=None, base_url=None, concurrency=DEFAULT_CONCURRENCY,
+                 timeout=client.DEFAULT_TIMEOUT, rate_limit=None, burst=None, retry=None,
+                 coalescer=None, hooks=None, cache=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.cache = cache
+        self.coalescer = coalescer
+        self.hooks = list(hooks or ())
+        self.concurrency = concurrency
+        self.rate_limiter = TokenBucket(rate_limit, burst) if rate_limit else None
+        self.retry = retry or RetryPolicy()
+        self.retries = 0
+        self.timeout = aiohttp.ClientTimeout(connect=timeout[0], sock_read=timeout[1])
+        self.session = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def open(self):
+        if self.session is None:
+            if self.api_key is None:
+                self.api_key = get_api_key()
+            connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers={'X-API-Key': self.api_key, 'Accept': 'application/json'},
+            )
+        return self
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        if self.cache:
+            self.cache.close()
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def request(self, endpoint, params=None, raw=False):
+        """The decoded JSON response, or with `raw=True` the body bytes as received."""
+        await self.open()
+        if not self.hooks:
+            return await self._request(endpoint, params, raw=raw)
+        event = begin(self.hooks, endpoint, params)
+        try:
+            response = await self._request(endpoint, params, event, raw)
+        except Exception as e:
+            finish(self.hooks, event, error=e)
+            raise
+        finish(self.hooks, event, response)
+        return response
+
+    async def _request(self, endpoint, params, event=None, raw=False):
+        if self.coalescer is None:
+            body = await self._fetch(endpoint, params, event)
+        else:
+            key = cache_key(endpoint, params, self.base_url or client.BASE_URL, self.api_key)
+            body = await self.coalescer.acall(key, lambda: self._fetch(endpoint, params, event))
+        return body if raw else loads(body)
+
+    async def _fetch(self, endpoint, params, event=None):
+        # Entries are kept per server and API key, like coalesced requests
+        scope = (self.base_url or client.BASE_URL, self.api_key)
+        # The cache is SQLite: its reads and writes run in a worker thread so
+        # they don't stall every other request on the event loop
+        cached = await asyncio.to_thread(self.cache.get, endpoint, params, *scope) if self.cache else None
+        if cached and cached.fresh:
+            if event:
+                event.source, event.status = 'cache', 200
+            return cached.body
+
+        headers = {}
+        if cached:
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
+
+        response, body = await self._get(endpoint, params, headers, event)
+        if response.status == 304 and cached:
+            await asyncio.to_thread(self.cache.revalidated, cached, endpoint)
+            if event:
+                event.source = 'revalidated'
+            return cached.body
+
+        if self.cache:
+            await asyncio.to_thread(
+                self.cache.put, endpoint, params, body,
+                response.headers.get('ETag'), response.headers.get('Last-Modified'), *scope,
+            )
+        if event:
+            event.source = 'network'
+        return body
+
+    async def _get(self, endpoint, params, headers=None, event=None, stream=False):
+        """
+        The first successful (or 304) response and its body, retrying rate
+        limits and transient failures. With `stream=True` the body is left
+        unread (None) and the caller must release the response.
+        """
+        url = f"{self.base_url or client.BASE_URL}{endpoint}"
+
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                await asyncio.sleep(self.rate_limiter.reserve())
+            if event:
+                event.retries = attempt
+
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    response = await self.session.get(url, params=params, headers=headers)
+                    try:
+                        if self.rate_limiter:
+                            self.rate_limiter.update_from_headers(response.headers)
+                        if event:
+                            event.status = response.status
+                        if response.status < 400:
+                            if stream:
+                                return response, None
+                            body = await response.read()
+                            if event:
+                                event.bytes += len(body)
+                            return response, body
+
+                        body = await response.read()
+                        if event:
+                            event.bytes += len(body)
+                    finally:
+                        if not stream or response.status >= 400:
+                            response.release()
+
+                error = error_for_status(response.status, body.decode('utf-8', 'replace'), response.headers)
+                if response.status not in self.retry.statuses:
+                    raise error
+                retry_after = retry_after_from_headers(response.headers, response.status)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = NetworkError(f'Could not connect to the API: {e}')
+
+            if attempt >= self.retry.max_retries:
+                raise error
+
+            delay = self.retry.delay(attempt, retry_after)
+            if retry_after is not None and self.rate_limiter:
+                self.rate_limiter.pause_until(time.monotonic() + delay)
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    async def stream(self, endpoint, params=None):
+        """
+        Request a list endpoint and return a jsonstream.AsyncItemStream over
+        its `data` items, decoded as they arrive (see RecipeClient.stream):
+
+            async with await api.stream('/api/v1/recipes', {'per_page': 10000}) as recipes:
+                async for recipe in recipes:
+                    ...
+
+        The concurrency semaphore covers the request, not reading the body.
+        """
+        await self.open()
+        event = begin(self.hooks, endpoint, params) if self.hooks else None
+        try:
+            response, _ = await self._get(endpoint, params, event=event, stream=True)
+        except Exception as e:
+            if event:
+                finish(self.hooks, event, error=e)
+            raise
+
+        async def chunks():
+            try:
+                async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    yield chunk
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise NetworkError(f'Connection lost while streaming: {e}') from e
+
+        def done(stream, error):
+            response.release()
+            if event:
+                event.source, event.bytes = 'network', stream.bytes
+                finish(self.hooks, event, stream.fields, error)
+
+        return AsyncItemStream(chunks(), on_close=done)
+
+    async def get_recipe(self, recipe_id, model=False):
+        """Fetch one full recipe, returning a RecipeResult instead of raising."""
+        try:
+            response = await self.request(f'/api/v1/recipes/{recipe_id}')
+        except RecipeApiError as e:
+            return RecipeResult(recipe_id, None, None, e)
+        data = Recipe.from_json(response['data']) if model else response['data']
+        return RecipeResult(recipe_id, data, response.get('usage'), None)
+
+    async def get_recipes(self, ids, models=False):
+        """
+        Fetch many full recipes, yielding RecipeResults as they complete.
+
+        Results arrive in completion order, not input order. Only a bounded
+        window of tasks exists at any time, so `ids` may be a large or lazy
+        iterable. Each recipe costs 1 credit. With `models=True`, `data` is
+        a models.Recipe.
+        """
+        ids = iter(ids)
+        window = self.concurrency * 2
+        pending = set()
+
+        try:
+            while True:
+                while len(pending) < window:
+                    recipe_id = next(ids, None)
+                    if recipe_id is None:
+                        break
+                    pending.add(asyncio.ensure_future(self.get_recipe(recipe_id, models)))
+
+                if not pending:
+                    return
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            # The caller stopped early; don't leave requests running
+            for task in pending:
+                task.cancel()
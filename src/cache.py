@@ -0,0 +1,185 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlencode
+
+# Seconds a cached response is served without asking the server. Longest
+# matching prefix wins; endpoints not listed are not cached.
+DEFAULT_TTLS = {
+    '/api/v1/cuisines': 24 * 3600,
+    '/api/v1/dietary-flags': 24 * 3600,
+    '/api/v1/ingredient-categories': 24 * 3600,
+    '/api/v1/ingredients': 3600,
+    '/api/v1/recipes': 300,
+    # Full recipes cost a credit each and rarely change
+    '/api/v1/recipes/': 7 * 24 * 3600,
+}
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+CacheEntry = namedtuple('CacheEntry', ['key', 'body', 'etag', 'last_modified', 'fresh'])
+
+def cache_key(endpoint, params=None, base_url=None, api_key=None):
+    """
+    Endpoint plus sorted, non-None params, so equivalent requests share an
+    entry, then a hash of `base_url` and `api_key` when given, so other
+    servers and accounts never do. The key itself is not kept.
+    """
+    items = sorted((k, str(v)) for k, v in (params or {}).items() if v is not None)
+    key = f"{endpoint}?{urlencode(items)}" if items else endpoint
+    if base_url is None and api_key is None:
+        return key
+    scope = hashlib.blake2b(f'{base_url}\n{api_key}'.encode(), digest_size=8).hexdigest()
+    return f'{key}#{scope}'
+
+class ResponseCache:
+    """
+    SQLite-backed cache of raw API response bodies.
+
+    Entries expire after a per-endpoint TTL; expired entries keep their
+    ETag/Last-Modified validators so the client can revalidate them with a
+    conditional request. Total body size is bounded, evicting the least
+    recently used entries first.
+    """
+
+    def __init__(self, path, ttls=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        ''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)')
+        self._size = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def ttl_for(self, endpoint):
+        """TTL of the longest configured prefix of `endpoint`, or None if uncached."""
+        best = None
+        for prefix in self.ttls:
+            if endpoint.startswith(prefix) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return None if best is None else self.ttls[best]
+
+    def get(self, endpoint, params=None, base_url=None, api_key=None):
+        """Return a CacheEntry (possibly stale) or None, counting hits and misses."""
+        if self.ttl_for(endpoint) is None:
+            return None
+
+        key = cache_key(endpoint, params, base_url, api_key)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                'SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            body, etag, last_modified, expires_at = row
+            fresh = expires_at > now
+            if fresh:
+                self.hits += 1
+                self._db.execute('UPDATE responses SET last_access = ? WHERE key = ?', (now, key))
+            else:
+                self.misses += 1
+        return CacheEntry(key, body, etag, last_modified, fresh)
+
+    def put(self, endpoint, params, body, etag=None, last_modified=None, base_url=None, api_key=None):
+        ttl = self.ttl_for(endpoint)
+        if ttl is None or len(body) > self.max_bytes:
+            return
+
+        key = cache_key(endpoint, params, base_url, api_key)
+        now = time.time()
+        with self._lock:
+            old = self._db.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, body, etag, last_modified, now + ttl, now, len(body)),
+            )
+            self._size += len(body) - (old[0] if old else 0)
+            self._evict()
+
+    def revalidated(self, entry, endpoint):
+        """Mark a stale entry fresh again after the server answered 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self.revalidations += 1
+            self._db.execute(
+                'UPDATE responses SET expires_at = ?, last_access = ? WHERE key = ?',
+                (now + self.ttl_for(endpoint), now, entry.key),
+            )
+
+    def _evict(self):
+        while self._size > self.max_bytes:
+            rows = self._db.execute(
+                'SELECT key, size FROM responses ORDER BY last_access LIMIT 64'
+            ).fetchall()
+            if not rows:
+                self._size = 0
+                return
+            for key, size in rows:
+                self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self._size -= size
+                if self._size <= self.max_bytes:
+                    return
+
+    def bodies(self, prefix):
+        """Every cached body (fresh or stale) whose key starts with `prefix`, for any server or account, without touching stats."""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT body FROM responses WHERE key >= ? AND key < ?', (prefix, prefix + '\uffff')
+            ).fetchall()
+        for (body,) in rows:
+            yield body
+
+    def version(self, prefix):
+        """A cheap fingerprint of the entries whose key starts with `prefix`; it changes whenever they may have."""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT COUNT(*), SUM(size), MAX(expires_at) FROM responses WHERE key >= ? AND key < ?',
+                (prefix, prefix + '\uffff'),
+            ).fetchone()
+        return hashlib.sha1(repr(row).encode()).hexdigest()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute('DELETE FROM responses')
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'bytes': self._size,
+        }
+
+    def close(self):
+        self._db.close()
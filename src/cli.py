@@ -0,0 +1,145 @@
+import sys
+import os
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(SRC_DIR, 'scripts')
+sys.path.insert(0, SRC_DIR)
+
+PROG = 'cli.py'
+
+# Subcommand -> (script in src/scripts, summary). A command's modules are
+# imported only when it runs, so `cli.py <command>` loads what that script
+# alone would.
+COMMANDS = {
+    'categories': ('01_categories', 'List recipe categories'),
+    'cuisines': ('02_cuisines', 'List cuisines'),
+    'browse': ('03_browse', 'Browse recipes'),
+    'search': ('04_search', 'Search recipes by keyword'),
+    'filter': ('05_filter', 'Filter recipes by category, cuisine, diet and nutrition'),
+    'recipe': ('06_recipe', 'Show a full recipe (1 credit)'),
+    'ingredient-categories': ('07_ingredient_categories', 'List ingredient categories'),
+    'ingredients': ('08_ingredients', 'List, search or resolve ingredients'),
+    'sync': ('09_sync', 'Sync the catalog into the local mirror'),
+    'prefetch': ('10_prefetch', 'Prefetch full recipes into the mirror within a credit budget'),
+    'gateway': ('11_gateway', 'Run the local gateway for a fleet of workers'),
+    'similar': ('12_similar', 'Find similar recipes in the mirror'),
+    'export': ('13_export', 'Export the catalog as relational tables'),
+    'plan': ('14_plan', 'Build a meal plan from the mirror under nutrition bounds'),
+}
+
+# Commands that never run inside the daemon: long-running servers
+LOCAL_ONLY = {'gateway'}
+
+_modules = {}
+
+def load_command(name):
+    """The script module behind a command, imported once per process."""
+    if name not in _modules:
+        from importlib.util import module_from_spec, spec_from_file_location
+
+        script = COMMANDS[name][0]
+        spec = spec_from_file_location(f'recipe_cli_{script}', os.path.join(SCRIPTS_DIR, f'{script}.py'))
+        module = module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _modules[name] = module
+    return _modules[name]
+
+def run_command(name, args):
+    """Run a command in this process, as its script would run it."""
+    module = load_command(name)
+    from client import run_cli
+
+    sys.argv = [f'{PROG} {name}', *args]
+    run_cli(module.main)
+
+def preload():
+    """Import every command and create the default client, so the daemon's first command is as fast as the rest."""
+    from client import get_api_key, get_default_client
+
+    for name in COMMANDS:
+        if name not in LOCAL_ONLY:
+            load_command(name)
+    get_api_key()
+    get_default_client()
+
+def reads_stdin(args):
+    return any(arg == '-' or arg.endswith('=-') for arg in args)
+
+def print_usage():
+    print(f'usage: {PROG} <command> [options]\n')
+    print('Commands:')
+    for name, (_, summary) in COMMANDS.items():
+        print(f'  {name:<23}{summary}')
+    print(f"  {'daemon':<23}Start, stop or check the warm background process (start|stop|status|run)")
+    print(f'\nRun `{PROG} <command> --help` for its options. While `{PROG} daemon start` is running,')
+    print('commands run in it, reusing its imports, config and connection pool (RECIPE_API_NO_DAEMON=1 to bypass).')
+
+def daemon_command(args):
+    import argparse
+    from daemon import DEFAULT_IDLE_TIMEOUT, control, default_socket_path, supported
+
+    parser = argparse.ArgumentParser(prog=f'{PROG} daemon', description='Manage the warm background process')
+    parser.add_argument('action', choices=['start', 'stop', 'status', 'run'], help='run stays in the foreground')
+    parser.add_argument('--idle', type=float, default=DEFAULT_IDLE_TIMEOUT, help='Exit after this many seconds without a command')
+    parser.add_argument('--socket', type=str, help='Socket path (default: RECIPE_API_DAEMON_SOCKET or a per-user path)')
+    args = parser.parse_args(args)
+    path = args.socket or default_socket_path()
+
+    if not supported():
+        print('[X] The daemon needs Unix domain sockets, which this platform lacks.')
+        return 1
+
+    if args.action in ('status', 'stop'):
+        status = control(args.action, path)
+        if status is None:
+            print(f'No daemon is listening on {path}')
+            return 1
+        print(f"Daemon {status['pid']} on {status['path']}: {status['commands']:,} commands in {status['uptime']:,.0f}s"
+              + (', stopping' if args.action == 'stop' else ''))
+        return 0
+
+    if args.action == 'run':
+        from daemon import Daemon
+        Daemon(path, args.idle).serve(run_command, warm=preload)
+        return 0
+
+    if control('status', path) is not None:
+        print(f'A daemon is already listening on {path}')
+        return 0
+    import subprocess
+    import time
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), 'daemon', 'run', f'--idle={args.idle}', f'--socket={path}'],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+    for _ in range(100):
+        status = control('status', path)
+        if status is not None:
+            print(f"Daemon {status['pid']} listening on {path} (exits after {args.idle:g}s idle)")
+            return 0
+        time.sleep(0.1)
+    print(f'[X] The daemon did not start; run `{PROG} daemon run` to see why.')
+    return 1
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] in ('-h', '--help'):
+        print_usage()
+        return 0
+    command, args = sys.argv[1], sys.argv[2:]
+    if command == 'daemon':
+        return daemon_command(args)
+    if command not in COMMANDS:
+        print(f"{PROG}: unknown command '{command}'\n", file=sys.stderr)
+        print_usage()
+        return 2
+
+    if command not in LOCAL_ONLY and not reads_stdin(args) and not os.getenv('RECIPE_API_NO_DAEMON'):
+        from daemon import run_remote
+        code = run_remote(command, args)
+        if code is not None:
+            return code
+    run_command(command, args)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
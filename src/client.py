@@ -1,11 +1,53 @@
 import os
 import sys
-import requests
-from dotenv import load_dotenv
+import json
+import threading
+import time
 
-load_dotenv()
+from cache import cache_key
+from jsonstream import CHUNK_SIZE as STREAM_CHUNK_SIZE, ItemStream, loads
+from metrics import begin, finish
+from models import Ingredient, Recipe, RecipeSummary
+from ratelimit import TokenBucket, RetryPolicy, retry_after_from_headers
 
-BASE_URL = 'https://recipe-api.com'
+# requests, dotenv and the coalescer (asyncio) are imported where first
+# needed: a script that prints --help, reads the offline mirror or
+# hands its command to the daemon (see daemon.py) never loads them.
+
+def find_dotenv():
+    """The nearest .env at or above this file's directory (where python-dotenv looks), or None."""
+    path = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        candidate = os.path.join(path, '.env')
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+# Environment variables that came from .env rather than the process's own environment
+DOTENV_NAMES = frozenset()
+
+def load_config():
+    """Load .env into the environment. Runs once, when this module is first imported."""
+    global DOTENV_NAMES
+    path = find_dotenv()
+    if path:
+        from dotenv import load_dotenv
+        before = set(os.environ)
+        load_dotenv(path)
+        DOTENV_NAMES = frozenset(os.environ.keys() - before)
+
+load_config()
+
+# Point at a gateway (see gateway.py) or another deployment with RECIPE_API_BASE_URL
+BASE_URL = os.getenv('RECIPE_API_BASE_URL', 'https://recipe-api.com').rstrip('/')
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5, 30)
+DEFAULT_POOL_SIZE = 10
+DEFAULT_PAGE_SIZE = 100
 
 class RecipeApiError(Exception):
     def __init__(self, message, status, code=None):
@@ -13,7 +55,34 @@ class RecipeApiError(Exception):
         self.status = status
         self.code = code
 
+class AuthenticationError(RecipeApiError):
+    pass
+
+class PermissionDeniedError(RecipeApiError):
+    pass
+
+class NotFoundError(RecipeApiError):
+    pass
+
+class RateLimitError(RecipeApiError):
+    def __init__(self, message, status=429, code='RATE_LIMITED', retry_after=None):
+        super().__init__(message, status, code)
+        self.retry_after = retry_after
+
+class ServerError(RecipeApiError):
+    pass
+
+class NetworkError(RecipeApiError):
+    def __init__(self, message, status=None, code='NETWORK_ERROR'):
+        super().__init__(message, status, code)
+
+_api_key = None
+
 def get_api_key():
+    """RECIPE_API_KEY, validated on first use and remembered for the life of the process."""
+    global _api_key
+    if _api_key is not None:
+        return _api_key
     key = os.getenv('RECIPE_API_KEY')
 
     if not key:
@@ -29,64 +98,433 @@ def get_api_key():
         print('Get your key from https://recipe-api.com\n')
         sys.exit(1)
 
+    _api_key = key
     return key
 
+class RecipeClient:
+    """
+    Reusable API client backed by a pooled, keep-alive requests.Session.
+
+    Connections are kept open between calls, so crawling many pages only
+    pays the TCP/TLS handshake once per pooled connection. Responses are
+    negotiated as gzip (and brotli, when the `brotli` package is installed).
+
+    Pass a cache.ResponseCache as `cache` to serve repeat requests from disk
+    and revalidate expired entries with ETag/Last-Modified.
+
+    Rate limiting (429) and transient failures (5xx, network errors) are
+    retried with jittered exponential backoff, honoring Retry-After. Pass
+    `rate_limit` (requests/sec) to pace calls with a shared token bucket so
+    sustained crawls stay at, not over, the plan's limit. When retries run
+    out a RecipeApiError subclass is raised; the client never exits.
+
+    Pass a coalesce.Coalescer as `coalescer` to share one upstream call
+    between identical requests made at the same moment from several
+    threads (or asyncio clients using the same coalescer).
+
+    `hooks` are metrics.Hooks (e.g. a metrics.MetricsRegistry) told when
+    each request starts and finishes; with none, nothing is recorded.
+    """
+
+    def __init__(self, api_key=None, base_url=None, pool_size=DEFAULT_POOL_SIZE,
+                 timeout=DEFAULT_TIMEOUT, keep_alive=True, cache=None,
+                 rate_limit=None, burst=None, retry=None, coalescer=None, hooks=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.cache = cache
+        self.coalescer = coalescer
+        self.hooks = list(hooks or ())
+        self.rate_limiter = TokenBucket(rate_limit, burst) if rate_limit else None
+        self.retry = retry or RetryPolicy()
+        self.retries = 0
+        # Requests run from pool threads (iter_pages prefetch, fetch_recipes)
+        self._retries_lock = threading.Lock()
+
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.request import ACCEPT_ENCODING
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': ACCEPT_ENCODING,
+            'Connection': 'keep-alive' if keep_alive else 'close',
+        })
+        if api_key:
+            self.session.headers['X-API-Key'] = api_key
+
+    def request(self, endpoint, params=None, raw=False):
+        """The decoded JSON response, or with `raw=True` the body bytes as received."""
+        if self.api_key is None:
+            self.api_key = get_api_key()
+            self.session.headers['X-API-Key'] = self.api_key
+
+        if not self.hooks:
+            return self._request(endpoint, params, raw=raw)
+        event = begin(self.hooks, endpoint, params)
+        try:
+            response = self._request(endpoint, params, event, raw)
+        except Exception as e:
+            finish(self.hooks, event, error=e)
+            raise
+        finish(self.hooks, event, response)
+        return response
+
+    def _request(self, endpoint, params, event=None, raw=False):
+        if self.coalescer is None:
+            body = self._fetch(endpoint, params, event)
+        else:
+            key = cache_key(endpoint, params, self.base_url or BASE_URL, self.api_key)
+            # The shared result is the raw body, so each caller gets its own objects
+            body = self.coalescer.call(key, lambda: self._fetch(endpoint, params, event))
+        return body if raw else loads(body)
+
+    def _fetch(self, endpoint, params, event=None):
+        """Response body bytes for one request, from the cache or the API."""
+        # Entries are kept per server and API key, like coalesced requests
+        scope = (self.base_url or BASE_URL, self.api_key)
+        cached = self.cache.get(endpoint, params, *scope) if self.cache else None
+        if cached and cached.fresh:
+            if event:
+                event.source, event.status = 'cache', 200
+            return cached.body
+
+        headers = {}
+        if cached:
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
+
+        response = self._get(endpoint, params, headers, event)
+        if event:
+            event.bytes += len(response.content)
+
+        if response.status_code == 304 and cached:
+            self.cache.revalidated(cached, endpoint)
+            if event:
+                event.source = 'revalidated'
+            return cached.body
+
+        if self.cache:
+            self.cache.put(
+                endpoint, params, response.content,
+                response.headers.get('ETag'), response.headers.get('Last-Modified'), *scope,
+            )
+        if event:
+            event.source = 'network'
+        return response.content
+
+    def _get(self, endpoint, params, headers=None, event=None, stream=False):
+        """
+        The first successful (or 304) response, retrying rate limits and
+        transient failures. With `stream=True` its body is left unread.
+        """
+        from requests import RequestException
+
+        # Construct full URL (BASE_URL is read per call so it can be repointed)
+        url = f"{self.base_url or BASE_URL}{endpoint}"
+
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            if event:
+                event.retries = attempt
+
+            retry_after = None
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout, stream=stream)
+            except RequestException as e:
+                error = NetworkError(f'Could not connect to the API: {e}')
+            else:
+                if self.rate_limiter:
+                    self.rate_limiter.update_from_headers(response.headers)
+                if event:
+                    event.status = response.status_code
+
+                if response.ok:
+                    return response
+
+                if event:
+                    event.bytes += len(response.content)
+                error = error_for_status(response.status_code, response.text, response.headers)
+                response.close()
+                if response.status_code not in self.retry.statuses:
+                    raise error
+                retry_after = retry_after_from_headers(response.headers, response.status_code)
+
+            if attempt >= self.retry.max_retries:
+                raise error
+
+            delay = self.retry.delay(attempt, retry_after)
+            if retry_after is not None and self.rate_limiter:
+                self.rate_limiter.pause_until(time.monotonic() + delay)
+            attempt += 1
+            with self._retries_lock:
+                self.retries += 1
+            time.sleep(delay)
+
+    def stream(self, endpoint, params=None):
+        """
+        Request a list endpoint and return a jsonstream.ItemStream over its
+        `data` items, each decoded as soon as its bytes arrive instead of
+        after the whole body has been read and parsed. `meta` is on the
+        stream once parsed. Use it as a context manager (or exhaust it) so
+        the connection is released:
+
+            with client.stream('/api/v1/recipes', {'per_page': 10000}) as recipes:
+                for recipe in recipes:
+                    ...
+
+        Streams skip the response cache and coalescing. Failures before the
+        body starts are retried as usual; a connection lost mid-body raises
+        NetworkError.
+        """
+        if self.api_key is None:
+            self.api_key = get_api_key()
+            self.session.headers['X-API-Key'] = self.api_key
+
+        event = begin(self.hooks, endpoint, params) if self.hooks else None
+        try:
+            response = self._get(endpoint, params, event=event, stream=True)
+        except Exception as e:
+            if event:
+                finish(self.hooks, event, error=e)
+            raise
+
+        from requests import RequestException
+
+        def chunks():
+            try:
+                yield from response.iter_content(STREAM_CHUNK_SIZE)
+            except RequestException as e:
+                raise NetworkError(f'Connection lost while streaming: {e}') from e
+
+        def done(stream, error):
+            response.close()
+            if event:
+                event.source, event.bytes = 'network', stream.bytes
+                finish(self.hooks, event, stream.fields, error)
+
+        return ItemStream(chunks(), on_close=done)
+
+    def close(self):
+        self.session.close()
+        if self.cache:
+            self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+_default_client = None
+
+def get_default_client():
+    """Return the shared module-level client, creating it on first use."""
+    global _default_client
+    if _default_client is None:
+        from cache import ResponseCache
+        from coalesce import get_default_coalescer
+
+        cache_path = os.getenv('RECIPE_API_CACHE')
+        rate_limit = os.getenv('RECIPE_API_RATE_LIMIT')
+        _default_client = RecipeClient(
+            cache=ResponseCache(cache_path) if cache_path else None,
+            rate_limit=float(rate_limit) if rate_limit else None,
+            coalescer=get_default_coalescer(),
+        )
+    return _default_client
+
+def set_default_client(client):
+    """Replace the shared client used by api_request (e.g. to tune pool size)."""
+    global _default_client
+    if _default_client is not None and _default_client is not client:
+        _default_client.close()
+    _default_client = client
+
 def api_request(endpoint, params=None):
-    api_key = get_api_key()
-    
-    # Construct full URL
-    url = f"{BASE_URL}{endpoint}"
-    
-    headers = {
-        'X-API-Key': api_key,
-        'Accept': 'application/json'
-    }
+    return get_default_client().request(endpoint, params)
 
+def iter_pages(endpoint, params=None, per_page=DEFAULT_PAGE_SIZE, max_items=None, client=None):
+    """
+    Yield (data, meta) for each page of a paginated list endpoint.
+
+    While the caller works through page N, page N+1 is already being fetched
+    on a background thread. Pages that `max_items` would not reach are never
+    requested.
+    """
+    client = client or get_default_client()
+    params = {k: v for k, v in (params or {}).items() if v is not None}
+    params['per_page'] = per_page
+
+    def fetch(page):
+        return client.request(endpoint, {**params, 'page': page})
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    executor = ThreadPoolExecutor(max_workers=1)
     try:
-        response = requests.get(url, params=params, headers=headers)
-        
-        if not response.ok:
-            handle_error_response(response)
-            
-        return response.json()
-        
-    except requests.RequestException as e:
-        # Check if it was handled by handle_error_response (raised RecipeApiError)
-        # But requests raises RequestException on connection errors, not on 4xx/5xx responses usually unless raise_for_status is called
-        # Our handle_error_response calls sys.exit or raises RecipeApiError.
-        
-        print('\n[X] Network error!\n')
-        print('Could not connect to the API. Please check:')
-        print('  - Your internet connection')
-        print('  - The API status at https://recipe-api.com\n')
-        sys.exit(1)
+        page = params.pop('page', 1)
+        pending = executor.submit(fetch, page)
+        fetched = 0
+        page_size = 0
+
+        while pending is not None:
+            response = pending.result()
+            data = response['data']
+            meta = response.get('meta') or {}
+            fetched += len(data)
+
+            # The server may cap the page size below the one asked for
+            total = meta.get('total')
+            page_size = meta.get('per_page') or max(page_size, len(data))
+            more = bool(data) and (total is None or page * page_size < total)
+            if max_items is not None and fetched >= max_items:
+                more = False
+
+            page += 1
+            pending = executor.submit(fetch, page) if more else None
+            yield data, meta
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def iter_items(endpoint, params=None, per_page=DEFAULT_PAGE_SIZE, max_items=None, client=None):
+    """Lazily yield every item of a paginated list endpoint, across pages."""
+    count = 0
+    for data, _ in iter_pages(endpoint, params, per_page, max_items, client):
+        for item in data:
+            if max_items is not None and count >= max_items:
+                return
+            count += 1
+            yield item
+
+def stream_items(endpoint, params=None, per_page=DEFAULT_PAGE_SIZE, max_items=None, client=None):
+    """
+    Like iter_items, but each page is decoded while it downloads (see
+    RecipeClient.stream), so a large `per_page` never holds a whole page in
+    memory. Pages are requested one after another.
+    """
+    client = client or get_default_client()
+    params = {k: v for k, v in (params or {}).items() if v is not None}
+    params['per_page'] = per_page
+    page = params.pop('page', 1)
+    count = 0
+    page_size = 0
+
+    while max_items is None or count < max_items:
+        with client.stream(endpoint, {**params, 'page': page}) as items:
+            received = 0
+            for item in items:
+                yield item
+                received += 1
+                count += 1
+                if max_items is not None and count >= max_items:
+                    return
+            meta = items.meta or {}
+        # The server may cap the page size below the one asked for
+        total = meta.get('total')
+        page_size = meta.get('per_page') or max(page_size, received)
+        if not received or (total is not None and page * page_size >= total):
+            return
+        page += 1
+
+def iter_recipes(max_items=None, per_page=DEFAULT_PAGE_SIZE, client=None, models=False, stream=False, **filters):
+    """
+    Stream recipes from /api/v1/recipes, e.g.
+
+        for recipe in iter_recipes(cuisine='Italian', max_items=500):
+            ...
+
+    With `models=True` each recipe is a models.RecipeSummary instead of a dict.
+    With `stream=True` pages are decoded incrementally (see stream_items).
+    """
+    items = (stream_items if stream else iter_items)('/api/v1/recipes', filters, per_page, max_items, client)
+    return map(RecipeSummary.from_json, items) if models else items
+
+def iter_ingredients(max_items=None, per_page=DEFAULT_PAGE_SIZE, client=None, models=False, stream=False, **filters):
+    """Stream ingredients from /api/v1/ingredients (filters: q, category), as models.Ingredient with `models=True`."""
+    items = (stream_items if stream else iter_items)('/api/v1/ingredients', filters, per_page, max_items, client)
+    return map(Ingredient.from_json, items) if models else items
+
+def get_recipe(recipe_id, model=False, client=None):
+    """Fetch one full recipe (1 credit), as a models.Recipe with `model=True`."""
+    data = (client or get_default_client()).request(f'/api/v1/recipes/{recipe_id}')['data']
+    return Recipe.from_json(data) if model else data
+
+def error_for_status(status, text='', headers=None):
+    """Build the RecipeApiError subclass matching an error response."""
+    code = None
+    message = None
+    try:
+        error = json.loads(text).get('error') or {}
+        code = error.get('code')
+        message = error.get('message')
+    except (ValueError, AttributeError):
+        pass
 
-def handle_error_response(response):
-    status = response.status_code
-    
     if status == 401:
+        return AuthenticationError(message or 'Authentication failed', status, code or 'UNAUTHORIZED')
+    if status == 403:
+        return PermissionDeniedError(message or 'Access denied', status, code or 'FORBIDDEN')
+    if status == 404:
+        return NotFoundError(message or 'Resource not found', status, code or 'NOT_FOUND')
+    if status == 429:
+        retry_after = retry_after_from_headers(headers or {})
+        return RateLimitError(message or 'Rate limit exceeded', status, code or 'RATE_LIMITED', retry_after)
+    if status >= 500:
+        return ServerError(message or f'API error ({status}): {text[:500]}', status, code or 'SERVER_ERROR')
+    return RecipeApiError(message or f'API error ({status}): {text[:500]}', status, code)
+
+def handle_error_response(response):
+    raise error_for_status(response.status_code, response.text, response.headers)
+
+def report_error(error):
+    """Print a user-facing explanation of a RecipeApiError, as the CLI scripts show it."""
+    if isinstance(error, AuthenticationError):
         print('\n[X] Authentication failed!\n')
         print('Your API key was rejected. Please check:')
         print('  - The key is copied correctly (no extra spaces)')
         print('  - The key is active in your dashboard\n')
-        sys.exit(1)
-        
-    elif status == 403:
+
+    elif isinstance(error, PermissionDeniedError):
         print('\n[X] Access denied!\n')
         print('Your account may not have access to this endpoint.')
         print('Check your plan limits at https://recipe-api.com\n')
-        sys.exit(1)
-        
-    elif status == 404:
-        raise RecipeApiError('Resource not found', 404, 'NOT_FOUND')
-        
-    elif status == 429:
+
+    elif isinstance(error, RateLimitError):
         print('\n[X] Rate limit exceeded!\n')
         print('You have exceeded your API limits.')
         print('Check your remaining quota in the dashboard.\n')
-        sys.exit(1)
-        
+
+    elif isinstance(error, NetworkError):
+        print('\n[X] Network error!\n')
+        print('Could not connect to the API. Please check:')
+        print('  - Your internet connection')
+        print('  - The API status at https://recipe-api.com\n')
+
+    elif isinstance(error, NotFoundError):
+        print('\n[X] Not found!\n')
+        print(f'{error}\n')
+
     else:
-        print(f'\n[X] API error ({status})!\n')
-        print('Response:', response.text[:500])
+        print(f'\n[X] API error ({error.status})!\n')
+        print(f'{error}\n')
+
+def run_cli(main):
+    """Run a script's main(), turning API errors into a message and exit code 1."""
+    try:
+        main()
+    except RecipeApiError as e:
+        report_error(e)
+        sys.exit(1)
+    except BrokenPipeError:
+        # Output piped into a command that stopped reading, e.g. `| head`
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
         sys.exit(1)
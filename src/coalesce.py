@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# Seconds a finished response keeps answering identical requests
+DEFAULT_TTL = 1.0
+DEFAULT_MAX_ENTRIES = 1024
+
+_HIT, _WAIT, _LEAD = range(3)
+
+class _Abandoned(Exception):
+    """The caller running a fetch was cancelled or interrupted; a waiter takes over."""
+
+class Coalescer:
+    """
+    Single-flight deduplication of identical requests.
+
+    The first caller for a key runs the fetch. Callers that ask for the same
+    key while it is in flight, from any thread (`call`) or asyncio task
+    (`acall`), wait for it and get the same result or exception instead of
+    making their own upstream call. Successful results are then kept for
+    `ttl` seconds, so the rest of a burst is answered from memory too;
+    errors are never kept.
+
+    Results are shared between callers, so they should be immutable: the
+    clients coalesce raw response bodies and decode them per caller.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.upstream = 0
+        self.coalesced = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._recent = OrderedDict()
+
+    def _claim(self, key):
+        with self._lock:
+            entry = self._recent.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self.hits += 1
+                    return _HIT, entry[1]
+                del self._recent[key]
+
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return _WAIT, future
+
+            future = self._inflight[key] = Future()
+            self.upstream += 1
+            return _LEAD, future
+
+    def _settle(self, key, future, result=None, error=None):
+        with self._lock:
+            del self._inflight[key]
+            if error is None and self.ttl > 0:
+                # Entries share one TTL, so the oldest is also the first to expire
+                self._recent[key] = (time.monotonic() + self.ttl, result)
+                while len(self._recent) > self.max_entries:
+                    self._recent.popitem(last=False)
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+
+    def call(self, key, fetch):
+        """Return `fetch()`, or the result of an identical call already running or just finished."""
+        while True:
+            kind, value = self._claim(key)
+            if kind == _HIT:
+                return value
+            if kind == _WAIT:
+                try:
+                    return value.result()
+                except _Abandoned:
+                    continue
+
+            try:
+                result = fetch()
+            except Exception as e:
+                self._settle(key, value, error=e)
+                raise
+            except BaseException:
+                self._settle(key, value, error=_Abandoned())
+                raise
+            self._settle(key, value, result)
+            return result
+
+    async def acall(self, key, fetch):
+        """Asyncio form of `call`; `fetch` is a coroutine function."""
+        import asyncio
+
+        while True:
+            kind, value = self._claim(key)
+            if kind == _HIT:
+                return value
+            if kind == _WAIT:
+                try:
+                    # Shielded: a cancelled waiter must not cancel the shared future
+                    return await asyncio.shield(asyncio.wrap_future(value))
+                except _Abandoned:
+                    continue
+
+            try:
+                result = await fetch()
+            except Exception as e:
+                self._settle(key, value, error=e)
+                raise
+            except BaseException:
+                self._settle(key, value, error=_Abandoned())
+                raise
+            self._settle(key, value, result)
+            return result
+
+    def clear(self):
+        with self._lock:
+            self._recent.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'upstream': self.upstream,
+                'coalesced': self.coalesced,
+                'hits': self.hits,
+                'in_flight': len(self._inflight),
+                'recent': len(self._recent),
+            }
+
+_default_coalescer = None
+_default_lock = threading.Lock()
+
+def get_default_coalescer():
+    """Return the process-wide coalescer, so sync and async clients share in-flight requests."""
+    global _default_coalescer
+    with _default_lock:
+        if _default_coalescer is None:
+            ttl = os.getenv('RECIPE_API_COALESCE_TTL')
+            _default_coalescer = Coalescer(float(ttl) if ttl else DEFAULT_TTL)
+        return _default_coalescer
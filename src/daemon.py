@@ -0,0 +1,277 @@
+import hashlib
+import io
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+import time
+
+# Seconds without a command before the daemon exits
+DEFAULT_IDLE_TIMEOUT = 10 * 60
+# Environment variables a command is run with must match the daemon's
+CONFIG_PREFIX = 'RECIPE_API_'
+
+def config(environ=None):
+    """The RECIPE_API_* variables of `environ` (default: this process's environment)."""
+    environ = os.environ if environ is None else environ
+    return {name: value for name, value in environ.items() if name.startswith(CONFIG_PREFIX)}
+
+def config_digest(settings):
+    """
+    A digest of RECIPE_API_* `settings`, sent instead of their values (the
+    API key among them), so the daemon can match them without seeing them.
+    """
+    return hashlib.sha256(json.dumps(sorted(settings.items())).encode()).hexdigest()
+
+def default_socket_path():
+    """RECIPE_API_DAEMON_SOCKET, or a socket in a directory only this user can enter."""
+    path = os.getenv('RECIPE_API_DAEMON_SOCKET')
+    if path:
+        return path
+    runtime_dir = os.getenv('XDG_RUNTIME_DIR') or '/tmp'
+    directory = os.path.join(runtime_dir, f'recipe-api-{os.getuid()}')
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    return os.path.join(directory, 'daemon.sock')
+
+def private_directory(path):
+    """Whether `path` is a real directory (not a link) owned by this user and closed to everyone else."""
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISDIR(info.st_mode) and info.st_uid == os.getuid() and not info.st_mode & 0o077
+
+def supported():
+    return hasattr(socket, 'AF_UNIX')
+
+def _peer_uid(sock):
+    """The user ID of the process at the other end of `sock`, or None where the OS doesn't tell."""
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return None
+    credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    return struct.unpack('3i', credentials)[1]
+
+def _connect(path):
+    """
+    A connection to the daemon at `path`, or None when none is listening or
+    it isn't this user's: the socket, and the process behind it where the OS
+    reports it, must belong to us before anything is sent.
+    """
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return None
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        peer = _peer_uid(sock)
+    except OSError:
+        sock.close()
+        return None
+    if peer is not None and peer != os.getuid():
+        sock.close()
+        return None
+    return sock
+
+def _send(sock, message):
+    sock.sendall(json.dumps(message).encode() + b'\n')
+
+def control(action, path=None):
+    """Send `status` or `stop` to a running daemon; its reply, or None if none is listening."""
+    sock = _connect(path or default_socket_path()) if supported() else None
+    if sock is None:
+        return None
+    with sock:
+        _send(sock, {'control': action})
+        line = sock.makefile('rb').readline()
+    return json.loads(line) if line else None
+
+def run_remote(command, args, path=None):
+    """
+    Run a CLI command in the daemon and relay its output. Returns its exit
+    code, or None when no daemon took it (none running, or this shell's
+    RECIPE_API_* settings differ from the daemon's), so the caller should
+    run it itself.
+
+    Only the standard library is imported here: handing a command to a
+    warm daemon costs little more than starting the interpreter.
+    """
+    sock = _connect(path or default_socket_path()) if supported() else None
+    if sock is None:
+        return None
+    with sock:
+        _send(sock, {
+            'command': command,
+            'args': args,
+            'cwd': os.getcwd(),
+            'tty': sys.stdout.isatty(),
+            # Names are not secret; values are only sent as a digest
+            'env': sorted(config()),
+            'env_digest': config_digest(config()),
+        })
+        try:
+            for line in sock.makefile('rb'):
+                kind, value = json.loads(line)
+                if kind == 'out':
+                    sys.stdout.write(value)
+                elif kind == 'err':
+                    sys.stderr.write(value)
+                elif kind == 'exit':
+                    sys.stdout.flush()
+                    return value
+                elif kind == 'declined':
+                    return None
+        except BrokenPipeError:
+            # Our output was piped into a command that stopped reading
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 1
+    print('\n[X] The daemon stopped before the command finished.\n', file=sys.stderr)
+    return 1
+
+class _Relay(io.TextIOBase):
+    """Text stream that forwards each write to the invoking CLI process."""
+
+    def __init__(self, sock, kind, tty):
+        self.sock = sock
+        self.kind = kind
+        self.tty = tty
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        _send(self.sock, [self.kind, text])
+        return len(text)
+
+    def isatty(self):
+        return self.tty
+
+class Daemon:
+    """
+    Persistent process that runs CLI commands on behalf of short-lived
+    `cli.py` invocations, over a Unix socket only this user can open.
+
+    Imports, .env, the API key and the default client (with its pooled
+    keep-alive connections, cache and coalescer) are loaded once, so a
+    repeat invocation costs an interpreter start and a socket round trip.
+    Commands run one at a time, in the caller's working directory, with
+    their output relayed as it is written; invocations made meanwhile wait
+    their turn. The daemon exits after `idle_timeout` seconds unused.
+
+        Daemon().serve(run_command, warm=preload)
+    """
+
+    def __init__(self, path=None, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.path = path or default_socket_path()
+        self.idle_timeout = idle_timeout
+        self.started = None
+        self.commands = 0
+        self._stopping = False
+
+    def serve(self, run, warm=None):
+        """Listen until stopped or idle; `run(command, args)` executes one command."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if self.path == default_socket_path() and not private_directory(directory):
+            raise RuntimeError(f'{directory} must be a directory only this user can access (mode 0700)')
+        if _connect(self.path) is not None:
+            raise RuntimeError(f'A daemon is already listening on {self.path}')
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            listener.bind(self.path)
+        finally:
+            os.umask(old_umask)
+        try:
+            if warm:
+                warm()
+            listener.listen(64)
+            listener.settimeout(self.idle_timeout)
+            self.started = time.time()
+            while not self._stopping:
+                try:
+                    conn, _ = listener.accept()
+                except socket.timeout:
+                    break
+                with conn:
+                    conn.settimeout(None)
+                    self._handle(conn, run)
+        finally:
+            listener.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    def _handle(self, conn, run):
+        peer = _peer_uid(conn)
+        if peer is not None and peer != os.getuid():
+            return
+        line = conn.makefile('rb').readline()
+        if not line:
+            return
+        request = json.loads(line)
+        try:
+            if 'control' in request:
+                self._stopping = request['control'] == 'stop'
+                _send(conn, {'pid': os.getpid(), 'path': self.path, 'commands': self.commands,
+                             'uptime': round(time.time() - self.started, 1), 'idle_timeout': self.idle_timeout})
+            elif not self._same_config(request['env'], request['env_digest']):
+                _send(conn, ['declined', None])
+            else:
+                self.commands += 1
+                _send(conn, ['exit', self._run(conn, run, request)])
+        except OSError:
+            # The caller went away (e.g. interrupted); nothing left to tell it
+            pass
+
+    def _same_config(self, names, digest):
+        """
+        Whether a caller with the RECIPE_API_* variables `names`, whose
+        values hash to `digest`, would run with this daemon's settings.
+        Variables the daemon read from .env are the only ones the caller may
+        lack, since it would load the same .env.
+        """
+        from client import DOTENV_NAMES
+
+        names = set(names)
+        own = {name: value for name, value in config().items() if name not in DOTENV_NAMES or name in names}
+        return set(own) == names and config_digest(own) == digest
+
+    def _run(self, conn, run, request):
+        import traceback
+
+        import client
+        import utils
+
+        saved = sys.stdout, sys.stderr, sys.argv, os.getcwd()
+        warm_client = client._default_client
+        code = 0
+        try:
+            os.chdir(request['cwd'])
+            sys.stdout = _Relay(conn, 'out', request['tty'])
+            sys.stderr = _Relay(conn, 'err', request['tty'])
+            utils.set_color(utils.use_color())
+            run(request['command'], request['args'])
+        except SystemExit as e:
+            if isinstance(e.code, str):
+                print(e.code, file=sys.stderr)
+            code = e.code if isinstance(e.code, int) else int(e.code is not None)
+        except Exception:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.stdout, sys.stderr, sys.argv = saved[:3]
+            os.chdir(saved[3])
+            # --offline swapped in a mirror client (closing the warm one); start afresh
+            if client._default_client is not warm_client:
+                client.set_default_client(None)
+                client.get_default_client()
+        return code
@@ -0,0 +1,75 @@
+import re
+from functools import lru_cache
+
+# P[nW][nD][T[nH][nM][n[.n]S]], with at least one part after T
+_DURATION = re.compile(r'P(?:(\d+)W)?(?:(\d+)D)?(?:T(?=\d)(?:(\d+)H)?(?:(\d+)M)?(?:(\d+(?:[.,]\d+)?)S)?)?$')
+
+# A catalog only uses a few hundred distinct duration strings
+MEMO_SIZE = 4096
+
+@lru_cache(maxsize=MEMO_SIZE)
+def parse_duration(value):
+    """
+    Seconds in an ISO 8601 duration ("PT1H30M" -> 5400, "P1DT2H" -> 93600),
+    or None if `value` isn't one. Fractional seconds give a float.
+    """
+    match = _DURATION.match(value) if value.__class__ is str and value != 'P' else None
+    if match is None:
+        return None
+    weeks, days, hours, minutes, seconds = match.groups()
+    total = ((int(weeks or 0) * 7 + int(days or 0)) * 24 + int(hours or 0)) * 60 + int(minutes or 0)
+    if seconds is None:
+        return total * 60
+    if seconds.isdigit():
+        return total * 60 + int(seconds)
+    return total * 60 + float(seconds.replace(',', '.'))
+
+def parse_durations(values, missing=0, dtype=None):
+    """
+    Parse a sequence of durations into a NumPy array of seconds (int64 by
+    default). Each distinct string is parsed once; values that aren't
+    durations (including None) become `missing`.
+    """
+    # Imported here so scripts that only format durations don't load NumPy
+    import numpy as np
+
+    if not isinstance(values, (list, tuple)):
+        values = list(values)
+    lookup = {}
+    for value in dict.fromkeys(values):
+        seconds = parse_duration(value)
+        lookup[value] = missing if seconds is None else seconds
+    return np.fromiter(map(lookup.__getitem__, values), dtype=dtype or np.int64, count=len(values))
+
+def iso_duration(seconds):
+    """The ISO 8601 form of a number of seconds: 5400 -> "PT1H30M", 86400 -> "P1D"."""
+    days, rest = divmod(seconds, 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes, seconds = divmod(rest, 60)
+    time = ''.join(f'{n}{unit}' for n, unit in ((hours, 'H'), (minutes, 'M'), (seconds, 'S')) if n)
+    if days and not time:
+        return f'P{days}D'
+    return f"P{f'{days}D' if days else ''}T{time or '0S'}"
+
+@lru_cache(maxsize=MEMO_SIZE)
+def humanize_duration(value):
+    """
+    Display form of an ISO 8601 duration: "PT30M" -> "30 min",
+    "PT90M" -> "90 min", "PT1H30M" -> "1h 30m", "P1DT2H" -> "1d 2h".
+    Parts are shown as written, not carried into larger units. Anything
+    else is returned as is.
+    """
+    match = _DURATION.match(value) if value.__class__ is str and value != 'P' else None
+    if match is None:
+        return value
+    if not parse_duration(value):
+        return 'instant'
+    weeks, days, hours, minutes, seconds = match.groups()
+    days = int(weeks or 0) * 7 + int(days or 0)
+    hours, minutes = int(hours or 0), int(minutes or 0)
+    seconds = int(seconds or 0) if not seconds or seconds.isdigit() else float(seconds.replace(',', '.'))
+    if not (days or hours or seconds):
+        return f'{minutes} min'
+    if not (days or hours or minutes):
+        return f'{seconds} sec'
+    return ' '.join(f'{n}{unit}' for n, unit in ((days, 'd'), (hours, 'h'), (minutes, 'm'), (seconds, 's')) if n)
@@ -0,0 +1,324 @@
+import csv
+import gzip
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from client import NotFoundError, get_default_client, iter_pages
+from duration import parse_duration
+from jsonstream import loads
+from render import write_jsonl
+
+DEFAULT_EXPORT_DIR = 'recipe_export'
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+
+# Items per part file; a part is decoded, flattened and written by one worker
+DEFAULT_PART_SIZE = 10_000
+# Items per list-page request
+EXPORT_PAGE_SIZE = 1000
+# Requests in flight while fetching pages or full recipes
+DEFAULT_FETCHERS = 4
+# gzip level for csv/jsonl parts: most of level 9's ratio at a fraction of its time
+GZIP_LEVEL = 5
+
+# Relational layout of the export: table -> columns
+TABLES = {
+    'recipes': (
+        'id', 'name', 'description', 'category', 'cuisine', 'difficulty',
+        'total_time_s', 'active_time_s', 'passive_time_s', 'yields', 'overnight_required',
+        'calories', 'protein_g', 'carbohydrates_g', 'fat_g', 'fiber_g',
+    ),
+    'recipe_flags': ('recipe_id', 'flag'),
+    'ingredients': ('id', 'name', 'category', 'source'),
+    'recipe_ingredients': (
+        'recipe_id', 'group_index', 'group_name', 'position',
+        'ingredient_id', 'name', 'quantity', 'unit', 'preparation', 'notes',
+    ),
+    'instructions': ('recipe_id', 'step_number', 'phase', 'text', 'duration_s', 'tips'),
+    'equipment': ('recipe_id', 'name', 'alternative', 'required'),
+}
+
+# Tables each kind of source record fills
+KIND_TABLES = {
+    'recipes': ('recipes', 'recipe_flags'),
+    'full': ('recipes', 'recipe_flags', 'recipe_ingredients', 'instructions', 'equipment'),
+    'ingredients': ('ingredients',),
+}
+
+def _seconds(value):
+    return parse_duration(value) if value else None
+
+def flatten_recipe(recipe, tables):
+    """Append the rows of one list-page or full recipe to `tables` (table -> list of tuples)."""
+    recipe_id = recipe['id']
+    meta = recipe.get('meta') or {}
+    nutrition = (recipe.get('nutrition') or {}).get('per_serving') or recipe.get('nutrition_summary') or {}
+    tables['recipes'].append((
+        recipe_id, recipe.get('name'), recipe.get('description'),
+        recipe.get('category'), recipe.get('cuisine'), recipe.get('difficulty'),
+        _seconds(meta.get('total_time')), _seconds(meta.get('active_time')), _seconds(meta.get('passive_time')),
+        meta.get('yields'), meta.get('overnight_required'),
+        nutrition.get('calories'), nutrition.get('protein_g'), nutrition.get('carbohydrates_g'),
+        nutrition.get('fat_g'), nutrition.get('fiber_g'),
+    ))
+    flags = tables['recipe_flags']
+    for flag in (recipe.get('dietary') or {}).get('flags', ()):
+        flags.append((recipe_id, flag))
+
+    if 'recipe_ingredients' not in tables:
+        return
+    items = tables['recipe_ingredients']
+    for group_index, group in enumerate(recipe.get('ingredients') or ()):
+        for position, item in enumerate(group.get('items', ())):
+            items.append((
+                recipe_id, group_index, group.get('group_name'), position,
+                item.get('id'), item.get('name'), item.get('quantity'), item.get('unit'),
+                item.get('preparation'), item.get('notes'),
+            ))
+    steps = tables['instructions']
+    for step in recipe.get('instructions') or ():
+        structured = step.get('structured') or {}
+        steps.append((
+            recipe_id, step.get('step_number'), step.get('phase'), step.get('text'),
+            _seconds(structured.get('duration')), '|'.join(step.get('tips') or ()),
+        ))
+    equipment = tables['equipment']
+    for item in recipe.get('equipment') or ():
+        equipment.append((recipe_id, item.get('name'), item.get('alternative'), item.get('required')))
+
+def flatten_ingredient(ingredient, tables):
+    tables['ingredients'].append((
+        ingredient['id'], ingredient.get('name'), ingredient.get('category'), ingredient.get('source'),
+    ))
+
+def part_path(out_dir, table, part, fmt, compress=True):
+    suffix = {'csv': '.csv', 'jsonl': '.jsonl', 'parquet': '.parquet'}[fmt]
+    if compress and fmt != 'parquet':
+        suffix += '.gz'
+    return os.path.join(out_dir, table, f'part-{part:05d}{suffix}')
+
+def write_table(path, columns, rows, fmt, compress=True):
+    """Write one part file of a table. Returns its size in bytes."""
+    if fmt == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        pq.write_table(pa.table({name: [row[i] for row in rows] for i, name in enumerate(columns)}), path)
+        return os.path.getsize(path)
+
+    opener = (lambda: gzip.open(path, 'wt', compresslevel=GZIP_LEVEL, encoding='utf-8', newline='')) if compress \
+        else (lambda: open(path, 'w', encoding='utf-8', newline=''))
+    with opener() as f:
+        if fmt == 'csv':
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(columns)
+            writer.writerows(rows)
+        else:
+            write_jsonl((dict(zip(columns, row)) for row in rows), f)
+    return os.path.getsize(path)
+
+def export_part(job):
+    """
+    Decode, flatten and write one part. Runs in a worker process: `bodies`
+    are (raw response body, items to keep) pairs, so JSON decoding happens
+    here rather than in the process fetching them. Returns (part, rows per table, bytes).
+    """
+    kind, part, bodies, out_dir, fmt, compress = job
+    tables = {name: [] for name in KIND_TABLES[kind]}
+    flatten = flatten_ingredient if kind == 'ingredients' else flatten_recipe
+    for body, count in bodies:
+        data = loads(body)['data']
+        for item in data[:count] if isinstance(data, list) else [data]:
+            flatten(item, tables)
+
+    size = 0
+    for name, rows in tables.items():
+        if rows:
+            size += write_table(part_path(out_dir, name, part, fmt, compress), TABLES[name], rows, fmt, compress)
+    return part, {name: len(rows) for name, rows in tables.items()}, size
+
+class CatalogExport:
+    """
+    Snapshot of the catalog as flat relational tables (see TABLES), one
+    directory per table of numbered part files plus `manifest.json`.
+
+    The calling process only fetches: list pages (or, with `full=True`,
+    every full recipe, 1 credit each) are requested `fetchers` at a time
+    and handed over undecoded, `part_size` items per part, to a pool of
+    `processes` workers that decode, flatten, compress and write them. At
+    most two parts per worker are queued, so memory stays bounded however
+    large the catalog is.
+
+        manifest = CatalogExport('exports/2024-06-01', fmt='csv').run()
+    """
+
+    def __init__(self, out_dir=None, fmt='csv', full=False, compress=True, part_size=DEFAULT_PART_SIZE,
+                 per_page=EXPORT_PAGE_SIZE, processes=None, fetchers=DEFAULT_FETCHERS,
+                 max_items=None, client=None, report=None):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f'Unknown export format: {fmt!r} (expected one of {", ".join(EXPORT_FORMATS)})')
+        if fmt == 'parquet':
+            try:
+                import pyarrow.parquet  # noqa: F401
+            except ImportError:
+                raise ValueError('Parquet export needs pyarrow (pip install pyarrow)') from None
+        self.out_dir = out_dir or os.getenv('RECIPE_API_EXPORT_DIR') or DEFAULT_EXPORT_DIR
+        self.fmt = fmt
+        self.full = full
+        self.compress = compress
+        self.part_size = part_size
+        self.per_page = min(per_page, part_size)
+        self.processes = processes or os.cpu_count() or 1
+        self.fetchers = fetchers
+        self.max_items = max_items
+        self.client = client or get_default_client()
+        self.report = report
+        self.kind = 'full' if full else 'recipes'
+        self.tables = KIND_TABLES[self.kind] + KIND_TABLES['ingredients']
+        self.rows = {name: 0 for name in self.tables}
+        self.parts = {name: [] for name in self.tables}
+        self.bytes = 0
+        self.missing = 0
+        self._next_part = 0
+
+    def run(self):
+        """Export every table; returns the manifest (also written to `manifest.json`)."""
+        start = time.perf_counter()
+        for table in self.tables:
+            os.makedirs(os.path.join(self.out_dir, table), exist_ok=True)
+
+        if self.processes == 1:
+            pool = None
+            submit = lambda job: _Done(export_part(job))
+        else:
+            pool = ProcessPoolExecutor(self.processes)
+            submit = lambda job: pool.submit(export_part, job)
+        self._pending = deque()
+        self._submit = submit
+        try:
+            recipe_bodies = self._full_recipe_bodies() if self.full else self._list_pages('/api/v1/recipes')
+            self._queue_parts(self.kind, recipe_bodies)
+            self._queue_parts('ingredients', self._list_pages('/api/v1/ingredients'))
+            while self._pending:
+                self._collect()
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        manifest = {
+            'format': self.fmt,
+            'compressed': self.compress and self.fmt != 'parquet',
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'full_recipes': self.full,
+            'seconds': round(time.perf_counter() - start, 3),
+            'bytes': self.bytes,
+            'missing_recipes': self.missing,
+            'tables': {
+                name: {'columns': list(TABLES[name]), 'rows': self.rows[name], 'parts': sorted(self.parts[name])}
+                for name in self.tables
+            },
+        }
+        with open(os.path.join(self.out_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+    def _queue_parts(self, kind, bodies):
+        batch, items = [], 0
+        for body, count in bodies:
+            batch.append((body, count))
+            items += count
+            if items >= self.part_size:
+                self._enqueue(kind, batch)
+                batch, items = [], 0
+        if batch:
+            self._enqueue(kind, batch)
+
+    def _enqueue(self, kind, bodies):
+        # Bound the parts held in memory: wait for the oldest before queueing more
+        while len(self._pending) >= 2 * self.processes:
+            self._collect()
+        job = (kind, self._next_part, bodies, self.out_dir, self.fmt, self.compress)
+        self._next_part += 1
+        self._pending.append(self._submit(job))
+
+    def _collect(self):
+        part, rows, size = self._pending.popleft().result()
+        self.bytes += size
+        for name, count in rows.items():
+            self.rows[name] += count
+            if count:
+                self.parts[name].append(os.path.relpath(
+                    part_path(self.out_dir, name, part, self.fmt, self.compress), self.out_dir))
+        if self.report:
+            self.report(self.rows)
+
+    def _list_pages(self, endpoint):
+        """(body, item count) for each page of a list endpoint, fetched `fetchers` pages ahead."""
+        first = self.client.request(endpoint, {'page': 1, 'per_page': self.per_page}, raw=True)
+        decoded = loads(first)
+        meta = decoded.get('meta') or {}
+        total = meta.get('total') or 0
+        if self.max_items is not None:
+            total = min(total, self.max_items)
+        # Page count and sizes follow the page size the server used, which it may cap
+        page_size = meta.get('per_page') or len(decoded.get('data') or ()) or self.per_page
+        pages = -(-total // page_size)
+        # Not held while the generator runs
+        del decoded
+
+        def fetch(page):
+            return self.client.request(endpoint, {'page': page, 'per_page': self.per_page}, raw=True)
+
+        yield first, min(page_size, total)
+        with ThreadPoolExecutor(self.fetchers) as executor:
+            ahead = deque()
+            for page in range(2, pages + 1):
+                ahead.append((page, executor.submit(fetch, page)))
+                if len(ahead) >= self.fetchers:
+                    done, future = ahead.popleft()
+                    yield future.result(), min(page_size, total - (done - 1) * page_size)
+            while ahead:
+                done, future = ahead.popleft()
+                yield future.result(), min(page_size, total - (done - 1) * page_size)
+
+    def _full_recipe_bodies(self):
+        """(body, 1) for the full recipe of every listed recipe; IDs that vanished since listing are counted and skipped."""
+        def fetch(recipe_id):
+            try:
+                return self.client.request(f'/api/v1/recipes/{recipe_id}', raw=True)
+            except NotFoundError:
+                return None
+
+        def ids():
+            for data, _ in iter_pages('/api/v1/recipes', None, self.per_page, self.max_items, self.client):
+                yield from (recipe['id'] for recipe in data)
+
+        with ThreadPoolExecutor(self.fetchers) as executor:
+            ahead = deque()
+            count = 0
+            for recipe_id in ids():
+                if self.max_items is not None and count >= self.max_items:
+                    break
+                count += 1
+                ahead.append(executor.submit(fetch, recipe_id))
+                if len(ahead) >= 4 * self.fetchers:
+                    yield from self._full_result(ahead.popleft())
+            while ahead:
+                yield from self._full_result(ahead.popleft())
+
+    def _full_result(self, future):
+        body = future.result()
+        if body is None:
+            self.missing += 1
+        else:
+            yield body, 1
+
+class _Done:
+    """Already-computed stand-in for a Future when exporting without a pool."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def result(self):
+        return self.value
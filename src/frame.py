@@ -0,0 +1,294 @@
+import operator
+import re
+
+import numpy as np
+
+from duration import parse_durations
+
+NUTRITION_COLUMNS = ('calories', 'protein_g', 'carbohydrates_g', 'fat_g')
+CATEGORICAL_COLUMNS = ('category', 'cuisine', 'difficulty')
+
+# IDs such as rec_0000042: a prefix and a zero-padded number
+_NUMBERED_ID = re.compile(r'([A-Za-z]+_)([0-9]+)\Z')
+
+class TextColumn:
+    """
+    Strings stored as one UTF-8 buffer plus row offsets, so each row costs
+    its own length instead of the longest string's. Indexing with an int
+    gives a str; a mask, index array or slice gives a new TextColumn.
+    """
+
+    def __init__(self, buffer, offsets):
+        self.buffer = buffer
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, values):
+        encoded = [value.encode() for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, selector):
+        if isinstance(selector, (int, np.integer)):
+            row = range(len(self))[selector]
+            return self.buffer[self.offsets[row]:self.offsets[row + 1]].tobytes().decode()
+        rows = np.arange(len(self))[selector]
+        starts = self.offsets[rows]
+        lengths = self.offsets[rows + 1] - starts
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        # Each selected string's bytes, gathered in one pass
+        positions = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return TextColumn(self.buffer[positions], offsets)
+
+    def __iter__(self):
+        data = self.buffer.tobytes()
+        for start, end in zip(self.offsets[:-1].tolist(), self.offsets[1:].tolist()):
+            yield data[start:end].decode()
+
+    @property
+    def nbytes(self):
+        return self.buffer.nbytes + self.offsets.nbytes
+
+    def isin(self, values):
+        """Boolean mask of rows whose string is in `values`."""
+        values = set(values)
+        return np.fromiter((value in values for value in self), dtype=bool, count=len(self))
+
+class IdColumn:
+    """
+    IDs that share a prefix and a zero-padded width (rec_0000042), stored as
+    int64 numbers. Same interface as TextColumn; `from_strings` falls back to
+    a TextColumn for IDs of any other form.
+    """
+
+    def __init__(self, numbers, prefix, width):
+        self.numbers = numbers
+        self.prefix = prefix
+        self.width = width
+
+    @classmethod
+    def from_strings(cls, values):
+        values = list(values)
+        match = _NUMBERED_ID.match(values[0]) if values else None
+        if match is None or len(match.group(2)) > 18:
+            return TextColumn.from_strings(values)
+        prefix, width = match.group(1), len(match.group(2))
+        length = len(prefix) + width
+        if any(len(value) != length for value in values) or not all(map(str.isascii, values)):
+            return TextColumn.from_strings(values)
+        text = ''.join(values).encode('ascii')
+        # One row of bytes per ID, checked and converted as a whole
+        rows = np.frombuffer(text, dtype=np.uint8).reshape(len(values), length)
+        digits = rows[:, len(prefix):].astype(np.int64) - ord('0')
+        if (np.any(rows[:, :len(prefix)] != np.frombuffer(prefix.encode(), dtype=np.uint8))
+                or np.any((digits < 0) | (digits > 9))):
+            return TextColumn.from_strings(values)
+        return cls(digits @ 10 ** np.arange(width - 1, -1, -1, dtype=np.int64), prefix, width)
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def __getitem__(self, selector):
+        if isinstance(selector, (int, np.integer)):
+            return f'{self.prefix}{operator.index(self.numbers[selector]):0{self.width}d}'
+        return IdColumn(self.numbers[selector], self.prefix, self.width)
+
+    def __iter__(self):
+        return (f'{self.prefix}{number:0{self.width}d}' for number in self.numbers.tolist())
+
+    @property
+    def nbytes(self):
+        return self.numbers.nbytes
+
+    def isin(self, values):
+        """Boolean mask of rows whose ID is in `values`."""
+        numbers = []
+        for value in values:
+            match = _NUMBERED_ID.match(value)
+            if match and match.group(1) == self.prefix and len(match.group(2)) == self.width:
+                numbers.append(int(match.group(2)))
+        return np.isin(self.numbers, numbers)
+
+class RecipeFrame:
+    """
+    Columnar, NumPy-backed view of list-page recipes for analytics.
+
+    Nutrition and `total_time` (seconds, parsed once) are float32 with NaN
+    where missing, category/cuisine/difficulty are small integer codes into
+    `labels`, and dietary flags are a bitset matrix with one bit per flag in
+    `flags`. IDs are kept as numbers when they follow the API's rec_NNNNNNN
+    form (see IdColumn), and names in a TextColumn.
+
+        frame = RecipeFrame.from_recipes(iter_recipes())
+        quick = frame[frame.mask(dietary='Vegan', total_time=(None, 1800))]
+        quick.group_mean('calories', by='cuisine')
+        quick.top_k('protein_g', 10)
+    """
+
+    def __init__(self, ids, names, columns, codes, labels, flag_bits, flags):
+        self.ids = ids
+        self.names = names
+        self.columns = columns
+        self.codes = codes
+        self.labels = labels
+        self.flag_bits = flag_bits
+        self.flags = flags
+
+    @classmethod
+    def from_recipes(cls, recipes):
+        ids, names = [], []
+        nutrition = {name: [] for name in NUTRITION_COLUMNS}
+        total_time = []
+        codes = {name: [] for name in CATEGORICAL_COLUMNS}
+        code_of = {name: {} for name in CATEGORICAL_COLUMNS}
+        flag_of = {}
+        flag_rows = []
+
+        for recipe in recipes:
+            ids.append(recipe['id'])
+            names.append(recipe['name'])
+            summary = recipe.get('nutrition_summary') or {}
+            for name in NUTRITION_COLUMNS:
+                value = summary.get(name)
+                nutrition[name].append(np.nan if value is None else value)
+            total_time.append((recipe.get('meta') or {}).get('total_time'))
+            for name in CATEGORICAL_COLUMNS:
+                value = recipe.get(name)
+                codes[name].append(code_of[name].setdefault(value, len(code_of[name])))
+            flag_rows.append([
+                flag_of.setdefault(flag, len(flag_of))
+                for flag in (recipe.get('dietary') or {}).get('flags', [])
+            ])
+
+        count = len(ids)
+        flag_bits = np.zeros((count, max(1, -(-len(flag_of) // 64))), dtype=np.uint64)
+        for row, bits in enumerate(flag_rows):
+            for bit in bits:
+                flag_bits[row, bit // 64] |= np.uint64(1 << (bit % 64))
+
+        columns = {name: np.array(values, dtype=np.float32) for name, values in nutrition.items()}
+        columns['total_time'] = parse_durations(total_time, missing=np.nan, dtype=np.float32)
+        return cls(
+            ids=IdColumn.from_strings(ids),
+            names=TextColumn.from_strings(names),
+            columns=columns,
+            codes={name: np.array(values, dtype=np.uint16) for name, values in codes.items()},
+            labels={name: list(mapping) for name, mapping in code_of.items()},
+            flag_bits=flag_bits,
+            flags=list(flag_of),
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, selector):
+        """Select rows by boolean mask, index array or slice, returning a new frame."""
+        return RecipeFrame(
+            ids=self.ids[selector],
+            names=self.names[selector],
+            columns={name: column[selector] for name, column in self.columns.items()},
+            codes={name: codes[selector] for name, codes in self.codes.items()},
+            labels=self.labels,
+            flag_bits=self.flag_bits[selector],
+            flags=self.flags,
+        )
+
+    @property
+    def nbytes(self):
+        arrays = [self.ids, self.names, self.flag_bits, *self.columns.values(), *self.codes.values()]
+        return sum(array.nbytes for array in arrays)
+
+    def has_flags(self, *flags):
+        """Boolean mask of recipes carrying every one of `flags`."""
+        required = np.zeros(self.flag_bits.shape[1], dtype=np.uint64)
+        for flag in flags:
+            if flag not in self.flags:
+                return np.zeros(len(self), dtype=bool)
+            bit = self.flags.index(flag)
+            required[bit // 64] |= np.uint64(1 << (bit % 64))
+        return np.all((self.flag_bits & required) == required, axis=1)
+
+    def mask(self, dietary=None, **filters):
+        """
+        Boolean mask for equality filters on categorical columns
+        (`cuisine='Thai'`), `(low, high)` ranges on numeric columns
+        (`calories=(300, 500)`, either bound may be None) and dietary flags.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if dietary:
+            mask &= self.has_flags(*([dietary] if isinstance(dietary, str) else dietary))
+        for name, value in filters.items():
+            if name in self.codes:
+                if value not in self.labels[name]:
+                    return np.zeros(len(self), dtype=bool)
+                mask &= self.codes[name] == self.labels[name].index(value)
+            else:
+                low, high = value
+                column = self.columns[name]
+                if low is not None:
+                    mask &= column >= low
+                if high is not None:
+                    mask &= column <= high
+        return mask
+
+    def top_k(self, column, k, largest=True):
+        """Row indices of the k largest (or smallest) values, best first."""
+        values = self.columns[column].astype(np.float64)
+        values = np.where(np.isnan(values), -np.inf if largest else np.inf, values)
+        if largest:
+            values = -values
+        k = min(k, len(values))
+        if k == 0:
+            return np.array([], dtype=np.intp)
+        picked = np.argpartition(values, k - 1)[:k]
+        return picked[np.argsort(values[picked], kind='stable')]
+
+    def group_mean(self, column, by):
+        """Mean of a numeric column per label of a categorical column."""
+        codes = self.codes[by]
+        values = self.columns[column].astype(np.float64)
+        valid = ~np.isnan(values)
+        sums = np.bincount(codes[valid], weights=values[valid], minlength=len(self.labels[by]))
+        counts = np.bincount(codes[valid], minlength=len(self.labels[by]))
+        return {
+            label: sums[code] / counts[code]
+            for code, label in enumerate(self.labels[by]) if counts[code]
+        }
+
+    def describe(self, column):
+        values = self.columns[column]
+        values = values[~np.isnan(values)] if values.dtype.kind == 'f' else values
+        if not len(values):
+            return {'count': 0}
+        p50, p95 = np.percentile(values, [50, 95])
+        return {
+            'count': int(len(values)),
+            'mean': float(values.mean()),
+            'min': float(values.min()),
+            'p50': float(p50),
+            'p95': float(p95),
+            'max': float(values.max()),
+        }
+
+    def to_records(self, rows=None):
+        """Plain dicts for the selected rows, e.g. to print a top-k result."""
+        rows = range(len(self)) if rows is None else rows
+        records = []
+        for row in rows:
+            record = {'id': self.ids[row], 'name': self.names[row]}
+            for name, codes in self.codes.items():
+                record[name] = self.labels[name][codes[row]]
+            for name, column in self.columns.items():
+                record[name] = column[row].item()
+            record['flags'] = [flag for flag in self.flags if self._row_has_flag(row, flag)]
+            records.append(record)
+        return records
+
+    def _row_has_flag(self, row, flag):
+        bit = self.flags.index(flag)
+        return bool(int(self.flag_bits[row, bit // 64]) >> (bit % 64) & 1)
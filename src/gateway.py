@@ -0,0 +1,102 @@
+import asyncio
+import math
+import os
+
+from aiohttp import web
+
+from async_client import AsyncRecipeClient
+from cache import ResponseCache
+from client import RecipeApiError, get_api_key
+from coalesce import Coalescer, DEFAULT_TTL
+from metrics import MetricsRegistry
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8787
+DEFAULT_CONCURRENCY = 32
+DEFAULT_CACHE = '.recipe_gateway_cache.sqlite3'
+
+# Where the gateway itself sends requests. Deliberately not RECIPE_API_BASE_URL,
+# which workers sharing the same .env use to reach the gateway.
+DEFAULT_UPSTREAM = 'https://recipe-api.com'
+
+class Gateway:
+    """
+    Local HTTP proxy exposing the Recipe API's `/api/v1/...` routes.
+
+    Workers point `RECIPE_API_BASE_URL` at the gateway instead of the API,
+    and then share:
+
+    - one pool of `concurrency` keep-alive upstream connections
+    - one ResponseCache with ETag revalidation, read and written off the
+      event loop so a slow disk doesn't hold up other requests
+    - one token bucket for `rate_limit`
+    - single-flight coalescing, so identical concurrent requests from
+      different workers make one upstream call
+
+    Upstream calls use the gateway's own API key. The key workers send is
+    not checked, so bind the gateway to a private interface.
+    `/gateway/stats` (JSON) and `/metrics` (Prometheus) report traffic.
+    """
+
+    def __init__(self, upstream=None, api_key=None, cache=None, rate_limit=None, burst=None,
+                 concurrency=DEFAULT_CONCURRENCY, coalesce_ttl=DEFAULT_TTL):
+        self.cache = cache
+        self.metrics = MetricsRegistry()
+        self.coalescer = Coalescer(coalesce_ttl)
+        self.client = AsyncRecipeClient(
+            # Resolved now so a missing key stops startup, not a request
+            api_key=api_key or get_api_key(),
+            base_url=(upstream or os.getenv('RECIPE_API_UPSTREAM') or DEFAULT_UPSTREAM).rstrip('/'),
+            concurrency=concurrency,
+            rate_limit=rate_limit,
+            burst=burst,
+            coalescer=self.coalescer,
+            hooks=[self.metrics],
+            cache=cache,
+        )
+
+        self.app = web.Application()
+        self.app.router.add_get('/api/v1/{path:.*}', self.proxy)
+        self.app.router.add_get('/gateway/stats', self.stats)
+        self.app.router.add_get('/metrics', self.prometheus)
+        self.app.on_cleanup.append(self._close)
+
+    async def proxy(self, request):
+        try:
+            body = await self.client.request(request.path, dict(request.query), raw=True)
+        except RecipeApiError as e:
+            return error_response(e)
+        return web.Response(body=body, content_type='application/json')
+
+    async def stats(self, request):
+        cache = await asyncio.to_thread(self.cache.stats) if self.cache else None
+        return web.json_response({
+            'upstream': self.client.base_url,
+            'coalescer': self.coalescer.stats(),
+            'cache': cache,
+            'retries': self.client.retries,
+            'requests': self.metrics.snapshot(),
+        })
+
+    async def prometheus(self, request):
+        return web.Response(text=self.metrics.prometheus(), content_type='text/plain', charset='utf-8')
+
+    async def _close(self, app):
+        await self.client.close()
+
+    def run(self, host=DEFAULT_HOST, port=DEFAULT_PORT, print=print):
+        """Serve until interrupted."""
+        web.run_app(self.app, host=host, port=port, print=print)
+
+def error_response(error):
+    """The API's error JSON for a RecipeApiError, so clients behind the gateway raise the same error."""
+    headers = {}
+    if getattr(error, 'retry_after', None) is not None:
+        headers['Retry-After'] = str(math.ceil(error.retry_after))
+    # No status means the API couldn't be reached at all
+    status = error.status or 502
+    return web.json_response({'error': {'code': error.code, 'message': str(error)}}, status=status, headers=headers)
+
+def create_gateway(cache_path=DEFAULT_CACHE, **options):
+    """A Gateway with a ResponseCache at `cache_path` (None for no cache)."""
+    return Gateway(cache=ResponseCache(cache_path) if cache_path else None, **options)
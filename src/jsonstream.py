@@ -0,0 +1,269 @@
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Faster decoding when orjson is installed; both accept bytes
+loads = orjson.loads if orjson is not None else json.loads
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+# Bytes read from the network per chunk when streaming
+CHUNK_SIZE = 64 * 1024
+
+# Consumed input is dropped from the buffer once it grows past this
+_COMPACT_AT = 256 * 1024
+
+# Unrolled patterns ("normal* (special normal*)*") that never backtrack far
+# on input cut off mid-string, and need no possessive quantifiers (3.11+)
+_WHITESPACE = re.compile(rb'[ \t\r\n]*')
+# Everything up to the next bracket, stepping over complete strings
+_SKIP = re.compile(rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*')
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+_SCALAR = re.compile(rb'[^,\]}\s]*')
+
+_OPEN = frozenset(b'{[')
+_QUOTE, _COMMA, _COLON = ord('"'), ord(','), ord(':')
+_LBRACE, _RBRACE, _LBRACKET, _RBRACKET = b'{}[]'
+
+_MORE = object()
+
+class ItemParser:
+    """
+    Push parser for a `{"data": [...], "meta": {...}}` response body.
+
+    `feed(chunk)` returns the items of the `data` array completed by that
+    chunk, each decoded on its own as soon as its bytes are in, so the
+    whole body is never held as text or as one object tree. Other
+    top-level members are decoded into `fields` as they go past.
+    """
+
+    def __init__(self, key='data'):
+        self.key = key
+        self.fields = {}
+        self.count = 0
+        self.bytes = 0
+        self._buf = bytearray()
+        self._pos = 0
+        self._eof = False
+        self._done = False
+        self._parser = self._parse()
+
+    def feed(self, chunk):
+        """Add body bytes; returns a list of the items they completed."""
+        self._buf += chunk
+        self.bytes += len(chunk)
+        return self._run()
+
+    def end(self):
+        """Mark the end of the body; returns any last items. Raises ValueError if it was cut short."""
+        self._eof = True
+        return self._run()
+
+    def _run(self):
+        items = []
+        if self._done:
+            return items
+        for value in self._parser:
+            if value is _MORE:
+                return items
+            items.append(value)
+        self._done = True
+        return items
+
+    def _more(self):
+        if self._eof:
+            raise ValueError('Unexpected end of JSON document')
+        yield _MORE
+
+    def _next_byte(self):
+        """The next non-whitespace byte, left unconsumed; None at the end of the document."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if self._eof:
+                return None
+            yield _MORE
+
+    def _value_end(self):
+        """Index just past the JSON value starting at the current (non-whitespace) position."""
+        buf = self._buf
+        start = self._pos
+        if buf[start] in _OPEN:
+            i, depth = start, 0
+            while True:
+                i = _SKIP.match(buf, i).end()
+                if i == len(buf) or buf[i] == _QUOTE:
+                    # Mid-string or out of input
+                    yield from self._more()
+                    continue
+                depth += 1 if buf[i] in _OPEN else -1
+                i += 1
+                if not depth:
+                    return i
+        if buf[start] == _QUOTE:
+            while True:
+                match = _STRING.match(buf, start)
+                if match:
+                    return match.end()
+                yield from self._more()
+        # Number, true, false or null
+        while True:
+            end = _SCALAR.match(buf, start).end()
+            if end < len(buf) or self._eof:
+                return end
+            yield from self._more()
+
+    def _value(self):
+        if (yield from self._next_byte()) is None:
+            raise ValueError('Unexpected end of JSON document')
+        end = yield from self._value_end()
+        value = loads(self._buf[self._pos:end])
+        self._pos = end
+        return value
+
+    def _expect(self, byte):
+        if (yield from self._next_byte()) != byte:
+            raise ValueError(f'Expected {chr(byte)!r} at offset {self.bytes - len(self._buf) + self._pos}')
+        self._pos += 1
+
+    def _parse(self):
+        yield from self._expect(_LBRACE)
+        if (yield from self._next_byte()) == _RBRACE:
+            return
+        while True:
+            if (yield from self._next_byte()) != _QUOTE:
+                yield from self._expect(_QUOTE)
+            name = yield from self._value()
+            yield from self._expect(_COLON)
+            if name == self.key and (yield from self._next_byte()) == _LBRACKET:
+                self._pos += 1
+                yield from self._items()
+            else:
+                self.fields[name] = yield from self._value()
+            if (yield from self._next_byte()) == _RBRACE:
+                self._pos += 1
+                return
+            yield from self._expect(_COMMA)
+
+    def _items(self):
+        if (yield from self._next_byte()) == _RBRACKET:
+            self._pos += 1
+            return
+        while True:
+            yield (yield from self._value())
+            self.count += 1
+            if self._pos > _COMPACT_AT:
+                del self._buf[:self._pos]
+                self._pos = 0
+            if (yield from self._next_byte()) == _RBRACKET:
+                self._pos += 1
+                return
+            yield from self._expect(_COMMA)
+
+class _Stream:
+    def __init__(self, chunks, key='data', on_close=None):
+        self.parser = ItemParser(key)
+        self._chunks = chunks
+        self._on_close = on_close
+
+    @property
+    def fields(self):
+        return self.parser.fields
+
+    @property
+    def meta(self):
+        return self.parser.fields.get('meta')
+
+    @property
+    def bytes(self):
+        return self.parser.bytes
+
+    def _finish(self, error):
+        if self._on_close is not None:
+            on_close, self._on_close = self._on_close, None
+            on_close(self, error)
+
+class ItemStream(_Stream):
+    """
+    Iterator over the `data` items of a response body arriving as `chunks`.
+
+    `meta` (and any other top-level member, in `fields`) is available once
+    parsed: before the first item if the server sends it first, otherwise
+    once iteration ends. `on_close(stream, error)` is called once, when the
+    items run out, decoding fails, or the stream is closed early.
+    """
+
+    def __init__(self, chunks, key='data', on_close=None):
+        super().__init__(chunks, key, on_close)
+        self._items = self._iterate()
+
+    def _iterate(self):
+        feed = self.parser.feed
+        for chunk in self._chunks:
+            yield from feed(chunk)
+        yield from self.parser.end()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._items)
+        except StopIteration:
+            self._finish(None)
+            raise
+        except Exception as e:
+            self._finish(e)
+            raise
+
+    def close(self):
+        self._items.close()
+        self._finish(None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class AsyncItemStream(_Stream):
+    """ItemStream over an async iterable of chunks, for `async for`."""
+
+    def __init__(self, chunks, key='data', on_close=None):
+        super().__init__(chunks, key, on_close)
+        self._items = self._iterate()
+
+    async def _iterate(self):
+        feed = self.parser.feed
+        async for chunk in self._chunks:
+            for item in feed(chunk):
+                yield item
+        for item in self.parser.end():
+            yield item
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self._items.__anext__()
+        except StopAsyncIteration:
+            self._finish(None)
+            raise
+        except Exception as e:
+            self._finish(e)
+            raise
+
+    async def aclose(self):
+        await self._items.aclose()
+        self._finish(None)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
@@ -0,0 +1,281 @@
+import bisect
+import threading
+import time
+
+from jsonstream import loads
+
+# Latency histogram bucket bounds in seconds: 1ms to ~65s, four per doubling
+LATENCY_BUCKETS = tuple(0.001 * 2 ** (i / 4) for i in range(65))
+
+SOURCES = ('network', 'revalidated', 'cache', 'coalesced', 'error')
+
+class RequestEvent:
+    """
+    One api_request call as seen by instrumentation hooks.
+
+    `source` says where the response came from: 'network', 'revalidated'
+    (a 304 for a cached body), 'cache' (a fresh on-disk entry) or
+    'coalesced' (shared with an identical concurrent request). `bytes` is
+    the body size received from the network. `span` is free for a hook to
+    keep per-request state in.
+    """
+
+    __slots__ = ('endpoint', 'params', 'start', 'duration', 'status', 'source',
+                 'bytes', 'retries', 'usage', 'error', 'span')
+
+    def __init__(self, endpoint, params):
+        self.endpoint = endpoint
+        self.params = params
+        self.start = time.perf_counter()
+        self.duration = None
+        self.status = None
+        self.source = None
+        self.bytes = 0
+        self.retries = 0
+        self.usage = None
+        self.error = None
+        self.span = None
+
+class Hooks:
+    """Base class for instrumentation hooks; override either method."""
+
+    def request_started(self, event):
+        pass
+
+    def request_finished(self, event):
+        pass
+
+def begin(hooks, endpoint, params):
+    event = RequestEvent(endpoint, params)
+    for hook in hooks:
+        hook.request_started(event)
+    return event
+
+def finish(hooks, event, response=None, error=None):
+    event.duration = time.perf_counter() - event.start
+    if error is not None:
+        event.error = error
+        event.status = getattr(error, 'status', None) or event.status
+    else:
+        if event.source is None:
+            # The fetch ran for another caller
+            event.source, event.status = 'coalesced', 200
+        event.usage = _usage(response)
+    for hook in hooks:
+        hook.request_finished(event)
+
+def _usage(response):
+    """The `usage` block of a decoded response, or of a raw body (raw=True)."""
+    if isinstance(response, dict):
+        return response.get('usage')
+    # Raw bodies are only decoded when they can hold one; list pages don't
+    if isinstance(response, (bytes, bytearray)) and b'"usage"' in response:
+        decoded = loads(response)
+        return decoded.get('usage') if isinstance(decoded, dict) else None
+    return None
+
+def endpoint_label(endpoint):
+    """Collapse per-item paths so labels stay few: /api/v1/recipes/rec_1 -> /api/v1/recipes/{id}."""
+    parts = endpoint.split('/', 5)
+    if len(parts) > 4:
+        parts[4] = '{id}'
+    return '/'.join(parts)
+
+class Histogram:
+    """Fixed-bucket histogram with interpolated quantiles."""
+
+    __slots__ = ('bounds', 'counts', 'count', 'sum')
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = self.bounds[i - 1] if i else 0.0
+                high = self.bounds[i] if i < len(self.bounds) else low
+                return low + (high - low) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+class _EndpointStats:
+    __slots__ = ('latency', 'statuses', 'bytes', 'retries', 'errors')
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.statuses = {}
+        self.bytes = 0
+        self.retries = 0
+        self.errors = {}
+
+class MetricsRegistry(Hooks):
+    """
+    In-process request metrics, per endpoint: latency histogram
+    (p50/p95/p99), counts by status and source, bytes received, retries
+    and error codes, plus credits spent and remaining from `usage` blocks.
+
+        registry = MetricsRegistry()
+        client = RecipeClient(hooks=[registry])
+        ...
+        print(registry.snapshot())
+        open('metrics.prom', 'w').write(registry.prometheus())
+    """
+
+    def __init__(self, prefix='recipe_api'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+            self.credits_used = 0
+            self.credits_remaining = {}
+
+    def request_finished(self, event):
+        label = endpoint_label(event.endpoint)
+        key = (event.status, event.source if event.error is None else 'error')
+        with self._lock:
+            stats = self._endpoints.get(label)
+            if stats is None:
+                stats = self._endpoints[label] = _EndpointStats()
+            stats.latency.observe(event.duration)
+            stats.statuses[key] = stats.statuses.get(key, 0) + 1
+            stats.bytes += event.bytes
+            stats.retries += event.retries
+            if event.error is not None:
+                code = getattr(event.error, 'code', None) or type(event.error).__name__
+                stats.errors[code] = stats.errors.get(code, 0) + 1
+            elif event.usage and event.source == 'network':
+                # Only responses fetched from the API cost a credit
+                self.credits_used += 1
+                for name, value in event.usage.items():
+                    if name.endswith('_remaining'):
+                        self.credits_remaining[name[:-len('_remaining')]] = value
+
+    def snapshot(self):
+        """Plain-dict summary per endpoint, with latencies in milliseconds."""
+        with self._lock:
+            endpoints = {}
+            for label, stats in sorted(self._endpoints.items()):
+                sources = dict.fromkeys(SOURCES, 0)
+                for (_, source), n in stats.statuses.items():
+                    sources[source] = sources.get(source, 0) + n
+                served = sources['cache'] + sources['revalidated']
+                endpoints[label] = {
+                    'requests': stats.latency.count,
+                    'errors': dict(stats.errors),
+                    'p50_ms': _ms(stats.latency.quantile(0.5)),
+                    'p95_ms': _ms(stats.latency.quantile(0.95)),
+                    'p99_ms': _ms(stats.latency.quantile(0.99)),
+                    'bytes': stats.bytes,
+                    'retries': stats.retries,
+                    'sources': sources,
+                    'cache_hit_rate': served / (served + sources['network']) if served else 0.0,
+                }
+            return {
+                'endpoints': endpoints,
+                'credits_used': self.credits_used,
+                'credits_remaining': dict(self.credits_remaining),
+            }
+
+    def prometheus(self):
+        """The metrics in the Prometheus text exposition format."""
+        p = self.prefix
+        lines = []
+
+        def family(name, kind, help):
+            lines.append(f'# HELP {p}_{name} {help}')
+            lines.append(f'# TYPE {p}_{name} {kind}')
+
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+
+            family('requests_total', 'counter', 'Requests by endpoint, status and response source.')
+            for label, stats in endpoints:
+                for (status, source), n in sorted(stats.statuses.items(), key=str):
+                    lines.append(f'{p}_requests_total{{endpoint="{_escape(label)}",'
+                                 f'status="{status or ""}",source="{source}"}} {n}')
+
+            family('request_duration_seconds', 'histogram', 'Request latency, including retries.')
+            for label, stats in endpoints:
+                endpoint = _escape(label)
+                cumulative = 0
+                for bound, n in zip(stats.latency.bounds, stats.latency.counts):
+                    cumulative += n
+                    lines.append(f'{p}_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound:.6g}"}} {cumulative}')
+                lines.append(f'{p}_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {stats.latency.count}')
+                lines.append(f'{p}_request_duration_seconds_sum{{endpoint="{endpoint}"}} {stats.latency.sum:.6f}')
+                lines.append(f'{p}_request_duration_seconds_count{{endpoint="{endpoint}"}} {stats.latency.count}')
+
+            family('response_bytes_total', 'counter', 'Response body bytes received from the API.')
+            for label, stats in endpoints:
+                lines.append(f'{p}_response_bytes_total{{endpoint="{_escape(label)}"}} {stats.bytes}')
+
+            family('retries_total', 'counter', 'Retried attempts after rate limiting or transient failures.')
+            for label, stats in endpoints:
+                lines.append(f'{p}_retries_total{{endpoint="{_escape(label)}"}} {stats.retries}')
+
+            family('errors_total', 'counter', 'Failed requests by error code.')
+            for label, stats in endpoints:
+                for code, n in sorted(stats.errors.items()):
+                    lines.append(f'{p}_errors_total{{endpoint="{_escape(label)}",code="{_escape(code)}"}} {n}')
+
+            family('credits_used_total', 'counter', 'Credits spent on full-recipe fetches.')
+            lines.append(f'{p}_credits_used_total {self.credits_used}')
+
+            family('credits_remaining', 'gauge', 'Credits left, as last reported by the API.')
+            for period, value in sorted(self.credits_remaining.items()):
+                lines.append(f'{p}_credits_remaining{{period="{_escape(period)}"}} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+class SpanHooks(Hooks):
+    """
+    One client span per request, through an OpenTelemetry tracer (any
+    object with the OpenTelemetry API's `start_span`). Without one, the
+    global tracer from the `opentelemetry` package is used.
+    """
+
+    def __init__(self, tracer=None):
+        if tracer is None:
+            from opentelemetry import trace
+            tracer = trace.get_tracer('recipe-api-client')
+        self.tracer = tracer
+
+    def request_started(self, event):
+        event.span = self.tracer.start_span(f'GET {endpoint_label(event.endpoint)}', attributes={
+            'http.request.method': 'GET',
+            'url.path': event.endpoint,
+        })
+
+    def request_finished(self, event):
+        span = event.span
+        if event.status is not None:
+            span.set_attribute('http.response.status_code', event.status)
+        span.set_attribute('recipe_api.source', event.source or 'error')
+        span.set_attribute('recipe_api.response_bytes', event.bytes)
+        if event.retries:
+            span.set_attribute('http.request.resend_count', event.retries)
+        if event.error is not None:
+            span.set_attribute('error.type', getattr(event.error, 'code', None) or type(event.error).__name__)
+            span.record_exception(event.error)
+        span.end()
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,425 @@
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from client import NotFoundError, get_default_client, iter_pages, set_default_client
+
+DEFAULT_MIRROR_PATH = '.recipe_mirror.sqlite3'
+SYNC_PAGE_SIZE = 100
+
+# Lookup endpoints mirrored as (name, count) lists
+LOOKUPS = {
+    'cuisines': '/api/v1/cuisines',
+    'dietary-flags': '/api/v1/dietary-flags',
+    'ingredient-categories': '/api/v1/ingredient-categories',
+}
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS recipes (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    category TEXT,
+    cuisine TEXT,
+    difficulty TEXT,
+    calories REAL,
+    protein_g REAL,
+    updated_at TEXT,
+    data TEXT NOT NULL,
+    seen INTEGER NOT NULL
+);
+-- Filters match case-insensitively, as the API does
+DROP INDEX IF EXISTS recipes_category;
+DROP INDEX IF EXISTS recipes_cuisine;
+DROP INDEX IF EXISTS recipes_difficulty;
+CREATE INDEX IF NOT EXISTS recipes_category_nocase ON recipes (category COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS recipes_cuisine_nocase ON recipes (cuisine COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS recipes_difficulty_nocase ON recipes (difficulty COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS recipes_calories ON recipes (calories);
+
+CREATE TABLE IF NOT EXISTS recipe_flags (
+    recipe_id TEXT NOT NULL,
+    flag TEXT NOT NULL,
+    PRIMARY KEY (flag, recipe_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS recipe_flags_nocase ON recipe_flags (flag COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS ingredients (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT,
+    updated_at TEXT,
+    data TEXT NOT NULL,
+    seen INTEGER NOT NULL
+);
+DROP INDEX IF EXISTS ingredients_category;
+CREATE INDEX IF NOT EXISTS ingredients_category_nocase ON ingredients (category COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS lookups (
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    count INTEGER,
+    PRIMARY KEY (kind, name)
+);
+
+CREATE TABLE IF NOT EXISTS page_hashes (
+    endpoint TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (endpoint, page)
+);
+
+CREATE TABLE IF NOT EXISTS full_recipes (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sync_log (
+    synced_at REAL NOT NULL,
+    stats TEXT NOT NULL
+);
+'''
+
+def page_hash(data):
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+class Mirror:
+    """
+    Local SQLite copy of the recipe list, ingredients and lookup endpoints.
+
+    `sync()` pages through the list endpoints and only rewrites pages whose
+    content hash changed since the last run (and, within a page, rows whose
+    `updated_at` changed when the API provides one). Items that no longer
+    appear are removed. Full recipes are not synced (each costs a credit);
+    they are stored by the prefetcher (see prefetch.py) via
+    `put_full_recipe()`, in the mirror's own table or, when `store` (or
+    RECIPE_API_STORE) names one, in a RecipeStore (see recipe_store.py).
+    Recipes already in the table stay readable either way.
+    """
+
+    def __init__(self, path=None, store=None):
+        self.path = path or os.getenv('RECIPE_API_MIRROR') or DEFAULT_MIRROR_PATH
+        # Queries may come from the paginator's prefetch thread
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.executescript(SCHEMA)
+        self.store = None
+        store = store or os.getenv('RECIPE_API_STORE')
+        if store:
+            from recipe_store import RecipeStore
+            self.store = RecipeStore(store)
+
+    def close(self):
+        self.db.close()
+        if self.store is not None:
+            self.store.close()
+
+    def last_synced(self):
+        row = self.db.execute('SELECT synced_at, stats FROM sync_log ORDER BY synced_at DESC LIMIT 1').fetchone()
+        return (row[0], json.loads(row[1])) if row else (None, None)
+
+    def sync(self, client=None, full=False, per_page=SYNC_PAGE_SIZE):
+        """
+        Bring the mirror up to date and return per-table stats.
+
+        With `full=True` every page is rewritten regardless of its hash.
+        """
+        client = client or get_default_client()
+        generation = time.time_ns()
+        stats = {}
+
+        with self.db:
+            for kind, endpoint in LOOKUPS.items():
+                data = client.request(endpoint)['data']
+                self.db.execute('DELETE FROM lookups WHERE kind = ?', (kind,))
+                self.db.executemany(
+                    'INSERT INTO lookups VALUES (?, ?, ?)',
+                    [(kind, item['name'], item.get('count')) for item in data],
+                )
+                stats[kind] = len(data)
+
+        stats['recipes'] = self._sync_list(
+            client, '/api/v1/recipes', 'recipes', self._upsert_recipes, generation, full, per_page)
+        stats['ingredients'] = self._sync_list(
+            client, '/api/v1/ingredients', 'ingredients', self._upsert_ingredients, generation, full, per_page)
+
+        with self.db:
+            self.db.execute('INSERT INTO sync_log VALUES (?, ?)', (time.time(), json.dumps(stats)))
+        return stats
+
+    def _sync_list(self, client, endpoint, table, upsert, generation, full, per_page):
+        stats = {'pages': 0, 'changed_pages': 0, 'written': 0, 'removed': 0}
+        hash_key = f'{endpoint}?per_page={per_page}'
+        known = dict(self.db.execute('SELECT page, hash FROM page_hashes WHERE endpoint = ?', (hash_key,)))
+
+        for page, (data, _) in enumerate(iter_pages(endpoint, per_page=per_page, client=client), 1):
+            stats['pages'] += 1
+            digest = page_hash(data)
+            ids = [(generation, item['id']) for item in data]
+
+            with self.db:
+                if not full and known.get(page) == digest:
+                    self.db.executemany(f'UPDATE {table} SET seen = ? WHERE id = ?', ids)
+                    continue
+                stats['changed_pages'] += 1
+                stats['written'] += upsert(data, generation)
+                self.db.execute('INSERT OR REPLACE INTO page_hashes VALUES (?, ?, ?)', (hash_key, page, digest))
+
+        with self.db:
+            if table == 'recipes':
+                self.db.execute(
+                    'DELETE FROM recipe_flags WHERE recipe_id IN (SELECT id FROM recipes WHERE seen != ?)',
+                    (generation,))
+            stats['removed'] = self.db.execute(f'DELETE FROM {table} WHERE seen != ?', (generation,)).rowcount
+            self.db.execute('DELETE FROM page_hashes WHERE endpoint = ? AND page > ?', (hash_key, stats['pages']))
+        return stats
+
+    def _changed_ids(self, table, data):
+        """IDs in `data` that are new or whose updated_at differs from the stored row."""
+        stored = dict(self.db.execute(
+            f"SELECT id, updated_at FROM {table} WHERE id IN ({','.join('?' * len(data))})",
+            [item['id'] for item in data],
+        )) if data else {}
+        return {
+            item['id'] for item in data
+            if item['id'] not in stored or item.get('updated_at') is None
+            or item.get('updated_at') != stored[item['id']]
+        }
+
+    def _upsert_recipes(self, data, generation):
+        changed = self._changed_ids('recipes', data)
+        rows = [
+            (r['id'], r['name'], r.get('description'), r.get('category'), r.get('cuisine'),
+             r.get('difficulty'), (r.get('nutrition_summary') or {}).get('calories'),
+             (r.get('nutrition_summary') or {}).get('protein_g'), r.get('updated_at'),
+             json.dumps(r), generation)
+            for r in data if r['id'] in changed
+        ]
+        self.db.executemany('INSERT OR REPLACE INTO recipes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        self.db.executemany(
+            'UPDATE recipes SET seen = ? WHERE id = ?',
+            [(generation, r['id']) for r in data if r['id'] not in changed],
+        )
+        self.db.executemany('DELETE FROM recipe_flags WHERE recipe_id = ?', [(row[0],) for row in rows])
+        self.db.executemany(
+            'INSERT OR IGNORE INTO recipe_flags VALUES (?, ?)',
+            [(r['id'], flag) for r in data if r['id'] in changed for flag in (r.get('dietary') or {}).get('flags', [])],
+        )
+        return len(rows)
+
+    def _upsert_ingredients(self, data, generation):
+        changed = self._changed_ids('ingredients', data)
+        rows = [
+            (i['id'], i['name'], i.get('category'), i.get('updated_at'), json.dumps(i), generation)
+            for i in data if i['id'] in changed
+        ]
+        self.db.executemany('INSERT OR REPLACE INTO ingredients VALUES (?, ?, ?, ?, ?, ?)', rows)
+        self.db.executemany(
+            'UPDATE ingredients SET seen = ? WHERE id = ?',
+            [(generation, i['id']) for i in data if i['id'] not in changed],
+        )
+        return len(rows)
+
+    def query_recipes(self, q=None, category=None, cuisine=None, difficulty=None, dietary=None,
+                      max_calories=None, min_protein=None, page=1, per_page=10):
+        """Filter mirrored recipes like /api/v1/recipes. Returns (items, total)."""
+        where, args = [], []
+        if q:
+            where.append('(name LIKE ? OR description LIKE ?)')
+            args += [f'%{q}%', f'%{q}%']
+        for column, value in (('category', category), ('cuisine', cuisine), ('difficulty', difficulty)):
+            if value:
+                where.append(f'{column} = ? COLLATE NOCASE')
+                args.append(value)
+        if dietary:
+            where.append('id IN (SELECT recipe_id FROM recipe_flags WHERE flag = ? COLLATE NOCASE)')
+            args.append(dietary)
+        if max_calories is not None:
+            where.append('calories <= ?')
+            args.append(float(max_calories))
+        if min_protein is not None:
+            where.append('protein_g >= ?')
+            args.append(float(min_protein))
+        return self._page('recipes', where, args, page, per_page)
+
+    def query_ingredients(self, q=None, category=None, page=1, per_page=20):
+        """Filter mirrored ingredients like /api/v1/ingredients. Returns (items, total)."""
+        where, args = [], []
+        if q:
+            where.append('name LIKE ?')
+            args.append(f'%{q}%')
+        if category:
+            where.append('category = ? COLLATE NOCASE')
+            args.append(category)
+        return self._page('ingredients', where, args, page, per_page)
+
+    def _page(self, table, where, args, page, per_page):
+        clause = f"WHERE {' AND '.join(where)}" if where else ''
+        page, per_page = int(page), int(per_page)
+        with self._lock:
+            total = self.db.execute(f'SELECT COUNT(*) FROM {table} {clause}', args).fetchone()[0]
+            rows = self.db.execute(
+                f'SELECT data FROM {table} {clause} ORDER BY rowid LIMIT ? OFFSET ?',
+                args + [per_page, (page - 1) * per_page],
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows], total
+
+    def recipes(self):
+        """Yield every mirrored list-page recipe."""
+        with self._lock:
+            rows = self.db.execute('SELECT data FROM recipes ORDER BY rowid').fetchall()
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def recipes_by_id(self, ids):
+        """Mirrored list-page recipes for `ids`, in the same order (missing IDs are skipped)."""
+        ids = list(ids)
+        if not ids:
+            return []
+        with self._lock:
+            rows = dict(self.db.execute(
+                f"SELECT id, data FROM recipes WHERE id IN ({','.join('?' * len(ids))})", ids))
+        return [json.loads(rows[i]) for i in ids if i in rows]
+
+    def full_recipe(self, recipe_id):
+        if self.store is not None:
+            recipe = self.store.get(recipe_id)
+            if recipe is not None:
+                return recipe
+        with self._lock:
+            row = self.db.execute('SELECT data FROM full_recipes WHERE id = ?', (recipe_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def full_recipes(self):
+        """Yield every stored full recipe."""
+        stored = set()
+        if self.store is not None:
+            stored.update(self.store.ids())
+            yield from self.store.recipes()
+        with self._lock:
+            rows = self.db.execute('SELECT id, data FROM full_recipes ORDER BY rowid').fetchall()
+        for recipe_id, data in rows:
+            if recipe_id not in stored:
+                yield json.loads(data)
+
+    def has_full_recipes(self, ids):
+        """The subset of `ids` whose full recipe is stored."""
+        ids = list(ids)
+        found = self.store.has_full_recipes(ids) if self.store is not None else set()
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                found.update(row[0] for row in self.db.execute(
+                    f"SELECT id FROM full_recipes WHERE id IN ({','.join('?' * len(chunk))})", chunk))
+        return found
+
+    def has_any_full_recipe(self):
+        if self.store is not None and len(self.store):
+            return True
+        with self._lock:
+            return self.db.execute('SELECT 1 FROM full_recipes LIMIT 1').fetchone() is not None
+
+    def put_full_recipe(self, recipe):
+        if self.store is not None:
+            self.store.put(recipe)
+            return
+        with self._lock, self.db:
+            self.db.execute(
+                'INSERT OR REPLACE INTO full_recipes VALUES (?, ?, ?)',
+                (recipe['id'], json.dumps(recipe), time.time()))
+
+    def version(self):
+        """
+        A cheap fingerprint of the recipes and full recipes held, from
+        counts, latest update times and page hashes; it changes whenever
+        their contents may have.
+        """
+        with self._lock:
+            recipes = self.db.execute('SELECT COUNT(*), MAX(updated_at) FROM recipes').fetchone()
+            pages = self.db.execute(
+                "SELECT endpoint, page, hash FROM page_hashes WHERE endpoint LIKE '/api/v1/recipes?%' "
+                'ORDER BY endpoint, page').fetchall()
+            full = self.db.execute('SELECT COUNT(*), MAX(fetched_at) FROM full_recipes').fetchone()
+        store = (len(self.store), self.store.size()) if self.store is not None else None
+        return hashlib.sha1(json.dumps([recipes, pages, full, store]).encode()).hexdigest()
+
+    def lookup(self, kind):
+        with self._lock:
+            rows = self.db.execute(
+                'SELECT name, count FROM lookups WHERE kind = ? ORDER BY name', (kind,)).fetchall()
+        return [{'name': name, 'count': count} for name, count in rows]
+
+class MirrorClient:
+    """
+    Drop-in stand-in for client.RecipeClient that answers list and lookup
+    endpoints, and prefetched full recipes, from a Mirror without any
+    network access.
+    """
+
+    def __init__(self, mirror):
+        self.mirror = mirror
+
+    def request(self, endpoint, params=None, raw=False):
+        """The decoded response, or its JSON body as bytes with `raw=True` (as RecipeClient.request)."""
+        response = self._respond(endpoint, params)
+        return json.dumps(response).encode() if raw else response
+
+    def _respond(self, endpoint, params):
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        # Like the API, ignore query parameters an endpoint doesn't support
+        if endpoint == '/api/v1/recipes':
+            params = _supported(self.mirror.query_recipes, params)
+        elif endpoint == '/api/v1/ingredients':
+            params = _supported(self.mirror.query_ingredients, params)
+
+        for kind, lookup_endpoint in LOOKUPS.items():
+            if endpoint == lookup_endpoint:
+                return {'data': self.mirror.lookup(kind)}
+
+        if endpoint == '/api/v1/recipes':
+            params.setdefault('per_page', 10)
+            items, total = self.mirror.query_recipes(**params)
+        elif endpoint == '/api/v1/ingredients':
+            params.setdefault('per_page', 20)
+            items, total = self.mirror.query_ingredients(**params)
+        elif endpoint.startswith('/api/v1/recipes/'):
+            recipe = self.mirror.full_recipe(endpoint[len('/api/v1/recipes/'):])
+            if recipe is None:
+                raise NotFoundError(f'{endpoint} has not been prefetched', 404, 'NOT_IN_MIRROR')
+            return {'data': recipe}
+        else:
+            raise NotFoundError(f'{endpoint} is not available offline', 404, 'NOT_IN_MIRROR')
+
+        meta = {'page': int(params.get('page', 1)), 'per_page': int(params['per_page']), 'total': total}
+        return {'data': items, 'meta': meta}
+
+    def close(self):
+        self.mirror.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _supported(query, params):
+    """The `params` that `query` accepts."""
+    names = inspect.signature(query).parameters
+    return {k: v for k, v in params.items() if k in names}
+
+def use_offline_mirror(path=None):
+    """Route api_request and the iter_* helpers to the local mirror."""
+    mirror = Mirror(path)
+    if mirror.last_synced()[0] is None and not mirror.has_any_full_recipe():
+        print('\n[X] The offline mirror is empty!\n')
+        print('Run `python src/scripts/09_sync.py` first.\n')
+        sys.exit(1)
+    set_default_client(MirrorClient(mirror))
+    return mirror
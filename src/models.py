@@ -0,0 +1,231 @@
+import sys
+
+class Field:
+    """
+    One attribute of a Model, read from the JSON key of the same name.
+
+    `model` parses a nested dict (or, with `many=True`, each dict of a list)
+    into that Model class; `intern=True` interns a string (or each string of
+    a list); `lazy=True` keeps the raw JSON until the attribute is first read.
+    Lists become tuples.
+    """
+
+    def __init__(self, name, model=None, many=False, intern=False, lazy=False):
+        self.name = name
+        self.model = model
+        self.many = many
+        self.intern = intern
+        self.lazy = lazy
+
+    def parse(self, value):
+        if self.model is not None:
+            from_json = self.model.from_json
+            if self.many:
+                return tuple([from_json(x) if x.__class__ is dict else x for x in value]) if value.__class__ is list else value
+            return from_json(value) if value.__class__ is dict else value
+        if self.intern:
+            if self.many:
+                return tuple([sys.intern(x) if x.__class__ is str else x for x in value]) if value.__class__ is list else value
+            return sys.intern(value) if value.__class__ is str else value
+        return value
+
+    def dump(self, value):
+        if value.__class__ is tuple:
+            return [x.to_dict() if isinstance(x, Model) else x for x in value]
+        return value.to_dict() if isinstance(value, Model) else value
+
+class _LazyField:
+    # Public attribute over the private slot holding the raw JSON; parsed once, on first read
+    def __init__(self, field, slot):
+        self.field = field
+        self.slot = slot
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        value = self.slot.__get__(obj, owner)
+        if value.__class__ is dict or value.__class__ is list:
+            value = self.field.parse(value)
+            self.slot.__set__(obj, value)
+        return value
+
+    def __set__(self, obj, value):
+        self.slot.__set__(obj, value)
+
+# Sets of declared keys missing from a response, shared by every object missing the same ones
+_absent_sets = {}
+
+def _absent_keys(keys):
+    return _absent_sets.setdefault(keys, keys)
+
+def _compile_from_json(cls):
+    lines = ['def from_json(data):', '    self = new(cls)', '    get = data.get', '    keys = data.keys()']
+    namespace = {'new': object.__new__, 'cls': cls, 'known': cls._names, 'absent': _absent_keys}
+    for i, field in enumerate(cls.fields):
+        target = f'self._{field.name}' if field.lazy else f'self.{field.name}'
+        if field.lazy or (field.model is None and not field.intern):
+            lines.append(f'    {target} = get({field.name!r})')
+        else:
+            namespace[f'parse{i}'] = field.parse
+            lines.append(f'    {target} = parse{i}(get({field.name!r}))')
+    lines += [
+        '    self.extra = None if keys <= known else {k: v for k, v in data.items() if k not in known}',
+        '    self._absent = None if keys >= known else absent(known.difference(keys))',
+        '    return self',
+    ]
+    exec('\n'.join(lines), namespace)
+    return namespace['from_json']
+
+class Model:
+    """
+    Base for typed, `__slots__`-based views of API objects.
+
+    Subclasses list their `fields`; slots, a generated `from_json` and lazy
+    attributes are set up from them. Declared fields missing from the JSON
+    read as None. Keys the class doesn't declare are kept in `extra` (None
+    when there are none) and are readable as attributes too, so nothing in a
+    response is lost. Models also answer `model['key']` and `model.get('key')`
+    like the dicts they replace, and `to_dict()` returns the JSON form.
+    """
+
+    __slots__ = ('extra', '_absent')
+    fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._names = frozenset(f.name for f in cls.fields)
+        for field in cls.fields:
+            if field.lazy:
+                setattr(cls, field.name, _LazyField(field, cls.__dict__[f'_{field.name}']))
+        cls.from_json = staticmethod(_compile_from_json(cls))
+
+    def __init__(self, **values):
+        for field in self.fields:
+            setattr(self, field.name, field.parse(values.pop(field.name, None)))
+        self.extra = values or None
+        self._absent = None
+
+    def __getattr__(self, name):
+        # Only reached for names that aren't slots: fall back to undeclared keys
+        if name not in ('extra', '_absent'):
+            extra = self.extra
+            if extra is not None and name in extra:
+                return extra[name]
+        raise AttributeError(f'{type(self).__name__!r} object has no attribute {name!r}')
+
+    def __getitem__(self, key):
+        if key in self._names and not (self._absent and key in self._absent):
+            return getattr(self, key)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return value
+
+    def __contains__(self, key):
+        if key in self._names:
+            return not (self._absent and key in self._absent)
+        return self.extra is not None and key in self.extra
+
+    def to_dict(self):
+        data = {}
+        for field in self.fields:
+            if self._absent and field.name in self._absent:
+                continue
+            value = (getattr(type(self), field.name).slot.__get__(self) if field.lazy
+                     else getattr(self, field.name))
+            data[field.name] = field.dump(value)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self):
+        shown = ', '.join(f'{f.name}={getattr(self, f.name)!r}' for f in self.fields[:2])
+        return f'{type(self).__name__}({shown})'
+
+class Nutrition(Model):
+    __slots__ = ('calories', 'protein_g', 'carbohydrates_g', 'fat_g', 'fiber_g')
+    fields = tuple(Field(name) for name in __slots__)
+
+class Meta(Model):
+    __slots__ = ('active_time', 'passive_time', 'total_time', 'yields', 'overnight_required')
+    fields = tuple(Field(name, intern=name != 'overnight_required') for name in __slots__)
+
+class Dietary(Model):
+    __slots__ = ('flags',)
+    fields = (Field('flags', many=True, intern=True),)
+
+class Ingredient(Model):
+    """An ingredient as listed by /api/v1/ingredients."""
+    __slots__ = ('id', 'name', 'category', 'source')
+    fields = tuple(Field(name, intern=name != 'id') for name in __slots__)
+
+class IngredientItem(Model):
+    """One line of a recipe's ingredient list."""
+    __slots__ = ('id', 'name', 'quantity', 'unit', 'preparation', 'notes')
+    fields = tuple(Field(name, intern=name != 'quantity') for name in __slots__)
+
+class IngredientGroup(Model):
+    __slots__ = ('group_name', 'items')
+    fields = (Field('group_name', intern=True), Field('items', IngredientItem, many=True))
+
+class Equipment(Model):
+    __slots__ = ('name', 'alternative', 'required')
+    fields = (Field('name', intern=True), Field('alternative', intern=True), Field('required'))
+
+class InstructionStep(Model):
+    __slots__ = ('step_number', 'phase', 'text', 'structured', 'tips')
+    fields = (
+        Field('step_number'),
+        Field('phase', intern=True),
+        Field('text'),
+        Field('structured'),
+        Field('tips'),
+    )
+
+class RecipeNutrition(Model):
+    __slots__ = ('per_serving',)
+    fields = (Field('per_serving', Nutrition),)
+
+_RECIPE_FIELDS = (
+    Field('id'),
+    Field('name'),
+    Field('description'),
+    Field('category', intern=True),
+    Field('cuisine', intern=True),
+    Field('difficulty', intern=True),
+    Field('meta', Meta),
+    Field('dietary', Dietary),
+)
+
+class RecipeSummary(Model):
+    """A recipe as listed by /api/v1/recipes."""
+    __slots__ = ('id', 'name', 'description', 'category', 'cuisine', 'difficulty',
+                 'meta', 'dietary', 'nutrition_summary')
+    fields = _RECIPE_FIELDS + (Field('nutrition_summary', Nutrition),)
+
+class Recipe(Model):
+    """
+    A full recipe from /api/v1/recipes/{id}. Ingredients, instructions,
+    equipment and nutrition are parsed on first access.
+    """
+    __slots__ = ('id', 'name', 'description', 'category', 'cuisine', 'difficulty',
+                 'meta', 'dietary', '_nutrition', '_equipment', '_ingredients', '_instructions')
+    fields = _RECIPE_FIELDS + (
+        Field('nutrition', RecipeNutrition, lazy=True),
+        Field('equipment', Equipment, many=True, lazy=True),
+        Field('ingredients', IngredientGroup, many=True, lazy=True),
+        Field('instructions', InstructionStep, many=True, lazy=True),
+    )
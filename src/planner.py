@@ -0,0 +1,265 @@
+from collections import namedtuple
+
+import numpy as np
+
+from frame import NUTRITION_COLUMNS
+
+# Per-day totals a plan is bounded on: nutrition plus total time in seconds
+PLAN_COLUMNS = NUTRITION_COLUMNS + ('total_time',)
+
+# Score = sum of weight x standardized column; protein up, time down
+DEFAULT_WEIGHTS = {'protein_g': 1.0, 'total_time': -0.5}
+
+# Candidate index: recipes are bucketed by cuisine x calorie band and only
+# the best-scoring few per bucket are searched. A plan of N meals can use
+# at most N recipes (or max_per_cuisine) from one bucket, and bucket-mates
+# are near-substitutes.
+CALORIE_BANDS = 16
+# Improvement passes over every meal of the plan
+DEFAULT_ROUNDS = 4
+
+MealPlan = namedtuple('MealPlan', ['days', 'totals', 'score', 'bound', 'feasible', 'candidates'])
+
+class MealPlanner:
+    """
+    Picks `days` x `meals` distinct recipes from a RecipeFrame, maximizing a
+    vectorized score under per-day bounds on calories, macros and time,
+    dietary flags, a per-recipe time limit and variety caps.
+
+    Recipes that could not fit any day are pruned first, the rest are cut
+    down to the candidate index, then a greedy pass fills each day with the
+    best recipe that keeps the day's bounds reachable, and 1-swap passes
+    replace meals while that raises the score (or repairs a day the greedy
+    pass could not fit). `bound` is the score of the best recipes with the
+    daily bounds relaxed, so `score / bound` shows how close the plan is.
+
+        planner = MealPlanner(RecipeFrame.from_recipes(mirror.recipes()))
+        plan = planner.plan(days=7, meals=3, daily={'calories': (1800, 2200), 'protein_g': (90, None)},
+                            dietary='Vegetarian', max_time=45 * 60, max_per_cuisine=4)
+        for rows in plan.days:
+            frame.to_records(rows)
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.values = np.column_stack([frame.columns[name] for name in PLAN_COLUMNS]).astype(np.float64)
+        self.valid = ~np.isnan(self.values).any(axis=1)
+        self._standardized = {}
+
+    def standardized(self, column):
+        """A numeric column as z-scores over recipes with complete nutrition, 0 where missing."""
+        if column not in self._standardized:
+            values = self.frame.columns[column].astype(np.float64)
+            known = values[self.valid & ~np.isnan(values)]
+            mean = known.mean() if len(known) else 0.0
+            std = known.std() if len(known) else 0.0
+            self._standardized[column] = np.nan_to_num((values - mean) / (std or 1.0))
+        return self._standardized[column]
+
+    def score(self, weights=None, extra=None):
+        """Score of every recipe: weighted z-scores of `weights` columns, plus `extra` (e.g. ratings) if given."""
+        score = np.zeros(len(self.frame))
+        for column, weight in (DEFAULT_WEIGHTS if weights is None else weights).items():
+            score += weight * self.standardized(column)
+        if extra is not None:
+            score += extra
+        return score
+
+    def bounds(self, daily):
+        """`daily` {column: (low, high)} as low/high arrays over PLAN_COLUMNS; None is unbounded."""
+        low = np.full(len(PLAN_COLUMNS), -np.inf)
+        high = np.full(len(PLAN_COLUMNS), np.inf)
+        for column, (lo, hi) in (daily or {}).items():
+            if column not in PLAN_COLUMNS:
+                raise ValueError(f"Can't bound '{column}'; choose from {', '.join(PLAN_COLUMNS)}")
+            index = PLAN_COLUMNS.index(column)
+            if lo is not None:
+                low[index] = lo
+            if hi is not None:
+                high[index] = hi
+        if np.any(low > high):
+            raise ValueError('A daily lower bound is above its upper bound')
+        return low, high
+
+    def eligible(self, meals, low, high, dietary=None, max_time=None, exclude=()):
+        """Mask of recipes that pass the filters and could be one of `meals` in a day within the bounds."""
+        mask = self.valid.copy()
+        if dietary:
+            mask &= self.frame.has_flags(*([dietary] if isinstance(dietary, str) else dietary))
+        if max_time is not None:
+            mask &= self.values[:, -1] <= max_time
+        if exclude:
+            mask &= ~self.frame.ids.isin(exclude)
+        if not mask.any():
+            return mask
+        # The other meals of the day add at least the pool's minimum and at most its maximum
+        pool = self.values[mask]
+        others = meals - 1
+        mask &= np.all(self.values + others * pool.min(axis=0) <= high, axis=1)
+        mask &= np.all(self.values + others * pool.max(axis=0) >= low, axis=1)
+        return mask
+
+    def candidates(self, rows, score, per_cell):
+        """The best `per_cell` of `rows` by score in each cuisine x calorie band bucket."""
+        if len(rows) <= per_cell:
+            return rows
+        calories = self.values[rows, 0]
+        edges = np.quantile(calories, np.linspace(0, 1, CALORIE_BANDS + 1)[1:-1])
+        cell = self.frame.codes['cuisine'][rows].astype(np.int64) * CALORIE_BANDS + np.searchsorted(edges, calories)
+        order = np.lexsort((-score[rows], cell))
+        cell = cell[order]
+        rank = np.arange(len(order)) - np.searchsorted(cell, cell)
+        return rows[np.sort(order[rank < per_cell])]
+
+    def plan(self, days=7, meals=3, daily=None, dietary=None, max_time=None, max_per_cuisine=None,
+             max_per_category=None, exclude=(), weights=None, extra=None, prune=True, rounds=DEFAULT_ROUNDS):
+        """
+        A MealPlan of `days` lists of `meals` frame rows. `daily` bounds the
+        day's totals ({'calories': (1800, 2200), 'protein_g': (90, None),
+        'total_time': (None, 7200)}), `max_time` is per recipe in seconds,
+        `max_per_cuisine` caps a cuisine across the plan and
+        `max_per_category` caps a category within a day.
+        """
+        if days < 1 or meals < 1:
+            raise ValueError('A plan needs at least one day and one meal')
+        slots = days * meals
+        low, high = self.bounds(daily)
+        score = self.score(weights, extra)
+        rows = np.flatnonzero(self.eligible(meals, low, high, dietary, max_time, exclude))
+        if len(rows) < slots:
+            raise ValueError(f'Only {len(rows):,} recipes fit these constraints; a plan needs {slots:,}')
+        bound = float(np.partition(score[rows], len(rows) - slots)[len(rows) - slots:].sum())
+        if prune:
+            rows = self.candidates(rows, score, min(slots, max_per_cuisine or slots))
+
+        search = _Search(self.values[rows], score[rows], self.frame.codes['cuisine'][rows],
+                         self.frame.codes['category'][rows], days, meals, low, high,
+                         max_per_cuisine, max_per_category)
+        search.fill()
+        for _ in range(rounds):
+            if not search.improve():
+                break
+
+        picked = rows[search.picked]
+        return MealPlan(
+            days=[picked[day] for day in range(days)],
+            totals=search.totals,
+            score=float(score[picked].sum()),
+            bound=bound,
+            feasible=search.feasible(),
+            candidates=len(rows),
+        )
+
+class _Search:
+    """Greedy fill and 1-swap improvement over candidate arrays (positions, not frame rows)."""
+
+    def __init__(self, values, score, cuisine, category, days, meals, low, high, max_per_cuisine, max_per_category):
+        self.values = values
+        self.score = score
+        self.cuisine = cuisine.astype(np.intp)
+        self.category = category.astype(np.intp)
+        self.days = days
+        self.meals = meals
+        self.low = low
+        self.high = high
+        self.max_per_cuisine = max_per_cuisine
+        self.max_per_category = max_per_category
+        # Violations are measured in units of each column's spread
+        self.scale = np.maximum(values.std(axis=0), 1e-9)
+
+        self.picked = np.full((days, meals), -1, dtype=np.intp)
+        self.totals = np.zeros((days, len(low)))
+        self.used = np.zeros(len(score), dtype=bool)
+        self.cuisine_counts = np.zeros(self.cuisine.max() + 1, dtype=np.int64)
+        self.category_counts = np.zeros((days, self.category.max() + 1), dtype=np.int64)
+
+    def violation(self, totals):
+        """How far each row of day totals is outside the bounds, summed over columns in spread units."""
+        over = np.maximum(totals - self.high, 0) + np.maximum(self.low - totals, 0)
+        return (over / self.scale).sum(axis=-1)
+
+    def feasible(self):
+        """Every day within its bounds and every variety cap kept."""
+        if np.any(self.violation(self.totals) > 0):
+            return False
+        if self.max_per_cuisine is not None and self.cuisine_counts.max() > self.max_per_cuisine:
+            return False
+        return self.max_per_category is None or self.category_counts.max() <= self.max_per_category
+
+    def allowed(self, day, without=None):
+        """Unused candidates within the variety caps, as if the recipe at `without` were not in the plan."""
+        ok = ~self.used
+        if self.max_per_cuisine is not None:
+            counts = self.cuisine_counts.copy()
+            if without is not None:
+                counts[self.cuisine[without]] -= 1
+            ok &= counts[self.cuisine] < self.max_per_cuisine
+        if self.max_per_category is not None:
+            counts = self.category_counts[day].copy()
+            if without is not None:
+                counts[self.category[without]] -= 1
+            ok &= counts[self.category] < self.max_per_category
+        return ok
+
+    def place(self, day, meal, position):
+        previous = self.picked[day, meal]
+        if previous >= 0:
+            self.used[previous] = False
+            self.cuisine_counts[self.cuisine[previous]] -= 1
+            self.category_counts[day, self.category[previous]] -= 1
+            self.totals[day] -= self.values[previous]
+        self.picked[day, meal] = position
+        self.used[position] = True
+        self.cuisine_counts[self.cuisine[position]] += 1
+        self.category_counts[day, self.category[position]] += 1
+        self.totals[day] += self.values[position]
+
+    def fill(self):
+        """Fill each day meal by meal with the best recipe that leaves the day's bounds reachable."""
+        low_each, high_each = self.values.min(axis=0), self.values.max(axis=0)
+        for day in range(self.days):
+            for meal in range(self.meals):
+                rest = self.meals - meal - 1
+                ok = self.allowed(day)
+                if not ok.any():
+                    # The variety caps leave nothing; fill with any unused recipe and let improve() repair it
+                    ok = ~self.used
+                after = self.totals[day] + self.values
+                reachable = ok & np.all(after + rest * low_each <= self.high, axis=1) \
+                               & np.all(after + rest * high_each >= self.low, axis=1)
+                if reachable.any():
+                    position = np.argmax(np.where(reachable, self.score, -np.inf))
+                else:
+                    # Nearest to reachable, assuming the remaining meals are average
+                    expected = self.violation(after + rest * self.values.mean(axis=0))
+                    position = np.argmin(np.where(ok, expected, np.inf))
+                self.place(day, meal, position)
+
+    def improve(self):
+        """One pass of best single-meal swaps; whether anything changed."""
+        changed = False
+        for day in range(self.days):
+            for meal in range(self.meals):
+                current = self.picked[day, meal]
+                current_violation = self.violation(self.totals[day])
+                ok = self.allowed(day, without=current)
+                if current_violation == 0:
+                    # Only recipes scoring higher are worth checking against the bounds
+                    ok &= self.score > self.score[current] + 1e-9
+                positions = np.flatnonzero(ok)
+                if not len(positions):
+                    continue
+                violation = self.violation(self.totals[day] - self.values[current] + self.values[positions])
+                if current_violation > 0:
+                    # Repair an infeasible day first: least violation, then best score
+                    keep = violation < current_violation - 1e-9
+                    if keep.any():
+                        keep &= violation <= violation[keep].min() + 1e-9
+                else:
+                    keep = violation == 0
+                if not keep.any():
+                    continue
+                positions = positions[keep]
+                self.place(day, meal, positions[np.argmax(self.score[positions])])
+                changed = True
+        return changed
@@ -0,0 +1,309 @@
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from async_client import AsyncRecipeClient, DEFAULT_CONCURRENCY
+from client import NotFoundError, RateLimitError
+
+DEFAULT_CHECKPOINT_PATH = '.recipe_prefetch.json'
+
+# Write the checkpoint after this many completed fetches (and on exit)
+CHECKPOINT_EVERY = 50
+
+# Time of day (HH:MM, UTC) the daily quota resets; monthly quotas reset with the UTC calendar month
+DEFAULT_DAILY_RESET = '00:00'
+
+class CreditBudget:
+    """
+    Remaining daily/monthly credits, learned from the `usage` block of each
+    full-recipe response.
+
+    A credit is reserved when a request is dispatched and settled when its
+    response arrives, so concurrent fetches never spend past `reserve`
+    (credits left untouched for other work) or `max_credits` (a cap for this
+    run). Until the first usage block arrives only one request is let out.
+    """
+
+    def __init__(self, reserve=0, max_credits=None):
+        self.reserve = reserve
+        self.max_credits = max_credits
+        self.daily_remaining = None
+        self.monthly_remaining = None
+        self.in_flight = 0
+        self.spent = 0
+
+    @property
+    def available(self):
+        """Credits that may still be spent, or None while the remaining quota is unknown."""
+        known = [r for r in (self.daily_remaining, self.monthly_remaining) if r is not None]
+        available = min(known) - self.reserve if known else None
+        if self.max_credits is not None:
+            left = self.max_credits - self.spent
+            available = left if available is None else min(available, left)
+        return available
+
+    def try_acquire(self):
+        available = self.available
+        if (self.in_flight >= 1) if available is None else (available - self.in_flight <= 0):
+            return False
+        self.in_flight += 1
+        return True
+
+    def settle(self, usage=None, charged=True):
+        self.in_flight -= 1
+        self.spent += charged
+        self.learn(usage)
+
+    def learn(self, usage):
+        """Take the remaining daily/monthly figures of a usage block, keeping the smallest seen."""
+        if usage:
+            # Responses can complete out of order; the smallest figure is the newest
+            for key in ('daily_remaining', 'monthly_remaining'):
+                if usage.get(key) is not None:
+                    current = getattr(self, key)
+                    setattr(self, key, usage[key] if current is None else min(current, usage[key]))
+
+    def blocked_by_daily(self):
+        """True when only the daily quota stops spending, so waiting for its reset helps."""
+        return (
+            self.daily_remaining is not None and self.daily_remaining <= self.reserve
+            and (self.monthly_remaining is None or self.monthly_remaining > self.reserve)
+            and (self.max_credits is None or self.spent < self.max_credits)
+        )
+
+    def daily_reset(self):
+        """Forget the daily figure once the quota has reset."""
+        self.daily_remaining = None
+
+def _reset_offset(daily_reset):
+    """`daily_reset` ("HH:MM", UTC) as the time after midnight it stands for."""
+    hours, _, minutes = str(daily_reset).partition(':')
+    if not (hours.isdigit() and minutes.isdigit() and int(hours) < 24 and int(minutes) < 60):
+        raise ValueError(f'Daily reset must be a UTC time of day as HH:MM, not {daily_reset!r}')
+    return timedelta(hours=int(hours), minutes=int(minutes))
+
+def last_daily_reset(now=None, daily_reset=DEFAULT_DAILY_RESET):
+    """When the daily quota last reset, at `daily_reset` ("HH:MM", UTC) each day."""
+    now = now or datetime.now(timezone.utc)
+    reset = now.replace(hour=0, minute=0, second=0, microsecond=0) + _reset_offset(daily_reset)
+    return reset if reset <= now else reset - timedelta(days=1)
+
+def seconds_until_daily_reset(now=None, daily_reset=DEFAULT_DAILY_RESET):
+    """Seconds until the daily quota next resets, at `daily_reset` ("HH:MM", UTC)."""
+    now = now or datetime.now(timezone.utc)
+    return (last_daily_reset(now, daily_reset) + timedelta(days=1) - now).total_seconds()
+
+class Prefetcher:
+    """
+    Fetches full recipes into a local store, most important first, without
+    overspending credits.
+
+    IDs are queued with a priority (lower runs first) and fetched
+    concurrently by an AsyncRecipeClient. IDs already in the store (e.g. a
+    Mirror) are skipped. A CreditBudget stops dispatching when the remaining
+    credits reach its reserve; with `wait_for_reset=True` the run instead
+    sleeps until the daily quota resets and carries on while monthly credits
+    last. Every recipe is written to the store as it arrives, and the queue
+    is checkpointed to a JSON file, so an interrupted run resumes where it
+    left off without spending credits twice (`resume=False` starts afresh).
+    The remaining credits it saved are restored too, unless the quota has
+    reset since; the daily reset is at `daily_reset` (HH:MM UTC, default
+    RECIPE_API_DAILY_RESET or midnight):
+
+        prefetcher = Prefetcher(Mirror(), budget=CreditBudget(reserve=500))
+        prefetcher.add(top_ids, priority=0)
+        prefetcher.add(other_ids, priority=1)
+        stats = prefetcher.run()
+
+    `report(stats)`, if given, is called every `report_every` seconds with
+    running totals, including fetched/s and credits/s. A `client` passed in
+    is closed when the run ends.
+    """
+
+    def __init__(self, store, budget=None, concurrency=DEFAULT_CONCURRENCY, checkpoint=None,
+                 wait_for_reset=False, report=None, report_every=2.0, client=None, resume=True,
+                 daily_reset=None):
+        self.store = store
+        self.budget = budget or CreditBudget()
+        self.concurrency = concurrency
+        self.checkpoint_path = checkpoint or os.getenv('RECIPE_API_PREFETCH_CHECKPOINT') or DEFAULT_CHECKPOINT_PATH
+        self.wait_for_reset = wait_for_reset
+        self.daily_reset = daily_reset or os.getenv('RECIPE_API_DAILY_RESET') or DEFAULT_DAILY_RESET
+        _reset_offset(self.daily_reset)
+        self.report = report
+        self.report_every = report_every
+        self.client = client
+
+        self._heap = []
+        self._priority = {}
+        self._in_flight = {}
+        self._counter = itertools.count()
+        self.not_found = set()
+        self.failed = {}
+        self.stats = {'fetched': 0, 'skipped': 0, 'not_found': 0, 'failed': 0, 'credits': 0}
+        self.stop_reason = None
+        self._started = self._last_report = time.monotonic()
+
+        if resume and os.path.exists(self.checkpoint_path):
+            self._load_checkpoint()
+
+    def __len__(self):
+        return len(self._priority)
+
+    def add(self, ids, priority=0):
+        """Queue recipe IDs; ones already stored, known missing or queued at a better priority are ignored."""
+        ids = [i for i in dict.fromkeys(ids) if i not in self.not_found]
+        stored = self.store.has_full_recipes(ids)
+        self.stats['skipped'] += len(stored)
+        for recipe_id in ids:
+            if recipe_id in stored or self._priority.get(recipe_id, float('inf')) <= priority:
+                continue
+            self._priority[recipe_id] = priority
+            heapq.heappush(self._heap, (priority, next(self._counter), recipe_id))
+
+    def _pop(self):
+        while self._heap:
+            priority, _, recipe_id = heapq.heappop(self._heap)
+            # Entries superseded by a later, better-priority add() are stale
+            if self._priority.get(recipe_id) == priority:
+                del self._priority[recipe_id]
+                self._in_flight[recipe_id] = priority
+                return recipe_id
+        return None
+
+    def run(self):
+        """
+        Fetch until the queue is empty or the budget runs out. Returns the
+        final stats; `stop_reason` is done, budget or rate_limited.
+        """
+        return asyncio.run(self.run_async())
+
+    async def run_async(self):
+        self._started = self._last_report = time.monotonic()
+        since_checkpoint = 0
+        api = self.client or AsyncRecipeClient(concurrency=self.concurrency)
+        tasks = set()
+
+        try:
+            await api.open()
+            while True:
+                while (not self.stop_reason and len(tasks) < self.concurrency
+                       and self._priority and self.budget.try_acquire()):
+                    tasks.add(asyncio.ensure_future(api.get_recipe(self._pop())))
+
+                if not tasks:
+                    if self.stop_reason:
+                        break
+                    if not self._priority:
+                        self.stop_reason = 'done'
+                        break
+                    if not (self.wait_for_reset and self.budget.blocked_by_daily()):
+                        self.stop_reason = 'budget'
+                        break
+                    self._write_checkpoint()
+                    self._emit_report(force=True)
+                    await asyncio.sleep(seconds_until_daily_reset(daily_reset=self.daily_reset) + 1)
+                    self.budget.daily_reset()
+                    continue
+
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    self._settle(task.result())
+                since_checkpoint += len(done)
+                if since_checkpoint >= CHECKPOINT_EVERY:
+                    self._write_checkpoint()
+                    since_checkpoint = 0
+                self._emit_report()
+        finally:
+            # Interrupted mid-flight: unfinished IDs go back on the queue
+            for task in tasks:
+                task.cancel()
+            for recipe_id, priority in self._in_flight.items():
+                self._priority[recipe_id] = priority
+                heapq.heappush(self._heap, (priority, next(self._counter), recipe_id))
+            self._in_flight.clear()
+            self._write_checkpoint()
+            self._emit_report(force=True)
+            await api.close()
+        return self.current_stats()
+
+    def _settle(self, result):
+        priority = self._in_flight.pop(result.id)
+        if result.error is None:
+            self.store.put_full_recipe(result.data)
+            self.budget.settle(result.usage, charged=True)
+            self.stats['fetched'] += 1
+            self.stats['credits'] += 1
+            return
+
+        self.budget.settle(charged=False)
+        if isinstance(result.error, NotFoundError):
+            self.not_found.add(result.id)
+            self.stats['not_found'] += 1
+            return
+
+        # Kept for the next run rather than retried now
+        self.failed[result.id] = priority
+        self.stats['failed'] += 1
+        if isinstance(result.error, RateLimitError):
+            # Still limited after every retry, most likely out of credits
+            self.stop_reason = 'rate_limited'
+
+    def current_stats(self):
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        return dict(
+            self.stats,
+            elapsed=elapsed,
+            fetched_per_sec=self.stats['fetched'] / elapsed,
+            credits_per_sec=self.stats['credits'] / elapsed,
+            daily_remaining=self.budget.daily_remaining,
+            monthly_remaining=self.budget.monthly_remaining,
+            queued=len(self._priority) + len(self._in_flight) + len(self.failed),
+            stop_reason=self.stop_reason,
+        )
+
+    def _emit_report(self, force=False):
+        now = time.monotonic()
+        if self.report and (force or now - self._last_report >= self.report_every):
+            self._last_report = now
+            self.report(self.current_stats())
+
+    def _write_checkpoint(self):
+        queue = {**self._priority, **self._in_flight, **self.failed}
+        state = {
+            'queue': sorted(([p, i] for i, p in queue.items()), key=lambda item: item[0]),
+            'not_found': sorted(self.not_found),
+            'usage': {'daily_remaining': self.budget.daily_remaining,
+                      'monthly_remaining': self.budget.monthly_remaining},
+            'saved_at': time.time(),
+        }
+        tmp = f'{self.checkpoint_path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp, self.checkpoint_path)
+
+    def _load_checkpoint(self):
+        with open(self.checkpoint_path) as f:
+            state = json.load(f)
+        self.not_found = set(state.get('not_found', []))
+        saved_at = state.get('saved_at')
+        if saved_at is not None:
+            # Credits spent earlier in the same quota period still count
+            usage = dict(state.get('usage') or {})
+            saved, now = datetime.fromtimestamp(saved_at, timezone.utc), datetime.now(timezone.utc)
+            if saved < last_daily_reset(now, self.daily_reset):
+                usage.pop('daily_remaining', None)
+            if (saved.year, saved.month) != (now.year, now.month):
+                usage.pop('monthly_remaining', None)
+            self.budget.learn(usage)
+        queue = state.get('queue', [])
+        for priority in sorted({p for p, _ in queue}):
+            self.add([i for p, i in queue if p == priority], priority)
+
+    def clear_checkpoint(self):
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
@@ -0,0 +1,188 @@
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+
+from duration import parse_duration
+
+# Equality fields with an inverted index (matched case-insensitively)
+CATEGORICAL_FIELDS = ('category', 'cuisine', 'difficulty')
+
+# Range fields with a sorted array: name -> how to read it from a list-page recipe
+NUMERIC_FIELDS = {
+    'calories': lambda r: r['nutrition_summary']['calories'],
+    'protein_g': lambda r: r['nutrition_summary']['protein_g'],
+    'total_time': lambda r: _minutes(r['meta']['total_time']),
+}
+
+def _minutes(iso_duration):
+    # Like missing nutrition, a missing or unparseable time is NaN, not 0
+    seconds = parse_duration(iso_duration)
+    return float('nan') if seconds is None else seconds / 60
+
+def _key(value):
+    return value.casefold() if isinstance(value, str) else value
+
+def _read(name, recipe):
+    """A numeric field of a recipe as a float, NaN when it is missing."""
+    try:
+        return float(NUMERIC_FIELDS[name](recipe))
+    except (KeyError, TypeError):
+        return float('nan')
+
+def _sort_key(column, descending):
+    # Missing (NaN) values sort last in either direction
+    if descending:
+        return lambda i: (column[i] != column[i], -column[i])
+    return lambda i: (column[i] != column[i], column[i])
+
+class RecipeIndex:
+    """
+    In-process query engine over a list of list-page recipes.
+
+    Builds an inverted index (a frozenset of positions) per categorical value
+    and dietary flag, and a sorted (value, position) array per numeric field.
+    A query estimates each predicate's match count, then narrows from the
+    most selective one: index sets are intersected, ranges are bisected or
+    checked against compact column arrays. Cost scales with the smallest
+    matching set rather than the catalog:
+
+        index = RecipeIndex(iter_recipes())
+        index.query(dietary='Vegan', min_calories=300, max_calories=500,
+                    max_total_time=30, sort='-protein_g', limit=20)
+    """
+
+    def __init__(self, recipes):
+        self.recipes = list(recipes)
+
+        self._postings = {field: {} for field in CATEGORICAL_FIELDS}
+        self._flag_postings = {}
+        self._columns = {name: array('d') for name in NUMERIC_FIELDS}
+
+        for position, recipe in enumerate(self.recipes):
+            for field in CATEGORICAL_FIELDS:
+                self._postings[field].setdefault(_key(recipe.get(field)), []).append(position)
+
+            for flag in (recipe.get('dietary') or {}).get('flags', []):
+                self._flag_postings.setdefault(_key(flag), []).append(position)
+
+            for name in NUMERIC_FIELDS:
+                self._columns[name].append(_read(name, recipe))
+
+        # Frozen sets make multi-predicate intersections run at C speed
+        for postings in (*self._postings.values(), self._flag_postings):
+            for value, positions in postings.items():
+                postings[value] = frozenset(positions)
+
+        # Recipes missing a value are left out of its sorted array: NaN has no
+        # place in a sort order, and would throw off every bisect after it
+        self._sorted = {}
+        for name, column in self._columns.items():
+            order = sorted((i for i in range(len(column)) if column[i] == column[i]), key=column.__getitem__)
+            self._sorted[name] = (array('d', (column[i] for i in order)), array('I', order))
+
+    def __len__(self):
+        return len(self.recipes)
+
+    def query(self, category=None, cuisine=None, difficulty=None, dietary=None,
+              min_calories=None, max_calories=None, min_protein=None, max_protein=None,
+              min_total_time=None, max_total_time=None, sort=None, limit=None):
+        """
+        Return recipes matching every given filter.
+
+        `dietary` is a flag or a list of flags (all required); `*_total_time`
+        is in minutes. `sort` names a numeric field (`calories`, `protein_g`,
+        `total_time`), prefixed with `-` for descending.
+        """
+        positions = self._match(
+            {'category': category, 'cuisine': cuisine, 'difficulty': difficulty},
+            dietary,
+            {
+                'calories': (min_calories, max_calories),
+                'protein_g': (min_protein, max_protein),
+                'total_time': (min_total_time, max_total_time),
+            },
+        )
+        return [self.recipes[i] for i in self._order(positions, sort, limit)]
+
+    def scan(self, category=None, cuisine=None, difficulty=None, dietary=None,
+             min_calories=None, max_calories=None, min_protein=None, max_protein=None,
+             min_total_time=None, max_total_time=None, sort=None, limit=None):
+        """Answer the same query with a linear scan over the raw dicts (for comparison)."""
+        equals = {f: _key(v) for f, v in (('category', category), ('cuisine', cuisine),
+                                          ('difficulty', difficulty)) if v is not None}
+        flags = {_key(f) for f in ([dietary] if isinstance(dietary, str) else dietary or [])}
+        ranges = [(name, lo, hi) for name, lo, hi in (
+            ('calories', min_calories, max_calories),
+            ('protein_g', min_protein, max_protein),
+            ('total_time', min_total_time, max_total_time),
+        ) if lo is not None or hi is not None]
+
+        matches = []
+        for recipe in self.recipes:
+            if any(_key(recipe.get(f)) != v for f, v in equals.items()):
+                continue
+            if not flags <= {_key(f) for f in (recipe.get('dietary') or {}).get('flags', [])}:
+                continue
+            values = [(_read(name, recipe), lo, hi) for name, lo, hi in ranges]
+            if any(v != v or (lo is not None and v < lo) or (hi is not None and v > hi) for v, lo, hi in values):
+                continue
+            matches.append(recipe)
+
+        if sort:
+            column = [_read(sort.lstrip('-'), recipe) for recipe in matches]
+            order = sorted(range(len(matches)), key=_sort_key(column, sort.startswith('-')))
+            matches = [matches[i] for i in order]
+        return matches[:limit] if limit is not None else matches
+
+    def _match(self, equals, dietary, ranges):
+        # Candidate sources as (size, kind, payload), narrowed smallest-first
+        sources = []
+
+        for field, value in equals.items():
+            if value is not None:
+                posting = self._postings[field].get(_key(value), frozenset())
+                sources.append((len(posting), 'set', posting))
+
+        for flag in [dietary] if isinstance(dietary, str) else list(dietary or []):
+            posting = self._flag_postings.get(_key(flag), frozenset())
+            sources.append((len(posting), 'set', posting))
+
+        for name, (lo, hi) in ranges.items():
+            if lo is None and hi is None:
+                continue
+            values, _ = self._sorted[name]
+            start = bisect_left(values, lo) if lo is not None else 0
+            stop = bisect_right(values, hi) if hi is not None else len(values)
+            sources.append((max(0, stop - start), 'range', (name, lo, hi, start, stop)))
+
+        if not sources:
+            return range(len(self.recipes))
+
+        sources.sort(key=lambda source: source[0])
+        candidates = None
+        for size, kind, payload in sources:
+            if kind == 'set':
+                candidates = payload if candidates is None else candidates & payload
+            elif candidates is None:
+                name, lo, hi, start, stop = payload
+                candidates = set(self._sorted[name][1][start:stop])
+            else:
+                name, lo, hi, start, stop = payload
+                # Cheaper to test the (already smaller) candidates than to build the range's set
+                column = self._columns[name]
+                lo = float('-inf') if lo is None else lo
+                hi = float('inf') if hi is None else hi
+                candidates = {i for i in candidates if lo <= column[i] <= hi}
+            if not candidates:
+                return []
+        return candidates
+
+    def _order(self, positions, sort, limit):
+        if not sort:
+            positions = sorted(positions)
+            return positions[:limit] if limit is not None else positions
+
+        key = _sort_key(self._columns[sort.lstrip('-')], sort.startswith('-'))
+        if limit is not None:
+            return heapq.nsmallest(limit, positions, key=key)
+        return sorted(positions, key=key)
@@ -0,0 +1,112 @@
+import random
+import threading
+import time
+
+# Statuses worth retrying: rate limited or a transient server failure
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """
+    Thread-safe token bucket pacing requests to `rate` per second, allowing
+    bursts of up to `burst` requests (default 1, i.e. evenly spaced calls,
+    which keeps a crawl from tripping fixed-window server limits).
+
+    `reserve()` claims the next slot and returns how long to wait for it, so
+    the same bucket can pace threads (`acquire()`) and asyncio tasks
+    (`await asyncio.sleep(bucket.reserve())`). `pause_until()` holds every
+    caller back, e.g. after the server sends Retry-After.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or 1)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause_until(self, deadline):
+        """Block all callers until `deadline` (a time.monotonic() value)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, deadline)
+            # Don't let a burst of saved-up tokens stampede once the pause ends
+            self._tokens = min(self._tokens, 1.0)
+
+    def update_from_headers(self, headers):
+        """Pause until the window resets when the server reports no requests remaining."""
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = parse_reset(headers.get('X-RateLimit-Reset'))
+        if remaining is not None and reset is not None and remaining.strip() == '0':
+            self.pause_until(time.monotonic() + reset)
+
+class RetryPolicy:
+    """Jittered exponential backoff ("full jitter") for transient failures."""
+
+    def __init__(self, max_retries=5, base_delay=0.5, max_delay=30.0, statuses=RETRY_STATUSES):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.statuses = statuses
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def delay(self, attempt, retry_after=None):
+        """Seconds to wait before retry number `attempt` (0-based)."""
+        if retry_after is not None:
+            return min(retry_after, self.max_delay) + random.uniform(0, self.base_delay / 2)
+        return self.backoff(attempt)
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    from email.utils import parsedate_to_datetime
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def retry_after_from_headers(headers, status=429):
+    """
+    Seconds the server asked us to wait before retrying, or None.
+
+    For a 429, X-RateLimit-Reset is used too: Retry-After is whole seconds,
+    so a more precise reset time wins when the server sends both.
+    """
+    retry_after = parse_retry_after(headers.get('Retry-After'))
+    if status != 429:
+        return retry_after
+    reset = parse_reset(headers.get('X-RateLimit-Reset'))
+    if retry_after is None or (reset is not None and reset < retry_after):
+        return reset
+    return retry_after
+
+def parse_reset(value):
+    """Seconds until an X-RateLimit-Reset (delta-seconds or epoch timestamp), or None."""
+    try:
+        reset = float(value)
+    except (TypeError, ValueError):
+        return None
+    # Large values are epoch timestamps rather than a number of seconds
+    if reset > 1e9:
+        reset -= time.time()
+    return max(0.0, reset)
@@ -0,0 +1,420 @@
+import marshal
+import mmap
+import os
+import struct
+import threading
+
+from duration import iso_duration, parse_duration
+
+DEFAULT_STORE_PATH = '.recipe_store.dat'
+
+MAGIC = b'RCPSTORE'
+FORMAT_VERSION = 1
+# Records are marshal data, so the header also records the marshal format that
+# wrote them: older formats are readable (and are rewritten when opened), newer
+# ones are not
+HEADER = MAGIC + bytes([FORMAT_VERSION, marshal.version])
+
+# Every frame in the data file: kind (T = new strings/shapes, R = recipe) and payload length
+_FRAME = struct.Struct('<cI')
+
+# Strings up to this length are interned; longer ones (descriptions, step text) are stored inline
+MAX_INTERNED_LENGTH = 32
+
+def _duration_seconds(value):
+    """Seconds for an ISO 8601 duration that iso_duration() reproduces exactly, else None."""
+    seconds = parse_duration(value)
+    if seconds is None or seconds.__class__ is float:
+        return None
+    return seconds if iso_duration(seconds) == value else None
+
+class _Durations(dict):
+    # Seconds -> ISO string, built once per distinct duration
+    def __missing__(self, seconds):
+        value = self[seconds] = iso_duration(seconds)
+        return value
+
+# How a value in a given dict slot is encoded; the decoder for each is generated per shape
+#   s  interned string or None: index into the string table (0 is None)
+#   d  ISO 8601 duration: integer seconds
+#   o  nested dict: encoded tuple
+#   O  list of dicts: list of encoded tuples
+#   S  list of interned strings: list of indexes
+#   v  anything else, stored as is
+_DECODE_EXPRESSIONS = {
+    's': 'S[{v}]',
+    'd': 'D[{v}]',
+    'o': 'X[{v}[0]]({v})',
+    'O': '[X[x[0]](x) for x in {v}]',
+    'S': '[S[x] for x in {v}]',
+    'v': '{v}',
+}
+
+def _internable(value):
+    return isinstance(value, str) and len(value) <= MAX_INTERNED_LENGTH
+
+class RecipeCodec:
+    """
+    Schema-aware binary encoding of recipe dicts.
+
+    Short strings (units, phases, ingredient names, categories...) are
+    interned into a shared string table, ISO durations are stored as integer
+    seconds, and each distinct set of dict keys (a "shape") is stored once,
+    so an encoded dict is just a tuple of values led by its shape number.
+    The tuple is serialized with marshal, and every shape gets a generated
+    decoder that rebuilds the dict in a single expression, so decoding is
+    mostly C-level work. Anything that doesn't fit the scheme is stored as
+    is, so the round trip is lossless for any JSON value.
+
+    The tables only grow; `tables_since(strings, shapes)` returns what was
+    added after a point, so a store can persist them incrementally.
+    """
+
+    def __init__(self):
+        self.strings = [None]
+        self.shapes = []
+        self._string_index = {None: 0}
+        self._shape_index = {}
+        self._decoders = []
+        self._durations = _Durations()
+
+    def encode(self, obj):
+        keys, values = [], []
+        for key, value in obj.items():
+            if value is None or _internable(value):
+                seconds = _duration_seconds(value) if value and value[0] == 'P' else None
+                if seconds is None:
+                    kind, value = 's', self._intern(value)
+                else:
+                    kind, value = 'd', seconds
+            elif isinstance(value, dict):
+                kind, value = 'o', self.encode(value)
+            elif isinstance(value, list) and value and all(isinstance(x, dict) for x in value):
+                kind, value = 'O', [self.encode(x) for x in value]
+            elif isinstance(value, list) and value and all(_internable(x) for x in value):
+                kind, value = 'S', [self._intern(x) for x in value]
+            else:
+                kind = 'v'
+            keys.append((key, kind))
+            values.append(value)
+
+        shape = tuple(keys)
+        number = self._shape_index.get(shape)
+        if number is None:
+            number = self._add_shape(shape)
+        return (number, *values)
+
+    def decode(self, encoded):
+        return self._decoders[encoded[0]](encoded)
+
+    def decode_fields(self, encoded, fields):
+        """Decode only the top-level `fields` of an encoded dict."""
+        result = {}
+        for position, (key, kind) in enumerate(self.shapes[encoded[0]], 1):
+            if key in fields:
+                result[key] = self._decode_value(kind, encoded[position])
+        return result
+
+    def dumps(self, obj):
+        return marshal.dumps(self.encode(obj))
+
+    def loads(self, data):
+        return self.decode(marshal.loads(data))
+
+    def tables_since(self, strings, shapes):
+        return self.strings[strings:], self.shapes[shapes:]
+
+    def extend_tables(self, strings, shapes):
+        for value in strings:
+            self._intern(value)
+        for shape in shapes:
+            self._add_shape(tuple(tuple(slot) for slot in shape))
+
+    def _intern(self, value):
+        index = self._string_index.get(value)
+        if index is None:
+            index = self._string_index[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+    def _add_shape(self, shape):
+        number = self._shape_index[shape] = len(self.shapes)
+        self.shapes.append(shape)
+        self._decoders.append(self._compile(shape))
+        return number
+
+    def _compile(self, shape):
+        items = ', '.join(
+            f'{key!r}: ' + _DECODE_EXPRESSIONS[kind].format(v=f'v[{position}]')
+            for position, (key, kind) in enumerate(shape, 1)
+        )
+        namespace = {'S': self.strings, 'D': self._durations, 'X': self._decoders}
+        exec(f'def decode(v):\n    return {{{items}}}\n', namespace)
+        return namespace['decode']
+
+    def _decode_value(self, kind, value):
+        if kind == 's':
+            return self.strings[value]
+        if kind == 'd':
+            return self._durations[value]
+        if kind == 'o':
+            return self.decode(value)
+        if kind == 'O':
+            return [self.decode(x) for x in value]
+        if kind == 'S':
+            return [self.strings[x] for x in value]
+        return value
+
+class RecipeStore:
+    """
+    Append-only file of full recipes in RecipeCodec's binary format, read
+    through a memory map.
+
+    Records are appended to the data file (`.recipe_store.dat` or
+    `RECIPE_API_STORE`), and `<path>.idx` maps each recipe ID to the offset
+    and length of its latest record, so `get()` decodes one recipe without
+    reading the rest; `fields=` narrows that to a few top-level fields.
+    Rewriting a recipe appends a new record (unchanged ones are skipped) and
+    `compact()` drops the superseded ones. Each frame in the data file has a
+    small header, so entries missing from the index after a crash are
+    recovered from the data file when it is next opened.
+
+    marshal's format belongs to the Python version that wrote the store. A
+    store from an older version is rewritten in the current format when
+    opened; one from a newer version can't be read, so it is set aside as
+    `<path>.marshal<N>` (still usable by that version) and the store starts
+    over empty. Its recipes are fetched again by the next prefetch.
+
+    It has the same full-recipe methods as Mirror, so it can be the store of
+    a Prefetcher:
+
+        with RecipeStore() as store:
+            store.put_many(recipes)
+            store.get('rec_0000042', fields=('name', 'meta'))
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv('RECIPE_API_STORE') or DEFAULT_STORE_PATH
+        self.index_path = f'{self.path}.idx'
+        self._lock = threading.RLock()
+        self._open()
+
+    def _open(self):
+        self.codec = RecipeCodec()
+        self._offsets = {}
+        self._saved_tables = (1, 0)
+        self._superseded = 0
+        self._map = None
+
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            with open(self.path, 'wb') as f:
+                f.write(HEADER)
+            open(self.index_path, 'w').close()
+        self._data = open(self.path, 'r+b')
+        header = self._data.read(len(HEADER))
+        if header[:-1] != HEADER[:-1]:
+            self._data.close()
+            raise ValueError(f'{self.path} is not a recipe store of this format (delete it to rebuild)')
+        if header[-1] > marshal.version:
+            self._data.close()
+            self._rebuild(header[-1])
+            return
+        self._load()
+        if header != HEADER:
+            # Written with an older marshal format: rewrites every recipe in the current one, then reopens
+            self.compact()
+
+    def _rebuild(self, version):
+        aside = f'{self.path}.marshal{version}'
+        os.replace(self.path, aside)
+        if os.path.exists(self.index_path):
+            os.replace(self.index_path, f'{aside}.idx')
+        self._open()
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __contains__(self, recipe_id):
+        return recipe_id in self._offsets
+
+    def ids(self):
+        return list(self._offsets)
+
+    def size(self):
+        """Bytes on disk (data file and index)."""
+        return os.path.getsize(self.path) + os.path.getsize(self.index_path)
+
+    def stats(self):
+        return {
+            'recipes': len(self._offsets),
+            'strings': len(self.codec.strings),
+            'shapes': len(self.codec.shapes),
+            'bytes': self.size(),
+            'superseded_bytes': self._superseded,
+        }
+
+    def get(self, recipe_id, fields=None):
+        """The recipe, or only its top-level `fields`; None if it isn't stored."""
+        entry = self._offsets.get(recipe_id)
+        if entry is None:
+            return None
+        encoded = self._read(*entry)[1]
+        return self.codec.decode(encoded) if fields is None else self.codec.decode_fields(encoded, fields)
+
+    def get_many(self, ids, fields=None):
+        """Stored recipes among `ids`, in the same order."""
+        return [r for r in (self.get(i, fields) for i in ids) if r is not None]
+
+    def recipes(self, fields=None):
+        """Yield every stored recipe, in file order."""
+        for offset, length in sorted(self._offsets.values()):
+            encoded = self._read(offset, length)[1]
+            yield self.codec.decode(encoded) if fields is None else self.codec.decode_fields(encoded, fields)
+
+    def put(self, recipe):
+        return self.put_many([recipe])
+
+    def put_many(self, recipes):
+        """Append recipes, replacing stored ones with the same ID. Returns how many were written."""
+        with self._lock:
+            records = []
+            for recipe in recipes:
+                record = (recipe['id'], self.codec.encode(recipe))
+                entry = self._offsets.get(recipe['id'])
+                if entry is not None and self._read(*entry) == record:
+                    continue
+                records.append((recipe['id'], marshal.dumps(record)))
+            if not records:
+                return 0
+
+            frames, lines = [], []
+            position = self._data.seek(0, os.SEEK_END)
+
+            def add(kind, recipe_id, payload):
+                nonlocal position
+                frames.append(_FRAME.pack(kind, len(payload)) + payload)
+                position += _FRAME.size
+                lines.append(f'{kind.decode()} {position} {len(payload)} {recipe_id}\n')
+                position += len(payload)
+
+            strings, shapes = self.codec.tables_since(*self._saved_tables)
+            if strings or shapes:
+                add(b'T', '-', marshal.dumps((strings, shapes)))
+            for recipe_id, payload in records:
+                add(b'R', recipe_id, payload)
+
+            # Data first: an index line never points at bytes that aren't written yet
+            self._data.write(b''.join(frames))
+            self._data.flush()
+            with open(self.index_path, 'a') as f:
+                f.write(''.join(lines))
+
+            self._saved_tables = (len(self.codec.strings), len(self.codec.shapes))
+            for line in lines[-len(records):]:
+                self._apply(*line.rstrip('\n').split(' ', 3))
+            return len(records)
+
+    def full_recipe(self, recipe_id):
+        return self.get(recipe_id)
+
+    def has_full_recipes(self, ids):
+        """The subset of `ids` that is stored."""
+        return {i for i in ids if i in self._offsets}
+
+    def put_full_recipe(self, recipe):
+        self.put(recipe)
+
+    def compact(self):
+        """Rewrite the store with only the latest record of each recipe. Returns bytes reclaimed."""
+        before = self.size()
+        recipes = list(self.recipes())
+        tmp = f'{self.path}.tmp'
+        for path in (tmp, f'{tmp}.idx'):
+            if os.path.exists(path):
+                os.remove(path)
+        with RecipeStore(tmp) as fresh:
+            fresh.put_many(recipes)
+        with self._lock:
+            self.close()
+            os.replace(f'{tmp}.idx', self.index_path)
+            os.replace(tmp, self.path)
+            self._open()
+        return before - self.size()
+
+    def _load(self):
+        with open(self.index_path, 'a+') as f:
+            f.seek(0)
+            text = f.read()
+            if text and not text.endswith('\n'):
+                # Drop a line torn by a crash; its frame is recovered below
+                text = text[:text.rindex('\n') + 1] if '\n' in text else ''
+                f.truncate(len(text.encode()))
+
+        end = len(HEADER)
+        data_size = os.fstat(self._data.fileno()).st_size
+        for line in text.splitlines():
+            kind, offset, length, recipe_id = line.split(' ', 3)
+            if int(offset) + int(length) > data_size:
+                break
+            self._apply(kind, offset, length, recipe_id)
+            end = int(offset) + int(length)
+
+        # Frames written after the last index line (a crash between the two writes)
+        recovered = []
+        while end + _FRAME.size <= data_size:
+            kind, length = _FRAME.unpack(self._read_bytes(end, _FRAME.size))
+            offset = end + _FRAME.size
+            if offset + length > data_size:
+                break
+            recipe_id = '-' if kind == b'T' else self._read(offset, length)[0]
+            recovered.append(f'{kind.decode()} {offset} {length} {recipe_id}\n')
+            self._apply(kind.decode(), offset, length, recipe_id)
+            end = offset + length
+        if recovered:
+            with open(self.index_path, 'a') as f:
+                f.write(''.join(recovered))
+        if end < data_size:
+            # A partly written frame; later appends go where it started
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._data.truncate(end)
+        self._saved_tables = (len(self.codec.strings), len(self.codec.shapes))
+
+    def _apply(self, kind, offset, length, recipe_id):
+        offset, length = int(offset), int(length)
+        if kind == 'T':
+            self.codec.extend_tables(*self._read(offset, length))
+            return
+        previous = self._offsets.get(recipe_id)
+        if previous is not None:
+            self._superseded += previous[1]
+        self._offsets[recipe_id] = (offset, length)
+
+    def _read_bytes(self, offset, length):
+        with self._lock:
+            return self._mapped(offset, length)
+
+    def _mapped(self, offset, length):
+        if self._map is None or offset + length > len(self._map):
+            # The file has grown since it was mapped
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._data.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map[offset:offset + length]
+
+    def _read(self, offset, length):
+        return marshal.loads(self._read_bytes(offset, length))
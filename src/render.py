@@ -0,0 +1,140 @@
+import csv
+import io
+import json
+import os
+import sys
+
+FORMATS = ('text', 'jsonl', 'csv')
+
+# Text output is written in one call per this many items
+PAGE_SIZE = 100
+
+RECIPE_COLUMNS = {
+    'id': lambda r: r['id'],
+    'name': lambda r: r['name'],
+    'category': lambda r: r['category'],
+    'cuisine': lambda r: r['cuisine'],
+    'difficulty': lambda r: r['difficulty'],
+    'total_time': lambda r: r['meta']['total_time'],
+    'calories': lambda r: r['nutrition_summary']['calories'],
+    'protein_g': lambda r: r['nutrition_summary']['protein_g'],
+    'carbohydrates_g': lambda r: r['nutrition_summary']['carbohydrates_g'],
+    'fat_g': lambda r: r['nutrition_summary']['fat_g'],
+    'dietary': lambda r: '|'.join(r['dietary']['flags']),
+}
+
+INGREDIENT_COLUMNS = {
+    'id': lambda i: i['id'],
+    'name': lambda i: i['name'],
+    'category': lambda i: i['category'],
+    'source': lambda i: i['source'],
+}
+
+def use_color(stream=None):
+    """ANSI colors only for a terminal, unless NO_COLOR or FORCE_COLOR says otherwise."""
+    if os.getenv('NO_COLOR'):
+        return False
+    if os.getenv('FORCE_COLOR'):
+        return True
+    stream = stream or sys.stdout
+    return hasattr(stream, 'isatty') and stream.isatty()
+
+def _to_json(obj):
+    # Typed models (see models.py) serialize as their JSON form
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+def write_jsonl(items, stream):
+    """Write one JSON document per line, a page at a time. Returns how many were written."""
+    encode = json.JSONEncoder(ensure_ascii=False, default=_to_json).encode
+    count = 0
+    page = []
+    for item in items:
+        page.append(encode(item))
+        if len(page) >= PAGE_SIZE:
+            stream.write('\n'.join(page) + '\n')
+            count += len(page)
+            page.clear()
+    if page:
+        stream.write('\n'.join(page) + '\n')
+        count += len(page)
+    return count
+
+def write_csv(items, columns, stream):
+    """Write a header row and one row per item, a page at a time; `columns` maps names to getters. Returns the row count."""
+    getters = list(columns.values())
+    page = io.StringIO()
+    writer = csv.writer(page, lineterminator='\n')
+    writer.writerow(columns)
+    count = 0
+    for item in items:
+        writer.writerow([get(item) for get in getters])
+        count += 1
+        if count % PAGE_SIZE == 0:
+            stream.write(page.getvalue())
+            page.seek(0)
+            page.truncate()
+    stream.write(page.getvalue())
+    return count
+
+class Output:
+    """
+    Where a list script's output goes, by `--format`.
+
+    `text` collects everything printed inside the block into one buffer and
+    writes it in a single call per page (PAGE_SIZE items) instead of once
+    per line. `jsonl` and `csv` stream the items themselves to stdout, with
+    no per-field formatting, while headers and tips printed inside the block
+    go to stderr so the data can be piped:
+
+        with Output(args.format, RECIPE_COLUMNS) as out:
+            header('Browse Recipes')
+            count = out.emit(recipes, print_recipe_summary)
+    """
+
+    def __init__(self, format='text', columns=None, stream=None):
+        if format not in FORMATS:
+            raise ValueError(f'Unknown output format {format!r} (expected one of {", ".join(FORMATS)})')
+        self.format = format
+        self.columns = columns
+        self.stream = stream
+        self._saved_stdout = None
+        self._buffer = None
+
+    def __enter__(self):
+        self._saved_stdout = sys.stdout
+        if self.stream is None:
+            self.stream = sys.stdout
+        if self.format == 'text':
+            self._buffer = sys.stdout = io.StringIO()
+        else:
+            sys.stdout = sys.stderr
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self.flush()
+        finally:
+            sys.stdout = self._saved_stdout
+
+    def flush(self):
+        if self._buffer is not None and self._buffer.tell():
+            self.stream.write(self._buffer.getvalue())
+            self._buffer.seek(0)
+            self._buffer.truncate()
+        self.stream.flush()
+
+    def emit(self, items, render=None):
+        """Output every item (text: via `render(item)`), returning how many there were."""
+        if self.format == 'jsonl':
+            return write_jsonl(items, self.stream)
+        if self.format == 'csv':
+            return write_csv(items, self.columns, self.stream)
+        count = 0
+        for item in items:
+            render(item)
+            count += 1
+            if count % PAGE_SIZE == 0:
+                self.flush()
+        return count
@@ -0,0 +1,228 @@
+import re
+import threading
+import weakref
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, namedtuple
+from difflib import SequenceMatcher
+
+from client import get_default_client, iter_ingredients
+
+# Below this confidence a name is reported as unresolved (with a best guess)
+DEFAULT_MIN_CONFIDENCE = 0.6
+
+# Fuzzy candidates re-scored with SequenceMatcher after the trigram pass
+FUZZY_CANDIDATES = 8
+
+# Distinct (name, category, threshold) lookups remembered, least recently used dropped first
+DEFAULT_MEMO_SIZE = 10_000
+
+# Leading shopping-list noise: quantities and units ("2 1/2 cups of ...")
+UNITS = frozenset('''
+    g gram grams kg ml l liter liters litre litres cup cups tbsp tablespoon tablespoons tsp
+    teaspoon teaspoons oz ounce ounces lb lbs pound pounds clove cloves pinch pinches can cans
+    jar jars pack packs packet packets bunch bunches handful handfuls piece pieces slice slices
+    x of
+'''.split())
+
+# Preparation words dropped anywhere in a name ("onions, finely chopped")
+PREPARATIONS = frozenset('''
+    diced minced sliced chopped grated peeled crushed halved quartered trimmed shredded
+    finely roughly thinly coarsely large small medium
+'''.split())
+
+_WORD = re.compile(r'[a-z0-9]+|[\u00bc-\u00be\u2150-\u215e]')
+_QUANTITY = re.compile(r'^(\d+|[\u00bc-\u00be\u2150-\u215e])$')
+
+# `id`/`name` are None when nothing reached the confidence threshold, and
+# `category` is then the best guess's category, as a hint, if it was close. `method` is exact,
+# partial or fuzzy; `alternatives` holds up to three (id, name, confidence).
+Resolution = namedtuple(
+    'Resolution', ['query', 'id', 'name', 'category', 'confidence', 'method', 'alternatives'])
+
+def _singular(word):
+    if len(word) <= 3 or word.isdigit():
+        return word
+    if word.endswith('ies'):
+        return word[:-3] + 'y'
+    if word.endswith(('oes', 'ches', 'shes', 'sses', 'xes')):
+        return word[:-2]
+    if word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+def normalize(text):
+    """
+    Canonical form of an ingredient name or shopping-list line: lowercase,
+    no punctuation, notes after a comma dropped, leading quantities/units
+    and preparation words removed, words singularized.
+
+        normalize('2 1/2 cups Red Onions, finely chopped')  # -> 'red onion'
+    """
+    words = _WORD.findall(text.lower().split(',')[0])
+    while words and (_QUANTITY.match(words[0]) or words[0] in UNITS):
+        words.pop(0)
+    return ' '.join(_singular(w) for w in words if w not in PREPARATIONS)
+
+def _trigrams(key):
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class IngredientResolver:
+    """
+    Maps free-text ingredient names to catalog ingredients, locally.
+
+    The catalog is loaded once and indexed three ways by normalized name: a
+    dict for exact matches, a sorted key array searched with bisect for
+    trie-style prefix lookups (`complete()`), and a trigram index for fuzzy
+    matches. Repeated names are answered from a memo of the last
+    `memo_size` distinct lookups, so resolving a long shopping list costs a
+    few microseconds per distinct line.
+
+        resolver = IngredientResolver(iter_ingredients())
+        resolver.resolve('2 cups red onions, chopped')
+        # -> Resolution(query=..., id='ing_00042', name='red onion', confidence=1.0, method='exact', ...)
+    """
+
+    def __init__(self, ingredients, memo_size=DEFAULT_MEMO_SIZE):
+        self.ingredients = []
+        self.memo_size = memo_size
+        self._exact = {}
+        self._trigrams = {}
+        self._memo = OrderedDict()
+        self._memo_lock = threading.Lock()
+
+        for ingredient in ingredients:
+            key = normalize(ingredient['name'])
+            if not key or key in self._exact:
+                continue
+            position = len(self.ingredients)
+            self.ingredients.append(ingredient)
+            self._exact[key] = position
+            for gram in _trigrams(key):
+                self._trigrams.setdefault(gram, array('I')).append(position)
+
+        self._keys = sorted(self._exact)
+        self._key_of = [None] * len(self.ingredients)
+        for key, position in self._exact.items():
+            self._key_of[position] = key
+        self._gram_counts = array('H', (len(_trigrams(key)) for key in self._key_of))
+
+    def __len__(self):
+        return len(self.ingredients)
+
+    def complete(self, prefix, limit=10):
+        """Catalog ingredients whose normalized name starts with `prefix` ("Tomatoes" finds "tomato paste")."""
+        # A bare unit-like prefix ("g" for garlic) is still a prefix
+        prefix = normalize(prefix) or ' '.join(_WORD.findall(prefix.lower()))
+        matches = []
+        for key in self._keys[bisect_left(self._keys, prefix):]:
+            if not key.startswith(prefix) or len(matches) >= limit:
+                break
+            matches.append(self.ingredients[self._exact[key]])
+        return matches
+
+    def resolve(self, name, category=None, min_confidence=DEFAULT_MIN_CONFIDENCE):
+        """
+        Resolve one name to a Resolution. Candidates in `category`, when
+        given, win ties and get a small confidence boost.
+        """
+        key = normalize(name)
+        memo_key = (key, category, min_confidence)
+        with self._memo_lock:
+            cached = self._memo.get(memo_key)
+            if cached is not None:
+                self._memo.move_to_end(memo_key)
+        if cached is None:
+            cached = self._resolve(key, category, min_confidence)
+            with self._memo_lock:
+                self._memo[memo_key] = cached
+                while len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+        return cached._replace(query=name)
+
+    def resolve_many(self, names, category=None, min_confidence=DEFAULT_MIN_CONFIDENCE):
+        return [self.resolve(name, category, min_confidence) for name in names]
+
+    def _resolve(self, key, category, min_confidence):
+        if not key:
+            return Resolution(None, None, None, None, 0.0, None, [])
+
+        # Scored candidates: position -> (confidence, method)
+        candidates = {}
+        position = self._exact.get(key)
+        if position is not None:
+            candidates[position] = (1.0, 'exact')
+        else:
+            self._partial_candidates(key, candidates)
+            self._fuzzy_candidates(key, candidates)
+
+        def rank(item):
+            position, (confidence, _) = item
+            in_category = category is not None and self.ingredients[position]['category'] == category
+            return min(1.0, confidence + 0.05 * in_category), in_category
+
+        ranked = sorted(candidates.items(), key=rank, reverse=True)
+        if not ranked:
+            return Resolution(None, None, None, None, 0.0, None, [])
+        alternatives = [
+            (self.ingredients[p]['id'], self.ingredients[p]['name'], round(rank((p, c))[0], 3))
+            for p, c in ranked[1:4]
+        ]
+
+        best, (_, method) = ranked[0]
+        confidence = round(rank(ranked[0])[0], 3)
+        ingredient = self.ingredients[best]
+        if confidence < min_confidence:
+            # Only a reasonably close guess is worth a category hint
+            hint = ingredient['category'] if confidence >= min_confidence / 2 else None
+            return Resolution(None, None, None, hint, confidence, None, alternatives)
+        return Resolution(None, ingredient['id'], ingredient['name'], ingredient['category'],
+                          confidence, method, alternatives)
+
+    def _partial_candidates(self, key, candidates):
+        """Catalog names found as a run of whole words in `key` ("organic baby spinach" -> "spinach")."""
+        words = key.split()
+        for size in range(len(words) - 1, 0, -1):
+            for start in range(len(words) - size + 1):
+                span = ' '.join(words[start:start + size])
+                position = self._exact.get(span)
+                if position is not None and position not in candidates:
+                    candidates[position] = (0.7 + 0.25 * len(span) / len(key), 'partial')
+
+    def _fuzzy_candidates(self, key, candidates):
+        """Best trigram (Dice) overlaps, re-scored mostly by edit similarity (kinder to transposed letters)."""
+        grams = _trigrams(key)
+        shared = {}
+        for gram in grams:
+            for position in self._trigrams.get(gram, ()):
+                shared[position] = shared.get(position, 0) + 1
+        if not shared:
+            return
+
+        dice = lambda p: 2 * shared[p] / (len(grams) + self._gram_counts[p])
+        for position in sorted(shared, key=dice, reverse=True)[:FUZZY_CANDIDATES]:
+            similarity = SequenceMatcher(None, key, self._key_of[position]).ratio()
+            confidence = 0.95 * (0.7 * similarity + 0.3 * dice(position))
+            if confidence > candidates.get(position, (0.0,))[0]:
+                candidates[position] = (confidence, 'fuzzy')
+
+# One resolver per client, dropped along with its client
+_resolvers = weakref.WeakKeyDictionary()
+_resolvers_lock = threading.Lock()
+
+def get_resolver(client=None):
+    """
+    A shared resolver over the full ingredient catalog of `client` (the
+    default client if None), loaded on first use.
+    """
+    client = client or get_default_client()
+    with _resolvers_lock:
+        resolver = _resolvers.get(client)
+        if resolver is None:
+            resolver = _resolvers[client] = IngredientResolver(iter_ingredients(client=client))
+    return resolver
+
+def resolve_ingredients(names, category=None, min_confidence=DEFAULT_MIN_CONFIDENCE, client=None):
+    """Resolve free-text ingredient names to catalog IDs in bulk, with one catalog download."""
+    return get_resolver(client).resolve_many(names, category, min_confidence)
@@ -0,0 +1,272 @@
+import copy
+import numbers
+import re
+
+import numpy as np
+
+NUTRIENTS = ('calories', 'protein_g', 'carbohydrates_g', 'fat_g', 'fiber_g')
+SYSTEMS = ('metric', 'imperial')
+
+# Size of each unit in its dimension's base unit (grams or millilitres).
+# Imperial volumes are US customary measures.
+CONVERSIONS = {
+    'mg': ('mass', 0.001),
+    'g': ('mass', 1.0),
+    'kg': ('mass', 1000.0),
+    'oz': ('mass', 28.349523125),
+    'lb': ('mass', 453.59237),
+    'ml': ('volume', 1.0),
+    'cl': ('volume', 10.0),
+    'dl': ('volume', 100.0),
+    'l': ('volume', 1000.0),
+    'tsp': ('volume', 4.92892159375),
+    'tbsp': ('volume', 14.78676478125),
+    'fl oz': ('volume', 29.5735295625),
+    'cup': ('volume', 236.5882365),
+    'pint': ('volume', 473.176473),
+    'quart': ('volume', 946.352946),
+    'gallon': ('volume', 3785.411784),
+}
+
+UNIT_ALIASES = {
+    'gram': 'g', 'grams': 'g', 'kilogram': 'kg', 'kilograms': 'kg', 'milligram': 'mg',
+    'ounce': 'oz', 'ounces': 'oz', 'pound': 'lb', 'pounds': 'lb', 'lbs': 'lb',
+    'milliliter': 'ml', 'millilitre': 'ml', 'milliliters': 'ml', 'millilitres': 'ml',
+    'liter': 'l', 'litre': 'l', 'liters': 'l', 'litres': 'l',
+    'teaspoon': 'tsp', 'teaspoons': 'tsp', 'tablespoon': 'tbsp', 'tablespoons': 'tbsp',
+    'cups': 'cup', 'pints': 'pint', 'pt': 'pint', 'quarts': 'quart', 'qt': 'quart',
+    'gallons': 'gallon', 'gal': 'gallon', 'floz': 'fl oz', 'fluid ounce': 'fl oz', 'fluid ounces': 'fl oz',
+}
+
+# Unit used from each base-unit amount upward when converting into a system
+LADDERS = {
+    ('metric', 'mass'): [(0, 'g'), (1000, 'kg')],
+    ('metric', 'volume'): [(0, 'ml'), (1000, 'l')],
+    ('imperial', 'mass'): [(0, 'oz'), (453.59237, 'lb')],
+    ('imperial', 'volume'): [(0, 'tsp'), (14.78676478125, 'tbsp'), (59.1470591, 'cup')],
+}
+
+DIMENSIONS = ('mass', 'volume')
+METRIC_UNITS = frozenset(['mg', 'g', 'kg', 'ml', 'cl', 'dl', 'l'])
+
+# Conversion table, precomputed once: unit code -> (dimension code, base size).
+# Codes index UNITS; dimension -1 marks counts ("clove", "pinch", "") that never convert.
+UNITS = list(CONVERSIONS)
+_DIMENSION = np.array([DIMENSIONS.index(CONVERSIONS[u][0]) for u in UNITS], dtype=np.int8)
+_BASE_SIZE = np.array([CONVERSIONS[u][1] for u in UNITS], dtype=np.float64)
+_LADDERS = {
+    (system, DIMENSIONS.index(dimension)): (
+        np.array([low for low, _ in steps], dtype=np.float64),
+        np.array([UNITS.index(unit) for _, unit in steps], dtype=np.intp),
+    )
+    for (system, dimension), steps in LADDERS.items()
+}
+
+_YIELD = re.compile(r'\s*(\d+(?:[.,]\d+)?)')
+
+def canonical_unit(unit):
+    """The CONVERSIONS name for `unit` ("Tablespoons" -> "tbsp"), or `unit` unchanged if it isn't a measure."""
+    if not unit:
+        return unit or ''
+    key = unit.strip().lower().rstrip('.')
+    return key if key in CONVERSIONS else UNIT_ALIASES.get(key, unit)
+
+def parse_servings(yields):
+    """Leading number of a `meta.yields` string ("4 servings" -> 4.0), or None."""
+    if isinstance(yields, (int, float)):
+        return float(yields)
+    match = _YIELD.match(yields) if isinstance(yields, str) else None
+    return float(match.group(1).replace(',', '.')) if match else None
+
+class RecipeBatch:
+    """
+    Ingredient quantities of many full recipes in flat NumPy arrays, for
+    rescaling yields and converting units across the whole batch at once.
+
+    Items of recipe `i` are `quantities[offsets[i]:offsets[i + 1]]`, in
+    the order they appear in its ingredient groups; `unit_codes` index
+    `units`. `servings` is NaN for recipes whose yield isn't a number,
+    and those keep their quantities when rescaled.
+
+        batch = RecipeBatch.from_recipes(recipes)
+        scaled = batch.scale(2).convert('metric')
+        scaled.totals[:, 0]        # calories for the whole (rescaled) recipe
+        scaled.ingredients(0)      # [(quantity, unit), ...]
+    """
+
+    def __init__(self, ids, servings, offsets, quantities, unit_codes, units, nutrition):
+        self.ids = ids
+        self.servings = servings
+        self.offsets = offsets
+        self.quantities = quantities
+        self.unit_codes = unit_codes
+        self.units = units
+        self.nutrition = nutrition
+        self._owner = None
+        self._dimension = None
+
+    @classmethod
+    def from_recipes(cls, recipes):
+        ids, servings, nutrition = [], [], []
+        offsets = [0]
+        quantities, unit_codes = [], []
+        code_of = {unit: code for code, unit in enumerate(UNITS)}
+
+        for recipe in recipes:
+            ids.append(recipe['id'])
+            servings.append(parse_servings((recipe.get('meta') or {}).get('yields')))
+            per_serving = (recipe.get('nutrition') or {}).get('per_serving') or {}
+            nutrition.append([per_serving.get(name) for name in NUTRIENTS])
+            for group in recipe.get('ingredients') or ():
+                for item in group['items']:
+                    quantity = item.get('quantity')
+                    quantities.append(quantity if isinstance(quantity, (int, float)) else np.nan)
+                    unit = canonical_unit(item.get('unit'))
+                    code = code_of.get(unit)
+                    if code is None:
+                        code = code_of[unit] = len(code_of)
+                    unit_codes.append(code)
+            offsets.append(len(quantities))
+
+        return cls(
+            ids=np.array(ids, dtype=str),
+            servings=np.array([np.nan if s is None else s for s in servings], dtype=np.float64),
+            offsets=np.array(offsets, dtype=np.int64),
+            quantities=np.array(quantities, dtype=np.float64),
+            unit_codes=np.array(unit_codes, dtype=np.uint16),
+            units=list(code_of),
+            nutrition=np.array(nutrition, dtype=np.float64).reshape(len(ids), len(NUTRIENTS)),
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def owner(self):
+        """Recipe row of every ingredient item."""
+        if self._owner is None:
+            self._owner = np.repeat(np.arange(len(self)), np.diff(self.offsets))
+        return self._owner
+
+    @property
+    def totals(self):
+        """Nutrition for the whole recipe (per serving x servings), one column per NUTRIENTS entry."""
+        return self.nutrition * self.servings[:, None]
+
+    def _replace(self, **changes):
+        values = {
+            'ids': self.ids, 'servings': self.servings, 'offsets': self.offsets,
+            'quantities': self.quantities, 'unit_codes': self.unit_codes,
+            'units': self.units, 'nutrition': self.nutrition,
+        }
+        values.update(changes)
+        batch = RecipeBatch(**values)
+        # Item layout is unchanged, so the derived index carries over
+        batch._owner = self._owner
+        return batch
+
+    def scale(self, servings):
+        """A batch rescaled to `servings` (a number, or one per recipe)."""
+        target = np.broadcast_to(np.asarray(servings, dtype=np.float64), self.servings.shape)
+        known = ~np.isnan(self.servings)
+        factor = np.divide(target, self.servings, out=np.ones_like(target), where=known)
+        return self._replace(
+            servings=np.where(known, target, self.servings),
+            quantities=self.quantities * factor[self.owner],
+        )
+
+    def convert(self, system):
+        """
+        A batch with masses and volumes expressed in `system` ('metric' or
+        'imperial'), each in the unit that suits its size. Counts, unknown
+        units and items without a quantity are left alone; mass and volume
+        never mix.
+        """
+        if system not in SYSTEMS:
+            raise ValueError(f'Unknown unit system: {system!r} (expected one of {", ".join(SYSTEMS)})')
+        if self._dimension is None:
+            # Per-batch view of the precomputed table, extended with this batch's unknown units
+            extra = len(self.units) - len(UNITS)
+            self._dimension = np.concatenate([_DIMENSION, np.full(extra, -1, dtype=np.int8)])
+            self._base_size = np.concatenate([_BASE_SIZE, np.full(extra, np.nan)])
+
+        codes = self.unit_codes.astype(np.intp)
+        dimension = self._dimension[codes]
+        base = self.quantities * self._base_size[codes]
+        quantities = self.quantities.copy()
+        unit_codes = self.unit_codes.copy()
+        # Items without a numeric quantity keep their unit as well
+        known = np.isfinite(base)
+        for code in range(len(DIMENSIONS)):
+            rows = np.flatnonzero((dimension == code) & known)
+            if not len(rows):
+                continue
+            lows, steps = _LADDERS[system, code]
+            amounts = base[rows]
+            chosen = steps[np.clip(np.searchsorted(lows, amounts, side='right') - 1, 0, len(steps) - 1)]
+            quantities[rows] = amounts / _BASE_SIZE[chosen]
+            unit_codes[rows] = chosen
+        batch = self._replace(quantities=quantities, unit_codes=unit_codes)
+        batch._dimension, batch._base_size = self._dimension, self._base_size
+        return batch
+
+    def ingredients(self, row):
+        """(quantity, unit) for each ingredient item of one recipe; quantity is None if it wasn't a number."""
+        start, end = self.offsets[row], self.offsets[row + 1]
+        return [
+            (None if np.isnan(quantity) else quantity.item(), self.units[code])
+            for quantity, code in zip(self.quantities[start:end], self.unit_codes[start:end])
+        ]
+
+def scale_recipe(recipe, servings=None, system=None):
+    """
+    A copy of one full recipe with ingredient quantities rescaled to
+    `servings` and/or converted to `system`, `meta.yields` updated and
+    whole-recipe nutrition added as `nutrition.total`.
+    """
+    batch = RecipeBatch.from_recipes([recipe])
+    if servings is not None:
+        batch = batch.scale(servings)
+    if system is not None:
+        batch = batch.convert(system)
+
+    recipe = copy.deepcopy(recipe)
+    items = (item for group in recipe.get('ingredients') or () for item in group['items'])
+    for item, (quantity, unit) in zip(items, batch.ingredients(0)):
+        if quantity is not None:
+            item['quantity'] = quantity
+        if item.get('unit') and unit != canonical_unit(item['unit']):
+            item['unit'] = unit
+
+    count = batch.servings[0]
+    if servings is not None and not np.isnan(count):
+        recipe.setdefault('meta', {})['yields'] = f'{format_quantity(count)} servings'
+    if recipe.get('nutrition') and not np.isnan(count):
+        recipe['nutrition']['total'] = {
+            name: round(total, 1)
+            for name, total in zip(NUTRIENTS, batch.totals[0].tolist()) if total == total
+        }
+    return recipe
+
+# Kitchen fractions shown instead of decimals for imperial measures and counts
+_FRACTIONS = [(1 / 8, '1/8'), (1 / 4, '1/4'), (1 / 3, '1/3'), (1 / 2, '1/2'), (2 / 3, '2/3'), (3 / 4, '3/4')]
+
+def format_quantity(value, unit=None):
+    """A quantity for display: "250", "1.25" (metric), or "1 1/2" (imperial and counts)."""
+    if value is None:
+        return ''
+    if not isinstance(value, numbers.Real):
+        return str(value)
+    if canonical_unit(unit) in METRIC_UNITS:
+        digits = 2 if value < 10 else 1 if value < 100 else 0
+        return f'{value:.{digits}f}'.rstrip('0').rstrip('.') if digits else str(round(value))
+    whole = int(value)
+    fraction = value - whole
+    if fraction < 0.02:
+        return str(whole)
+    if fraction > 0.98:
+        return str(whole + 1)
+    for part, text in _FRACTIONS:
+        if abs(fraction - part) < 0.02:
+            return f'{whole} {text}' if whole else text
+    return f'{value:.2f}'.rstrip('0').rstrip('.')
@@ -1,13 +1,22 @@
 import sys
 import os
+import argparse
 
 # Add src directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from client import api_request
+from client import api_request, run_cli
+from mirror import use_offline_mirror
 from utils import header, divider
 
 def main():
+    parser = argparse.ArgumentParser(description='List dietary flags')
+    parser.add_argument('--offline', action='store_true', help='Query the local mirror (see 09_sync.py) instead of the API')
+    args = parser.parse_args()
+
+    if args.offline:
+        use_offline_mirror()
+
     header('Dietary Flags')
 
     response = api_request('/api/v1/dietary-flags')
@@ -28,5 +37,5 @@ def main():
     print('\n>> Next step: Run `python src/scripts/02_cuisines.py` to see available cuisines\n')
 
 if __name__ == "__main__":
-    main()
+    run_cli(main)
 
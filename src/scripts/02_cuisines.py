@@ -1,13 +1,22 @@
 import sys
 import os
+import argparse
 
 # Add src directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from client import api_request
+from client import api_request, run_cli
+from mirror import use_offline_mirror
 from utils import header, divider
 
 def main():
+    parser = argparse.ArgumentParser(description='List cuisines')
+    parser.add_argument('--offline', action='store_true', help='Query the local mirror (see 09_sync.py) instead of the API')
+    args = parser.parse_args()
+
+    if args.offline:
+        use_offline_mirror()
+
     header('Cuisines')
 
     response = api_request('/api/v1/cuisines')
@@ -26,5 +35,5 @@ def main():
     print('\n>> Next step: Run `python src/scripts/03_browse.py` to see recipes\n')
 
 if __name__ == "__main__":
-    main()
+    run_cli(main)
 
@@ -6,51 +6,84 @@ import math
 # Add src directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from client import api_request
-from utils import header, label, divider, format_duration, highlight, truncate
+from client import api_request, iter_recipes, run_cli
+from mirror import use_offline_mirror
+from render import FORMATS, RECIPE_COLUMNS, Output
+from utils import header, print_recipe_summary
+
+def print_no_results():
+    print('No recipes found matching your search.\n')
+    print('Try:')
+    print('  * Different keywords')
+    print('  * Broader terms')
+    print('  * Check spelling\n')
 
 def main():
     parser = argparse.ArgumentParser(description='Search recipes')
     parser.add_argument('--q', type=str, required=True, help='Search query')
     parser.add_argument('--page', type=int, default=1, help='Page number')
     parser.add_argument('--per_page', type=int, default=10, help='Items per page')
+    parser.add_argument('--all', action='store_true', help='Stream every matching recipe across all pages')
+    parser.add_argument('--max_items', type=int, help='Stop after this many recipes (with --all)')
+    parser.add_argument('--offline', action='store_true', help='Query the local mirror (see 09_sync.py) instead of the API')
+    parser.add_argument('--local', action='store_true', help='Rank mirrored recipes with the local full-text index (BM25)')
+    parser.add_argument('--prefix', action='store_true', help='With --local, let the last word match as a prefix (typeahead)')
+    parser.add_argument('--format', choices=FORMATS, default='text', help='text, or jsonl/csv records on stdout (messages go to stderr)')
     args = parser.parse_args()
 
-    header(f'Search: "{args.q}"')
-
-    response = api_request('/api/v1/recipes', {
-        'q': args.q,
-        'page': args.page,
-        'per_page': args.per_page
-    })
-
-    recipes = response['data']
-    meta = response['meta']
-
-    if not recipes:
-        print('No recipes found matching your search.\n')
-        print('Try:')
-        print('  * Different keywords')
-        print('  * Broader terms')
-        print('  * Check spelling\n')
-        return
-
-    total_pages = math.ceil(meta['total'] / meta['per_page'])
-    print(f"Page {meta['page']} of {total_pages} ({meta['total']} matching recipes)\n")
-
-    for recipe in recipes:
-        print(f"{highlight(recipe['name'])}")
-        label('ID', recipe['id'])
-        label('Category', f"{recipe['category']} | {recipe['cuisine']}")
-        label('Difficulty', recipe['difficulty'])
-        label('Time', format_duration(recipe['meta']['total_time']))
-        
-        if recipe['dietary']['flags']:
-            label('Dietary', ', '.join(recipe['dietary']['flags'][:4]))
-            
-        label('Calories', f"{round(recipe['nutrition_summary']['calories'])} kcal")
-        print(f"  {truncate(recipe['description'], 80)}")
-        divider()
+    if args.offline or args.local:
+        mirror = use_offline_mirror()
+
+    with Output(args.format, RECIPE_COLUMNS) as out:
+        header(f'Search: "{args.q}"')
+
+        if args.local:
+            # Imported here so API searches don't load NumPy
+            from cache import ResponseCache
+            from search_index import local_index
+
+            cache_path = os.getenv('RECIPE_API_CACHE')
+            cache = ResponseCache(cache_path) if cache_path else None
+            try:
+                index = local_index(mirror, cache)
+            finally:
+                if cache is not None:
+                    cache.close()
+            first = (args.page - 1) * args.per_page
+            hits = index.search(args.q, limit=first + args.per_page, prefix=args.prefix)[first:]
+            recipes = mirror.recipes_by_id(recipe_id for recipe_id, _ in hits)
+
+            if not recipes:
+                print_no_results()
+                return
+
+            print(f"Best matches {first + 1}-{first + len(recipes)} (local index of {len(index)} recipes)\n")
+        elif args.all:
+            recipes = iter_recipes(q=args.q, max_items=args.max_items)
+        else:
+            response = api_request('/api/v1/recipes', {
+                'q': args.q,
+                'page': args.page,
+                'per_page': args.per_page
+            })
+
+            recipes = response['data']
+            meta = response['meta']
+
+            if not recipes:
+                print_no_results()
+                return
+
+            total_pages = math.ceil(meta['total'] / meta['per_page'])
+            print(f"Page {meta['page']} of {total_pages} ({meta['total']} matching recipes)\n")
+
+        count = out.emit(recipes, print_recipe_summary)
+
+        if args.all:
+            if count == 0:
+                print_no_results()
+            else:
+                print(f"\nListed {count} matching recipes\n")
 
 if __name__ == "__main__":
-    main()
+    run_cli(main)
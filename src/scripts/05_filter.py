@@ -6,8 +6,14 @@ import math
 # Add src directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from client import api_request
-from utils import header, label, divider, format_duration, highlight, truncate
+from client import api_request, iter_recipes, run_cli
+from mirror import use_offline_mirror
+from query import RecipeIndex
+from render import FORMATS, RECIPE_COLUMNS, Output
+from utils import header, print_recipe_summary
+
+# --sort choices for the local query engine: name -> RecipeIndex sort key
+SORTS = {'calories': 'calories', 'protein': '-protein_g', 'time': 'total_time'}
 
 def main():
     parser = argparse.ArgumentParser(description='Filter recipes')
@@ -17,18 +23,34 @@ def main():
     parser.add_argument('--dietary', type=str, help='Dietary preference')
     parser.add_argument('--max_calories', type=int, help='Maximum calories')
     parser.add_argument('--min_protein', type=int, help='Minimum protein')
+    parser.add_argument('--min_calories', type=int, help='Minimum calories (with --offline)')
+    parser.add_argument('--max_time', type=int, help='Maximum total time in minutes (with --offline)')
+    parser.add_argument('--sort', choices=SORTS, help='Sort by calories, protein (highest first) or time (with --offline)')
     parser.add_argument('--page', type=int, default=1, help='Page number')
     parser.add_argument('--per_page', type=int, default=10, help='Items per page')
+    parser.add_argument('--all', action='store_true', help='Stream every matching recipe across all pages')
+    parser.add_argument('--max_items', type=int, help='Stop after this many recipes (with --all)')
+    parser.add_argument('--offline', action='store_true', help='Query the local mirror (see 09_sync.py) instead of the API')
+    parser.add_argument('--format', choices=FORMATS, default='text', help='text, or jsonl/csv records on stdout (messages go to stderr)')
     
     # parse_known_args allows us to check if any filters were provided easily if we wanted, 
     # but argparse doesn't give a simple "was anything passed" flag.
     # We'll check values manually.
     args = parser.parse_args()
 
-    has_filters = any([
-        args.category, args.cuisine, args.difficulty, 
-        args.dietary, args.max_calories, args.min_protein
-    ])
+    mirror = use_offline_mirror() if args.offline else None
+
+    # Filters the API doesn't offer are answered by the in-process query engine
+    local_only = any(value is not None for value in (args.min_calories, args.max_time, args.sort))
+    if local_only and not args.offline:
+        print('\n[X] --min_calories, --max_time and --sort need the offline mirror; add --offline\n')
+        return
+
+    has_filters = any(value is not None for value in (
+        args.category, args.cuisine, args.difficulty,
+        args.dietary, args.max_calories, args.min_protein,
+        args.min_calories, args.max_time, args.sort
+    ))
 
     if not has_filters:
         print('\nFilter recipes by multiple criteria\n')
@@ -39,10 +61,15 @@ def main():
         print('  --dietary      Vegetarian, Vegan, Gluten-Free, etc. (run `python src/scripts/01_categories.py`)')
         print('  --max_calories Maximum calories per serving')
         print('  --min_protein  Minimum protein in grams\n')
+        print('With --offline (see `python src/scripts/09_sync.py`):')
+        print('  --min_calories Minimum calories per serving')
+        print('  --max_time     Maximum total time in minutes')
+        print('  --sort         calories, protein or time\n')
         print('Examples:')
         print('  python src/scripts/05_filter.py --cuisine="Italian" --difficulty="Beginner"')
         print('  python src/scripts/05_filter.py --dietary="Vegan" --max_calories=400')
-        print('  python src/scripts/05_filter.py --category="Dessert" --cuisine="French"\n')
+        print('  python src/scripts/05_filter.py --category="Dessert" --cuisine="French"')
+        print('  python src/scripts/05_filter.py --dietary="Vegan" --min_calories=300 --max_calories=500 --max_time=30 --sort=protein --offline\n')
         return
 
     # Build filter description
@@ -51,53 +78,74 @@ def main():
     if args.cuisine: filters.append(f"cuisine={args.cuisine}")
     if args.difficulty: filters.append(f"difficulty={args.difficulty}")
     if args.dietary: filters.append(f"dietary={args.dietary}")
-    if args.max_calories: filters.append(f"max_calories={args.max_calories}")
-    if args.min_protein: filters.append(f"min_protein={args.min_protein}")
+    if args.max_calories is not None: filters.append(f"max_calories={args.max_calories}")
+    if args.min_protein is not None: filters.append(f"min_protein={args.min_protein}")
+    if args.min_calories is not None: filters.append(f"min_calories={args.min_calories}")
+    if args.max_time is not None: filters.append(f"max_time={args.max_time}")
+    if args.sort: filters.append(f"sort={args.sort}")
     
-    header('Filtered Recipes')
-    print(f"Filters: {', '.join(filters)}\n")
-
-    params = {
-        'category': args.category,
-        'cuisine': args.cuisine,
-        'difficulty': args.difficulty,
-        'dietary': args.dietary,
-        'max_calories': args.max_calories,
-        'min_protein': args.min_protein,
-        'page': args.page,
-        'per_page': args.per_page
-    }
+    with Output(args.format, RECIPE_COLUMNS) as out:
+        header('Filtered Recipes')
+        print(f"Filters: {', '.join(filters)}\n")
+
+        params = {
+            'category': args.category,
+            'cuisine': args.cuisine,
+            'difficulty': args.difficulty,
+            'dietary': args.dietary,
+            'max_calories': args.max_calories,
+            'min_protein': args.min_protein,
+            'page': args.page,
+            'per_page': args.per_page
+        }
     
-    # Remove None values
-    params = {k: v for k, v in params.items() if v is not None}
+        # Remove None values
+        params = {k: v for k, v in params.items() if v is not None}
 
-    response = api_request('/api/v1/recipes', params)
+        if local_only:
+            index = RecipeIndex(mirror.recipes())
+            matches = index.query(
+                category=args.category, cuisine=args.cuisine, difficulty=args.difficulty,
+                dietary=args.dietary, min_calories=args.min_calories, max_calories=args.max_calories,
+                min_protein=args.min_protein, max_total_time=args.max_time,
+                sort=SORTS.get(args.sort),
+            )
+            if args.all:
+                recipes = matches[:args.max_items]
+            else:
+                start = (args.page - 1) * args.per_page
+                recipes = matches[start:start + args.per_page]
+                if not recipes:
+                    print('No recipes match your filters.\n')
+                    print('Try relaxing some criteria.\n')
+                    return
+                print(f"Found {len(matches)} matching recipes\n")
+        elif args.all:
+            del params['page'], params['per_page']
+            recipes = iter_recipes(max_items=args.max_items, **params)
+        else:
+            response = api_request('/api/v1/recipes', params)
 
-    recipes = response['data']
-    meta = response['meta']
+            recipes = response['data']
+            meta = response['meta']
 
-    if not recipes:
-        print('No recipes match your filters.\n')
-        print('Try relaxing some criteria.\n')
-        return
+            if not recipes:
+                print('No recipes match your filters.\n')
+                print('Try relaxing some criteria.\n')
+                return
+
+            print(f"Found {meta['total']} matching recipes\n")
 
-    print(f"Found {meta['total']} matching recipes\n")
+        count = out.emit(recipes, print_recipe_summary)
 
-    for recipe in recipes:
-        print(f"{highlight(recipe['name'])}")
-        label('ID', recipe['id'])
-        label('Category', f"{recipe['category']} | {recipe['cuisine']}")
-        label('Difficulty', recipe['difficulty'])
-        label('Time', format_duration(recipe['meta']['total_time']))
-        
-        if recipe['dietary']['flags']:
-            label('Dietary', ', '.join(recipe['dietary']['flags'][:4]))
-            
-        label('Calories', f"{round(recipe['nutrition_summary']['calories'])} kcal")
-        print(f"  {truncate(recipe['description'], 80)}")
-        divider()
+        if args.all:
+            if count == 0:
+                print('No recipes match your filters.\n')
+                print('Try relaxing some criteria.\n')
+                return
+            print(f"\nListed {count} matching recipes")
 
-    print('\n>> Get full recipe: python src/scripts/06_recipe.py --id=<recipe_id>\n')
+        print('\n>> Get full recipe: python src/scripts/06_recipe.py --id=<recipe_id>\n')
 
 if __name__ == "__main__":
-    main()
+    run_cli(main)
@@ -5,8 +5,45 @@ import argparse
 # Add src directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from client import api_request
-from utils import header, divider
+from client import api_request, iter_ingredients, run_cli
+from mirror import use_offline_mirror
+from resolver import resolve_ingredients
+from render import FORMATS, INGREDIENT_COLUMNS, Output
+from utils import header, divider, highlight, warning
+
+def print_resolutions(path, category=None):
+    if path == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path) as f:
+            lines = f.read().splitlines()
+    names = [line.strip() for line in lines if line.strip()]
+
+    header('Resolve Ingredients')
+
+    results = resolve_ingredients(names, category=category)
+    for result in results:
+        print(f"  {result.query}")
+        if result.id:
+            print(f"    -> {highlight(result.name)} ({result.id}, {result.category}) "
+                  f"{result.confidence:.0%} {result.method}")
+        else:
+            hint = f", probably {result.category}" if result.category else ''
+            warning(f"    -> no confident match{hint}")
+            if result.alternatives:
+                print(f"       Did you mean: {', '.join(name for _, name, _ in result.alternatives)}?")
+        print()
+
+    divider()
+    resolved = [result.id for result in results if result.id]
+    print(f"\nResolved {len(resolved):,} of {len(results):,} names\n")
+
+def print_ingredient(ingredient):
+    print(f"  {ingredient['name']}")
+    print(f"    ID: {ingredient['id']}")
+    print(f"    Category: {ingredient['category']}")
+    print(f"    Source: {ingredient['source']}")
+    print()
 
 def main():
     parser = argparse.ArgumentParser(description='Browse and search ingredients')
@@ -14,46 +51,60 @@ def main():
     parser.add_argument('--category', type=str, help='Filter by category')
     parser.add_argument('--page', type=int, default=1, help='Page number')
     parser.add_argument('--per_page', type=int, default=20, help='Results per page')
+    parser.add_argument('--all', action='store_true', help='Stream every matching ingredient across all pages')
+    parser.add_argument('--max_items', type=int, help='Stop after this many ingredients (with --all)')
+    parser.add_argument('--offline', action='store_true', help='Query the local mirror (see 09_sync.py) instead of the API')
+    parser.add_argument('--resolve', type=str, help='Match a file of ingredient names (one per line, - for stdin) to IDs')
+    parser.add_argument('--format', choices=FORMATS, default='text', help='text, or jsonl/csv records on stdout (messages go to stderr)')
     args = parser.parse_args()
 
-    header('Browse Ingredients')
+    if args.offline:
+        use_offline_mirror()
 
-    if args.q:
-        print(f'Search: "{args.q}"')
-    if args.category:
-        print(f'Category: {args.category}')
-    print()
+    if args.resolve:
+        print_resolutions(args.resolve, args.category)
+        return
+
+    with Output(args.format, INGREDIENT_COLUMNS) as out:
+        header('Browse Ingredients')
 
-    params = {
-        'page': args.page,
-        'per_page': args.per_page
-    }
-    if args.q:
-        params['q'] = args.q
-    if args.category:
-        params['category'] = args.category
-
-    response = api_request('/api/v1/ingredients', params)
-    data = response['data']
-    meta = response['meta']
-
-    print(f"Found {meta['total']:,} ingredients (page {meta['page']}):\n")
-
-    for ingredient in data:
-        print(f"  {ingredient['name']}")
-        print(f"    ID: {ingredient['id']}")
-        print(f"    Category: {ingredient['category']}")
-        print(f"    Source: {ingredient['source']}")
+        if args.q:
+            print(f'Search: "{args.q}"')
+        if args.category:
+            print(f'Category: {args.category}')
         print()
 
-    divider()
+        params = {
+            'page': args.page,
+            'per_page': args.per_page
+        }
+        if args.q:
+            params['q'] = args.q
+        if args.category:
+            params['category'] = args.category
+
+        if args.all:
+            data = iter_ingredients(q=args.q, category=args.category, max_items=args.max_items)
+        else:
+            response = api_request('/api/v1/ingredients', params)
+            data = response['data']
+            meta = response['meta']
+
+            print(f"Found {meta['total']:,} ingredients (page {meta['page']}):\n")
+
+        count = out.emit(data, print_ingredient)
+
+        divider()
+
+        if args.all:
+            print(f"\nListed {count:,} ingredients")
 
-    print('\nUsage examples:')
-    print('  python src/scripts/08_ingredients.py --q="chicken"')
-    print('  python src/scripts/08_ingredients.py --category="Vegetables"')
-    print('  python src/scripts/08_ingredients.py --page=2')
-    print('\nUse ingredient IDs to filter recipes:')
-    print('  python src/scripts/05_filter.py --ingredients="<id1>,<id2>"\n')
+        print('\nUsage examples:')
+        print('  python src/scripts/08_ingredients.py --q="chicken"')
+        print('  python src/scripts/08_ingredients.py --category="Vegetables"')
+        print('  python src/scripts/08_ingredients.py --page=2')
+        print('  python src/scripts/08_ingredients.py --category="Vegetables" --all')
+        print('  python src/scripts/08_ingredients.py --resolve=shopping_list.txt\n')
 
 if __name__ == "__main__":
-    main()
+    run_cli(main)
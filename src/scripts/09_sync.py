@@ -0,0 +1,47 @@
+import sys
+import os
+import argparse
+import time
+
+# Add src directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from client import run_cli
+from mirror import Mirror
+from utils import header, label, divider, success
+
+def main():
+    parser = argparse.ArgumentParser(description='Sync a local offline mirror of the catalog')
+    parser.add_argument('--db', type=str, help='Mirror file (default: RECIPE_API_MIRROR or .recipe_mirror.sqlite3)')
+    parser.add_argument('--full', action='store_true', help='Rewrite every page, ignoring stored page hashes')
+    args = parser.parse_args()
+
+    header('Sync Offline Mirror')
+
+    mirror = Mirror(args.db)
+    last_synced, _ = mirror.last_synced()
+    if last_synced:
+        print(f"Last synced: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(last_synced))}\n")
+    else:
+        print('First sync: fetching the full catalog (list endpoints only, no credits used)\n')
+
+    start = time.perf_counter()
+    stats = mirror.sync(full=args.full)
+    elapsed = time.perf_counter() - start
+
+    for kind in ('cuisines', 'dietary-flags', 'ingredient-categories'):
+        label(kind, f"{stats[kind]} entries")
+    for table in ('recipes', 'ingredients'):
+        s = stats[table]
+        label(table, f"{s['pages']} pages, {s['changed_pages']} changed, "
+                     f"{s['written']:,} written, {s['removed']:,} removed")
+
+    divider()
+    success(f"\nMirror up to date in {elapsed:.1f}s: {mirror.path}\n")
+    print('>> Query it offline, e.g.:')
+    print('   python src/scripts/03_browse.py --offline')
+    print('   python src/scripts/05_filter.py --cuisine="Italian" --offline\n')
+    mirror.close()
+
+if __name__ == "__main__":
+    run_cli(main)
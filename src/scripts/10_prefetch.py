@@ -0,0 +1,114 @@
+import sys
+import os
+import argparse
+
+# Add src directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from client import run_cli
+from mirror import Mirror
+from prefetch import CreditBudget, Prefetcher
+from utils import header, label, divider, success, warning
+
+# Priority of IDs added with --all, after any listed explicitly
+ALL_PRIORITY = 100
+
+def read_id_file(path):
+    """(priority, id) pairs from lines of `<id>` or `<id> <priority>`; blank lines and # comments are skipped."""
+    entries = []
+    for line in open(path):
+        parts = line.split('#')[0].replace(',', ' ').split()
+        if parts:
+            entries.append((int(parts[1]) if len(parts) > 1 else 0, parts[0]))
+    return entries
+
+def print_progress(stats):
+    remaining = '' if stats['daily_remaining'] is None else f" | daily left {stats['daily_remaining']:,}"
+    print(f"  fetched {stats['fetched']:,} ({stats['fetched_per_sec']:.1f}/s) | "
+          f"credits {stats['credits']:,} ({stats['credits_per_sec']:.1f}/s){remaining} | "
+          f"queued {stats['queued']:,}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Prefetch full recipes into the local mirror within a credit budget')
+    parser.add_argument('--ids', type=str, help='Comma-separated recipe IDs (highest priority)')
+    parser.add_argument('--file', type=str, help='File of recipe IDs, one per line, optionally followed by a priority (lower runs first)')
+    parser.add_argument('--all', action='store_true', help='Queue every recipe in the mirror, after the others')
+    parser.add_argument('--reserve', type=int, default=100, help='Credits to leave unspent (default: 100)')
+    parser.add_argument('--max_credits', type=int, help='Spend at most this many credits in this run')
+    parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight at once')
+    parser.add_argument('--wait_for_reset', action='store_true', help='When the daily quota runs out, wait for it to reset instead of stopping')
+    parser.add_argument('--daily_reset', type=str, help='UTC time of day the daily quota resets, HH:MM (default: RECIPE_API_DAILY_RESET or 00:00)')
+    parser.add_argument('--checkpoint', type=str, help='Checkpoint file (default: .recipe_prefetch.json)')
+    parser.add_argument('--restart', action='store_true', help='Discard the checkpoint and start a new queue')
+    parser.add_argument('--db', type=str, help='Mirror file (default: RECIPE_API_MIRROR or .recipe_mirror.sqlite3)')
+    parser.add_argument('--store', type=str, help='Keep full recipes in this binary store instead of the mirror file (default: RECIPE_API_STORE)')
+    args = parser.parse_args()
+
+    header('Prefetch Full Recipes')
+
+    mirror = Mirror(args.db, store=args.store)
+    try:
+        prefetcher = Prefetcher(
+            mirror,
+            budget=CreditBudget(reserve=args.reserve, max_credits=args.max_credits),
+            concurrency=args.concurrency,
+            checkpoint=args.checkpoint,
+            wait_for_reset=args.wait_for_reset,
+            daily_reset=args.daily_reset,
+            report=print_progress,
+            resume=not args.restart,
+        )
+    except ValueError as e:
+        warning(f'[X] {e}\n')
+        return
+    if len(prefetcher):
+        print(f"Resuming {len(prefetcher):,} queued recipes from {prefetcher.checkpoint_path}\n")
+
+    if args.ids:
+        prefetcher.add([i.strip() for i in args.ids.split(',') if i.strip()], priority=0)
+    if args.file:
+        for priority, recipe_id in sorted(read_id_file(args.file)):
+            prefetcher.add([recipe_id], priority)
+    if args.all:
+        prefetcher.add((recipe['id'] for recipe in mirror.recipes()), priority=ALL_PRIORITY)
+
+    if not len(prefetcher):
+        print('Nothing to fetch: every requested recipe is already stored.\n')
+        print('Usage examples:')
+        print('  python src/scripts/10_prefetch.py --ids="<id1>,<id2>"')
+        print('  python src/scripts/10_prefetch.py --file=ids.txt --reserve=500')
+        print('  python src/scripts/10_prefetch.py --all --max_credits=1000\n')
+        return
+
+    warning(f"!! Fetching up to {len(prefetcher):,} full recipes (1 credit each), "
+            f"keeping {args.reserve:,} credits in reserve !!\n")
+
+    stats = prefetcher.run()
+
+    print()
+    divider()
+    label('Fetched', f"{stats['fetched']:,} in {stats['elapsed']:.1f}s ({stats['fetched_per_sec']:.1f}/s)")
+    label('Credits spent', f"{stats['credits']:,} ({stats['credits_per_sec']:.1f}/s)")
+    label('Already stored', f"{stats['skipped']:,}")
+    if stats['not_found']:
+        label('Not found', f"{stats['not_found']:,}")
+    if stats['failed']:
+        label('Failed (kept for next run)', f"{stats['failed']:,}")
+    if stats['monthly_remaining'] is not None:
+        label('Credits left', f"{stats['daily_remaining']:,} today, {stats['monthly_remaining']:,} this month")
+
+    if not stats['queued']:
+        prefetcher.clear_checkpoint()
+        success('\nAll queued recipes fetched.\n')
+    else:
+        reason = {'done': 'some fetches failed', 'budget': 'credit budget reached'}.get(stats['stop_reason'], 'rate limited')
+        warning(f"\nStopped ({reason}) with {stats['queued']:,} recipes left; run again to resume.\n")
+    print('>> Read them offline, e.g.:')
+    if args.store and args.store != os.getenv('RECIPE_API_STORE'):
+        print(f'   RECIPE_API_STORE={args.store} python src/scripts/06_recipe.py --id=<recipe_id> --offline\n')
+    else:
+        print('   python src/scripts/06_recipe.py --id=<recipe_id> --offline\n')
+    mirror.close()
+
+if __name__ == "__main__":
+    run_cli(main)
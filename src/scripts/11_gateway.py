@@ -0,0 +1,42 @@
+import sys
+import os
+import argparse
+
+# Add src directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from client import run_cli
+from gateway import DEFAULT_CACHE, DEFAULT_CONCURRENCY, DEFAULT_HOST, DEFAULT_PORT, create_gateway
+from utils import header, label
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local gateway that fronts the Recipe API for many workers')
+    parser.add_argument('--host', type=str, default=DEFAULT_HOST, help=f'Interface to listen on (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port to listen on (default: {DEFAULT_PORT})')
+    parser.add_argument('--upstream', type=str, help='API base URL (default: RECIPE_API_UPSTREAM or https://recipe-api.com)')
+    parser.add_argument('--cache', type=str, default=DEFAULT_CACHE, help=f'Shared response cache file (default: {DEFAULT_CACHE})')
+    parser.add_argument('--no_cache', action='store_true', help='Disable the response cache')
+    parser.add_argument('--rate_limit', type=float, help='Global upstream requests per second (default: RECIPE_API_RATE_LIMIT)')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Upstream connections in use at once')
+    args = parser.parse_args()
+
+    rate_limit = args.rate_limit or (float(os.environ['RECIPE_API_RATE_LIMIT']) if os.getenv('RECIPE_API_RATE_LIMIT') else None)
+    gateway = create_gateway(
+        None if args.no_cache else args.cache,
+        upstream=args.upstream,
+        rate_limit=rate_limit,
+        concurrency=args.concurrency,
+    )
+
+    header('Recipe API Gateway')
+    label('Listening', f'http://{args.host}:{args.port}')
+    label('Upstream', gateway.client.base_url)
+    label('Cache', 'off' if args.no_cache else args.cache)
+    label('Rate limit', f'{rate_limit:g}/s' if rate_limit else 'none')
+    print(f'\n>> Point workers at it: RECIPE_API_BASE_URL=http://{args.host}:{args.port}')
+    print(f'>> Stats: http://{args.host}:{args.port}/gateway/stats  Metrics: /metrics\n', flush=True)
+
+    gateway.run(args.host, args.port, print=None)
+
+if __name__ == "__main__":
+    run_cli(main)
@@ -0,0 +1,51 @@
+import sys
+import os
+import argparse
+import time
+
+# Add src directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from client import run_cli
+from mirror import Mirror
+from render import Output
+from similarity import DEFAULT_NEIGHBOURS, local_similarity
+from utils import header, label, print_recipe_summary, warning
+
+def main():
+    parser = argparse.ArgumentParser(description='Find recipes similar to one in the local mirror (no API calls)')
+    parser.add_argument('--id', type=str, required=True, help='Recipe ID')
+    parser.add_argument('--k', type=int, default=5, help='How many similar recipes to show')
+    parser.add_argument('--approximate', action='store_true', help='Use the LSH index instead of an exact scan (only if not precomputed)')
+    parser.add_argument('--processes', type=int, help='Worker processes when neighbour lists are rebuilt (default: one per CPU)')
+    parser.add_argument('--index', type=str, help='Index file (default: RECIPE_API_SIMILARITY_INDEX or .recipe_similarity.npz)')
+    parser.add_argument('--db', type=str, help='Mirror file (default: RECIPE_API_MIRROR or .recipe_mirror.sqlite3)')
+    args = parser.parse_args()
+
+    mirror = Mirror(args.db)
+    start = time.perf_counter()
+    index = local_similarity(mirror, args.index, k=max(args.k, DEFAULT_NEIGHBOURS), processes=args.processes)
+    elapsed = time.perf_counter() - start
+
+    with Output():
+        header('More Like This')
+        if args.id not in index.row_of:
+            warning(f'[X] {args.id} is not in the mirror. Sync it with: python src/scripts/09_sync.py\n')
+            return
+        label('Index', f"{len(index):,} recipes, loaded in {elapsed * 1000:.0f}ms")
+        recipe = (mirror.recipes_by_id([args.id]) or [mirror.full_recipe(args.id)])[0]
+        label('Recipe', f"{recipe['name']} ({recipe['cuisine']})")
+        print()
+
+        similar = index.similar(args.id, args.k, approximate=args.approximate)
+        by_id = {r['id']: r for r in mirror.recipes_by_id(recipe_id for recipe_id, _ in similar)}
+        for recipe_id, score in similar:
+            if recipe_id in by_id:
+                label('Similarity', f'{score:.2f}')
+                print_recipe_summary(by_id[recipe_id])
+
+        print('>> Similarity uses ingredients of recipes fetched with 10_prefetch.py; others match on cuisine, nutrition and time.\n')
+    mirror.close()
+
+if __name__ == "__main__":
+    run_cli(main)
@@ -0,0 +1,54 @@
+import sys
+import os
+import argparse
+
+# Add src directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from client import run_cli
+from export import DEFAULT_PART_SIZE, EXPORT_FORMATS, CatalogExport
+from utils import header, label, divider, success, warning
+
+def print_progress(rows):
+    print('  ' + ' | '.join(f"{name} {count:,}" for name, count in rows.items() if count))
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the catalog as flat relational tables (csv, jsonl or parquet)')
+    parser.add_argument('--out', type=str, help='Output directory (default: RECIPE_API_EXPORT_DIR or recipe_export)')
+    parser.add_argument('--format', type=str, default='csv', choices=EXPORT_FORMATS, help='File format of the tables')
+    parser.add_argument('--full', action='store_true', help='Export full recipes with ingredients, instructions and equipment (1 credit each)')
+    parser.add_argument('--max_items', type=int, help='Export at most this many recipes (and ingredients)')
+    parser.add_argument('--processes', type=int, help='Worker processes that flatten and write parts (default: one per CPU)')
+    parser.add_argument('--part_size', type=int, default=DEFAULT_PART_SIZE, help='Items per part file')
+    parser.add_argument('--no_compress', action='store_true', help='Write plain csv/jsonl instead of gzip')
+    args = parser.parse_args()
+
+    header('Catalog Export')
+    try:
+        export = CatalogExport(
+            args.out, fmt=args.format, full=args.full, compress=not args.no_compress, part_size=args.part_size,
+            processes=args.processes, max_items=args.max_items, report=print_progress,
+        )
+    except ValueError as e:
+        warning(f'[X] {e}\n')
+        return
+    label('Output', f"{export.out_dir} ({args.format}, {export.processes} process{'es' if export.processes > 1 else ''})")
+    if args.full:
+        warning('!! Fetching every full recipe costs 1 credit each; use --max_items to cap it !!')
+    print()
+
+    manifest = export.run()
+
+    print()
+    divider()
+    for name, table in manifest['tables'].items():
+        label(name, f"{table['rows']:,} rows in {len(table['parts'])} part{'s' if len(table['parts']) != 1 else ''}")
+    rows = sum(table['rows'] for table in manifest['tables'].values())
+    label('Total', f"{rows:,} rows, {manifest['bytes'] / 1e6:.1f} MB in {manifest['seconds']:.1f}s "
+                   f"({rows / max(manifest['seconds'], 1e-9):,.0f} rows/s)")
+    if manifest['missing_recipes']:
+        label('Removed since listing', f"{manifest['missing_recipes']:,}")
+    success(f"\nWrote {os.path.join(export.out_dir, 'manifest.json')}\n")
+
+if __name__ == "__main__":
+    run_cli(main)
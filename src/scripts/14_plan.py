@@ -0,0 +1,108 @@
+import sys
+import os
+import argparse
+import time
+
+# Add src directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from client import run_cli
+from mirror import Mirror
+from render import FORMATS, RECIPE_COLUMNS, Output
+from utils import header, subheader, label, divider, highlight, format_duration, warning
+
+# --format=csv columns: where each recipe sits in the plan, then the usual recipe columns
+PLAN_RECIPE_COLUMNS = {'day': lambda r: r['day'], 'meal': lambda r: r['meal'], **RECIPE_COLUMNS}
+
+def print_meal(recipe):
+    if recipe['meal'] == 1:
+        subheader(f"Day {recipe['day']}")
+    nutrition = recipe['nutrition_summary']
+    print(f"  {highlight(recipe['name'])} ({recipe['category']} | {recipe['cuisine']}, {recipe['id']})")
+    print(f"    {round(nutrition['calories'])} kcal, {nutrition['protein_g']:g}g protein, "
+          f"{nutrition['carbohydrates_g']:g}g carbs, {nutrition['fat_g']:g}g fat, "
+          f"{format_duration(recipe['meta']['total_time'])}")
+
+def parse_list(value):
+    return [item.strip() for item in value.split(',') if item.strip()] if value else []
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a meal plan from the local mirror under daily nutrition bounds (no API calls)')
+    parser.add_argument('--days', type=int, default=7, help='Days to plan')
+    parser.add_argument('--meals', type=int, default=3, help='Recipes per day')
+    parser.add_argument('--min_calories', type=int, help='Minimum calories per day')
+    parser.add_argument('--max_calories', type=int, help='Maximum calories per day')
+    parser.add_argument('--min_protein', type=int, help='Minimum protein per day in grams')
+    parser.add_argument('--max_carbs', type=int, help='Maximum carbohydrates per day in grams')
+    parser.add_argument('--max_fat', type=int, help='Maximum fat per day in grams')
+    parser.add_argument('--dietary', type=str, help='Dietary flags every recipe must carry, comma-separated')
+    parser.add_argument('--max_time', type=int, help='Maximum total time per recipe in minutes')
+    parser.add_argument('--day_time', type=int, help='Maximum total time of a day\'s recipes in minutes')
+    parser.add_argument('--max_per_cuisine', type=int, help='Recipes of one cuisine in the whole plan')
+    parser.add_argument('--max_per_category', type=int, help='Recipes of one category in a day')
+    parser.add_argument('--exclude', type=str, help='Recipe IDs to leave out, comma-separated (e.g. last week\'s plan)')
+    parser.add_argument('--db', type=str, help='Mirror file (default: RECIPE_API_MIRROR or .recipe_mirror.sqlite3)')
+    parser.add_argument('--format', choices=FORMATS, default='text', help='text, or jsonl/csv records on stdout (messages go to stderr)')
+    args = parser.parse_args()
+
+    # Imported here so the other scripts (and --help) don't load NumPy
+    from frame import RecipeFrame
+    from planner import MealPlanner
+
+    mirror = Mirror(args.db)
+    start = time.perf_counter()
+    frame = RecipeFrame.from_recipes(mirror.recipes())
+    loaded = time.perf_counter() - start
+
+    with Output(args.format, PLAN_RECIPE_COLUMNS) as out:
+        header('Meal Plan')
+        if not len(frame):
+            warning('[X] The mirror is empty. Sync it with: python src/scripts/09_sync.py\n')
+            return
+
+        daily = {
+            'calories': (args.min_calories, args.max_calories),
+            'protein_g': (args.min_protein, None),
+            'carbohydrates_g': (None, args.max_carbs),
+            'fat_g': (None, args.max_fat),
+            'total_time': (None, args.day_time and args.day_time * 60),
+        }
+        start = time.perf_counter()
+        try:
+            plan = MealPlanner(frame).plan(
+                days=args.days, meals=args.meals, daily=daily, dietary=parse_list(args.dietary),
+                max_time=args.max_time and args.max_time * 60, max_per_cuisine=args.max_per_cuisine,
+                max_per_category=args.max_per_category, exclude=parse_list(args.exclude),
+            )
+        except ValueError as e:
+            warning(f'[X] {e}\n')
+            return
+        elapsed = time.perf_counter() - start
+
+        label('Pool', f"{len(frame):,} recipes, loaded in {loaded * 1000:.0f}ms; "
+                      f"{plan.candidates:,} candidates searched in {elapsed * 1000:.0f}ms")
+        label('Score', f"{plan.score:.2f} of at most {plan.bound:.2f} (protein up, time down)")
+        if not plan.feasible:
+            warning('!! No plan found that meets every bound; the closest one is shown !!')
+        print()
+
+        ids = [str(frame.ids[row]) for rows in plan.days for row in rows]
+        by_id = {r['id']: r for r in mirror.recipes_by_id(ids)}
+        meals = []
+        for day, rows in enumerate(plan.days, 1):
+            for meal, row in enumerate(rows, 1):
+                meals.append({'day': day, 'meal': meal, **by_id[str(frame.ids[row])]})
+
+        def print_plan_meal(recipe):
+            print_meal(recipe)
+            if recipe['meal'] == args.meals:
+                calories, protein, carbs, fat, seconds = plan.totals[recipe['day'] - 1]
+                label('Day total', f"{round(calories)} kcal, {protein:.0f}g protein, {carbs:.0f}g carbs, "
+                                   f"{fat:.0f}g fat, {seconds / 60:.0f} min")
+                divider()
+
+        out.emit(meals, print_plan_meal)
+    mirror.close()
+
+if __name__ == "__main__":
+    run_cli(main)
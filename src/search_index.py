@@ -0,0 +1,323 @@
+import hashlib
+import json
+import os
+import re
+from bisect import bisect_left
+
+import numpy as np
+
+DEFAULT_INDEX_PATH = '.recipe_search.npz'
+
+# How much a term occurrence counts for, by field
+FIELD_WEIGHTS = {'name': 3.0, 'ingredients': 2.0, 'description': 1.0}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Most prefix expansions considered for the last query token
+MAX_PREFIX_TERMS = 32
+
+STOPWORDS = frozenset('a an and the of with for in on to or at by from is it'.split())
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+def tokenize(text):
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+def recipe_fields(recipe):
+    """Text per field for a list-page or full recipe."""
+    ingredients = [
+        item['name']
+        for group in recipe.get('ingredients') or []
+        for item in group.get('items', [])
+    ]
+    return {
+        'name': recipe.get('name') or '',
+        'description': recipe.get('description') or '',
+        'ingredients': ' '.join(ingredients),
+    }
+
+class SearchIndex:
+    """
+    BM25 full-text index over recipe names, descriptions and ingredient names.
+
+    Postings are stored in CSR form (one NumPy array of doc numbers and one
+    of weighted term frequencies, sliced per term), so scoring a query is a
+    handful of vectorized operations. Adding a recipe that is already
+    indexed replaces it, and unchanged recipes are skipped, so the index can
+    be refreshed incrementally from the mirror. `save()`/`load()` persist it
+    as a single .npz file.
+
+        index = SearchIndex.load_or_create()
+        index.update(mirror.recipes())
+        index.search('garlic chick', prefix=True)   # -> [(recipe_id, score), ...]
+    """
+
+    def __init__(self):
+        # Frozen CSR postings
+        self.vocab = {}
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.post_docs = np.zeros(0, dtype=np.int32)
+        self.post_tfs = np.zeros(0, dtype=np.float32)
+        # Postings added since the last freeze: term -> ([docs], [tfs])
+        self.pending = {}
+
+        self.doc_ids = []
+        self.doc_hashes = []
+        self.doc_lengths = []
+        self.deleted = []
+        self.by_id = {}
+        # Fingerprint of the sources the index was last brought in line with, if any
+        self.version = None
+        self._sorted_terms = None
+        self._stats = None
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def add(self, recipe):
+        """Index a recipe, replacing an older version with the same ID. Returns True if indexed."""
+        fields = recipe_fields(recipe)
+        digest = hashlib.blake2b(repr(sorted(fields.items())).encode(), digest_size=8).hexdigest()
+
+        old = self.by_id.get(recipe['id'])
+        if old is not None:
+            if self.doc_hashes[old] == digest:
+                return False
+            self.deleted[old] = True
+
+        frequencies = {}
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(text):
+                frequencies[token] = frequencies.get(token, 0.0) + weight
+
+        doc = len(self.doc_ids)
+        self.doc_ids.append(recipe['id'])
+        self.doc_hashes.append(digest)
+        self.doc_lengths.append(sum(frequencies.values()))
+        self.deleted.append(False)
+        self.by_id[recipe['id']] = doc
+
+        for term, tf in frequencies.items():
+            docs, tfs = self.pending.setdefault(term, ([], []))
+            docs.append(doc)
+            tfs.append(tf)
+        self._sorted_terms = None
+        self._stats = None
+        return True
+
+    def add_many(self, recipes):
+        """Index many recipes; returns how many were new or changed."""
+        return sum(self.add(recipe) for recipe in recipes)
+
+    def remove(self, recipe_id):
+        doc = self.by_id.pop(recipe_id, None)
+        if doc is not None:
+            self.deleted[doc] = True
+            self._stats = None
+
+    def update(self, recipes):
+        """
+        Make the index match `recipes` exactly: index new and changed ones and
+        remove any no longer present. Returns (indexed, removed).
+        """
+        seen = set()
+        indexed = 0
+        for recipe in recipes:
+            seen.add(recipe['id'])
+            indexed += self.add(recipe)
+        gone = [recipe_id for recipe_id in self.by_id if recipe_id not in seen]
+        for recipe_id in gone:
+            self.remove(recipe_id)
+        return indexed, len(gone)
+
+    def freeze(self):
+        """Merge pending postings into the CSR arrays (done automatically before searching)."""
+        if not self.pending:
+            return
+
+        terms = list(self.vocab) + [t for t in self.pending if t not in self.vocab]
+        doc_parts, tf_parts, offsets = [], [], [0]
+        for term in terms:
+            size = 0
+            index = self.vocab.get(term)
+            if index is not None:
+                start, stop = self.offsets[index], self.offsets[index + 1]
+                doc_parts.append(self.post_docs[start:stop])
+                tf_parts.append(self.post_tfs[start:stop])
+                size += stop - start
+            docs, tfs = self.pending.get(term, ((), ()))
+            doc_parts.append(np.array(docs, dtype=np.int32))
+            tf_parts.append(np.array(tfs, dtype=np.float32))
+            offsets.append(offsets[-1] + size + len(docs))
+
+        self.vocab = {term: i for i, term in enumerate(terms)}
+        self.offsets = np.array(offsets, dtype=np.int64)
+        self.post_docs = np.concatenate(doc_parts)
+        self.post_tfs = np.concatenate(tf_parts)
+        self.pending = {}
+
+    def _terms_with_prefix(self, prefix):
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self.vocab)
+        terms = []
+        for term in self._sorted_terms[bisect_left(self._sorted_terms, prefix):]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        if len(terms) > MAX_PREFIX_TERMS:
+            df = lambda t: self.offsets[self.vocab[t] + 1] - self.offsets[self.vocab[t]]
+            terms = sorted(terms, key=df, reverse=True)[:MAX_PREFIX_TERMS]
+        return terms
+
+    def _doc_stats(self):
+        """Live-document mask, live count and BM25 length normalization, cached between changes."""
+        if self._stats is None:
+            lengths = np.asarray(self.doc_lengths, dtype=np.float32)
+            live = ~np.asarray(self.deleted, dtype=bool)
+            count = int(live.sum())
+            avgdl = float(lengths[live].mean()) if count else 1.0
+            self._stats = live, count, K1 * (1 - B + B * lengths / avgdl)
+        return self._stats
+
+    def search(self, query, limit=10, prefix=False):
+        """
+        Return up to `limit` (recipe_id, score) pairs, best first.
+
+        With `prefix=True` the last query token also matches longer terms
+        ("chick" finds "chicken"), for typeahead.
+        """
+        self.freeze()
+        tokens = tokenize(query)
+        if not tokens or not self.by_id:
+            return []
+
+        groups = [[t] for t in tokens[:-1]]
+        groups.append(self._terms_with_prefix(tokens[-1]) if prefix else [tokens[-1]])
+
+        live, count, norm = self._doc_stats()
+        scores = np.zeros(len(self.doc_ids), dtype=np.float32)
+        for group in groups:
+            # A prefix group scores each doc by its best-matching expansion
+            best = scores if len(group) == 1 else np.zeros_like(scores)
+            for term in group:
+                index = self.vocab.get(term)
+                if index is None:
+                    continue
+                start, stop = self.offsets[index], self.offsets[index + 1]
+                docs = self.post_docs[start:stop]
+                tfs = self.post_tfs[start:stop]
+                df = stop - start if count == len(live) else int(live[docs].sum())
+                idf = np.log(1 + (count - df + 0.5) / (df + 0.5))
+                contribution = idf * tfs * (K1 + 1) / (tfs + norm[docs])
+                # Each doc appears once per posting list, so plain fancy indexing is safe
+                if best is scores:
+                    scores[docs] += contribution
+                else:
+                    best[docs] = np.maximum(best[docs], contribution)
+            if best is not scores:
+                scores += best
+
+        scores[~live] = 0
+        limit = min(limit, int((scores > 0).sum()))
+        if limit == 0:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(self.doc_ids[doc], float(scores[doc])) for doc in top]
+
+    def save(self, path=None):
+        """Write the index to a single .npz file, dropping removed documents."""
+        self.compact()
+        path = path or os.getenv('RECIPE_API_SEARCH_INDEX') or DEFAULT_INDEX_PATH
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                vocab=np.array(list(self.vocab), dtype=str),
+                offsets=self.offsets,
+                post_docs=self.post_docs,
+                post_tfs=self.post_tfs,
+                doc_ids=np.array(self.doc_ids, dtype=str),
+                doc_hashes=np.array(self.doc_hashes, dtype=str),
+                doc_lengths=np.asarray(self.doc_lengths, dtype=np.float32),
+                version=np.array(self.version or '', dtype=str),
+            )
+
+    @classmethod
+    def load(cls, path=None):
+        path = path or os.getenv('RECIPE_API_SEARCH_INDEX') or DEFAULT_INDEX_PATH
+        index = cls()
+        with np.load(path) as data:
+            index.vocab = {term: i for i, term in enumerate(data['vocab'].tolist())}
+            index.offsets = data['offsets']
+            index.post_docs = data['post_docs']
+            index.post_tfs = data['post_tfs']
+            index.doc_ids = data['doc_ids'].tolist()
+            index.doc_hashes = data['doc_hashes'].tolist()
+            index.doc_lengths = data['doc_lengths'].tolist()
+            index.version = (str(data['version']) or None) if 'version' in data else None
+        index.deleted = [False] * len(index.doc_ids)
+        index.by_id = {recipe_id: doc for doc, recipe_id in enumerate(index.doc_ids)}
+        return index
+
+    @classmethod
+    def load_or_create(cls, path=None):
+        path = path or os.getenv('RECIPE_API_SEARCH_INDEX') or DEFAULT_INDEX_PATH
+        return cls.load(path) if os.path.exists(path) else cls()
+
+    def compact(self):
+        """Renumber documents to drop removed ones from the postings."""
+        self.freeze()
+        deleted = np.asarray(self.deleted, dtype=bool)
+        if not deleted.any():
+            return
+
+        keep = ~deleted
+        renumber = np.cumsum(keep, dtype=np.int64) - 1
+        live_postings = keep[self.post_docs]
+        # Live postings per term; terms may already have empty posting lists
+        terms = np.repeat(np.arange(len(self.offsets) - 1), np.diff(self.offsets))
+        counts = np.bincount(terms[live_postings], minlength=len(self.offsets) - 1)
+
+        self.post_docs = renumber[self.post_docs[live_postings]].astype(np.int32)
+        self.post_tfs = self.post_tfs[live_postings]
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        self.doc_ids = [d for d, dead in zip(self.doc_ids, self.deleted) if not dead]
+        self.doc_hashes = [h for h, dead in zip(self.doc_hashes, self.deleted) if not dead]
+        self.doc_lengths = [n for n, dead in zip(self.doc_lengths, self.deleted) if not dead]
+        self.deleted = [False] * len(self.doc_ids)
+        self.by_id = {recipe_id: doc for doc, recipe_id in enumerate(self.doc_ids)}
+        self._stats = None
+
+def local_index(mirror, cache=None, path=None):
+    """
+    Load the saved index, bring it in line with the mirror and save it back
+    if anything changed. Full recipes the mirror (or its RecipeStore) holds,
+    or found in `cache` (a ResponseCache), are indexed in place of their
+    list-page summaries, adding ingredient names. While the mirror's and the
+    cache's versions are those saved with the index, it is returned as
+    loaded, without reading any recipe.
+    """
+    version = mirror.version()
+    if cache is not None:
+        version = f"{version}:{cache.version('/api/v1/recipes/')}"
+    index = SearchIndex.load_or_create(path)
+    if index.version == version:
+        return index
+
+    full = {}
+    if cache is not None:
+        for body in cache.bodies('/api/v1/recipes/'):
+            recipe = json.loads(body).get('data')
+            if isinstance(recipe, dict) and 'id' in recipe:
+                full[recipe['id']] = recipe
+    # Prefetched recipes take precedence over cached responses
+    for recipe in mirror.full_recipes():
+        full[recipe['id']] = recipe
+
+    index.update(full.get(r['id'], r) for r in mirror.recipes())
+    index.version = version
+    index.save(path)
+    return index
@@ -0,0 +1,409 @@
+import hashlib
+import os
+from multiprocessing import Pool
+
+import numpy as np
+
+from duration import parse_duration
+
+DEFAULT_INDEX_PATH = '.recipe_similarity.npz'
+DEFAULT_NEIGHBOURS = 10
+
+# Numeric features compared after standardizing across the catalog
+FEATURES = ('calories', 'protein_g', 'carbohydrates_g', 'fat_g', 'total_time')
+
+# Share of the score from shared ingredients (and tags) versus nutrition/time
+INGREDIENT_WEIGHT = 0.7
+# Weight of cuisine/category/dietary tags relative to an ingredient's IDF
+TAG_WEIGHT = 0.5
+
+# MinHash LSH for approximate queries: BANDS x ROWS hash functions. Recipes
+# sharing all ROWS values of any band become candidates, so a pair with
+# ingredient-set Jaccard s is found with probability 1 - (1 - s^ROWS)^BANDS.
+BANDS = 16
+ROWS = 4
+# Members read from any one bucket, so very common ingredient sets stay cheap
+MAX_BUCKET = 256
+_PRIME = (1 << 31) - 1
+
+# Queries scored together in one (batch x recipes) matrix
+QUERY_BATCH = 64
+
+def recipe_terms(recipe):
+    """Ingredient keys (ID, else lowercased name) and cuisine/category/dietary tags of a full or list-page recipe."""
+    ingredients = {
+        item.get('id') or (item.get('name') or '').lower()
+        for group in recipe.get('ingredients') or ()
+        for item in group.get('items', ())
+    }
+    ingredients.discard('')
+    tags = {f'{field}:{recipe[field]}' for field in ('cuisine', 'category') if recipe.get(field)}
+    tags.update(f'flag:{flag}' for flag in (recipe.get('dietary') or {}).get('flags', ()))
+    return ingredients, tags
+
+def recipe_features(recipe):
+    """FEATURES of a recipe (per-serving nutrition, total time in minutes); None where missing."""
+    nutrition = (recipe.get('nutrition') or {}).get('per_serving') or recipe.get('nutrition_summary') or {}
+    seconds = parse_duration((recipe.get('meta') or {}).get('total_time'))
+    return [nutrition.get(name) for name in FEATURES[:-1]] + [None if seconds is None else seconds / 60]
+
+def _gather(offsets, rows):
+    """Positions of the CSR entries of `rows`, concatenated, and the length of each row's run."""
+    starts = offsets[rows]
+    lengths = offsets[rows + 1] - starts
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64), lengths
+    shift = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+    return np.arange(total, dtype=np.int64) + shift, lengths
+
+class SimilarityIndex:
+    """
+    "More like this" index over a catalog of recipes.
+
+    Each recipe is a sparse, L2-normalized TF-IDF vector over its
+    ingredients plus cuisine/category/dietary tags (CSR rows, with a
+    transposed posting list per term), and a dense row of standardized
+    nutrition and total-time features. The similarity of two recipes is
+
+        INGREDIENT_WEIGHT * cosine(terms) + (1 - INGREDIENT_WEIGHT) / (1 + mean squared feature distance)
+
+    Exact queries score a batch of recipes against the whole catalog with
+    one scatter-add over the postings and one matrix product. Approximate
+    queries only rerank candidates sharing a MinHash LSH band, for large
+    catalogs. `precompute()` stores every recipe's neighbour list, spread
+    over a process pool, and `save()`/`load()` keep it in one .npz file.
+
+        index = SimilarityIndex.from_recipes(recipes)
+        index.similar('rec_0000042', k=5)     # -> [(recipe_id, score), ...]
+    """
+
+    def __init__(self, ids, vocab, offsets, terms, weights, features, digest=None,
+                 neighbours=None, neighbour_scores=None, ingredient_weight=INGREDIENT_WEIGHT, version=None):
+        self.ids = ids
+        self.vocab = vocab
+        self.offsets = offsets
+        self.terms = terms
+        self.weights = weights
+        self.features = features
+        self.digest = digest
+        self.neighbours = neighbours
+        self.neighbour_scores = neighbour_scores
+        self.ingredient_weight = ingredient_weight
+        # Mirror.version() of the catalog the index was built from, if any
+        self.version = version
+        self.row_of = {recipe_id: row for row, recipe_id in enumerate(ids.tolist())}
+        self._postings = None
+        self._bands = None
+        self._squared_norms = None
+
+    @classmethod
+    def from_recipes(cls, recipes, ingredient_weight=INGREDIENT_WEIGHT):
+        ids, rows, features = [], [], []
+        term_of = {}
+        tag_terms = set()
+        for recipe in recipes:
+            ingredients, tags = recipe_terms(recipe)
+            codes = []
+            for term in sorted(ingredients) + sorted(tags):
+                code = term_of.get(term)
+                if code is None:
+                    code = term_of[term] = len(term_of)
+                codes.append(code)
+            tag_terms.update(term_of[tag] for tag in tags)
+            ids.append(recipe['id'])
+            rows.append(codes)
+            features.append(recipe_features(recipe))
+
+        count = len(ids)
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum([len(codes) for codes in rows], out=offsets[1:])
+        terms = np.fromiter((code for codes in rows for code in codes), dtype=np.int32, count=int(offsets[-1]))
+
+        # Binary TF-IDF, tags damped, each row scaled to unit length
+        df = np.bincount(terms, minlength=len(term_of))
+        idf = np.log((1 + count) / (1 + df)) + 1
+        if tag_terms:
+            idf[list(tag_terms)] *= TAG_WEIGHT
+        weights = idf[terms]
+        owner = np.repeat(np.arange(count), np.diff(offsets))
+        norms = np.sqrt(np.bincount(owner, weights ** 2, minlength=count))
+        weights = (weights / norms[owner]).astype(np.float32)
+
+        # Standardized features; a missing value sits at the catalog mean
+        values = np.array(features, dtype=np.float64).reshape(count, len(FEATURES))
+        values[:, -1] = np.log1p(values[:, -1])
+        with np.errstate(invalid='ignore'):
+            mean = np.nanmean(values, axis=0) if count else np.zeros(len(FEATURES))
+            std = np.nanstd(values, axis=0) if count else np.ones(len(FEATURES))
+        values = (values - np.nan_to_num(mean)) / np.where(np.nan_to_num(std) > 0, std, 1)
+        values = np.nan_to_num(values, nan=0.0).astype(np.float32)
+
+        ids = np.array(ids, dtype=str)
+        digest = hashlib.blake2b(digest_size=16)
+        for array in (ids, offsets, terms, values):
+            digest.update(array.tobytes())
+        digest.update('\n'.join(term_of).encode())
+        return cls(ids, list(term_of), offsets, terms, weights, values, digest.hexdigest(),
+                   ingredient_weight=ingredient_weight)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _posting_lists(self):
+        """Term -> recipes (column-major) layout of the sparse vectors, built on first use."""
+        if self._postings is None:
+            order = np.argsort(self.terms, kind='stable')
+            owner = np.repeat(np.arange(len(self), dtype=np.int32), np.diff(self.offsets))
+            offsets = np.zeros(len(self.vocab) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.terms, minlength=len(self.vocab)), out=offsets[1:])
+            self._postings = offsets, owner[order], self.weights[order]
+        return self._postings
+
+    def _feature_similarity(self, rows, candidates=None):
+        query = self.features[rows]
+        if candidates is None:
+            if self._squared_norms is None:
+                self._squared_norms = (self.features ** 2).sum(1)
+            distance = query @ self.features.T
+            distance *= -2
+            distance += self._squared_norms
+            distance += self._squared_norms[rows][:, None]
+        else:
+            distance = ((self.features[candidates] - query) ** 2).sum(1)
+        np.maximum(distance, 0, out=distance)
+        distance /= len(FEATURES)
+        distance += 1
+        return np.reciprocal(distance, out=distance)
+
+    def _score_all(self, rows):
+        """(len(rows) x recipes) similarity matrix for a batch of query rows."""
+        post_offsets, post_docs, post_weights = self._posting_lists()
+        cosine = np.zeros((len(rows), len(self)), dtype=np.float32)
+        for i, row in enumerate(rows):
+            scores = cosine[i]
+            start, end = self.offsets[row], self.offsets[row + 1]
+            for term, weight in zip(self.terms[start:end].tolist(), self.weights[start:end].tolist()):
+                low, high = post_offsets[term], post_offsets[term + 1]
+                # Each recipe appears once per posting list, so plain fancy indexing is safe
+                scores[post_docs[low:high]] += weight * post_weights[low:high]
+
+        weight = self.ingredient_weight
+        cosine *= weight
+        cosine += (1 - weight) * self._feature_similarity(rows)
+        return cosine
+
+    def top_k(self, rows, k=DEFAULT_NEIGHBOURS, approximate=False):
+        """
+        Nearest neighbours of each row in `rows` (excluding itself): arrays
+        of row numbers and scores, both (len(rows) x k), best first. Rows
+        with fewer than k other recipes are padded with -1 and -inf.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        found = np.full((len(rows), k), -1, dtype=np.int32)
+        scores = np.full((len(rows), k), -np.inf, dtype=np.float32)
+        if approximate:
+            exact = []
+            for i, row in enumerate(rows):
+                if not self._approximate(row, k, found[i], scores[i]):
+                    exact.append(i)
+            rows_left = np.array(exact, dtype=np.int64)
+        else:
+            rows_left = np.arange(len(rows))
+
+        for start in range(0, len(rows_left), QUERY_BATCH):
+            batch = rows_left[start:start + QUERY_BATCH]
+            matrix = self._score_all(rows[batch])
+            matrix[np.arange(len(batch)), rows[batch]] = -np.inf
+            take = min(k, len(self) - 1)
+            if take <= 0:
+                continue
+            picked = np.argpartition(-matrix, take - 1, axis=1)[:, :take]
+            picked_scores = np.take_along_axis(matrix, picked, axis=1)
+            order = np.argsort(-picked_scores, axis=1, kind='stable')
+            found[batch, :take] = np.take_along_axis(picked, order, axis=1)
+            scores[batch, :take] = np.take_along_axis(picked_scores, order, axis=1)
+        return found, scores
+
+    def _lsh_bands(self):
+        """Per band: sorted bucket keys and the recipe rows in that order. Built on first use."""
+        if self._bands is None:
+            rng = np.random.default_rng(0)
+            a = rng.integers(1, _PRIME, size=BANDS * ROWS, dtype=np.int64)
+            b = rng.integers(0, _PRIME, size=BANDS * ROWS, dtype=np.int64)
+            mix = rng.integers(1, 1 << 62, size=ROWS, dtype=np.int64).astype(np.uint64) | np.uint64(1)
+
+            count = len(self)
+            signatures = np.full((count, BANDS * ROWS), _PRIME, dtype=np.int64)
+            nonempty = np.flatnonzero(np.diff(self.offsets))
+            # Hash the terms a chunk of recipes at a time to bound the (entries x hashes) matrix
+            for start in range(0, len(nonempty), 8192):
+                rows = nonempty[start:start + 8192]
+                positions, lengths = _gather(self.offsets, rows)
+                hashed = (self.terms[positions].astype(np.int64)[:, None] * a + b) % _PRIME
+                starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+                signatures[rows] = np.minimum.reduceat(hashed, starts, axis=0)
+
+            keys = (signatures.reshape(count, BANDS, ROWS).astype(np.uint64) * mix).sum(axis=2, dtype=np.uint64)
+            keys[np.diff(self.offsets) == 0] = np.uint64(0)
+            order = np.argsort(keys, axis=0, kind='stable')
+            self._bands = np.take_along_axis(keys, order, axis=0).T.copy(), order.T.astype(np.int32).copy(), keys
+        return self._bands
+
+    def _approximate(self, row, k, found, scores):
+        """Fill one row's neighbours from its LSH candidates; False if there were fewer than k."""
+        sorted_keys, members, keys = self._lsh_bands()
+        if self.offsets[row] == self.offsets[row + 1]:
+            return False
+        candidates = []
+        for band in range(BANDS):
+            key = keys[row, band]
+            low = np.searchsorted(sorted_keys[band], key, side='left')
+            high = min(np.searchsorted(sorted_keys[band], key, side='right'), low + MAX_BUCKET)
+            candidates.append(members[band, low:high])
+        candidates = np.unique(np.concatenate(candidates))
+        candidates = candidates[candidates != row]
+        if len(candidates) < k:
+            return False
+
+        # Exact scores for the candidates only
+        query = np.zeros(len(self.vocab), dtype=np.float32)
+        start, end = self.offsets[row], self.offsets[row + 1]
+        query[self.terms[start:end]] = self.weights[start:end]
+        positions, lengths = _gather(self.offsets, candidates)
+        products = query[self.terms[positions]] * self.weights[positions]
+        cosine = np.zeros(len(candidates), dtype=np.float32)
+        nonempty = lengths > 0
+        cosine[nonempty] = np.add.reduceat(products, np.concatenate([[0], np.cumsum(lengths)[:-1]])[nonempty])
+        weight = self.ingredient_weight
+        similarity = weight * cosine + (1 - weight) * self._feature_similarity([row], candidates)
+
+        picked = np.argpartition(-similarity, k - 1)[:k]
+        picked = picked[np.argsort(-similarity[picked], kind='stable')]
+        found[:] = candidates[picked]
+        scores[:] = similarity[picked]
+        return True
+
+    def similar(self, recipe_id, k=DEFAULT_NEIGHBOURS, approximate=False):
+        """Up to k (recipe_id, score) pairs most like `recipe_id`, best first; precomputed lists are used when long enough."""
+        row = self.row_of.get(recipe_id)
+        if row is None:
+            raise KeyError(recipe_id)
+        if self.neighbours is not None and self.neighbours.shape[1] >= k:
+            found, scores = self.neighbours[row, :k], self.neighbour_scores[row, :k]
+        else:
+            found, scores = (array[0] for array in self.top_k([row], k, approximate))
+        return [(str(self.ids[i]), float(s)) for i, s in zip(found, scores) if i >= 0]
+
+    def precompute(self, k=DEFAULT_NEIGHBOURS, approximate=False, processes=None, chunk=1024):
+        """
+        Compute every recipe's k neighbours into `neighbours` and
+        `neighbour_scores`, chunks of rows spread over `processes` worker
+        processes (default: one per CPU; 1 runs in this process).
+        """
+        count = len(self)
+        self.neighbours = np.full((count, k), -1, dtype=np.int32)
+        self.neighbour_scores = np.full((count, k), -np.inf, dtype=np.float32)
+        jobs = [(start, min(start + chunk, count), k, approximate) for start in range(0, count, chunk)]
+
+        processes = processes or os.cpu_count() or 1
+        if processes == 1 or len(jobs) <= 1:
+            _init_worker(self)
+            results = map(_neighbour_chunk, jobs)
+            pool = None
+        else:
+            # Build the lazily created tables once here, so workers inherit or receive them
+            self._posting_lists()
+            if approximate:
+                self._lsh_bands()
+            pool = Pool(min(processes, len(jobs)), initializer=_init_worker, initargs=(self,))
+            results = pool.imap_unordered(_neighbour_chunk, jobs)
+        try:
+            for start, found, scores in results:
+                self.neighbours[start:start + len(found)] = found
+                self.neighbour_scores[start:start + len(found)] = scores
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        return self.neighbours, self.neighbour_scores
+
+    def save(self, path=None):
+        """Write the index (and any precomputed neighbours) to a single .npz file."""
+        path = path or os.getenv('RECIPE_API_SIMILARITY_INDEX') or DEFAULT_INDEX_PATH
+        arrays = {
+            'ids': self.ids,
+            'vocab': np.array(self.vocab, dtype=str),
+            'offsets': self.offsets,
+            'terms': self.terms,
+            'weights': self.weights,
+            'features': self.features,
+            'digest': np.array(self.digest or '', dtype=str),
+            'ingredient_weight': np.array(self.ingredient_weight),
+            'version': np.array(self.version or '', dtype=str),
+        }
+        if self.neighbours is not None:
+            arrays['neighbours'] = self.neighbours
+            arrays['neighbour_scores'] = self.neighbour_scores
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path=None):
+        path = path or os.getenv('RECIPE_API_SIMILARITY_INDEX') or DEFAULT_INDEX_PATH
+        with np.load(path) as data:
+            return cls(
+                ids=data['ids'],
+                vocab=data['vocab'].tolist(),
+                offsets=data['offsets'],
+                terms=data['terms'],
+                weights=data['weights'],
+                features=data['features'],
+                digest=str(data['digest']) or None,
+                neighbours=data['neighbours'] if 'neighbours' in data else None,
+                neighbour_scores=data['neighbour_scores'] if 'neighbour_scores' in data else None,
+                ingredient_weight=float(data['ingredient_weight']),
+                version=(str(data['version']) or None) if 'version' in data else None,
+            )
+
+_worker_index = None
+
+def _init_worker(index):
+    global _worker_index
+    _worker_index = index
+
+def _neighbour_chunk(job):
+    start, end, k, approximate = job
+    found, scores = _worker_index.top_k(np.arange(start, end), k, approximate)
+    return start, found, scores
+
+def local_similarity(mirror, path=None, k=DEFAULT_NEIGHBOURS, processes=None):
+    """
+    The similarity index of everything in the mirror: full recipes stored
+    by the prefetcher (with ingredients) and list-page recipes (tags,
+    nutrition and time only) for the rest. The saved index is reused while
+    the mirror's version is unchanged, without reading the catalog;
+    otherwise it is rebuilt, and its neighbour lists precomputed and saved
+    unless the rebuilt index turns out identical.
+    """
+    version = mirror.version()
+    path = path or os.getenv('RECIPE_API_SIMILARITY_INDEX') or DEFAULT_INDEX_PATH
+    saved = None
+    if os.path.exists(path):
+        saved = SimilarityIndex.load(path)
+        if saved.neighbours is None or saved.neighbours.shape[1] < k:
+            saved = None
+        elif saved.version == version:
+            return saved
+
+    full = {recipe['id']: recipe for recipe in mirror.full_recipes()}
+    recipes = [full.pop(summary['id'], summary) for summary in mirror.recipes()]
+    recipes.extend(full.values())
+    index = SimilarityIndex.from_recipes(recipes)
+    if saved is not None and saved.digest == index.digest:
+        index = saved
+    else:
+        index.precompute(k, processes=processes)
+    index.version = version
+    index.save(path)
+    return index
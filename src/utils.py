@@ -1,8 +1,11 @@
 import os
 import sys
 
+from duration import humanize_duration
+from render import use_color
+
 # ANSI color codes
-COLORS = {
+ANSI = {
     'reset': '\033[0m',
     'bright': '\033[1m',
     'dim': '\033[2m',
@@ -13,6 +16,14 @@ COLORS = {
     'red': '\033[31m',
 }
 
+def set_color(enabled):
+    """Switch ANSI colors on or off, e.g. when stdout is not the one seen at import."""
+    global COLORS
+    COLORS = dict(ANSI) if enabled else dict.fromkeys(ANSI, '')
+
+# Plain text when piped or redirected
+set_color(use_color())
+
 def header(text):
     print(f"\n{COLORS['bright']}{COLORS['cyan']}=== {text} ==={COLORS['reset']}\n")
 
@@ -41,26 +52,24 @@ def warning(text):
 def format_duration(iso_duration):
     """
     Parse ISO 8601 duration to human-readable format
-    e.g., "PT30M" -> "30 min", "PT1H30M" -> "1h 30m"
+    e.g., "PT30M" -> "30 min", "PT1H30M" -> "1h 30m", "P1DT2H" -> "1d 2h"
     """
-    if not iso_duration.startswith('PT'):
-        return iso_duration
-    
-    import re
-    match = re.match(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?', iso_duration)
-    if not match:
-        return iso_duration
-        
-    hours = int(match.group(1) or 0)
-    minutes = int(match.group(2) or 0)
-    
-    if hours == 0 and minutes == 0:
-        return 'instant'
-    if hours == 0:
-        return f"{minutes} min"
-    if minutes == 0:
-        return f"{hours}h"
-    return f"{hours}h {minutes}m"
+    return humanize_duration(iso_duration)
+
+def print_recipe_summary(recipe):
+    """The block the list scripts print for each list-page recipe."""
+    print(f"{highlight(recipe['name'])}")
+    label('ID', recipe['id'])
+    label('Category', f"{recipe['category']} | {recipe['cuisine']}")
+    label('Difficulty', recipe['difficulty'])
+    label('Time', format_duration(recipe['meta']['total_time']))
+
+    if recipe['dietary']['flags']:
+        label('Dietary', ', '.join(recipe['dietary']['flags'][:4]))
+
+    label('Calories', f"{round(recipe['nutrition_summary']['calories'])} kcal")
+    print(f"  {truncate(recipe['description'], 80)}")
+    divider()
 
 def truncate(text, max_length):
     if len(text) <= max_length:
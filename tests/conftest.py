@@ -0,0 +1,5 @@
+import sys
+import os
+
+# The modules live flat in src/, as the scripts import them
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+import cache as cache_module
+from cache import ResponseCache, cache_key
+from client import RecipeClient
+
+class Response:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.ok = status_code < 400
+        self.text = content.decode()
+
+    def close(self):
+        pass
+
+class Session:
+    """Answers every GET with a recipe body and its ETag, or 304 when the client's validator matches."""
+
+    def __init__(self):
+        self.headers = {}
+        self.calls = []
+        self.body = json.dumps({'data': {'id': 'rec_0000001', 'name': 'Soup'}}).encode()
+        self.etag = '"v1"'
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False):
+        self.calls.append((url, dict(headers or {}), self.headers.get('X-API-Key')))
+        if (headers or {}).get('If-None-Match') == self.etag:
+            return Response(304)
+        return Response(200, self.body, {'ETag': self.etag})
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache_module.time, 'time', lambda: now[0])
+    return now
+
+def make_client(response_cache, api_key='rapi_one', base_url='http://api.test'):
+    client = RecipeClient(api_key=api_key, base_url=base_url, cache=response_cache)
+    client.session = Session()
+    client.session.headers['X-API-Key'] = api_key
+    return client
+
+def test_cache_key_is_scoped_to_server_and_api_key():
+    plain = cache_key('/api/v1/recipes', {'page': 2, 'q': None, 'cuisine': 'Thai'})
+    assert plain == '/api/v1/recipes?cuisine=Thai&page=2'
+    scoped = cache_key('/api/v1/recipes', {'cuisine': 'Thai', 'page': 2}, 'http://api.test', 'rapi_one')
+    assert scoped.startswith(plain + '#')
+    assert 'rapi_one' not in scoped
+    assert scoped == cache_key('/api/v1/recipes', {'page': '2', 'cuisine': 'Thai'}, 'http://api.test', 'rapi_one')
+    assert scoped != cache_key('/api/v1/recipes', {'page': 2, 'cuisine': 'Thai'}, 'http://api.test', 'rapi_two')
+    assert scoped != cache_key('/api/v1/recipes', {'page': 2, 'cuisine': 'Thai'}, 'http://other.test', 'rapi_one')
+
+def test_entries_expire_after_their_ttl(tmp_path, clock):
+    response_cache = ResponseCache(str(tmp_path / 'cache.sqlite3'), ttls={'/api/v1/recipes': 300})
+    response_cache.put('/api/v1/recipes', {'page': 1}, b'{}', etag='"a"')
+    assert response_cache.get('/api/v1/recipes', {'page': 1}).fresh
+    assert response_cache.get('/api/v1/ingredients') is None
+    clock[0] += 301
+    entry = response_cache.get('/api/v1/recipes', {'page': 1})
+    assert (entry.fresh, entry.body, entry.etag) == (False, b'{}', '"a"')
+    response_cache.revalidated(entry, '/api/v1/recipes')
+    assert response_cache.get('/api/v1/recipes', {'page': 1}).fresh
+    assert response_cache.stats()['hits'] == 2
+
+def test_client_serves_fresh_entries_and_revalidates_stale_ones(tmp_path, clock):
+    response_cache = ResponseCache(str(tmp_path / 'cache.sqlite3'))
+    client = make_client(response_cache)
+    endpoint = '/api/v1/recipes/rec_0000001'
+
+    assert client.request(endpoint)['data']['name'] == 'Soup'
+    assert client.request(endpoint)['data']['name'] == 'Soup'
+    assert len(client.session.calls) == 1
+
+    clock[0] += 8 * 24 * 3600
+    assert client.request(endpoint)['data']['name'] == 'Soup'
+    assert client.session.calls[-1][1] == {'If-None-Match': '"v1"'}
+    assert response_cache.revalidations == 1
+    client.request(endpoint)
+    assert len(client.session.calls) == 2
+
+def test_clients_with_other_keys_or_servers_do_not_share_entries(tmp_path, clock):
+    response_cache = ResponseCache(str(tmp_path / 'cache.sqlite3'))
+    endpoint = '/api/v1/recipes/rec_0000001'
+    make_client(response_cache).request(endpoint)
+    for client in (make_client(response_cache, api_key='rapi_two'),
+                   make_client(response_cache, base_url='http://other.test')):
+        client.request(endpoint)
+        assert len(client.session.calls) == 1
+        assert client.session.calls[0][1] == {}
+    same = make_client(response_cache)
+    same.request(endpoint)
+    assert same.session.calls == []
+
+def test_version_changes_with_the_entries_under_a_prefix(tmp_path, clock):
+    response_cache = ResponseCache(str(tmp_path / 'cache.sqlite3'))
+    empty = response_cache.version('/api/v1/recipes/')
+    response_cache.put('/api/v1/recipes/rec_0000001', None, b'{"data": {}}')
+    first = response_cache.version('/api/v1/recipes/')
+    assert first != empty
+    response_cache.put('/api/v1/cuisines', None, b'{}')
+    assert response_cache.get('/api/v1/recipes/rec_0000001').fresh
+    assert response_cache.version('/api/v1/recipes/') == first
+    clock[0] += 1
+    response_cache.put('/api/v1/recipes/rec_0000001', None, b'{"data": {"id": 1}}')
+    assert response_cache.version('/api/v1/recipes/') != first
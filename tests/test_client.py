@@ -0,0 +1,102 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+
+import pytest
+
+import client as client_module
+from client import RateLimitError, RecipeClient, ServerError
+from ratelimit import RetryPolicy
+
+class Response:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.ok = status_code < 400
+        self.text = content.decode()
+
+    def close(self):
+        pass
+
+class FlakySession:
+    """
+    Fails the first `failures` attempts of every request with a 503, or
+    with a 429 carrying `retry_after` (a callable giving the Retry-After
+    header value) when given.
+    """
+
+    def __init__(self, failures, retry_after=None):
+        self.headers = {}
+        self.failures = failures
+        self.retry_after = retry_after
+        self.attempts = {}
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False):
+        key = (url, tuple(sorted((params or {}).items())))
+        self.attempts[key] = self.attempts.get(key, 0) + 1
+        if self.attempts[key] <= self.failures:
+            if self.retry_after is not None:
+                return Response(429, b'{"error": {"code": "RATE_LIMITED", "message": "Slow down"}}',
+                                {'Retry-After': self.retry_after()})
+            return Response(503, b'{"error": {"code": "UNAVAILABLE", "message": "Try again"}}')
+        return Response(200, json.dumps({'data': []}).encode())
+
+def make_client(failures, max_retries=3, retry_after=None, **options):
+    client = RecipeClient(api_key='rapi_test', base_url='http://api.test',
+                          retry=RetryPolicy(max_retries, base_delay=0), **options)
+    client.session = FlakySession(failures, retry_after)
+    return client
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Seconds each retry slept for, without sleeping."""
+    slept = []
+    monkeypatch.setattr(client_module.time, 'sleep', slept.append)
+    return slept
+
+def test_transient_failures_are_retried():
+    client = make_client(failures=2)
+    assert client.request('/api/v1/recipes') == {'data': []}
+    assert client.retries == 2
+
+def test_retries_run_out():
+    client = make_client(failures=10)
+    with pytest.raises(ServerError):
+        client.request('/api/v1/recipes')
+    assert client.retries == 3
+
+def test_retries_are_counted_across_threads():
+    client = make_client(failures=3)
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda page: client.request('/api/v1/recipes', {'page': page}), range(400)))
+    assert client.retries == 400 * 3
+
+def test_429_waits_for_retry_after_seconds(sleeps):
+    client = make_client(failures=2, retry_after=lambda: '7')
+    assert client.request('/api/v1/recipes') == {'data': []}
+    assert sleeps == [7.0, 7.0]
+    assert client.retries == 2
+
+def test_429_waits_until_a_retry_after_date(sleeps):
+    client = make_client(failures=1, retry_after=lambda: formatdate(time.time() + 10, usegmt=True))
+    assert client.request('/api/v1/recipes') == {'data': []}
+    # HTTP dates are whole seconds
+    assert len(sleeps) == 1 and 8.5 <= sleeps[0] <= 10
+
+def test_429_wait_is_capped_and_reported_when_retries_run_out(sleeps):
+    client = make_client(failures=10, max_retries=2, retry_after=lambda: '120')
+    with pytest.raises(RateLimitError) as raised:
+        client.request('/api/v1/recipes')
+    assert sleeps == [30.0, 30.0]
+    assert raised.value.retry_after == 120
+
+def test_429_pauses_the_rate_limiter(sleeps):
+    client = make_client(failures=1, retry_after=lambda: '5', rate_limit=100, burst=10)
+    client.request('/api/v1/recipes')
+    # The backoff, then the bucket holding the retry until the pause ends
+    # (the clock doesn't move while sleeps are recorded)
+    assert sleeps[0] == 5.0 and len(sleeps) == 2 and 4.5 < sleeps[1] <= 5
+    # Every other caller of the bucket waits out the same pause
+    assert 4.5 < client.rate_limiter.reserve() <= 5
@@ -0,0 +1,138 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from async_client import AsyncRecipeClient
+from client import NotFoundError, RecipeClient
+from coalesce import Coalescer
+
+# Concurrent callers per side (threads, and asyncio tasks)
+CALLERS = 8
+RECIPE = '/api/v1/recipes/rec_0000001'
+
+class CountingServer:
+    """Local stand-in API that counts requests and holds every response until `release` is set."""
+
+    def __init__(self, status=200):
+        self.hits = 0
+        self.release = threading.Event()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.hits += 1
+                server.release.wait(5)
+                if status == 200:
+                    body = {'data': {'id': 'rec_0000001', 'name': 'Soup'}}
+                else:
+                    body = {'error': {'code': 'NOT_FOUND', 'message': 'No such recipe'}}
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.release.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+@pytest.fixture
+def server_factory():
+    servers = []
+
+    def start(status=200):
+        servers.append(CountingServer(status))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.close()
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.005)
+
+def burst(server, coalescer):
+    """CALLERS threads and CALLERS asyncio tasks request the same recipe at once; their outcomes."""
+    sync_client = RecipeClient(api_key='rapi_test', base_url=server.url, pool_size=CALLERS, coalescer=coalescer)
+
+    def call_sync():
+        try:
+            return sync_client.request(RECIPE)
+        except NotFoundError as e:
+            return e
+
+    async def call_async():
+        async with AsyncRecipeClient(api_key='rapi_test', base_url=server.url, coalescer=coalescer) as api:
+            return await asyncio.gather(*(api.request(RECIPE) for _ in range(CALLERS)), return_exceptions=True)
+
+    with ThreadPoolExecutor(CALLERS + 1) as pool, sync_client:
+        futures = [pool.submit(call_sync) for _ in range(CALLERS)]
+        tasks = pool.submit(asyncio.run, call_async())
+        # Every caller has joined the one in-flight request before it is answered
+        wait_for(lambda: coalescer.upstream + coalescer.coalesced == 2 * CALLERS)
+        server.release.set()
+        return [future.result() for future in futures] + tasks.result()
+
+def test_threads_and_tasks_share_one_upstream_request(server_factory):
+    server = server_factory()
+    coalescer = Coalescer()
+    results = burst(server, coalescer)
+    assert server.hits == 1
+    assert results == [{'data': {'id': 'rec_0000001', 'name': 'Soup'}}] * (2 * CALLERS)
+    # Each caller decodes its own copy
+    assert len({id(result) for result in results}) == len(results)
+
+def test_an_error_reaches_every_waiter_and_is_not_kept(server_factory):
+    server = server_factory(status=404)
+    coalescer = Coalescer()
+    results = burst(server, coalescer)
+    assert server.hits == 1
+    assert all(isinstance(result, NotFoundError) for result in results)
+
+    with RecipeClient(api_key='rapi_test', base_url=server.url, coalescer=coalescer) as client:
+        with pytest.raises(NotFoundError):
+            client.request(RECIPE)
+    assert server.hits == 2
+
+def test_results_are_kept_for_the_ttl():
+    coalescer = Coalescer(ttl=0.2)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return len(calls)
+
+    async def afetch():
+        return fetch()
+
+    assert coalescer.call('key', fetch) == 1
+    assert coalescer.call('key', fetch) == 1
+    assert asyncio.run(coalescer.acall('key', afetch)) == 1
+    time.sleep(0.25)
+    assert coalescer.call('key', fetch) == 2
+    assert asyncio.run(coalescer.acall('key', afetch)) == 2
+    assert coalescer.stats()['upstream'] == 2 and coalescer.stats()['hits'] == 3
+
+def test_results_are_not_kept_without_a_ttl():
+    coalescer = Coalescer(ttl=0)
+    calls = []
+    for _ in range(3):
+        coalescer.call('key', lambda: calls.append(1))
+    assert len(calls) == 3
@@ -0,0 +1,100 @@
+import json
+import os
+import socket
+import threading
+
+import pytest
+
+import client
+import daemon
+from daemon import Daemon, config_digest, default_socket_path, private_directory, run_remote
+
+def handle(env):
+    """Send one command with the caller environment `env` to a daemon; the daemon's reply."""
+    ran = []
+    ours, theirs = socket.socketpair()
+    with ours, theirs:
+        ours.sendall(json.dumps({'command': 'categories', 'args': [], 'cwd': os.getcwd(), 'tty': False,
+                                 'env': sorted(env), 'env_digest': config_digest(env)}).encode() + b'\n')
+        Daemon(path='unused')._handle(theirs, lambda command, args: ran.append(command))
+        theirs.shutdown(socket.SHUT_WR)
+        reply = json.loads(ours.makefile('rb').readline())
+    return reply[0], ran
+
+@pytest.fixture
+def daemon_env(monkeypatch):
+    for name in list(os.environ):
+        if name.startswith('RECIPE_API_'):
+            monkeypatch.delenv(name)
+    monkeypatch.setenv('RECIPE_API_BASE_URL', 'http://127.0.0.1:8765')
+    monkeypatch.setenv('RECIPE_API_KEY', 'from-dotenv')
+    monkeypatch.setattr(client, 'DOTENV_NAMES', frozenset({'RECIPE_API_KEY'}))
+
+def test_runs_commands_with_the_same_config(daemon_env):
+    assert handle({'RECIPE_API_BASE_URL': 'http://127.0.0.1:8765'}) == ('exit', ['categories'])
+    # A caller may also set what .env sets, to the same value
+    assert handle({'RECIPE_API_BASE_URL': 'http://127.0.0.1:8765', 'RECIPE_API_KEY': 'from-dotenv'})[0] == 'exit'
+
+@pytest.mark.parametrize('env', [
+    # The caller lacks a variable the daemon was started with
+    {},
+    # ... has one the daemon lacks
+    {'RECIPE_API_BASE_URL': 'http://127.0.0.1:8765', 'RECIPE_API_CACHE': 'other.sqlite3'},
+    # ... or a different value, including for one the daemon read from .env
+    {'RECIPE_API_BASE_URL': 'https://recipe-api.com'},
+    {'RECIPE_API_BASE_URL': 'http://127.0.0.1:8765', 'RECIPE_API_KEY': 'another'},
+])
+def test_declines_commands_with_other_config(daemon_env, env):
+    assert handle(env) == ('declined', [])
+
+def listen(path, received):
+    """A stand-in daemon on `path` that records the first request and declines it."""
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(1)
+
+    def serve():
+        conn, _ = listener.accept()
+        with conn, listener:
+            received.append(conn.makefile('rb').readline())
+            conn.sendall(b'["declined", null]\n')
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    return thread
+
+def test_socket_directory_is_private(tmp_path, monkeypatch):
+    monkeypatch.delenv('RECIPE_API_DAEMON_SOCKET', raising=False)
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    path = default_socket_path()
+    assert private_directory(os.path.dirname(path))
+    os.chmod(os.path.dirname(path), 0o755)
+    assert not private_directory(os.path.dirname(path))
+    with pytest.raises(RuntimeError):
+        Daemon(path).serve(lambda command, args: None)
+
+def test_config_values_are_never_sent(tmp_path, daemon_env):
+    path = str(tmp_path / 'd.sock')
+    received = []
+    thread = listen(path, received)
+    assert run_remote('categories', [], path) is None
+    thread.join(5)
+    request = json.loads(received[0])
+    assert b'from-dotenv' not in received[0] and b'8765' not in received[0]
+    assert request['env'] == ['RECIPE_API_BASE_URL', 'RECIPE_API_KEY']
+    assert request['env_digest'] == config_digest(daemon.config())
+
+def test_sockets_of_other_users_are_not_used(tmp_path, daemon_env, monkeypatch):
+    path = str(tmp_path / 'd.sock')
+    received = []
+    thread = listen(path, received)
+    uid = os.getuid()
+    monkeypatch.setattr(os, 'getuid', lambda: uid + 1)
+    assert run_remote('categories', [], path) is None
+    monkeypatch.undo()
+    # Nothing was sent; unblock the stand-in
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.shutdown(socket.SHUT_WR)
+        thread.join(5)
+    assert received == [b'']
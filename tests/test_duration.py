@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from duration import humanize_duration, iso_duration, parse_duration, parse_durations
+from utils import format_duration
+
+@pytest.mark.parametrize('value, seconds', [
+    ('PT30M', 1800),
+    ('PT1H30M', 5400),
+    ('PT90M', 5400),
+    ('PT45S', 45),
+    ('PT1.5S', 1.5),
+    ('PT1,5S', 1.5),
+    ('P1DT2H', 93600),
+    ('P1W', 604800),
+    ('P2D', 172800),
+    ('PT0M', 0),
+])
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == seconds
+
+@pytest.mark.parametrize('value', [None, '', 'P', 'PT', '30 minutes', 'PT1H30', 'T30M', 'PT-5M', 1800])
+def test_parse_duration_rejects_non_durations(value):
+    assert parse_duration(value) is None
+
+def test_parse_durations_maps_missing_values():
+    values = ['PT30M', None, 'PT1H', 'bogus', 'PT30M']
+    assert parse_durations(values).tolist() == [1800, 0, 3600, 0, 1800]
+    parsed = parse_durations(iter(values), missing=np.nan, dtype=np.float32)
+    assert parsed.dtype == np.float32
+    assert parsed[[0, 2, 4]].tolist() == [1800, 3600, 1800]
+    assert np.isnan(parsed[[1, 3]]).all()
+
+@pytest.mark.parametrize('value, text', [
+    ('PT30M', '30 min'),
+    ('PT90M', '90 min'),
+    ('PT1H', '1h'),
+    ('PT1H30M', '1h 30m'),
+    ('PT2H0M', '2h'),
+    ('PT0M', 'instant'),
+    ('PT45S', '45 sec'),
+    ('PT1M30S', '1m 30s'),
+    ('P1DT2H', '1d 2h'),
+    ('bogus', 'bogus'),
+])
+def test_format_duration(value, text):
+    assert humanize_duration(value) == text
+    assert format_duration(value) == text
+
+@pytest.mark.parametrize('seconds', [0, 45, 1800, 5400, 86400, 93600, 93645])
+def test_iso_duration_round_trips(seconds):
+    assert parse_duration(iso_duration(seconds)) == seconds
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from export import CatalogExport
+from mirror import Mirror, MirrorClient
+
+class CatalogClient:
+    """A catalog of list-page recipes and ingredients that serves at most `cap` items per page."""
+
+    def __init__(self, recipes=2500, ingredients=700, cap=100):
+        self.lists = {
+            '/api/v1/recipes': [
+                {'id': f'rec_{i:07d}', 'name': f'Recipe {i}', 'cuisine': 'Thai', 'meta': {'total_time': 'PT20M'},
+                 'dietary': {'flags': ['Vegan'] if i % 2 else []}, 'nutrition_summary': {'calories': 400.0}}
+                for i in range(recipes)
+            ],
+            '/api/v1/ingredients': [{'id': f'ing_{i:05d}', 'name': f'Ingredient {i}'} for i in range(ingredients)],
+        }
+        self.cap = cap
+
+    def request(self, endpoint, params=None, raw=False):
+        params = params or {}
+        if endpoint in self.lists:
+            page, per_page = params.get('page', 1), min(params.get('per_page', 10), self.cap)
+            items = self.lists[endpoint]
+            response = {'data': items[(page - 1) * per_page:page * per_page],
+                        'meta': {'page': page, 'per_page': per_page, 'total': len(items)}}
+        else:
+            response = {'data': []}
+        return json.dumps(response).encode() if raw else response
+
+def line_count(path):
+    with open(path) as f:
+        return sum(1 for _ in f) - 1
+
+def run_export(tmp_path, client, **kwargs):
+    out = tmp_path / 'export'
+    manifest = CatalogExport(str(out), compress=False, processes=1, client=client, **kwargs).run()
+    written = {
+        name: sum(line_count(out / part) for part in table['parts'])
+        for name, table in manifest['tables'].items()
+    }
+    return manifest, written
+
+def test_export_covers_the_catalog_when_the_server_caps_page_size(tmp_path):
+    manifest, written = run_export(tmp_path, CatalogClient(cap=100))
+    assert manifest['tables']['recipes']['rows'] == written['recipes'] == 2500
+    assert manifest['tables']['recipe_flags']['rows'] == written['recipe_flags'] == 1250
+    assert manifest['tables']['ingredients']['rows'] == written['ingredients'] == 700
+
+@pytest.mark.parametrize('cap', [100, 1000])
+def test_export_max_items(tmp_path, cap):
+    manifest, written = run_export(tmp_path, CatalogClient(cap=cap), max_items=250)
+    assert written['recipes'] == manifest['tables']['recipes']['rows'] == 250
+    assert written['ingredients'] == 250
+
+def test_export_from_the_mirror(tmp_path):
+    mirror = Mirror(str(tmp_path / 'mirror.sqlite3'))
+    mirror.sync(CatalogClient(recipes=300, ingredients=50))
+    client = MirrorClient(mirror)
+    assert json.loads(client.request('/api/v1/recipes', {'per_page': 5}, raw=True))['meta']['total'] == 300
+    manifest, written = run_export(tmp_path, client)
+    assert written['recipes'] == 300
+    assert written['ingredients'] == 50
+    mirror.close()
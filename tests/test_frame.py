@@ -0,0 +1,38 @@
+import numpy as np
+
+from frame import IdColumn, RecipeFrame, TextColumn
+
+def recipe(recipe_id, name):
+    return {'id': recipe_id, 'name': name, 'category': 'Main', 'cuisine': 'Thai', 'difficulty': 'Beginner',
+            'meta': {'total_time': 'PT30M'}, 'dietary': {'flags': []},
+            'nutrition_summary': {'calories': 400.0, 'protein_g': 20.0}}
+
+def test_text_column_selects_rows():
+    names = ['Pad Thai', '', 'Crème brûlée', 'A much longer recipe name ' * 10]
+    column = TextColumn.from_strings(names)
+    assert list(column) == names
+    assert column[2] == 'Crème brûlée' and column[-1] == names[-1]
+    assert list(column[np.array([True, False, True, True])]) == [names[0], names[2], names[3]]
+    assert list(column[np.array([3, 0])]) == [names[3], names[0]]
+    assert list(column[1:3]) == names[1:3]
+    assert column.isin({'', 'Pad Thai'}).tolist() == [True, True, False, False]
+
+def test_numbered_ids_are_stored_as_numbers():
+    ids = IdColumn.from_strings(['rec_0000042', 'rec_0000007', 'rec_1234567'])
+    assert isinstance(ids, IdColumn) and ids.numbers.dtype == np.int64
+    assert list(ids) == ['rec_0000042', 'rec_0000007', 'rec_1234567']
+    assert ids[1] == 'rec_0000007'
+    assert list(ids[np.array([False, True, True])]) == ['rec_0000007', 'rec_1234567']
+    assert ids.isin(['rec_0000007', 'rec_7', 'other']).tolist() == [False, True, False]
+    # Any other form is kept as text
+    assert list(IdColumn.from_strings(['rec_1', 'rec_22'])) == ['rec_1', 'rec_22']
+    assert isinstance(IdColumn.from_strings(['abc', 'rec_0000001']), TextColumn)
+
+def test_one_long_name_does_not_widen_every_row():
+    recipes = [recipe(f'rec_{i:07d}', f'Recipe {i}') for i in range(1000)]
+    short = RecipeFrame.from_recipes(recipes).nbytes
+    recipes[0]['name'] = 'x' * 500
+    frame = RecipeFrame.from_recipes(recipes)
+    assert frame.nbytes - short < 600
+    assert frame.to_records([0])[0]['name'] == 'x' * 500
+    assert frame[frame.mask(cuisine='Thai')].to_records([1])[0]['id'] == 'rec_0000001'
@@ -0,0 +1,52 @@
+import json
+import time
+
+import pytest
+
+import jsonstream
+from jsonstream import ItemParser, ItemStream
+
+BODY = json.dumps({
+    'data': [
+        {'id': 'rec_1', 'name': 'Say "cheese" {now}', 'tags': ['a]', '[b'], 'n': 1.5},
+        {'id': 'rec_2', 'name': 'Back\\slash \\" and é', 'nested': {'x': [1, {'y': None}]}},
+        {'id': 'rec_3', 'ok': True, 'count': -12e3},
+    ],
+    'meta': {'page': 1, 'per_page': 3, 'total': 3},
+}).encode()
+
+def parse(body, size):
+    parser = ItemParser()
+    items = []
+    for start in range(0, len(body), size):
+        items += parser.feed(body[start:start + size])
+    items += parser.end()
+    return items, parser.fields
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64, len(BODY)])
+def test_items_match_json_loads_for_any_chunking(size):
+    items, fields = parse(BODY, size)
+    expected = json.loads(BODY)
+    assert items == expected['data']
+    assert fields['meta'] == expected['meta']
+
+def test_truncated_body_raises():
+    with pytest.raises(ValueError):
+        parse(BODY[:len(BODY) // 2], 16)
+
+def test_item_stream_exposes_meta():
+    stream = ItemStream(iter([BODY[:40], BODY[40:]]))
+    assert [item['id'] for item in stream] == ['rec_1', 'rec_2', 'rec_3']
+    assert stream.meta['total'] == 3
+
+def test_unterminated_string_is_not_quadratic():
+    parser = ItemParser()
+    start = time.perf_counter()
+    parser.feed(b'{"data": [{"name": "' + b'x\\"' * 200_000)
+    parser.feed(b'y' * 200_000)
+    assert time.perf_counter() - start < 2
+
+def test_patterns_avoid_possessive_quantifiers():
+    # Possessive quantifiers need Python 3.11; the client imports this module at startup
+    for pattern in (jsonstream._WHITESPACE, jsonstream._SKIP, jsonstream._STRING, jsonstream._SCALAR):
+        assert b'*+' not in pattern.pattern and b'++' not in pattern.pattern
@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from metrics import MetricsRegistry, begin, finish
+
+FULL_RECIPE = {'data': {'id': 'rec_0000001', 'name': 'Soup'}, 'usage': {'daily_remaining': 41, 'monthly_remaining': 990}}
+LIST_PAGE = {'data': [{'id': 'rec_0000001'}], 'meta': {'page': 1, 'per_page': 1, 'total': 1}}
+
+def record(registry, response, endpoint='/api/v1/recipes/rec_0000001', source='network'):
+    event = begin([registry], endpoint, None)
+    event.source, event.status = source, 200
+    finish([registry], event, response)
+    return event
+
+@pytest.mark.parametrize('raw', [False, True])
+def test_credits_are_counted_for_decoded_and_raw_responses(raw):
+    registry = MetricsRegistry()
+    event = record(registry, json.dumps(FULL_RECIPE).encode() if raw else FULL_RECIPE)
+    assert event.usage == FULL_RECIPE['usage']
+    snapshot = registry.snapshot()
+    assert snapshot['credits_used'] == 1
+    assert snapshot['credits_remaining'] == {'daily': 41, 'monthly': 990}
+    assert 'recipe_api_credits_used_total 1' in registry.prometheus()
+
+def test_raw_bodies_without_usage_spend_nothing():
+    registry = MetricsRegistry()
+    record(registry, json.dumps(LIST_PAGE).encode(), endpoint='/api/v1/recipes')
+    record(registry, json.dumps(FULL_RECIPE).encode(), source='cache')
+    assert registry.snapshot()['credits_used'] == 0
+    assert registry.snapshot()['endpoints']['/api/v1/recipes/{id}']['sources']['cache'] == 1
@@ -0,0 +1,50 @@
+import pytest
+
+from mirror import Mirror, MirrorClient
+
+RECIPES = [
+    {'id': 'rec_0000001', 'name': 'Green Curry', 'category': 'Main Course', 'cuisine': 'Thai', 'difficulty': 'Easy',
+     'dietary': {'flags': ['Vegan']}, 'nutrition_summary': {'calories': 450.0}},
+    {'id': 'rec_0000002', 'name': 'Pad Thai', 'category': 'Main Course', 'cuisine': 'Thai', 'difficulty': 'Medium',
+     'dietary': {'flags': []}, 'nutrition_summary': {'calories': 600.0}},
+    {'id': 'rec_0000003', 'name': 'Tiramisu', 'category': 'Dessert', 'cuisine': 'Italian', 'difficulty': 'Easy',
+     'dietary': {'flags': ['Vegetarian']}, 'nutrition_summary': {'calories': 500.0}},
+]
+INGREDIENTS = [
+    {'id': 'ing_00001', 'name': 'Basil', 'category': 'Herbs'},
+    {'id': 'ing_00002', 'name': 'Rice', 'category': 'Grains'},
+]
+
+class CatalogClient:
+    def request(self, endpoint, params=None, raw=False):
+        items = {'/api/v1/recipes': RECIPES, '/api/v1/ingredients': INGREDIENTS}.get(endpoint, [])
+        return {'data': items, 'meta': {'page': 1, 'per_page': len(items), 'total': len(items)}}
+
+@pytest.fixture
+def client(tmp_path):
+    mirror = Mirror(str(tmp_path / 'mirror.sqlite3'))
+    mirror.sync(CatalogClient())
+    with MirrorClient(mirror) as client:
+        yield client
+
+def ids(response):
+    return [item['id'] for item in response['data']]
+
+@pytest.mark.parametrize('params, expected', [
+    ({'cuisine': 'thai'}, ['rec_0000001', 'rec_0000002']),
+    ({'cuisine': 'THAI', 'difficulty': 'easy'}, ['rec_0000001']),
+    ({'category': 'dessert'}, ['rec_0000003']),
+    ({'dietary': 'vegan'}, ['rec_0000001']),
+    ({'q': 'pad thai'}, ['rec_0000002']),
+])
+def test_recipe_filters_ignore_case(client, params, expected):
+    assert ids(client.request('/api/v1/recipes', params)) == expected
+
+def test_ingredient_category_ignores_case(client):
+    assert ids(client.request('/api/v1/ingredients', {'category': 'herbs'})) == ['ing_00001']
+
+def test_unsupported_params_are_ignored(client):
+    response = client.request('/api/v1/recipes', {'cuisine': 'Thai', 'sort': 'name', 'fields': 'id'})
+    assert ids(response) == ['rec_0000001', 'rec_0000002']
+    assert response['meta']['total'] == 2
+    assert ids(client.request('/api/v1/ingredients', {'difficulty': 'Easy'})) == ['ing_00001', 'ing_00002']
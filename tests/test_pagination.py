@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from client import iter_items, iter_pages, stream_items
+from jsonstream import ItemStream
+
+class PagedClient:
+    """Serves `total` items, never more than `cap` per page whatever per_page asks for."""
+
+    def __init__(self, total, cap, send_per_page=True):
+        self.items = [{'id': f'rec_{i:07d}'} for i in range(total)]
+        self.cap = cap
+        self.send_per_page = send_per_page
+        self.pages = []
+
+    def request(self, endpoint, params=None):
+        page, per_page = params.get('page', 1), min(params['per_page'], self.cap)
+        self.pages.append(page)
+        meta = {'page': page, 'total': len(self.items)}
+        if self.send_per_page:
+            meta['per_page'] = per_page
+        return {'data': self.items[(page - 1) * per_page:page * per_page], 'meta': meta}
+
+    def stream(self, endpoint, params=None):
+        body = json.dumps(self.request(endpoint, params)).encode()
+        return ItemStream(iter([body[:50], body[50:]]))
+
+@pytest.mark.parametrize('send_per_page', [True, False])
+def test_iter_items_follows_a_capped_page_size(send_per_page):
+    client = PagedClient(total=250, cap=100, send_per_page=send_per_page)
+    items = list(iter_items('/api/v1/recipes', per_page=1000, client=client))
+    assert [item['id'] for item in items] == [item['id'] for item in client.items]
+    assert client.pages == [1, 2, 3]
+
+def test_iter_pages_stops_at_the_total():
+    client = PagedClient(total=200, cap=100)
+    pages = list(iter_pages('/api/v1/recipes', per_page=100, client=client))
+    assert [len(data) for data, _ in pages] == [100, 100]
+    assert client.pages == [1, 2]
+
+def test_max_items_skips_pages_it_would_not_reach():
+    client = PagedClient(total=1000, cap=100)
+    items = list(iter_items('/api/v1/recipes', per_page=100, max_items=150, client=client))
+    assert len(items) == 150
+    assert client.pages == [1, 2]
+
+@pytest.mark.parametrize('send_per_page', [True, False])
+def test_stream_items_follows_a_capped_page_size(send_per_page):
+    client = PagedClient(total=25_000, cap=1000, send_per_page=send_per_page)
+    items = list(stream_items('/api/v1/recipes', per_page=10_000, client=client))
+    assert len(items) == 25_000
+    assert items[-1] == client.items[-1]
+    assert client.pages == list(range(1, 26))
+
+def test_stream_items_respects_max_items():
+    client = PagedClient(total=500, cap=100)
+    assert len(list(stream_items('/api/v1/recipes', per_page=100, max_items=250, client=client))) == 250
+    assert client.pages == [1, 2, 3]
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from async_client import RecipeResult
+from prefetch import CreditBudget, Prefetcher, last_daily_reset, seconds_until_daily_reset
+
+class Store:
+    def __init__(self):
+        self.recipes = {}
+
+    def has_full_recipes(self, ids):
+        return {i for i in ids if i in self.recipes}
+
+    def put_full_recipe(self, recipe):
+        self.recipes[recipe['id']] = recipe
+
+class QuotaClient:
+    """Serves full recipes while daily credits last, reporting them in each usage block."""
+
+    def __init__(self, daily, monthly=1000):
+        self.daily = daily
+        self.monthly = monthly
+        self.requests = 0
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def get_recipe(self, recipe_id):
+        self.requests += 1
+        await asyncio.sleep(0)
+        self.daily -= 1
+        self.monthly -= 1
+        usage = {'daily_remaining': self.daily, 'monthly_remaining': self.monthly}
+        return RecipeResult(recipe_id, {'id': recipe_id}, usage, None)
+
+def prefetcher(tmp_path, client, **kwargs):
+    return Prefetcher(Store(), budget=CreditBudget(reserve=2), checkpoint=str(tmp_path / 'prefetch.json'),
+                      client=client, **kwargs)
+
+def test_resumed_run_remembers_credits_spent_earlier(tmp_path):
+    first = prefetcher(tmp_path, QuotaClient(daily=10))
+    first.add([f'rec_{i:07d}' for i in range(20)])
+    stats = first.run()
+    assert (stats['fetched'], stats['stop_reason'], stats['daily_remaining']) == (8, 'budget', 2)
+
+    # A new process: the API would still report 2 left, so nothing more may be spent
+    client = QuotaClient(daily=2)
+    second = prefetcher(tmp_path, client)
+    assert len(second) == 12
+    assert second.budget.daily_remaining == 2
+    assert second.run()['stop_reason'] == 'budget'
+    assert client.requests == 0
+
+def test_saved_usage_is_dropped_after_a_reset(tmp_path):
+    path = tmp_path / 'prefetch.json'
+    reset = last_daily_reset(daily_reset='00:00').timestamp()
+    for saved_at, daily in ((reset - 60, None), (reset + 1, 3)):
+        path.write_text(json.dumps({'queue': [[0, 'rec_0000001']], 'not_found': [],
+                                    'usage': {'daily_remaining': 3, 'monthly_remaining': 50},
+                                    'saved_at': min(saved_at, time.time())}))
+        resumed = prefetcher(tmp_path, QuotaClient(daily=10))
+        assert resumed.budget.daily_remaining == daily
+    assert resumed.budget.monthly_remaining == 50
+
+def test_daily_reset_time():
+    now = datetime(2026, 3, 4, 5, 0, tzinfo=timezone.utc)
+    assert seconds_until_daily_reset(now) == 19 * 3600
+    assert seconds_until_daily_reset(now, '06:30') == 90 * 60
+    assert last_daily_reset(now, '06:30') == datetime(2026, 3, 3, 6, 30, tzinfo=timezone.utc)
+    assert last_daily_reset(now, '04:00') == datetime(2026, 3, 4, 4, 0, tzinfo=timezone.utc)
+
+@pytest.mark.parametrize('value', ['6', '24:00', '06:60', 'noon'])
+def test_daily_reset_is_validated(tmp_path, value):
+    with pytest.raises(ValueError):
+        prefetcher(tmp_path, QuotaClient(daily=10), daily_reset=value)
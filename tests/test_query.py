@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from frame import RecipeFrame
+from query import RecipeIndex
+
+def make_recipe(index, calories, protein=20.0, total_time='PT30M', flags=()):
+    return {
+        'id': f'rec_{index:07d}',
+        'name': f'Recipe {index}',
+        'category': 'Main',
+        'cuisine': 'Thai' if index % 2 else 'Italian',
+        'difficulty': 'Beginner',
+        'meta': {'total_time': total_time},
+        'dietary': {'flags': list(flags)},
+        'nutrition_summary': {'calories': calories, 'protein_g': protein, 'carbohydrates_g': 10.0, 'fat_g': 5.0},
+    }
+
+@pytest.fixture
+def recipes():
+    rng = random.Random(7)
+    return [
+        make_recipe(i, None if i % 7 == 0 else round(rng.uniform(100, 900), 1),
+                    protein=None if i % 11 == 0 else round(rng.uniform(1, 60), 1),
+                    flags=['Vegan'] if i % 3 == 0 else [])
+        for i in range(200)
+    ]
+
+def ids(recipes):
+    return [recipe['id'] for recipe in recipes]
+
+@pytest.mark.parametrize('filters', [
+    {'min_calories': 300, 'max_calories': 500},
+    {'max_calories': 400},
+    {'min_calories': 700},
+    {'min_protein': 30, 'max_calories': 600},
+    {'dietary': 'Vegan', 'min_calories': 200, 'max_calories': 800},
+    {'cuisine': 'thai', 'max_protein': 25},
+])
+def test_range_queries_match_a_scan_with_missing_values(recipes, filters):
+    index = RecipeIndex(recipes)
+    expected = index.scan(**filters)
+    assert expected
+    assert sorted(ids(index.query(**filters))) == sorted(ids(expected))
+
+def test_missing_values_never_match_a_range(recipes):
+    index = RecipeIndex(recipes)
+    matched = index.query(min_calories=0)
+    assert len(matched) == sum(1 for r in recipes if r['nutrition_summary']['calories'] is not None)
+
+@pytest.mark.parametrize('sort', ['calories', '-calories'])
+def test_sort_puts_missing_values_last(recipes, sort):
+    index = RecipeIndex(recipes)
+    ordered = [r['nutrition_summary']['calories'] for r in index.query(cuisine='Italian', sort=sort)]
+    known = [value for value in ordered if value is not None]
+    assert ordered[:len(known)] == sorted(known, reverse=sort.startswith('-'))
+    assert all(value is None for value in ordered[len(known):])
+    limited = [r['nutrition_summary']['calories'] for r in index.query(cuisine='Italian', sort=sort, limit=5)]
+    assert limited == ordered[:5]
+
+def test_frame_mask_excludes_missing_values(recipes):
+    frame = RecipeFrame.from_recipes(recipes)
+    mask = frame.mask(calories=(300, 500))
+    expected = [r['id'] for r in recipes
+                if r['nutrition_summary']['calories'] is not None and 300 <= r['nutrition_summary']['calories'] <= 500]
+    assert list(frame.ids[mask]) == expected
+    assert frame.mask(calories=(None, 10_000)).sum() == sum(1 for r in recipes if r['nutrition_summary']['calories'] is not None)
+
+def test_missing_total_time_never_passes_a_time_filter():
+    recipes = [make_recipe(0, 400.0, total_time='PT20M'), make_recipe(1, 400.0, total_time=None),
+               make_recipe(2, 400.0, total_time='PT2H'), make_recipe(3, 400.0, total_time='soon')]
+    index = RecipeIndex(recipes)
+    assert ids(index.query(max_total_time=30)) == ['rec_0000000']
+    assert ids(index.scan(max_total_time=30)) == ['rec_0000000']
+    assert ids(index.query(sort='total_time')) == ['rec_0000000', 'rec_0000002', 'rec_0000001', 'rec_0000003']
+    frame = RecipeFrame.from_recipes(recipes)
+    assert list(frame.ids[frame.mask(total_time=(None, 1800))]) == ['rec_0000000']
+    assert frame.describe('total_time')['count'] == 2
+
+def test_recipes_without_dietary_data_match_no_flag():
+    recipes = [make_recipe(0, 400.0, flags=['Vegan']), make_recipe(1, 400.0), make_recipe(2, 400.0)]
+    del recipes[1]['dietary']
+    recipes[2]['dietary'] = None
+    index = RecipeIndex(recipes)
+    for answer in (index.query, index.scan):
+        assert ids(answer(dietary='Vegan')) == ['rec_0000000']
+        assert ids(answer(max_calories=500)) == ids(recipes)
@@ -0,0 +1,112 @@
+import marshal
+import os
+
+import pytest
+
+from mirror import Mirror
+from recipe_store import _FRAME, HEADER, MAGIC, RecipeCodec, RecipeStore
+
+def full_recipe(index, name=None):
+    return {
+        'id': f'rec_{index:07d}',
+        'name': name or f'Recipe {index}',
+        'description': 'A long description that is certainly not interned by the codec. ' * 2,
+        'meta': {'total_time': 'PT1H30M', 'active_time': 'PT20M', 'yields': '4 servings'},
+        'dietary': {'flags': ['Vegan', 'Gluten-Free']},
+        'ingredients': [{'group_name': None, 'items': [
+            {'name': 'salt', 'quantity': 1.5, 'unit': 'tsp', 'notes': None},
+            {'name': 'flour', 'quantity': 200, 'unit': 'g', 'notes': 'sifted'},
+        ]}],
+        'nutrition': {'per_serving': {'calories': 410.5, 'protein_g': 12}},
+        'odd': [1, 'two', {'three': 3}],
+        'overnight_required': False,
+    }
+
+def test_codec_round_trip():
+    codec = RecipeCodec()
+    for i in range(3):
+        recipe = full_recipe(i)
+        assert codec.loads(codec.dumps(recipe)) == recipe
+    assert codec.decode_fields(codec.encode(full_recipe(5)), ('name', 'meta')) == {
+        'name': 'Recipe 5', 'meta': full_recipe(5)['meta']}
+
+def test_put_get_reopen_and_compact(tmp_path):
+    path = str(tmp_path / 'store.dat')
+    with RecipeStore(path) as store:
+        assert store.put_many([full_recipe(i) for i in range(20)]) == 20
+        assert store.put(full_recipe(3)) == 0
+        assert store.put(full_recipe(3, name='Renamed')) == 1
+    with RecipeStore(path) as store:
+        assert len(store) == 20
+        assert store.get('rec_0000003')['name'] == 'Renamed'
+        assert store.get('rec_0000004') == full_recipe(4)
+        assert store.get('missing') is None
+        assert store.compact() > 0
+        assert store.get('rec_0000003')['name'] == 'Renamed'
+        assert sorted(r['id'] for r in store.recipes()) == [f'rec_{i:07d}' for i in range(20)]
+
+def test_records_missing_from_the_index_are_recovered(tmp_path):
+    path = str(tmp_path / 'store.dat')
+    with RecipeStore(path) as store:
+        store.put_many([full_recipe(i) for i in range(5)])
+    open(f'{path}.idx', 'w').close()
+    with RecipeStore(path) as store:
+        assert store.get('rec_0000002') == full_recipe(2)
+        assert len(store) == 5
+
+def write_store(path, header, dumps, recipes):
+    codec = RecipeCodec()
+    records = [dumps([r['id'], codec.encode(r)]) for r in recipes]
+    tables = dumps(codec.tables_since(1, 0))
+    with open(path, 'wb') as f:
+        f.write(header)
+        for kind, payload in [(b'T', tables)] + [(b'R', record) for record in records]:
+            f.write(_FRAME.pack(kind, len(payload)) + payload)
+    open(f'{path}.idx', 'w').close()
+
+def test_stores_from_an_older_marshal_format_are_rewritten(tmp_path):
+    path = str(tmp_path / 'store.dat')
+    older = marshal.version - 1
+    write_store(path, MAGIC + bytes([1, older]), lambda value: marshal.dumps(tuple(value), older),
+                [full_recipe(i) for i in range(3)])
+
+    with RecipeStore(path) as store:
+        assert [store.get(f'rec_{i:07d}') for i in range(3)] == [full_recipe(i) for i in range(3)]
+    with open(path, 'rb') as f:
+        assert f.read(len(HEADER)) == HEADER
+    with RecipeStore(path) as store:
+        assert len(store) == 3
+
+def test_stores_from_a_newer_marshal_format_are_set_aside(tmp_path):
+    path = str(tmp_path / 'store.dat')
+    newer = marshal.version + 1
+    write_store(path, MAGIC + bytes([1, newer]), marshal.dumps, [full_recipe(i) for i in range(3)])
+
+    with RecipeStore(path) as store:
+        assert len(store) == 0
+        store.put(full_recipe(7))
+        assert store.get('rec_0000007') == full_recipe(7)
+    assert os.path.exists(f'{path}.marshal{newer}')
+    assert os.path.exists(f'{path}.marshal{newer}.idx')
+
+def test_other_files_are_refused(tmp_path):
+    path = tmp_path / 'store.dat'
+    path.write_bytes(b'not a store')
+    with pytest.raises(ValueError):
+        RecipeStore(str(path))
+
+def test_mirror_keeps_full_recipes_in_the_store(tmp_path):
+    store_path = str(tmp_path / 'store.dat')
+    mirror = Mirror(str(tmp_path / 'mirror.sqlite3'))
+    mirror.put_full_recipe(full_recipe(1))
+    mirror.close()
+
+    mirror = Mirror(str(tmp_path / 'mirror.sqlite3'), store=store_path)
+    mirror.put_full_recipe(full_recipe(2))
+    assert os.path.getsize(store_path) > 0
+    assert mirror.has_full_recipes(['rec_0000001', 'rec_0000002', 'rec_0000003']) == {'rec_0000001', 'rec_0000002'}
+    assert mirror.full_recipe('rec_0000001') == full_recipe(1)
+    assert mirror.full_recipe('rec_0000002') == full_recipe(2)
+    assert sorted(r['id'] for r in mirror.full_recipes()) == ['rec_0000001', 'rec_0000002']
+    assert mirror.has_any_full_recipe()
+    mirror.close()
@@ -0,0 +1,63 @@
+import json
+
+import resolver
+from resolver import IngredientResolver, get_resolver, normalize
+
+CATALOG = [
+    {'id': 'ing_00001', 'name': 'Tomato', 'category': 'Vegetables'},
+    {'id': 'ing_00002', 'name': 'Tomato Paste', 'category': 'Pantry'},
+    {'id': 'ing_00003', 'name': 'Red Onion', 'category': 'Vegetables'},
+    {'id': 'ing_00004', 'name': 'Garlic', 'category': 'Vegetables'},
+    {'id': 'ing_00005', 'name': 'Baby Spinach', 'category': 'Vegetables'},
+    {'id': 'ing_00006', 'name': 'Strawberries', 'category': 'Fruit'},
+]
+
+class IngredientClient:
+    def __init__(self, ingredients=CATALOG):
+        self.ingredients = ingredients
+        self.requests = 0
+
+    def request(self, endpoint, params=None, raw=False):
+        self.requests += 1
+        params = params or {}
+        page, per_page = params.get('page', 1), params.get('per_page', 10)
+        response = {'data': self.ingredients[(page - 1) * per_page:page * per_page],
+                    'meta': {'page': page, 'per_page': per_page, 'total': len(self.ingredients)}}
+        return json.dumps(response).encode() if raw else response
+
+def test_normalize():
+    assert normalize('2 1/2 cups Red Onions, finely chopped') == 'red onion'
+    assert normalize('Strawberries') == 'strawberry'
+
+def test_resolve():
+    ingredients = IngredientResolver(CATALOG)
+    assert ingredients.resolve('3 large tomatoes').id == 'ing_00001'
+    assert ingredients.resolve('organic baby spinach').method == 'partial'
+    assert ingredients.resolve('galric').id == 'ing_00004'
+    missing = ingredients.resolve('motor oil')
+    assert missing.id is None and missing.query == 'motor oil'
+
+def test_complete_normalizes_the_prefix_like_the_keys():
+    ingredients = IngredientResolver(CATALOG)
+    assert [i['id'] for i in ingredients.complete('Tomatoes')] == ['ing_00001', 'ing_00002']
+    assert [i['id'] for i in ingredients.complete('tomato p')] == ['ing_00002']
+    assert [i['id'] for i in ingredients.complete('Strawberries')] == ['ing_00006']
+    assert [i['id'] for i in ingredients.complete('2 cups red on')] == ['ing_00003']
+    assert [i['id'] for i in ingredients.complete('g')] == ['ing_00004']
+    assert len(ingredients.complete('', limit=3)) == 3
+
+def test_memo_is_bounded():
+    ingredients = IngredientResolver(CATALOG, memo_size=3)
+    for name in ('tomato', 'garlic', 'onion', 'spinach', 'tomato'):
+        ingredients.resolve(name)
+    assert len(ingredients._memo) == 3
+    assert list(ingredients._memo)[-1][0] == 'tomato'
+
+def test_get_resolver_is_per_client():
+    first, second = IngredientClient(), IngredientClient(CATALOG[:2])
+    assert get_resolver(first) is get_resolver(first)
+    assert first.requests == 1
+    assert len(get_resolver(second)) == 2
+    assert len(get_resolver(first)) == len(CATALOG)
+    del first
+    assert len(resolver._resolvers) == 1
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from scaling import RecipeBatch, format_quantity, scale_recipe
+
+def make_recipe(items, yields='4 servings'):
+    return {
+        'id': 'rec_0000001',
+        'meta': {'yields': yields},
+        'nutrition': {'per_serving': {'calories': 500, 'protein_g': 20}},
+        'ingredients': [{'group': 'Main', 'items': [
+            {'name': name, 'quantity': quantity, 'unit': unit} for name, quantity, unit in items
+        ]}],
+    }
+
+def test_scale_and_convert():
+    recipe = make_recipe([('flour', 600, 'g'), ('milk', 2, 'cups'), ('eggs', 3, '')])
+    batch = RecipeBatch.from_recipes([recipe]).scale(8).convert('metric')
+    (flour, flour_unit), (milk, milk_unit), eggs = batch.ingredients(0)
+    assert (flour, flour_unit) == (pytest.approx(1.2), 'kg')
+    assert (milk, milk_unit) == (pytest.approx(946.352946), 'ml')
+    assert eggs == (6.0, '')
+    assert batch.totals[0].tolist()[:2] == [4000, 160]
+
+@pytest.mark.parametrize('system', ['metric', 'imperial'])
+def test_items_without_a_quantity_keep_their_unit(system):
+    recipe = make_recipe([('salt', 'to taste', 'g'), ('butter', None, 'tbsp'), ('sugar', 100, 'g')])
+    batch = RecipeBatch.from_recipes([recipe]).convert(system)
+    assert batch.ingredients(0)[:2] == [(None, 'g'), (None, 'tbsp')]
+    assert np.isfinite(batch.quantities[2])
+
+    scaled = scale_recipe(recipe, servings=2, system=system)
+    salt, butter, sugar = scaled['ingredients'][0]['items']
+    assert (salt['quantity'], salt['unit']) == ('to taste', 'g')
+    assert (butter['quantity'], butter['unit']) == (None, 'tbsp')
+    assert sugar['unit'] == ('g' if system == 'metric' else 'oz')
+
+def test_unknown_yield_keeps_quantities():
+    recipe = make_recipe([('flour', 600, 'g')], yields='one loaf')
+    batch = RecipeBatch.from_recipes([recipe]).scale(8)
+    assert batch.ingredients(0) == [(600.0, 'g')]
+    assert np.isnan(batch.servings[0])
+
+def test_format_scaled_recipe_with_a_text_quantity():
+    recipe = make_recipe([('salt', 'to taste', 'g'), ('flour', 600, 'g'), ('milk', 1.5, 'cup')])
+    scaled = scale_recipe(recipe, servings=2)
+    salt, flour, milk = scaled['ingredients'][0]['items']
+    assert format_quantity(salt['quantity'], salt['unit']) == 'to taste'
+    assert format_quantity(flour['quantity'], flour['unit']) == '300'
+    assert format_quantity(milk['quantity'], milk['unit']) == '3/4'
+
+@pytest.mark.parametrize('unit', ['g', 'grams', 'Grams', 'ml.', ' Millilitres'])
+def test_aliased_metric_units_format_as_decimals(unit):
+    assert format_quantity(333.3333, unit) == '333'
+    assert format_quantity(1.25, unit) == '1.25'
@@ -0,0 +1,93 @@
+from search_index import SearchIndex, local_index
+
+def recipe(recipe_id, name, description=''):
+    return {'id': recipe_id, 'name': name, 'description': description}
+
+def ids(results):
+    return [recipe_id for recipe_id, _ in results]
+
+def test_add_and_search():
+    index = SearchIndex()
+    index.add_many([recipe('a', 'Garlic Chicken'), recipe('b', 'Lemon Tart', 'with garlic'), recipe('c', 'Miso Soup')])
+    assert ids(index.search('garlic')) == ['a', 'b']
+    assert ids(index.search('gar', prefix=True)) == ['a', 'b']
+    assert index.search('zebra') == []
+
+def test_add_replaces_and_skips_unchanged():
+    index = SearchIndex()
+    assert index.add(recipe('a', 'Garlic Chicken'))
+    assert not index.add(recipe('a', 'Garlic Chicken'))
+    assert index.add(recipe('a', 'Lemon Chicken'))
+    assert index.search('garlic') == []
+    assert ids(index.search('lemon')) == ['a']
+    assert len(index) == 1
+
+def test_remove_and_compact():
+    index = SearchIndex()
+    index.add_many([recipe('a', 'Garlic Chicken'), recipe('b', 'Garlic Bread'), recipe('c', 'Miso Soup')])
+    index.remove('b')
+    assert ids(index.search('garlic')) == ['a']
+    index.compact()
+    assert index.doc_ids == ['a', 'c']
+    assert ids(index.search('garlic')) == ['a']
+    assert ids(index.search('miso')) == ['c']
+
+def test_compact_twice_with_an_emptied_last_term():
+    index = SearchIndex()
+    index.add_many([recipe('a', 'apple'), recipe('b', 'zebra')])
+    index.remove('b')
+    index.compact()
+    index.add(recipe('c', 'apple'))
+    index.remove('a')
+    index.compact()
+    assert index.doc_ids == ['c']
+    assert ids(index.search('apple')) == ['c']
+    assert index.search('zebra') == []
+
+def test_update_matches_the_given_recipes():
+    index = SearchIndex()
+    index.update([recipe('a', 'Garlic Chicken'), recipe('b', 'Miso Soup')])
+    assert index.update([recipe('b', 'Miso Soup'), recipe('c', 'Garlic Noodles')]) == (1, 1)
+    assert ids(index.search('garlic')) == ['c']
+
+def test_save_and_load(tmp_path):
+    index = SearchIndex()
+    index.add_many([recipe('a', 'Garlic Chicken'), recipe('b', 'Miso Soup')])
+    path = tmp_path / 'index.npz'
+    index.save(str(path))
+    loaded = SearchIndex.load(str(path))
+    assert loaded.search('garlic') == index.search('garlic')
+
+class StubMirror:
+    def __init__(self, summaries, full):
+        self.summaries = summaries
+        self.full = full
+        self.reads = 0
+
+    def version(self):
+        return repr((self.summaries, self.full))
+
+    def recipes(self):
+        self.reads += 1
+        return iter(self.summaries)
+
+    def full_recipes(self):
+        return iter(self.full)
+
+def test_local_index_uses_the_mirrors_full_recipes(tmp_path):
+    full = dict(recipe('a', 'Golden Rice'), ingredients=[{'group_name': None, 'items': [{'name': 'saffron'}]}])
+    mirror = StubMirror([recipe('a', 'Golden Rice'), recipe('b', 'Miso Soup')], [full])
+    index = local_index(mirror, path=str(tmp_path / 'index.npz'))
+    assert ids(index.search('saffron')) == ['a']
+    assert len(index) == 2
+
+def test_local_index_is_reused_while_the_mirror_is_unchanged(tmp_path):
+    path = str(tmp_path / 'index.npz')
+    mirror = StubMirror([recipe('a', 'Golden Rice')], [])
+    local_index(mirror, path=path)
+    assert ids(local_index(mirror, path=path).search('rice')) == ['a']
+    assert mirror.reads == 1
+
+    mirror.summaries.append(recipe('b', 'Fried Rice'))
+    assert ids(local_index(mirror, path=path).search('fried')) == ['b']
+    assert mirror.reads == 2
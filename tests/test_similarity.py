@@ -0,0 +1,74 @@
+import json
+
+from mirror import Mirror
+import similarity
+from similarity import SimilarityIndex, local_similarity
+
+class CatalogClient:
+    """List-page recipes for Mirror.sync; lookups are empty."""
+
+    def __init__(self, recipes=60):
+        self.recipes = [
+            {'id': f'rec_{i:07d}', 'name': f'Recipe {i}', 'cuisine': ('Thai', 'Italian', 'Mexican')[i % 3],
+             'category': ('Main', 'Dessert')[i % 2], 'meta': {'total_time': f'PT{10 + i}M'},
+             'dietary': {'flags': ['Vegan'] if i % 4 == 0 else []},
+             'nutrition_summary': {'calories': 200.0 + 10 * i, 'protein_g': 5.0 + i % 30,
+                                   'carbohydrates_g': 20.0 + i % 7, 'fat_g': 8.0 + i % 5}}
+            for i in range(recipes)
+        ]
+
+    def request(self, endpoint, params=None, raw=False):
+        params = params or {}
+        if endpoint == '/api/v1/recipes':
+            page, per_page = params.get('page', 1), params.get('per_page', 10)
+            response = {'data': self.recipes[(page - 1) * per_page:page * per_page],
+                        'meta': {'page': page, 'per_page': per_page, 'total': len(self.recipes)}}
+        else:
+            response = {'data': [], 'meta': {'page': 1, 'per_page': 10, 'total': 0}}
+        return json.dumps(response).encode() if raw else response
+
+def count_builds(monkeypatch):
+    builds = []
+    from_recipes = SimilarityIndex.from_recipes.__func__
+
+    def counted(cls, recipes, *args, **kwargs):
+        builds.append(len(recipes))
+        return from_recipes(cls, recipes, *args, **kwargs)
+
+    monkeypatch.setattr(SimilarityIndex, 'from_recipes', classmethod(counted))
+    return builds
+
+def test_saved_index_is_reused_until_the_mirror_changes(tmp_path, monkeypatch):
+    builds = count_builds(monkeypatch)
+    precomputed = []
+    precompute = SimilarityIndex.precompute
+    monkeypatch.setattr(SimilarityIndex, 'precompute',
+                        lambda self, *args, **kwargs: precomputed.append(1) or precompute(self, *args, **kwargs))
+    client = CatalogClient()
+    mirror = Mirror(str(tmp_path / 'mirror.sqlite3'))
+    mirror.sync(client)
+    path = str(tmp_path / 'similar.npz')
+
+    index = local_similarity(mirror, path, k=5, processes=1)
+    assert len(index) == 60 and builds == [60] and len(precomputed) == 1
+    assert local_similarity(mirror, path, k=5, processes=1).version == index.version
+    assert builds == [60]
+
+    # A sync that changes nothing keeps the version
+    mirror.sync(client)
+    local_similarity(mirror, path, k=5, processes=1)
+    assert builds == [60]
+
+    # Changed contents (no updated_at to go by) and new full recipes are picked up
+    client.recipes[3]['nutrition_summary']['calories'] = 9000.0
+    mirror.sync(client)
+    local_similarity(mirror, path, k=5, processes=1)
+    assert builds == [60, 60] and len(precomputed) == 2
+    mirror.put_full_recipe({**client.recipes[5], 'ingredients': [{'items': [{'ingredient_id': 'ing_00001'}]}]})
+    local_similarity(mirror, path, k=5, processes=1)
+    assert builds == [60, 60, 60]
+
+    # More neighbours than were saved needs a rebuild as well
+    local_similarity(mirror, path, k=similarity.DEFAULT_NEIGHBOURS + 5, processes=1)
+    assert len(builds) == 4
+    mirror.close()